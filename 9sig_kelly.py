@@ -1,6 +1,7 @@
 #!/usr/bin/env -S uv run --quiet --script
 # /// script
 # dependencies = [
+#   "numpy",
 # ]
 # ///
 """
@@ -78,19 +79,47 @@ Core rules:
     - CAGR from initial_value (config) vs last total_value.
     - Max drawdown from total_value series.
 
-Deterministic, non-interactive, CLI-driven. Uses only stdlib + sqlite3.
+- Historical simulation (--simulate PRICES_CSV):
+    - Runs the same 9-Sig rules on a daily price history from every start date
+      that leaves room for --sim-years, or on --bootstrap N resampled paths,
+      as one vectorised batch.
+    - Reports the distribution of CAGR and max drawdown against buy & hold, and
+      how often dry powder ran out before a BUY signal was funded.
+    - Never opens the state DB.
+
+Deterministic, non-interactive, CLI-driven. State is kept with sqlite3 only.
+The simulation code needs numpy and common.price_paths, which are imported in
+every mode, so run the script with uv from the repository root.
+
+Usage:
+./9sig_kelly.py --init --initial-date 2024-01-02 --initial-value 100000 --initial-tqqq-price 50
+./9sig_kelly.py --as-of-date 2024-04-02 --tqqq-price 55
+./9sig_kelly.py --simulate tqqq.csv --sim-years 10
+./9sig_kelly.py --simulate tqqq.csv --sim-years 20 --bootstrap 5000 --seed 1
 """
 
 import argparse
+import csv
 import logging
 import math
 import os
 import sqlite3
 import sys
+import time
+from bisect import bisect_left
 from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Iterable, List, Optional, Tuple
 
+import numpy as np
+
+from common.price_paths import (
+    PNL_PERCENTILES,
+    TRADING_DAYS,
+    bootstrap_log_returns,
+    price_paths,
+)
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -706,6 +735,270 @@ def metrics_from_db(
     return cagr, max_dd, start_date, end_date
 
 
+# --------------------------------------------------------------------------------------
+# Historical simulation (vectorised, no DB access)
+# --------------------------------------------------------------------------------------
+
+REBALANCES_PER_YEAR = 4
+TRADING_DAYS_PER_REBALANCE = TRADING_DAYS // REBALANCES_PER_YEAR
+# Portfolio value a simulated 1.0 stands for when --initial-value is not given
+DEFAULT_SIMULATION_VALUE = 100_000.0
+
+
+@dataclass
+class SimulationResult:
+    """
+    Outcome of the 9-Sig rules on many price paths, one entry per path.
+    """
+
+    years: np.ndarray
+    totals: np.ndarray  # (paths x rebalances + 1) values after each rebalance
+    equity_prices: np.ndarray  # (paths x rebalances + 1) prices at each rebalance
+    out_of_cash: np.ndarray  # (paths x rebalances) no dry powder left after rebalance
+
+    @property
+    def cagr(self) -> np.ndarray:
+        return (self.totals[:, -1] / self.totals[:, 0]) ** (1.0 / self.years) - 1.0
+
+    @property
+    def max_drawdown(self) -> np.ndarray:
+        return max_drawdowns(self.totals)
+
+    @property
+    def buy_and_hold_cagr(self) -> np.ndarray:
+        growth = self.equity_prices[:, -1] / self.equity_prices[:, 0]
+        return growth ** (1.0 / self.years) - 1.0
+
+    @property
+    def buy_and_hold_max_drawdown(self) -> np.ndarray:
+        return max_drawdowns(self.equity_prices)
+
+
+def max_drawdowns(values: np.ndarray) -> np.ndarray:
+    """
+    Max drawdown of each row of values, as compute_max_drawdown does for one series.
+    """
+    return np.min(values / np.maximum.accumulate(values, axis=1), axis=1) - 1.0
+
+
+def simulate_9sig(
+    equity_prices: np.ndarray,
+    signal_rate: float,
+    start_allocation_equity: float,
+    start_allocation_bond: float,
+    initial_value: float = DEFAULT_SIMULATION_VALUE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run the apply_9sig_rebalance rules on every row of equity_prices at once.
+
+    Args:
+        equity_prices: (paths x rebalances + 1) equity prices, the first column
+            at the initial allocation and one column per scheduled rebalance.
+        signal_rate: signal rate per period (e.g. 0.09 for 9%).
+        start_allocation_equity: initial fraction allocated to the equity.
+        start_allocation_bond: initial fraction kept as dry powder.
+        initial_value: portfolio value the 1.0 notional stands for. It scales
+            the $1e-6 HOLD tolerance of apply_9sig_rebalance.
+
+    Dry powder is held at a constant price of 1.0 and the initial value is 1.0.
+
+    Returns:
+        (totals, out_of_cash): (paths x rebalances + 1) total values after each
+        rebalance, and (paths x rebalances) flags of rebalances that left no dry
+        powder, either a BUY capped at the total value or one cash could not fund.
+    """
+    n_paths, n_points = equity_prices.shape
+    equity_value = np.full(n_paths, start_allocation_equity)
+    cash = np.full(n_paths, start_allocation_bond)
+    units = equity_value / equity_prices[:, 0]
+
+    totals = np.empty((n_paths, n_points))
+    totals[:, 0] = equity_value + cash
+    out_of_cash = np.zeros((n_paths, n_points - 1), dtype=bool)
+    hold_tolerance = 1e-6 / initial_value
+
+    for q in range(1, n_points):
+        price = equity_prices[:, q]
+        current = units * price
+        target = equity_value * (1.0 + signal_rate)
+        effective = np.minimum(target, current + cash)
+
+        hold = np.isclose(current, effective, rtol=1e-9, atol=hold_tolerance)
+        sell = ~hold & (current > effective)
+        shortfall = np.where(~hold & ~sell, effective - current, 0.0)
+        spend = np.minimum(shortfall, cash)
+
+        equity_value = np.where(sell, effective, current + spend)
+        cash = np.where(sell, cash + current - effective, cash - spend)
+        units = equity_value / price
+        totals[:, q] = equity_value + cash
+        out_of_cash[:, q - 1] = cash <= 1e-9 * totals[:, q]
+
+    return totals, out_of_cash
+
+
+def load_price_history(path: str) -> Tuple[List[date], np.ndarray]:
+    """
+    Read a daily price history CSV with a Date column and an Adj Close or Close
+    column (e.g. a Yahoo Finance export). Rows without a positive price are skipped.
+    """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+        price_column = columns.get("adj close") or columns.get("close")
+        if "date" not in columns or price_column is None:
+            raise ValueError(f"{path} needs Date and Close (or Adj Close) columns")
+
+        prices = {}
+        for row in reader:
+            try:
+                day = parse_iso_date(row[columns["date"]][:10])
+                price = float(row[price_column])
+            except ValueError:
+                continue
+            if price > 0:
+                prices[day] = price
+
+    dates = sorted(prices)
+    return dates, np.array([prices[d] for d in dates])
+
+
+def start_date_paths(
+    dates: List[date], prices: np.ndarray, years: int
+) -> Tuple[np.ndarray, np.ndarray, List[date]]:
+    """
+    Price paths of a 9-Sig portfolio started on every day of the history that
+    leaves room for the full horizon.
+
+    Rebalances follow compute_next_rebalance_date from the previous rebalance and
+    land on the first trading day on or after the scheduled date.
+
+    Returns:
+        ((paths x rebalances + 1) prices, years of each path, start dates)
+    """
+    next_index = np.array(
+        [bisect_left(dates, add_months(d, 3)) for d in dates] + [len(dates)]
+    )
+    n_rebalances = years * REBALANCES_PER_YEAR
+    index = np.empty((len(dates), n_rebalances + 1), dtype=int)
+    index[:, 0] = np.arange(len(dates))
+    for q in range(1, n_rebalances + 1):
+        index[:, q] = next_index[index[:, q - 1]]
+    index = index[index[:, -1] < len(dates)]
+
+    ordinals = np.array([d.toordinal() for d in dates])
+    path_years = (ordinals[index[:, -1]] - ordinals[index[:, 0]]) / 365.25
+    return prices[index], path_years, [dates[i] for i in index[:, 0]]
+
+
+def bootstrap_paths(
+    prices: np.ndarray, years: int, n_paths: int, block_size: int, seed: Optional[int]
+) -> np.ndarray:
+    """
+    (paths x rebalances + 1) prices at each rebalance of paths resampled in blocks
+    of daily log returns from the history, rebalancing every quarter of a year.
+    """
+    log_returns = np.diff(np.log(prices))
+    steps = years * TRADING_DAYS
+    sampled = bootstrap_log_returns(
+        log_returns, n_paths, steps, block_size, rng=np.random.default_rng(seed)
+    )
+    return price_paths(1.0, sampled)[:, ::TRADING_DAYS_PER_REBALANCE]
+
+
+def format_distribution(label: str, values: np.ndarray) -> str:
+    percentiles = np.percentile(values, PNL_PERCENTILES)
+    cells = [values.mean(), *percentiles]
+    return f"{label:<24}" + "".join(f"{v * 100:>9.2f}%" for v in cells)
+
+
+def handle_simulation(args: argparse.Namespace) -> None:
+    """
+    Historical simulation mode:
+    - Runs the 9-Sig rules over a price history from every possible start date,
+      or over bootstrapped paths, all in one vectorised batch.
+    - Prints the distribution of CAGR and max drawdown (from rebalance values, as
+      in the status report) and how often dry powder ran out.
+    - Does NOT open or modify the state DB.
+    """
+    try:
+        dates, prices = load_price_history(args.simulate)
+    except (OSError, ValueError) as exc:
+        print(f"error: cannot read --simulate prices: {exc}", file=sys.stderr)
+        sys.exit(1)
+    if len(dates) < 2:
+        print("error: --simulate needs at least two prices.", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    if args.bootstrap:
+        equity_prices = bootstrap_paths(
+            prices, args.sim_years, args.bootstrap, args.block_size, args.seed
+        )
+        years = np.full(len(equity_prices), float(args.sim_years))
+        description = (
+            f"{len(equity_prices)} bootstrapped paths "
+            f"({args.block_size}-day blocks from {dates[0]} to {dates[-1]})"
+        )
+    else:
+        equity_prices, years, starts = start_date_paths(dates, prices, args.sim_years)
+        if not len(equity_prices):
+            print(
+                f"error: price history from {dates[0]} to {dates[-1]} is shorter "
+                f"than --sim-years {args.sim_years}.",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        description = (
+            f"{len(equity_prices)} start dates from {starts[0]} to {starts[-1]}"
+        )
+
+    totals, out_of_cash = simulate_9sig(
+        equity_prices,
+        args.signal_rate,
+        args.start_allocation_equity,
+        args.start_allocation_bond,
+        args.initial_value or DEFAULT_SIMULATION_VALUE,
+    )
+    result = SimulationResult(years, totals, equity_prices, out_of_cash)
+    LOGGER.info(
+        "Simulated %d paths x %d rebalances in %.3fs",
+        totals.shape[0],
+        totals.shape[1] - 1,
+        time.perf_counter() - started,
+    )
+
+    print(
+        f"9-Sig historical simulation: {description}, "
+        f"{args.sim_years} years ({totals.shape[1] - 1} rebalances) each, "
+        f"signal rate {args.signal_rate:.2%}, "
+        f"start allocation {args.start_allocation_equity:.0%}/"
+        f"{args.start_allocation_bond:.0%}."
+    )
+    print(
+        f"{'':<24}{'Mean':>10}"
+        + "".join(f"{'P' + str(p):>10}" for p in PNL_PERCENTILES)
+    )
+    print(format_distribution("9-Sig CAGR", result.cagr))
+    print(format_distribution("9-Sig max drawdown", result.max_drawdown))
+    print(format_distribution("Buy & hold CAGR", result.buy_and_hold_cagr))
+    print(
+        format_distribution("Buy & hold max drawdown", result.buy_and_hold_max_drawdown)
+    )
+
+    ran_out = out_of_cash.any(axis=1)
+    print(
+        f"Cash exhausted: {ran_out.mean():.2%} of paths at least once, "
+        f"{out_of_cash.mean():.2%} of rebalances left no dry powder"
+    )
+    if ran_out.any():
+        first = out_of_cash[ran_out].argmax(axis=1) + 1
+        print(
+            f"- First exhaustion (when it happens): median after "
+            f"{np.median(first):.0f} rebalances, earliest after {first.min()}"
+        )
+
+
 # --------------------------------------------------------------------------------------
 # High-level flows
 # --------------------------------------------------------------------------------------
@@ -1011,7 +1304,8 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--initial-value",
         type=float,
-        help="Initial total portfolio value (>0). Required with --init.",
+        help="Initial total portfolio value (>0). Required with --init. With "
+        "--simulate it sets the scale of the HOLD tolerance (default 100000).",
     )
     parser.add_argument(
         "--initial-tqqq-price",
@@ -1086,6 +1380,45 @@ def parse_args() -> argparse.Namespace:
         help="Cash-like asset price at as-of date (>0). Default: 1.0.",
     )
 
+    # Historical simulation arguments
+    parser.add_argument(
+        "--simulate",
+        type=str,
+        metavar="PRICES_CSV",
+        help=(
+            "Simulate the strategy on a daily price history CSV with Date and "
+            "Close (or Adj Close) columns instead of using the state DB."
+        ),
+    )
+    parser.add_argument(
+        "--sim-years",
+        type=int,
+        default=10,
+        help="Years simulated from each start date or per bootstrapped path. Default: 10.",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        metavar="N",
+        help=(
+            "Simulate N paths resampled from the daily returns of the history "
+            "instead of every start date. Default: 0 (every start date)."
+        ),
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=21,
+        help="Consecutive days resampled together with --bootstrap. Default: 21.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed of --bootstrap, for repeatable runs.",
+    )
+
     # Shared
     parser.add_argument(
         "--db-path",
@@ -1117,7 +1450,36 @@ def parse_args() -> argparse.Namespace:
     args = parser.parse_args()
 
     # Validation depending on mode
-    if args.init:
+    if args.simulate:
+        if args.init:
+            print("error: --simulate cannot be combined with --init.", file=sys.stderr)
+            sys.exit(1)
+        if args.sim_years <= 0:
+            print("error: --sim-years must be positive.", file=sys.stderr)
+            sys.exit(1)
+        if args.bootstrap < 0 or args.block_size <= 0:
+            print(
+                "error: --bootstrap must be non-negative and --block-size positive.",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        if args.initial_value is not None and args.initial_value <= 0:
+            print("error: --initial-value must be positive.", file=sys.stderr)
+            sys.exit(1)
+        if args.signal_rate < 0:
+            print(
+                "error: --signal-rate must be non-negative.",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        alloc_sum = args.start_allocation_equity + args.start_allocation_bond
+        if abs(alloc_sum - 1.0) > 1e-6:
+            print(
+                f"error: start allocations must sum to 1.0 (got {alloc_sum:.6f}).",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+    elif args.init:
         # Required init args
         missing = []
         if not args.initial_date:
@@ -1192,6 +1554,10 @@ def main() -> None:
     args = parse_args()
     setup_logging(args.verbose)
 
+    if args.simulate:
+        handle_simulation(args)
+        return
+
     db_path = resolve_db_path(args.db_path)
     conn = get_db_connection(db_path)
     ensure_schema(conn)
@@ -1232,8 +1598,6 @@ def main() -> None:
         if args.output_csv:
             try:
                 rows = load_all_rebalances(conn)
-                import csv  # stdlib, allowed
-
                 with open(args.output_csv, "w", newline="") as f:
                     writer = csv.DictWriter(
                         f,
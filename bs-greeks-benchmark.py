@@ -0,0 +1,141 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "pandas",
+#   "numpy",
+#   "scipy",
+# ]
+# ///
+"""
+Black-Scholes Greeks Benchmark
+
+Measures throughput (options per second) of the shared vectorised pricing engine in
+common/black_scholes.py. Each batch prices random calls and puts with price only and
+with price plus all first, second and third order greeks. The scalar row compares
+against the old pattern of calling the pricer once per option.
+
+Usage:
+./bs-greeks-benchmark.py -h
+
+./bs-greeks-benchmark.py
+./bs-greeks-benchmark.py --sizes 10000 1000000 --repeat 5
+"""
+
+import logging
+import time
+from argparse import ArgumentParser, RawDescriptionHelpFormatter
+
+import numpy as np
+import pandas as pd
+
+from common.black_scholes import bs_greeks, bs_price
+from common.logger import setup_logging
+
+
+def random_options(size, seed=42):
+    rng = np.random.default_rng(seed)
+    return dict(
+        S=rng.uniform(50, 150, size),
+        K=rng.uniform(50, 150, size),
+        T=rng.uniform(1 / 365, 2, size),
+        sigma=rng.uniform(0.05, 1.0, size),
+        r=rng.uniform(0.0, 0.06, size),
+        q=rng.uniform(0.0, 0.03, size),
+        is_call=rng.random(size) < 0.5,
+    )
+
+
+def best_time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def benchmark_batch(size, repeat):
+    options = random_options(size)
+    price_seconds = best_time(lambda: bs_price(**options), repeat)
+    greeks_seconds = best_time(lambda: bs_greeks(**options), repeat)
+    return {
+        "Mode": "vectorised",
+        "Options": size,
+        "PriceOnly/s": size / price_seconds,
+        "AllGreeks/s": size / greeks_seconds,
+    }
+
+
+def benchmark_scalar(size, repeat):
+    options = random_options(size)
+    rows = [{name: values[i] for name, values in options.items()} for i in range(size)]
+    price_seconds = best_time(lambda: [bs_price(**row) for row in rows], repeat)
+    greeks_seconds = best_time(lambda: [bs_greeks(**row) for row in rows], repeat)
+    return {
+        "Mode": "one call per option",
+        "Options": size,
+        "PriceOnly/s": size / price_seconds,
+        "AllGreeks/s": size / greeks_seconds,
+    }
+
+
+def parse_args():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        dest="verbose",
+        help="Increase verbosity of logging output",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 100_000, 1_000_000],
+        help="Batch sizes to price in one call",
+    )
+    parser.add_argument(
+        "--scalar-count",
+        type=int,
+        default=2_000,
+        help="Number of options priced one call at a time for the baseline",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed runs per measurement, the fastest is reported",
+    )
+    return parser.parse_args()
+
+
+def main(args):
+    results = []
+    for size in args.sizes:
+        logging.info(f"Benchmarking batch of {size} options")
+        results.append(benchmark_batch(size, args.repeat))
+
+    logging.info(f"Benchmarking {args.scalar_count} scalar calls")
+    results.append(benchmark_scalar(args.scalar_count, args.repeat))
+
+    results_df = pd.DataFrame(results)
+    print(
+        results_df.to_string(
+            index=False,
+            formatters={
+                "Options": "{:,}".format,
+                "PriceOnly/s": "{:,.0f}".format,
+                "AllGreeks/s": "{:,.0f}".format,
+            },
+        )
+    )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging(args.verbose)
+    main(args)
@@ -12,7 +12,8 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 import yfinance as yf
-from scipy.stats import norm
+
+from common.black_scholes import bs_greeks
 
 # Define the necessary inputs
 underlying = "SPY"
@@ -45,33 +46,6 @@ expiry_date = datetime.strptime(expiry, "%Y-%m-%d")
 time_to_expiration = (expiry_date - end_date).days / 365
 
 
-# Define the Black-Scholes function
-def black_scholes(
-    underlying_price,
-    strike_price,
-    risk_free_rate,
-    time_to_expiration,
-    volatility,
-    option_type,
-):
-    d1 = (
-        np.log(underlying_price / strike_price)
-        + (risk_free_rate + 0.5 * volatility**2) * time_to_expiration
-    ) / (volatility * np.sqrt(time_to_expiration))
-    d2 = d1 - volatility * np.sqrt(time_to_expiration)
-
-    if option_type == "call":
-        option_price = underlying_price * norm.cdf(d1) - strike_price * np.exp(
-            -risk_free_rate * time_to_expiration
-        ) * norm.cdf(d2)
-    else:
-        option_price = strike_price * np.exp(
-            -risk_free_rate * time_to_expiration
-        ) * norm.cdf(-d2) - underlying_price * norm.cdf(-d1)
-
-    return option_price
-
-
 # Define the option parameters
 underlying_price = df["Close"].iloc[-1]  # Current underlying price
 strike_price = 590  # Example strike price
@@ -87,13 +61,17 @@ print(
     option_type,
 )
 
-# Calculate the option price using the Black-Scholes model
-option_price = black_scholes(
+# Calculate the option price and greeks using the Black-Scholes model
+greeks = bs_greeks(
     underlying_price,
     strike_price,
-    risk_free_rate,
     time_to_expiration,
     volatility,
-    option_type,
+    risk_free_rate,
+    is_call=option_type == "call",
+)
+print(f"The option price is: {greeks['price']:.2f}")
+print(
+    f"Delta: {greeks['delta']:.4f} | Gamma: {greeks['gamma']:.4f} | "
+    f"Theta/day: {greeks['theta'] / 365:.4f} | Vega/1%: {greeks['vega'] / 100:.4f}"
 )
-print(f"The option price is: {option_price:.2f}")
@@ -2,6 +2,7 @@
 # /// script
 # dependencies = [
 #   "pandas",
+#   "numpy",
 # ]
 # ///
 """
@@ -15,19 +16,26 @@ Usage:
 
 ./calendar-scanner.py --database options.db -v   # INFO logging
 ./calendar-scanner.py --database options.db -vv  # DEBUG logging
+./calendar-scanner.py --database options.db --as-of 2025-01-10  # Scan an earlier snapshot
+./calendar-scanner.py --database options.db --history --top-n 5  # Scan every quote date
 """
 
 import logging
+import os
 import sqlite3
 import subprocess
 import sys
 import tempfile
+import time
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 # =============================================================================
@@ -90,6 +98,16 @@ REQUIRED_COLUMNS = [
     "QuoteDate",
 ]
 
+# Per-leg columns (prefixed Call/Put) mapped to CalendarTrade field suffixes
+LEG_FIELDS = {
+    "Mid": "mid",
+    "Delta": "delta",
+    "IV": "iv",
+    "Vol": "volume",
+    "OpenInt": "oi",
+    "SpreadPct": "spread_pct",
+}
+
 
 # =============================================================================
 # Data Classes
@@ -454,16 +472,9 @@ def get_adjustment_playbook(trade: CalendarTrade) -> str:
 # =============================================================================
 
 
-def discover_table(
-    conn: sqlite3.Connection, target_date: Optional[datetime] = None
-) -> str:
-    """
-    Discover the appropriate options table for the given date.
-    Falls back to the most recent table if exact match not found.
-    """
+def list_quote_tables(conn: sqlite3.Connection) -> list[str]:
+    """Return the per-day SPX quote tables, most recent first."""
     cursor = conn.cursor()
-
-    # Get all tables matching the pattern
     cursor.execute(
         """
         SELECT name FROM sqlite_master
@@ -471,14 +482,34 @@ def discover_table(
         ORDER BY name DESC
     """
     )
+    return [row[0] for row in cursor.fetchall()]
 
-    tables = [row[0] for row in cursor.fetchall()]
+
+def discover_table(
+    conn: sqlite3.Connection,
+    target_date: Optional[datetime] = None,
+    as_of: Optional[datetime] = None,
+) -> str:
+    """
+    Discover the appropriate options table for the given date.
+    With as_of, the most recent table dated on or before it is used. Otherwise
+    falls back to the most recent table if exact match not found.
+    """
+    tables = list_quote_tables(conn)
 
     if not tables:
         raise ValueError("No SPX quote data tables found in database")
 
     logging.debug(f"Found {len(tables)} SPX tables in database")
 
+    if as_of:
+        as_of_suffix = as_of.strftime("%Y%m%d")
+        for table in tables:
+            if table.removeprefix("spx_quotedata_") <= as_of_suffix:
+                logging.info(f"Using latest table on or before {as_of_suffix}: {table}")
+                return table
+        raise ValueError(f"No SPX quote data tables on or before {as_of_suffix}")
+
     # If target date provided, look for exact match
     if target_date:
         target_suffix = target_date.strftime("%Y%m%d")
@@ -511,8 +542,63 @@ def validate_table_schema(conn: sqlite3.Connection, table_name: str) -> bool:
     return True
 
 
-def load_options_data(conn: sqlite3.Connection, table_name: str) -> pd.DataFrame:
-    """Load and normalize options data from the database."""
+def select_quote_date(
+    conn: sqlite3.Connection, table_name: str, as_of: Optional[datetime] = None
+) -> Optional[str]:
+    """
+    Return the stored QuoteDate value of the snapshot to scan.
+    Uses the latest snapshot, or the latest one on or before as_of.
+    """
+    quote_dates = pd.read_sql_query(
+        f"SELECT DISTINCT QuoteDate FROM {table_name}", conn
+    )["QuoteDate"]
+    parsed = pd.to_datetime(quote_dates)
+
+    if as_of is not None:
+        on_or_before = parsed.dt.normalize() <= pd.Timestamp(as_of).normalize()
+        quote_dates = quote_dates[on_or_before]
+        parsed = parsed[on_or_before]
+
+    if quote_dates.empty:
+        return None
+
+    logging.debug(f"Found {len(quote_dates)} candidate quote dates in {table_name}")
+    return quote_dates.loc[parsed.idxmax()]
+
+
+def select_expirations(
+    conn: sqlite3.Connection, table_name: str, quote_date: str
+) -> list[str]:
+    """Return the stored ExpirationDate values inside the front or back DTE window."""
+    expirations = pd.read_sql_query(
+        f"SELECT DISTINCT ExpirationDate FROM {table_name} WHERE QuoteDate = ?",
+        conn,
+        params=(quote_date,),
+    )["ExpirationDate"]
+    dte = (pd.to_datetime(expirations) - pd.to_datetime(quote_date)).dt.days
+    in_window = dte.between(FRONT_DTE_MIN, FRONT_DTE_MAX) | dte.between(
+        BACK_DTE_MIN, BACK_DTE_MAX
+    )
+    return expirations[in_window].tolist()
+
+
+def load_options_data(
+    conn: sqlite3.Connection, table_name: str, as_of: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    Load and normalize options data for a single snapshot.
+    The quote date, DTE windows and liquidity filters are applied in SQL so only
+    rows that can form a calendar are read.
+    """
+    started = time.perf_counter()
+
+    quote_date = select_quote_date(conn, table_name, as_of)
+    expirations = select_expirations(conn, table_name, quote_date) if quote_date else []
+    logging.info(
+        f"Snapshot {quote_date}: {len(expirations)} expirations in "
+        f"{FRONT_DTE_MIN}-{FRONT_DTE_MAX} / {BACK_DTE_MIN}-{BACK_DTE_MAX} DTE"
+    )
+
     query = f"""
         SELECT
             ExpirationDate,
@@ -522,12 +608,27 @@ def load_options_data(conn: sqlite3.Connection, table_name: str) -> pd.DataFrame
             PutBid, PutAsk, PutIV, PutDelta, PutOpenInt, PutVol,
             QuoteDate
         FROM {table_name}
-        WHERE CallBid > 0 AND CallAsk > 0 AND PutBid > 0 AND PutAsk > 0
+        WHERE QuoteDate = ?
+          AND ExpirationDate IN ({", ".join("?" * len(expirations))})
+          AND CallBid > 0 AND CallAsk > 0 AND PutBid > 0 AND PutAsk > 0
+          AND CallVol >= ? AND CallOpenInt >= ?
+          AND PutVol >= ? AND PutOpenInt >= ?
     """
+    params = [quote_date, *expirations] + [MIN_VOLUME, MIN_OPEN_INTEREST] * 2
+
+    df = pd.read_sql_query(query, conn, params=params)
+    elapsed = time.perf_counter() - started
+    logging.info(f"Loaded {len(df)} rows from {table_name} in {elapsed:.2f}s")
+    print(
+        f"Loaded {len(df):,} rows for quote date {quote_date} "
+        f"({len(expirations)} expirations) in {elapsed:.2f}s"
+    )
+
+    return normalize_options_data(df)
 
-    df = pd.read_sql_query(query, conn)
-    logging.info(f"Loaded {len(df)} rows from {table_name}")
 
+def normalize_options_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse dates and add DTE, mid price, spread and ATM distance columns."""
     # Parse dates
     df["ExpirationDate"] = pd.to_datetime(df["ExpirationDate"])
     df["QuoteDate"] = pd.to_datetime(df["QuoteDate"])
@@ -580,297 +681,186 @@ def get_back_month_options(df: pd.DataFrame) -> pd.DataFrame:
     return df[mask].copy()
 
 
-def find_calendar_pairs(
-    front_df: pd.DataFrame, back_df: pd.DataFrame
-) -> list[CalendarTrade]:
-    """Find all valid calendar spread pairs."""
-    trades = []
+def find_calendar_pairs(front_df: pd.DataFrame, back_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Find all valid calendar spread pairs.
+    Front and back legs are merge-joined on strike and the hard reject rules are applied
+    to whole columns. Returns one row per (strike, back expiration, option type).
+    """
     spot_price = front_df["SpotPrice"].iloc[0] if len(front_df) > 0 else 0
 
-    # Get unique strikes present in both front and back months
-    front_strikes = set(front_df["StrikePrice"].unique())
-    back_strikes = set(back_df["StrikePrice"].unique())
-    common_strikes = front_strikes & back_strikes
-
+    # The first front-month row of each strike is paired with every back-month row
+    pairs = front_df.drop_duplicates("StrikePrice").merge(
+        back_df, on="StrikePrice", suffixes=("_front", "_back")
+    )
     logging.info(
-        f"Found {len(common_strikes)} common strikes between front and back months"
+        f"Found {pairs['StrikePrice'].nunique()} common strikes between front and back months"
     )
 
-    for strike in common_strikes:
-        front_row = front_df[front_df["StrikePrice"] == strike].iloc[0]
-        back_rows = back_df[back_df["StrikePrice"] == strike]
-
-        for _, back_row in back_rows.iterrows():
-            # Ensure back expiration is after front
-            if back_row["ExpirationDate"] <= front_row["ExpirationDate"]:
-                continue
-
-            # Create CALL calendar
-            call_trade = create_calendar_trade(
-                "CALL", strike, front_row, back_row, spot_price
-            )
-            if call_trade and validate_calendar_trade(call_trade):
-                trades.append(call_trade)
-
-            # Create PUT calendar
-            put_trade = create_calendar_trade(
-                "PUT", strike, front_row, back_row, spot_price
-            )
-            if put_trade and validate_calendar_trade(put_trade):
-                trades.append(put_trade)
-
-    logging.info(f"Found {len(trades)} valid calendar trades")
-    return trades
-
-
-def create_calendar_trade(
-    option_type: str,
-    strike: float,
-    front_row: pd.Series,
-    back_row: pd.Series,
-    spot_price: float,
-) -> Optional[CalendarTrade]:
-    """Create a CalendarTrade object from front and back option rows."""
-    try:
-        if option_type == "CALL":
-            front_mid = front_row["CallMid"]
-            back_mid = back_row["CallMid"]
-            front_delta = front_row["CallDelta"]
-            back_delta = back_row["CallDelta"]
-            front_iv = front_row["CallIV"]
-            back_iv = back_row["CallIV"]
-            front_volume = int(front_row["CallVol"])
-            back_volume = int(back_row["CallVol"])
-            front_oi = int(front_row["CallOpenInt"])
-            back_oi = int(back_row["CallOpenInt"])
-            front_spread_pct = front_row["CallSpreadPct"]
-            back_spread_pct = back_row["CallSpreadPct"]
-        else:
-            front_mid = front_row["PutMid"]
-            back_mid = back_row["PutMid"]
-            front_delta = front_row["PutDelta"]
-            back_delta = back_row["PutDelta"]
-            front_iv = front_row["PutIV"]
-            back_iv = back_row["PutIV"]
-            front_volume = int(front_row["PutVol"])
-            back_volume = int(back_row["PutVol"])
-            front_oi = int(front_row["PutOpenInt"])
-            back_oi = int(back_row["PutOpenInt"])
-            front_spread_pct = front_row["PutSpreadPct"]
-            back_spread_pct = back_row["PutSpreadPct"]
-
-        # Validate IVs are positive
-        if front_iv <= 0 or back_iv <= 0:
-            return None
-
-        net_debit = back_mid - front_mid
-        net_delta = back_delta - front_delta
-        iv_ratio = back_iv / front_iv if front_iv > 0 else 0
-        atm_distance_pct = (
-            abs(strike - spot_price) / spot_price if spot_price > 0 else 1
-        )
-        debit_pct_of_spot = net_debit / spot_price if spot_price > 0 else 1
-        dte_gap = int(back_row["DTE"]) - int(front_row["DTE"])
-
-        return CalendarTrade(
-            option_type=option_type,
-            strike=strike,
-            front_expiration=front_row["ExpirationDate"].to_pydatetime(),
-            back_expiration=back_row["ExpirationDate"].to_pydatetime(),
-            front_dte=int(front_row["DTE"]),
-            back_dte=int(back_row["DTE"]),
-            front_mid=front_mid,
-            back_mid=back_mid,
-            net_debit=net_debit,
-            front_delta=front_delta,
-            back_delta=back_delta,
-            net_delta=net_delta,
-            front_iv=front_iv,
-            back_iv=back_iv,
-            iv_ratio=iv_ratio,
-            front_volume=front_volume,
-            back_volume=back_volume,
-            front_oi=front_oi,
-            back_oi=back_oi,
-            front_spread_pct=front_spread_pct,
-            back_spread_pct=back_spread_pct,
-            atm_distance_pct=atm_distance_pct,
-            spot_price=spot_price,
-            debit_pct_of_spot=debit_pct_of_spot,
-            dte_gap=dte_gap,
-        )
-    except Exception as e:
-        logging.debug(f"Error creating calendar trade: {e}")
-        return None
-
-
-def validate_calendar_trade(trade: CalendarTrade) -> bool:
-    """
-    Apply hard reject rules before scoring.
-    These are non-negotiable filters based on production-grade criteria.
-    """
-    # Hard Reject Rule 1: Back IV must be > Front IV
-    if trade.back_iv <= trade.front_iv:
-        logging.debug(
-            f"HARD REJECT: Back IV ({trade.back_iv:.4f}) <= Front IV ({trade.front_iv:.4f})"
+    # Ensure back expiration is after front
+    pairs = pairs[pairs["ExpirationDate_back"] > pairs["ExpirationDate_front"]]
+
+    legs = []
+    for option_type, prefix in (("CALL", "Call"), ("PUT", "Put")):
+        leg = pd.DataFrame(
+            {
+                "option_type": option_type,
+                "strike": pairs["StrikePrice"],
+                "front_expiration": pairs["ExpirationDate_front"],
+                "back_expiration": pairs["ExpirationDate_back"],
+                "front_dte": pairs["DTE_front"].astype(int),
+                "back_dte": pairs["DTE_back"].astype(int),
+            }
         )
-        return False
+        for column, field in LEG_FIELDS.items():
+            leg[f"front_{field}"] = pairs[f"{prefix}{column}_front"]
+            leg[f"back_{field}"] = pairs[f"{prefix}{column}_back"]
+        legs.append(leg)
 
-    # Hard Reject Rule 2: Front DTE must be >= 5
-    if trade.front_dte < HARD_REJECT_FRONT_DTE:
-        logging.debug(
-            f"HARD REJECT: Front DTE ({trade.front_dte}) < {HARD_REJECT_FRONT_DTE}"
-        )
-        return False
-
-    # Hard Reject Rule 3: Debit must be <= 2% of spot
-    if trade.debit_pct_of_spot > HARD_REJECT_MAX_DEBIT_PCT:
-        logging.debug(
-            f"HARD REJECT: Debit {trade.debit_pct_of_spot*100:.2f}% > {HARD_REJECT_MAX_DEBIT_PCT*100}%"
-        )
-        return False
-
-    # Hard Reject Rule 4: Liquidity minimum
-    if trade.front_oi < MIN_OPEN_INTEREST or trade.back_oi < MIN_OPEN_INTEREST:
-        logging.debug(
-            f"HARD REJECT: OI too low (Front: {trade.front_oi}, Back: {trade.back_oi})"
-        )
-        return False
+    candidates = pd.concat(legs, ignore_index=True).sort_values(
+        ["strike", "back_expiration", "option_type"], kind="mergesort"
+    )
+    candidates = candidates.astype(
+        {
+            "front_volume": int,
+            "back_volume": int,
+            "front_oi": int,
+            "back_oi": int,
+        }
+    )
 
-    # Hard Reject Rule 5: Net delta must be <= 0.30
-    if abs(trade.net_delta) > HARD_REJECT_MAX_NET_DELTA:
-        logging.debug(
-            f"HARD REJECT: Net delta {abs(trade.net_delta):.4f} > {HARD_REJECT_MAX_NET_DELTA}"
+    candidates["net_debit"] = candidates["back_mid"] - candidates["front_mid"]
+    candidates["net_delta"] = candidates["back_delta"] - candidates["front_delta"]
+    candidates["iv_ratio"] = candidates["back_iv"] / candidates["front_iv"]
+    candidates["spot_price"] = spot_price
+    if spot_price > 0:
+        candidates["atm_distance_pct"] = (
+            abs(candidates["strike"] - spot_price) / spot_price
         )
-        return False
-
-    # Net debit must be positive (we're buying a calendar)
-    if trade.net_debit <= 0:
-        logging.debug(f"HARD REJECT: Net debit {trade.net_debit:.2f} <= 0")
-        return False
+        candidates["debit_pct_of_spot"] = candidates["net_debit"] / spot_price
+    else:
+        candidates["atm_distance_pct"] = 1
+        candidates["debit_pct_of_spot"] = 1
+    candidates["dte_gap"] = candidates["back_dte"] - candidates["front_dte"]
+
+    # IVs must be positive and the hard reject rules are non-negotiable
+    hard_rejects = {
+        "IV not positive": (candidates["front_iv"] <= 0) | (candidates["back_iv"] <= 0),
+        "Back IV <= Front IV": candidates["back_iv"] <= candidates["front_iv"],
+        f"Front DTE < {HARD_REJECT_FRONT_DTE}": (
+            candidates["front_dte"] < HARD_REJECT_FRONT_DTE
+        ),
+        f"Debit > {HARD_REJECT_MAX_DEBIT_PCT*100}% of spot": (
+            candidates["debit_pct_of_spot"] > HARD_REJECT_MAX_DEBIT_PCT
+        ),
+        "OI too low": (candidates["front_oi"] < MIN_OPEN_INTEREST)
+        | (candidates["back_oi"] < MIN_OPEN_INTEREST),
+        f"Net delta > {HARD_REJECT_MAX_NET_DELTA}": (
+            candidates["net_delta"].abs() > HARD_REJECT_MAX_NET_DELTA
+        ),
+        "Net debit <= 0": candidates["net_debit"] <= 0,
+    }
+    rejected = pd.Series(False, index=candidates.index)
+    for rule, mask in hard_rejects.items():
+        logging.debug(f"HARD REJECT: {rule}: {(mask & ~rejected).sum()} trades")
+        rejected |= mask
 
-    return True
+    trades = candidates[~rejected].reset_index(drop=True)
+    logging.info(f"Found {len(trades)} valid calendar trades")
+    return trades
 
 
-def score_calendar_trade(trade: CalendarTrade) -> tuple[float, dict]:
+def score_calendar_trades(trades: pd.DataFrame) -> pd.DataFrame:
     """
     Production-grade scoring model for long calendar spreads.
-    Returns total score (0-100) and component breakdown.
+    Adds the total score (0-100) and the weighted component columns.
     """
 
     # Component A: IV Term Structure Score (30%)
-    iv_ratio = trade.iv_ratio
-    if iv_ratio < 1.00:
-        iv_term_score = 0
-    elif iv_ratio < 1.05:
-        iv_term_score = 40
-    elif iv_ratio < 1.10:
-        iv_term_score = 70
-    elif iv_ratio < 1.20:
-        iv_term_score = 90
-    else:
-        iv_term_score = 100
-
-    trade.score_iv_term = (iv_term_score / 100) * WEIGHT_IV_TERM
+    iv_ratio = trades["iv_ratio"]
+    iv_term_score = np.select(
+        [iv_ratio < 1.00, iv_ratio < 1.05, iv_ratio < 1.10, iv_ratio < 1.20],
+        [0, 40, 70, 90],
+        default=100,
+    )
 
     # Component B: ATM Proximity Score (20%)
-    atm_dist_pct = trade.atm_distance_pct * 100  # Convert to percentage
-    if atm_dist_pct > 3.0:
-        atm_score = 0
-    elif atm_dist_pct >= 2.0:
-        atm_score = 30
-    elif atm_dist_pct >= 1.0:
-        atm_score = 60
-    elif atm_dist_pct >= 0.5:
-        atm_score = 85
-    else:
-        atm_score = 100
-
-    trade.score_atm = (atm_score / 100) * WEIGHT_ATM
+    atm_dist_pct = trades["atm_distance_pct"] * 100  # Convert to percentage
+    atm_score = np.select(
+        [
+            atm_dist_pct > 3.0,
+            atm_dist_pct >= 2.0,
+            atm_dist_pct >= 1.0,
+            atm_dist_pct >= 0.5,
+        ],
+        [0, 30, 60, 85],
+        default=100,
+    )
 
     # Component C: Liquidity Score (15%)
     # Score each leg independently, take minimum
     def score_leg_liquidity(oi, spread_pct):
-        if oi < 500 or spread_pct > 0.10:
-            return 0
-        elif oi < 1000:
-            return 50
-        elif oi < 5000:
-            return 75
-        else:  # OI >= 5000 and tight spread
-            return 100 if spread_pct < 0.05 else 85
-
-    front_liq = score_leg_liquidity(trade.front_oi, trade.front_spread_pct)
-    back_liq = score_leg_liquidity(trade.back_oi, trade.back_spread_pct)
-    liquidity_score = min(front_liq, back_liq)
+        return np.select(
+            [(oi < 500) | (spread_pct > 0.10), oi < 1000, oi < 5000, spread_pct < 0.05],
+            [0, 50, 75, 100],
+            default=85,  # OI >= 5000 without a tight spread
+        )
 
-    trade.score_liquidity = (liquidity_score / 100) * WEIGHT_LIQUIDITY
+    liquidity_score = np.minimum(
+        score_leg_liquidity(trades["front_oi"], trades["front_spread_pct"]),
+        score_leg_liquidity(trades["back_oi"], trades["back_spread_pct"]),
+    )
 
     # Component D: Debit Efficiency Score (15%)
-    debit_pct = trade.debit_pct_of_spot * 100
-    if debit_pct > 2.0:
-        debit_score = 0
-    elif debit_pct >= 1.5:
-        debit_score = 40
-    elif debit_pct >= 1.0:
-        debit_score = 70
-    elif debit_pct >= 0.5:
-        debit_score = 90
-    else:
-        debit_score = 100
-
-    trade.score_debit = (debit_score / 100) * WEIGHT_DEBIT_EFFICIENCY
+    debit_pct = trades["debit_pct_of_spot"] * 100
+    debit_score = np.select(
+        [debit_pct > 2.0, debit_pct >= 1.5, debit_pct >= 1.0, debit_pct >= 0.5],
+        [0, 40, 70, 90],
+        default=100,
+    )
 
     # Component E: Delta Neutrality Score (10%)
-    abs_net_delta = abs(trade.net_delta)
-    if abs_net_delta > 0.25:
-        delta_score = 0
-    elif abs_net_delta >= 0.15:
-        delta_score = 50
-    elif abs_net_delta >= 0.05:
-        delta_score = 80
-    else:
-        delta_score = 100
-
-    trade.score_delta = (delta_score / 100) * WEIGHT_DELTA_NEUTRALITY
+    abs_net_delta = trades["net_delta"].abs()
+    delta_score = np.select(
+        [abs_net_delta > 0.25, abs_net_delta >= 0.15, abs_net_delta >= 0.05],
+        [0, 50, 80],
+        default=100,
+    )
 
     # Component F: Structure Quality Score (10%)
-    front_dte = trade.front_dte
-    dte_gap = trade.dte_gap
-
-    if front_dte < 5:
-        structure_score = 0
-    elif dte_gap < 14:
-        structure_score = 40
-    elif dte_gap >= 30 and dte_gap <= 45:
-        structure_score = 100
-    elif dte_gap >= 20 and dte_gap <= 40:
-        structure_score = 80
-    else:
-        structure_score = 60
+    front_dte = trades["front_dte"]
+    dte_gap = trades["dte_gap"]
+    structure_score = np.select(
+        [
+            front_dte < 5,
+            dte_gap < 14,
+            (dte_gap >= 30) & (dte_gap <= 45),
+            (dte_gap >= 20) & (dte_gap <= 40),
+        ],
+        [0, 40, 100, 80],
+        default=60,
+    )
 
-    trade.score_structure = (structure_score / 100) * WEIGHT_STRUCTURE_QUALITY
+    scored = trades.assign(
+        score_iv_term=(iv_term_score / 100) * WEIGHT_IV_TERM,
+        score_atm=(atm_score / 100) * WEIGHT_ATM,
+        score_liquidity=(liquidity_score / 100) * WEIGHT_LIQUIDITY,
+        score_debit=(debit_score / 100) * WEIGHT_DEBIT_EFFICIENCY,
+        score_delta=(delta_score / 100) * WEIGHT_DELTA_NEUTRALITY,
+        score_structure=(structure_score / 100) * WEIGHT_STRUCTURE_QUALITY,
+    )
 
     # Total Score
     total_score = (
-        trade.score_iv_term
-        + trade.score_atm
-        + trade.score_liquidity
-        + trade.score_debit
-        + trade.score_delta
-        + trade.score_structure
+        scored["score_iv_term"]
+        + scored["score_atm"]
+        + scored["score_liquidity"]
+        + scored["score_debit"]
+        + scored["score_delta"]
+        + scored["score_structure"]
     )
-
-    breakdown = {
-        "iv_term": trade.score_iv_term,
-        "atm": trade.score_atm,
-        "liquidity": trade.score_liquidity,
-        "debit": trade.score_debit,
-        "delta": trade.score_delta,
-        "structure": trade.score_structure,
-    }
-
-    return min(100, max(0, total_score)), breakdown
+    scored["score"] = total_score.clip(0, 100)
+    return scored
 
 
 def evaluate_roll_triggers(trade: CalendarTrade):
@@ -903,24 +893,257 @@ def evaluate_roll_triggers(trade: CalendarTrade):
     trade.roll_reason = " | ".join(reasons) if reasons else "Hold"
 
 
-def rank_trades(trades: list[CalendarTrade]) -> list[CalendarTrade]:
-    """Score, evaluate roll triggers, and rank all trades."""
-    scored_trades = []
+def select_ranked_trades(
+    scored: pd.DataFrame, top_n: Optional[int] = None
+) -> pd.DataFrame:
+    """Keep scored trades that meet the minimum score, best first."""
+    qualifying = scored["score"] >= MIN_ACCEPTABLE_SCORE
+    logging.debug(
+        f"Trades rejected: {(~qualifying).sum()} scored < {MIN_ACCEPTABLE_SCORE}"
+    )
+    ranked = scored[qualifying].sort_values("score", ascending=False, kind="mergesort")
+    return ranked if top_n is None else ranked.head(top_n)
 
-    for trade in trades:
-        score, breakdown = score_calendar_trade(trade)
-        trade.score = score
 
-        # Evaluate roll triggers
+def rank_trades(
+    trades: pd.DataFrame, top_n: Optional[int] = None
+) -> tuple[list[CalendarTrade], int]:
+    """
+    Score and rank all trades, then evaluate roll triggers.
+    CalendarTrade objects are only built for the ranked rows (the first top_n if given).
+    Returns them with the number of qualifying trades.
+    """
+    ranked = select_ranked_trades(score_calendar_trades(trades))
+    total_trades = len(ranked)
+    if top_n is not None:
+        ranked = ranked.head(top_n)
+
+    fields = [name for name in CalendarTrade.__dataclass_fields__ if name in ranked]
+    ranked_trades = []
+    for record in ranked[fields].to_dict("records"):
+        record["front_expiration"] = record["front_expiration"].to_pydatetime()
+        record["back_expiration"] = record["back_expiration"].to_pydatetime()
+        trade = CalendarTrade(**record)
         evaluate_roll_triggers(trade)
+        ranked_trades.append(trade)
 
-        # Only include trades that meet minimum score threshold
-        if score >= MIN_ACCEPTABLE_SCORE:
-            scored_trades.append(trade)
-        else:
-            logging.debug(f"Trade rejected: Score {score:.1f} < {MIN_ACCEPTABLE_SCORE}")
+    return ranked_trades, total_trades
+
+
+# =============================================================================
+# Historical Scan
+# =============================================================================
+
+# Columns of the per-date top trades stored by the historical scan
+HISTORY_TRADE_COLUMNS = [
+    "option_type",
+    "strike",
+    "front_expiration",
+    "back_expiration",
+    "front_dte",
+    "back_dte",
+    "net_debit",
+    "debit_pct_of_spot",
+    "iv_ratio",
+    "net_delta",
+    "atm_distance_pct",
+    "score",
+]
+
+
+# Scored trades of a snapshot without any tradeable rows
+EMPTY_HISTORY_TRADES = pd.DataFrame(
+    {column: pd.Series(dtype=float) for column in HISTORY_TRADE_COLUMNS}
+)
+
+
+def concat_history_trades(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate per-date top trades, or an empty frame when no date has any."""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=["QuoteDate", "Rank", *HISTORY_TRADE_COLUMNS])
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_quote_dates(
+    conn: sqlite3.Connection, table_name: str, quote_dates: list[str]
+) -> pd.DataFrame:
+    """Load and normalize the tradeable rows of several snapshots in one query."""
+    query = f"""
+        SELECT {", ".join(REQUIRED_COLUMNS)}
+        FROM {table_name}
+        WHERE QuoteDate IN ({", ".join("?" * len(quote_dates))})
+          AND CallBid > 0 AND CallAsk > 0 AND PutBid > 0 AND PutAsk > 0
+          AND CallVol >= ? AND CallOpenInt >= ?
+          AND PutVol >= ? AND PutOpenInt >= ?
+    """
+    params = [*quote_dates] + [MIN_VOLUME, MIN_OPEN_INTEREST] * 2
+    df = normalize_options_data(pd.read_sql_query(query, conn, params=params))
+    in_window = df["DTE"].between(FRONT_DTE_MIN, FRONT_DTE_MAX) | df["DTE"].between(
+        BACK_DTE_MIN, BACK_DTE_MAX
+    )
+    return df[in_window]
+
+
+def summarise_snapshot(scored: pd.DataFrame, ranked: pd.DataFrame) -> dict:
+    """Best score, IV ratio distribution and debit levels of one snapshot."""
+    iv_ratio = scored["iv_ratio"]
+    debit_pct = ranked["debit_pct_of_spot"] * 100
+    return {
+        "ValidPairs": len(scored),
+        "QualifyingTrades": len(ranked),
+        "BestScore": scored["score"].max(),
+        "IVRatioP10": iv_ratio.quantile(0.10),
+        "IVRatioMedian": iv_ratio.median(),
+        "IVRatioP90": iv_ratio.quantile(0.90),
+        "IVRatioMax": iv_ratio.max(),
+        "BestNetDebit": ranked["net_debit"].iloc[0] if len(ranked) else np.nan,
+        "MedianNetDebit": ranked["net_debit"].median(),
+        "MinDebitPct": debit_pct.min(),
+        "MedianDebitPct": debit_pct.median(),
+    }
+
+
+def scan_quote_dates(
+    database: Path, snapshots: list[tuple[str, str]], top_n: int
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Scan a chunk of (table, QuoteDate) snapshots in a worker process.
+    Returns one summary row per quote date and its top_n qualifying trades.
+    """
+    quote_dates_by_table = defaultdict(list)
+    for table_name, quote_date in snapshots:
+        quote_dates_by_table[table_name].append(quote_date)
+
+    conn = sqlite3.connect(f"{database.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        df = pd.concat(
+            [
+                load_quote_dates(conn, table_name, quote_dates)
+                for table_name, quote_dates in quote_dates_by_table.items()
+            ],
+            ignore_index=True,
+        )
+    finally:
+        conn.close()
+
+    snapshots_by_date = dict(list(df.groupby("QuoteDate")))
+    summaries = []
+    top_trades = []
+    for _, quote_date in snapshots:
+        quote_date = pd.Timestamp(quote_date)
+        snapshot = snapshots_by_date.get(quote_date)
+        if snapshot is None:
+            # Every row was removed by the liquidity filters: no setup on this date
+            summaries.append(
+                {
+                    "QuoteDate": quote_date.strftime("%Y-%m-%d"),
+                    "SpotPrice": np.nan,
+                    **summarise_snapshot(EMPTY_HISTORY_TRADES, EMPTY_HISTORY_TRADES),
+                }
+            )
+            continue
+
+        spot_price = snapshot["SpotPrice"].iloc[0]
+        front_df = get_front_month_options(snapshot)
+        back_df = get_back_month_options(snapshot)
+
+        scored = score_calendar_trades(find_calendar_pairs(front_df, back_df))
+        ranked = select_ranked_trades(scored)
+
+        summaries.append(
+            {
+                "QuoteDate": quote_date.strftime("%Y-%m-%d"),
+                "SpotPrice": spot_price,
+                **summarise_snapshot(scored, ranked),
+            }
+        )
+        top = ranked[HISTORY_TRADE_COLUMNS].head(top_n)
+        top_trades.append(
+            top.assign(
+                QuoteDate=quote_date.strftime("%Y-%m-%d"),
+                Rank=np.arange(1, len(top) + 1),
+            )
+        )
+
+    return pd.DataFrame(summaries), concat_history_trades(top_trades)
+
+
+def list_snapshots(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+    """Return the (table, QuoteDate) pairs of every quote table, oldest first."""
+    snapshots = []
+    for table_name in list_quote_tables(conn):
+        if not validate_table_schema(conn, table_name):
+            logging.warning(f"Skipping {table_name}: missing required columns")
+            continue
+        quote_dates = pd.read_sql_query(
+            f"SELECT DISTINCT QuoteDate FROM {table_name}", conn
+        )["QuoteDate"]
+        snapshots += [(table_name, quote_date) for quote_date in quote_dates]
+    return sorted(snapshots, key=lambda snapshot: pd.Timestamp(snapshot[1]))
+
+
+def run_history_scan(args, conn: sqlite3.Connection):
+    """Scan the snapshots of all quote tables in parallel chunks and store results."""
+    started = time.perf_counter()
+    snapshots = list_snapshots(conn)
+    if not snapshots:
+        logging.error("No SPX quote data tables found in database")
+        sys.exit(1)
+    chunks = [
+        snapshots[i : i + args.chunk_size]
+        for i in range(0, len(snapshots), args.chunk_size)
+    ]
+    logging.info(
+        f"Scanning {len(snapshots)} quote dates from "
+        f"{len({table_name for table_name, _ in snapshots})} tables in "
+        f"{len(chunks)} chunks on {args.workers} workers"
+    )
 
-    return sorted(scored_trades, key=lambda t: t.score, reverse=True)
+    summaries = []
+    top_trades = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(scan_quote_dates, args.database, chunk, args.top_n)
+            for chunk in chunks
+        ]
+        for completed, future in enumerate(as_completed(futures), start=1):
+            summary, trades = future.result()
+            summaries.append(summary)
+            top_trades.append(trades)
+            logging.info(f"Completed chunk {completed}/{len(chunks)}")
+
+    summary_df = pd.concat(summaries, ignore_index=True).sort_values(
+        "QuoteDate", ignore_index=True
+    )
+    trades_df = concat_history_trades(top_trades).sort_values(
+        ["QuoteDate", "Rank"], ignore_index=True
+    )
+    trades_df = trades_df[["QuoteDate", "Rank", *HISTORY_TRADE_COLUMNS]]
+    for column in ["front_expiration", "back_expiration"]:
+        trades_df[column] = pd.to_datetime(trades_df[column]).dt.strftime("%Y-%m-%d")
+
+    summary_df.to_sql(args.results_table, conn, if_exists="replace", index=False)
+    trades_df.to_sql(
+        f"{args.results_table}_trades", conn, if_exists="replace", index=False
+    )
+
+    with_setups = summary_df["QualifyingTrades"] > 0
+    print(
+        f"\nScanned {len(summary_df)} quote dates in {time.perf_counter() - started:.1f}s"
+    )
+    print(
+        f"Dates with a qualifying trade: {with_setups.sum()} "
+        f"({with_setups.mean() * 100:.1f}%)"
+    )
+    print(
+        f"Best score: median {summary_df['BestScore'].median():.1f}, "
+        f"max {summary_df['BestScore'].max():.1f}"
+    )
+    print(
+        f"Results saved to {args.results_table} and {args.results_table}_trades "
+        f"in {args.database}"
+    )
 
 
 # =============================================================================
@@ -928,13 +1151,15 @@ def rank_trades(trades: list[CalendarTrade]) -> list[CalendarTrade]:
 # =============================================================================
 
 
-def print_console_summary(trades: list[CalendarTrade], spot_price: float):
+def print_console_summary(
+    trades: list[CalendarTrade], spot_price: float, total_trades: int
+):
     """Print a summary of top trades to console."""
     print("\n" + "=" * 80)
     print("SPX CALENDAR SPREAD SCANNER RESULTS")
     print("=" * 80)
     print(f"\nSpot Price: ${spot_price:,.2f}")
-    print(f"Total Qualifying Trades: {len(trades)}")
+    print(f"Total Qualifying Trades: {total_trades}")
 
     if not trades:
         print("\n⚠️  No qualifying calendar trades found for today.")
@@ -992,8 +1217,13 @@ def print_console_summary(trades: list[CalendarTrade], spot_price: float):
             print(f"   Flags: {' | '.join(warnings)}")
 
 
-def export_to_html(trades: list[CalendarTrade], spot_price: float, output_path: Path):
-    """Export all trades to HTML with adjustment playbooks."""
+def export_to_html(
+    trades: list[CalendarTrade],
+    spot_price: float,
+    output_path: Path,
+    total_trades: int,
+):
+    """Export the ranked trades to HTML with adjustment playbooks."""
     if not trades:
         logging.warning("No trades to export")
         return
@@ -1290,7 +1520,7 @@ def export_to_html(trades: list[CalendarTrade], spot_price: float, output_path:
         <div>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
         <div class="stats">
             <div><strong>Spot Price:</strong> ${spot_price:,.2f}</div>
-            <div><strong>Total Trades:</strong> {len(trades)}</div>
+            <div><strong>Total Trades:</strong> {total_trades}</div>
             <div><strong>Top Score:</strong> {trades[0].score:.1f}/100</div>
         </div>
     </div>
@@ -1525,9 +1755,14 @@ def export_to_html(trades: list[CalendarTrade], spot_price: float, output_path:
     </div>
 """
 
-    # Add full data table at the end
-    html += """
-    <h2 style="margin-top: 40px; color: #374151;">Complete Trade Data</h2>
+    # Add data table of the ranked trades at the end
+    table_title = (
+        "Complete Trade Data"
+        if len(trades) == total_trades
+        else f"Top {len(trades)} of {total_trades} Trades"
+    )
+    html += f"""
+    <h2 style="margin-top: 40px; color: #374151;">{table_title}</h2>
 """
     html += df.to_html(classes="data-table", index=False, border=0)
 
@@ -1587,6 +1822,18 @@ def parse_args():
         default=None,
         help="Target date (YYYYMMDD format). Defaults to today.",
     )
+    parser.add_argument(
+        "--as-of",
+        type=str,
+        default=None,
+        help="Scan the latest table and quote date on or before this date (YYYY-MM-DD), instead of --date. Defaults to the latest snapshot.",
+    )
+    parser.add_argument(
+        "--max-trades",
+        type=int,
+        default=50,
+        help="Number of top ranked trades included in the console and HTML report",
+    )
     parser.add_argument(
         "--output",
         "-o",
@@ -1612,6 +1859,34 @@ def parse_args():
         action="store_true",
         help="Open the HTML report in the default browser",
     )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="Scan every quote date in every spx_quotedata table and store per-date results instead of a report",
+    )
+    parser.add_argument(
+        "--top-n",
+        type=int,
+        default=5,
+        help="Number of top trades stored per quote date in history mode",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes in history mode",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=20,
+        help="Quote dates scanned per worker task in history mode",
+    )
+    parser.add_argument(
+        "--results-table",
+        default="calendar_history",
+        help="Table for the per-date summary in history mode. Top trades go to <table>_trades",
+    )
     return parser.parse_args()
 
 
@@ -1637,6 +1912,14 @@ def main(args):
     else:
         target_date = datetime.now()
 
+    as_of = None
+    if args.as_of:
+        try:
+            as_of = pd.to_datetime(args.as_of).to_pydatetime()
+        except ValueError:
+            logging.error(f"Invalid --as-of date: {args.as_of}. Use YYYY-MM-DD.")
+            sys.exit(1)
+
     # Connect to database
     try:
         conn = sqlite3.connect(args.database)
@@ -1646,8 +1929,16 @@ def main(args):
         sys.exit(1)
 
     try:
+        if args.history:
+            run_history_scan(args, conn)
+            return
+
         # Discover table
-        table_name = discover_table(conn, target_date)
+        try:
+            table_name = discover_table(conn, target_date, as_of)
+        except ValueError as e:
+            logging.error(str(e))
+            sys.exit(1)
         logging.info(f"Using table: {table_name}")
 
         # Validate schema
@@ -1656,7 +1947,7 @@ def main(args):
             sys.exit(1)
 
         # Load and normalize data
-        df = load_options_data(conn, table_name)
+        df = load_options_data(conn, table_name, as_of)
 
         if df.empty:
             logging.error("No valid options data found in table")
@@ -1688,10 +1979,10 @@ def main(args):
 
         # Find and score calendar pairs
         trades = find_calendar_pairs(front_df, back_df)
-        ranked_trades = rank_trades(trades)
+        ranked_trades, total_trades = rank_trades(trades, args.max_trades)
 
         # Print console summary
-        print_console_summary(ranked_trades, spot_price)
+        print_console_summary(ranked_trades, spot_price, total_trades)
 
         # Show playbook for top trades if requested
         if args.show_playbook and ranked_trades:
@@ -1710,7 +2001,7 @@ def main(args):
             output_path = Path(temp_file.name)
             temp_file.close()
 
-        export_to_html(ranked_trades, spot_price, output_path)
+        export_to_html(ranked_trades, spot_price, output_path, total_trades)
 
         # Open in browser if requested
         if args.open:
@@ -6,7 +6,6 @@
 #   "numpy",
 #   "seaborn",
 #   "yfinance",
-#   "mibian",
 #   "scipy",
 #   "PyQt6"
 # ]
@@ -29,17 +28,19 @@ matplotlib.use("QtAgg")
 import calendar
 import sys
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 
-import mibian
 import numpy as np
 import pandas as pd
 import yfinance as yf
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.colors import TwoSlopeNorm
 from matplotlib.figure import Figure
 from PyQt6.QtCore import QObject, QRunnable, Qt, QThreadPool, QTimer, pyqtSignal
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
     QApplication,
+    QComboBox,
     QDoubleSpinBox,
     QFrame,
     QGraphicsColorizeEffect,
@@ -56,6 +57,7 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from common.black_scholes import bs_price
 from common.logger import setup_logging
 
 TIMELINE_FRAME_STYLE = (
@@ -85,6 +87,167 @@ MONTH_HEADER_H = 18
 TIMELINE_TOTAL_H = DAY_BTN_H + MONTH_HEADER_H + 12
 
 
+# Scenario curves: name, title, spot multiplier, IV shift (vol points, near & far)
+SCENARIOS = [
+    ("up", "Up 1% | VIX -3%", 1.01, -3.0),
+    ("down", "Down 1% | VIX +3%", 0.99, 3.0),
+    ("up2", "Up 2% | VIX -6%", 1.02, -6.0),
+    ("down2", "Down 2% | VIX +6%", 0.98, 6.0),
+    ("up3", "Up 3% | VIX -9%", 1.03, -9.0),
+    ("down3", "Down 3% | VIX +9%", 0.97, 9.0),
+]
+PARAM_NAMES = [
+    "iv_near",
+    "iv_far",
+    "strike_price_near",
+    "strike_price_far",
+    "underlying_spot_near",
+    "underlying_spot_far",
+    "days_to_expiry_near_t0",
+    "days_to_expiry_far_t0",
+    "days_to_expiry_near_t1",
+    "days_to_expiry_far_t1",
+    "risk_free_rate_pct",
+    "far_basis_adjustment",
+]
+# Parameters are rounded before caching so repeated UI values hit the cache
+PARAM_DECIMALS = 4
+SCENARIO_CACHE_SIZE = 512
+MIN_IV_PCT = 1.0
+MIN_DAYS = 0.001
+
+# Heatmap views: spot x IV shift at near expiry, spot x days elapsed at current IVs
+GRID_MODES = {
+    "Scenario Curves": None,
+    "Heatmap: Spot x IV Shift": "iv",
+    "Heatmap: Spot x Days Elapsed": "days",
+}
+GRID_SPOT_STEPS = 121
+GRID_IV_SHIFTS = np.arange(-12.0, 12.5, 1.0)
+GRID_DAY_STEPS = 31
+
+
+def _call_prices(spots, strike, risk_free_rate_pct, days_to_expiry, iv_pct):
+    """Vectorised call prices taking rate and IV in percent and time in days"""
+    return bs_price(
+        spots, strike, days_to_expiry / 365, iv_pct / 100, risk_free_rate_pct / 100
+    )
+
+
+def _params_key(params):
+    return tuple(round(float(params[name]), PARAM_DECIMALS) for name in PARAM_NAMES)
+
+
+def _read_only(*arrays):
+    """Cached arrays are shared between results so they must not be modified"""
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+@lru_cache(maxsize=SCENARIO_CACHE_SIZE)
+def _setup_cost(key):
+    p = dict(zip(PARAM_NAMES, key))
+    near_t0 = _call_prices(
+        p["underlying_spot_near"],
+        p["strike_price_near"],
+        p["risk_free_rate_pct"],
+        p["days_to_expiry_near_t0"],
+        p["iv_near"],
+    )
+    far_t0 = _call_prices(
+        p["underlying_spot_far"],
+        p["strike_price_far"],
+        p["risk_free_rate_pct"],
+        p["days_to_expiry_far_t0"],
+        p["iv_far"],
+    )
+    return float(far_t0 - near_t0)
+
+
+def _calendar_pnl(p, spots, near_days, far_days, iv_shift):
+    """Calendar value broadcasting spots, remaining days and IV shifts"""
+    near_vals = _call_prices(
+        spots,
+        p["strike_price_near"],
+        p["risk_free_rate_pct"],
+        near_days,
+        np.maximum(p["iv_near"] + iv_shift, MIN_IV_PCT),
+    )
+    far_vals = _call_prices(
+        spots + p["far_basis_adjustment"],
+        p["strike_price_far"],
+        p["risk_free_rate_pct"],
+        far_days,
+        np.maximum(p["iv_far"] + iv_shift, MIN_IV_PCT),
+    )
+    return far_vals - near_vals
+
+
+@lru_cache(maxsize=SCENARIO_CACHE_SIZE)
+def _scenario_curve(key, spot_move, iv_shift):
+    """Payoff at near expiry over $1 steps of the underlying after a spot move and IV shift"""
+    p = dict(zip(PARAM_NAMES, key))
+    prices = np.arange(
+        0.92 * (p["underlying_spot_near"] * spot_move),
+        1.1 * (p["underlying_spot_far"] * spot_move),
+        1.0,
+    )
+    payoff = _calendar_pnl(
+        p, prices, p["days_to_expiry_near_t1"], p["days_to_expiry_far_t1"], iv_shift
+    ) - _setup_cost(key)
+    return _read_only(prices, payoff)
+
+
+@lru_cache(maxsize=SCENARIO_CACHE_SIZE)
+def _scenario_grid(key, mode):
+    """
+    2-D P&L grid in one broadcast pass. Rows are IV shifts (evaluated at near expiry)
+    or days elapsed since entry (at current IVs), columns are underlying prices.
+    """
+    p = dict(zip(PARAM_NAMES, key))
+    spots = np.linspace(
+        0.92 * p["underlying_spot_near"],
+        1.1 * p["underlying_spot_far"],
+        GRID_SPOT_STEPS,
+    )
+    if mode == "iv":
+        rows = GRID_IV_SHIFTS
+        pnl = _calendar_pnl(
+            p,
+            spots[None, :],
+            p["days_to_expiry_near_t1"],
+            p["days_to_expiry_far_t1"],
+            rows[:, None],
+        )
+    else:
+        rows = np.linspace(0.0, p["days_to_expiry_near_t0"], GRID_DAY_STEPS)
+        pnl = _calendar_pnl(
+            p,
+            spots[None, :],
+            np.maximum(p["days_to_expiry_near_t0"] - rows[:, None], MIN_DAYS),
+            np.maximum(p["days_to_expiry_far_t0"] - rows[:, None], MIN_DAYS),
+            0.0,
+        )
+    return _read_only(spots, rows, pnl - _setup_cost(key))
+
+
+def _breakevens(xs, ys):
+    """Underlying prices where the payoff is zero, interpolating between grid points"""
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    if len(xs) < 2:
+        return []
+    x0, x1, y0, y1 = xs[:-1], xs[1:], ys[:-1], ys[1:]
+    crossing = np.sign(y0) * np.sign(y1) < 0
+    crossings = x0[crossing] - y0[crossing] * (x1 - x0)[crossing] / (y1 - y0)[crossing]
+    out = np.sort(np.concatenate([xs[ys == 0], crossings]))
+    if out.size == 0:
+        return []
+    keep = np.concatenate([[True], np.diff(out) > 1e-6])
+    return out[keep].tolist()
+
+
 class TimelineWidget(QWidget):
     near_selected = pyqtSignal(date)
     far_selected = pyqtSignal(date)
@@ -356,55 +519,9 @@ class _ComputeWorker(QRunnable):
     def run(self):
         try:
             p = self.params
-            underlying_prices = np.arange(
-                0.92 * p["underlying_spot_near"], 1.1 * p["underlying_spot_far"], 1.0
-            )
-            near_vals = [
-                mibian.BS(
-                    [
-                        float(s),
-                        p["strike_price_near"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_near_t1"],
-                    ],
-                    volatility=p["iv_near"],
-                ).callPrice
-                for s in underlying_prices
-            ]
-            far_vals = [
-                mibian.BS(
-                    [
-                        float(s + p["far_basis_adjustment"]),
-                        p["strike_price_far"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_far_t1"],
-                    ],
-                    volatility=p["iv_far"],
-                ).callPrice
-                for s in underlying_prices
-            ]
-
-            near_t0 = mibian.BS(
-                [
-                    p["underlying_spot_near"],
-                    p["strike_price_near"],
-                    p["risk_free_rate_pct"],
-                    p["days_to_expiry_near_t0"],
-                ],
-                volatility=p["iv_near"],
-            ).callPrice
-            far_t0 = mibian.BS(
-                [
-                    p["underlying_spot_far"],
-                    p["strike_price_far"],
-                    p["risk_free_rate_pct"],
-                    p["days_to_expiry_far_t0"],
-                ],
-                volatility=p["iv_far"],
-            ).callPrice
-            setup_cost = far_t0 - near_t0
-
-            payoff = np.array(far_vals) - np.array(near_vals) - setup_cost
+            key = _params_key(p)
+            setup_cost = _setup_cost(key)
+            underlying_prices, payoff = _scenario_curve(key, 1.0, 0.0)
             df = pd.DataFrame(
                 {
                     "underlying_price": underlying_prices,
@@ -412,280 +529,28 @@ class _ComputeWorker(QRunnable):
                 }
             )
 
-            idx_max = int(np.argmax(payoff))
-            float(payoff[idx_max])
-            float(underlying_prices[idx_max])
-            neg_idx = np.where(payoff < 0)[0]
-            int(neg_idx[0]) if neg_idx.size > 0 else None
-            loss_idx = np.where(payoff < -setup_cost)[0]
-            int(loss_idx[0]) if loss_idx.size > 0 else None
-            be_mask = np.abs(payoff) < 1.0
-            underlying_prices[be_mask]
-
-            metrics_text = f"Setup Cost: {setup_cost:.2f}"
-
-            def _breakevens(xs, ys):
-                xs = np.asarray(xs, dtype=float)
-                ys = np.asarray(ys, dtype=float)
-                out = []
-                for i in range(1, len(xs)):
-                    y0 = ys[i - 1]
-                    y1 = ys[i]
-                    if y0 == 0:
-                        out.append(float(xs[i - 1]))
-                    elif y1 == 0:
-                        out.append(float(xs[i]))
-                    elif (y0 > 0 and y1 < 0) or (y0 < 0 and y1 > 0):
-                        x0 = xs[i - 1]
-                        x1 = xs[i]
-                        xb = x0 + (0 - y0) * (x1 - x0) / (y1 - y0)
-                        out.append(float(xb))
-                if not out:
-                    return []
-                uniq = []
-                for v in sorted(out):
-                    if not uniq or abs(v - uniq[-1]) > 1e-6:
-                        uniq.append(v)
-                return uniq
-
             result = {
                 "seq": self.seq,
                 "underlying_prices": underlying_prices,
                 "setup_cost": setup_cost,
                 "payoff": payoff,
                 "df": df,
-                "metrics_text": metrics_text,
+                "metrics_text": f"Setup Cost: {setup_cost:.2f}",
+                "be_prices_baseline": _breakevens(underlying_prices, payoff),
             }
 
-            spot_up_near = float(p["underlying_spot_near"] * 1.01)
-            spot_up_far = float(p["underlying_spot_far"] * 1.01)
-            spot_down_near = float(p["underlying_spot_near"] * 0.99)
-            spot_down_far = float(p["underlying_spot_far"] * 0.99)
-
-            ivn_up = max(float(p["iv_near"] - 3.0), 1.0)
-            ivf_up = max(float(p["iv_far"] - 3.0), 1.0)
-            ivn_down = float(p["iv_near"] + 3.0)
-            ivf_down = float(p["iv_far"] + 3.0)
-
-            up_prices = np.arange(0.92 * spot_up_near, 1.1 * spot_up_far, 1.0)
-            down_prices = np.arange(0.92 * spot_down_near, 1.1 * spot_down_far, 1.0)
-
-            near_vals_up = [
-                mibian.BS(
-                    [
-                        float(s),
-                        p["strike_price_near"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_near_t1"],
-                    ],
-                    volatility=ivn_up,
-                ).callPrice
-                for s in up_prices
-            ]
-            far_vals_up = [
-                mibian.BS(
-                    [
-                        float(s + p["far_basis_adjustment"]),
-                        p["strike_price_far"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_far_t1"],
-                    ],
-                    volatility=ivf_up,
-                ).callPrice
-                for s in up_prices
-            ]
-
-            near_vals_down = [
-                mibian.BS(
-                    [
-                        float(s),
-                        p["strike_price_near"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_near_t1"],
-                    ],
-                    volatility=ivn_down,
-                ).callPrice
-                for s in down_prices
-            ]
-            far_vals_down = [
-                mibian.BS(
-                    [
-                        float(s + p["far_basis_adjustment"]),
-                        p["strike_price_far"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_far_t1"],
-                    ],
-                    volatility=ivf_down,
-                ).callPrice
-                for s in down_prices
-            ]
-
-            payoff_up = np.array(far_vals_up) - np.array(near_vals_up) - setup_cost
-            payoff_down = (
-                np.array(far_vals_down) - np.array(near_vals_down) - setup_cost
-            )
-
-            result["scenario_up_prices"] = up_prices
-            result["scenario_up_payoff"] = payoff_up
-            result["scenario_up_spot"] = spot_up_near
-            result["scenario_down_prices"] = down_prices
-            result["scenario_down_payoff"] = payoff_down
-            result["scenario_down_spot"] = spot_down_near
-            result["be_prices_baseline"] = _breakevens(underlying_prices, payoff)
-            result["be_prices_up"] = _breakevens(up_prices, payoff_up)
-            result["be_prices_down"] = _breakevens(down_prices, payoff_down)
-
-            spot_up_near_2 = float(p["underlying_spot_near"] * 1.02)
-            spot_up_far_2 = float(p["underlying_spot_far"] * 1.02)
-            ivn_up_2 = max(float(p["iv_near"] - 6.0), 1.0)
-            ivf_up_2 = max(float(p["iv_far"] - 6.0), 1.0)
-            up_prices_2 = np.arange(0.92 * spot_up_near_2, 1.1 * spot_up_far_2, 1.0)
-            near_vals_up_2 = [
-                mibian.BS(
-                    [
-                        float(s),
-                        p["strike_price_near"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_near_t1"],
-                    ],
-                    volatility=ivn_up_2,
-                ).callPrice
-                for s in up_prices_2
-            ]
-            far_vals_up_2 = [
-                mibian.BS(
-                    [
-                        float(s + p["far_basis_adjustment"]),
-                        p["strike_price_far"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_far_t1"],
-                    ],
-                    volatility=ivf_up_2,
-                ).callPrice
-                for s in up_prices_2
-            ]
-            payoff_up_2 = (
-                np.array(far_vals_up_2) - np.array(near_vals_up_2) - setup_cost
-            )
-            result["scenario_up2_prices"] = up_prices_2
-            result["scenario_up2_payoff"] = payoff_up_2
-            result["scenario_up2_spot"] = spot_up_near_2
-
-            spot_up_near_3 = float(p["underlying_spot_near"] * 1.03)
-            spot_up_far_3 = float(p["underlying_spot_far"] * 1.03)
-            ivn_up_3 = max(float(p["iv_near"] - 9.0), 1.0)
-            ivf_up_3 = max(float(p["iv_far"] - 9.0), 1.0)
-            up_prices_3 = np.arange(0.92 * spot_up_near_3, 1.1 * spot_up_far_3, 1.0)
-            near_vals_up_3 = [
-                mibian.BS(
-                    [
-                        float(s),
-                        p["strike_price_near"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_near_t1"],
-                    ],
-                    volatility=ivn_up_3,
-                ).callPrice
-                for s in up_prices_3
-            ]
-            far_vals_up_3 = [
-                mibian.BS(
-                    [
-                        float(s + p["far_basis_adjustment"]),
-                        p["strike_price_far"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_far_t1"],
-                    ],
-                    volatility=ivf_up_3,
-                ).callPrice
-                for s in up_prices_3
-            ]
-            payoff_up_3 = (
-                np.array(far_vals_up_3) - np.array(near_vals_up_3) - setup_cost
-            )
-            result["scenario_up3_prices"] = up_prices_3
-            result["scenario_up3_payoff"] = payoff_up_3
-            result["scenario_up3_spot"] = spot_up_near_3
-
-            spot_down_near_2 = float(p["underlying_spot_near"] * 0.98)
-            spot_down_far_2 = float(p["underlying_spot_far"] * 0.98)
-            ivn_down_2 = float(p["iv_near"] + 6.0)
-            ivf_down_2 = float(p["iv_far"] + 6.0)
-            down_prices_2 = np.arange(
-                0.92 * spot_down_near_2, 1.1 * spot_down_far_2, 1.0
-            )
-            near_vals_down_2 = [
-                mibian.BS(
-                    [
-                        float(s),
-                        p["strike_price_near"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_near_t1"],
-                    ],
-                    volatility=ivn_down_2,
-                ).callPrice
-                for s in down_prices_2
-            ]
-            far_vals_down_2 = [
-                mibian.BS(
-                    [
-                        float(s + p["far_basis_adjustment"]),
-                        p["strike_price_far"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_far_t1"],
-                    ],
-                    volatility=ivf_down_2,
-                ).callPrice
-                for s in down_prices_2
-            ]
-            payoff_down_2 = (
-                np.array(far_vals_down_2) - np.array(near_vals_down_2) - setup_cost
-            )
-            result["scenario_down2_prices"] = down_prices_2
-            result["scenario_down2_payoff"] = payoff_down_2
-            result["scenario_down2_spot"] = spot_down_near_2
-
-            spot_down_near_3 = float(p["underlying_spot_near"] * 0.97)
-            spot_down_far_3 = float(p["underlying_spot_far"] * 0.97)
-            ivn_down_3 = float(p["iv_near"] + 9.0)
-            ivf_down_3 = float(p["iv_far"] + 9.0)
-            down_prices_3 = np.arange(
-                0.92 * spot_down_near_3, 1.1 * spot_down_far_3, 1.0
-            )
-            near_vals_down_3 = [
-                mibian.BS(
-                    [
-                        float(s),
-                        p["strike_price_near"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_near_t1"],
-                    ],
-                    volatility=ivn_down_3,
-                ).callPrice
-                for s in down_prices_3
-            ]
-            far_vals_down_3 = [
-                mibian.BS(
-                    [
-                        float(s + p["far_basis_adjustment"]),
-                        p["strike_price_far"],
-                        p["risk_free_rate_pct"],
-                        p["days_to_expiry_far_t1"],
-                    ],
-                    volatility=ivf_down_3,
-                ).callPrice
-                for s in down_prices_3
-            ]
-            payoff_down_3 = (
-                np.array(far_vals_down_3) - np.array(near_vals_down_3) - setup_cost
-            )
-            result["scenario_down3_prices"] = down_prices_3
-            result["scenario_down3_payoff"] = payoff_down_3
-            result["scenario_down3_spot"] = spot_down_near_3
-            result["be_prices_up2"] = _breakevens(up_prices_2, payoff_up_2)
-            result["be_prices_up3"] = _breakevens(up_prices_3, payoff_up_3)
-            result["be_prices_down2"] = _breakevens(down_prices_2, payoff_down_2)
-            result["be_prices_down3"] = _breakevens(down_prices_3, payoff_down_3)
+            for name, _, spot_move, iv_shift in SCENARIOS:
+                prices, scenario_payoff = _scenario_curve(key, spot_move, iv_shift)
+                result[f"scenario_{name}_prices"] = prices
+                result[f"scenario_{name}_payoff"] = scenario_payoff
+                result[f"scenario_{name}_spot"] = float(
+                    p["underlying_spot_near"] * spot_move
+                )
+                result[f"be_prices_{name}"] = _breakevens(prices, scenario_payoff)
+
+            if p.get("grid_mode"):
+                result["grid_mode"] = p["grid_mode"]
+                result["grid"] = _scenario_grid(key, p["grid_mode"])
             self.signals.result.emit(result)
         except Exception as e:
             self.signals.error.emit(str(e))
@@ -710,6 +575,7 @@ class CalendarSpreadInteractive(QMainWindow):
         self.far_basis_adjustment = 0.0
         self.iv_near = 20.0
         self.iv_far = 20.0
+        self.grid_mode = None
         self.figure = Figure(figsize=(10, 7))
         self.canvas = FigureCanvas(self.figure)
         self.canvas.setSizePolicy(
@@ -829,6 +695,11 @@ class CalendarSpreadInteractive(QMainWindow):
         self.reset_btn = QPushButton("Reset")
         controls_row1.addWidget(self.reset_btn)
 
+        self.view_combo = QComboBox()
+        self.view_combo.addItems(GRID_MODES.keys())
+        controls_row2.addWidget(QLabel("View"))
+        controls_row2.addWidget(self.view_combo)
+
         controls_layout_v.addLayout(controls_row1)
         controls_layout_v.addLayout(controls_row2)
         controls.setLayout(controls_layout_v)
@@ -861,6 +732,7 @@ class CalendarSpreadInteractive(QMainWindow):
         self.far_days_spin.valueChanged.connect(self._on_change)
         self.rate_spin.valueChanged.connect(self._on_change)
         self.far_basis_spin.valueChanged.connect(self._on_change)
+        self.view_combo.currentTextChanged.connect(self._on_change)
         self.refresh_btn.clicked.connect(self._refresh_market)
         self.compute_btn.clicked.connect(self._compute_clicked)
         self.reset_btn.clicked.connect(self._reset)
@@ -931,6 +803,8 @@ class CalendarSpreadInteractive(QMainWindow):
         )
         self.risk_free_rate_pct = self.rate_spin.value()
         self.far_basis_adjustment = self.far_basis_spin.value()
+        self.grid_mode = GRID_MODES[self.view_combo.currentText()]
+        self._schedule_compute()
 
     def _reset(self):
         self.near_iv_spin.setValue(20.0)
@@ -1029,24 +903,24 @@ class CalendarSpreadInteractive(QMainWindow):
         return [d for d in ds if today <= d <= cutoff]
 
     def _compute_setup_cost(self):
-        near_t0 = mibian.BS(
-            [
+        near_t0 = float(
+            _call_prices(
                 self.underlying_spot_near,
                 self.strike_price_near,
                 self.risk_free_rate_pct,
                 self.days_to_expiry_near_t0,
-            ],
-            volatility=self.iv_near,
-        ).callPrice
-        far_t0 = mibian.BS(
-            [
+                self.iv_near,
+            )
+        )
+        far_t0 = float(
+            _call_prices(
                 self.underlying_spot_far,
                 self.strike_price_far,
                 self.risk_free_rate_pct,
                 self.days_to_expiry_far_t0,
-            ],
-            volatility=self.iv_far,
-        ).callPrice
+                self.iv_far,
+            )
+        )
         return far_t0 - near_t0
 
     def _schedule_compute(self):
@@ -1068,6 +942,7 @@ class CalendarSpreadInteractive(QMainWindow):
             "days_to_expiry_far_t1": self.days_to_expiry_far_t1,
             "risk_free_rate_pct": self.risk_free_rate_pct,
             "far_basis_adjustment": self.far_basis_adjustment,
+            "grid_mode": self.grid_mode,
         }
         worker = _ComputeWorker(self._compute_seq, params)
         worker.signals.result.connect(self._handle_result)
@@ -1080,208 +955,72 @@ class CalendarSpreadInteractive(QMainWindow):
         self.results_df = result["df"]
         self.metrics_label.setText(result["metrics_text"])
         self.figure.clear()
+        if result.get("grid_mode"):
+            self._plot_grid(result)
+        else:
+            self._plot_scenarios(result)
+        self.figure.tight_layout()
+        self.canvas.draw_idle()
+
+    def _plot_scenarios(self, result):
         gs = self.figure.add_gridspec(4, 2, height_ratios=[1, 1, 1, 1])
         ax_top = self.figure.add_subplot(gs[0, :])
-        ax_top.axhline(y=0, color="black", linestyle="--", alpha=0.5)
-        ax_top.axhline(y=-result["setup_cost"], color="red", linestyle="--", alpha=0.7)
-        ax_top.plot(
+        self._plot_payoff(
+            ax_top,
             result["underlying_prices"],
             result["payoff"],
-            linewidth=2,
-            label="Calendar Payoff",
-        )
-        ax_top.axvline(
-            x=self.underlying_spot_near,
-            color="blue",
-            linestyle=":",
-            alpha=0.7,
-            label="Spot",
-        )
-        ax_top.axvline(
-            x=self.strike_price_near,
-            color="green",
-            linestyle="--",
-            alpha=0.6,
-            label="Near Strike",
-        )
-        ax_top.axvline(
-            x=self.strike_price_far,
-            color="purple",
-            linestyle="--",
-            alpha=0.6,
-            label="Far Strike",
+            self.underlying_spot_near,
+            result["setup_cost"],
+            result.get("be_prices_baseline", []),
+            "Calendar Payoff",
         )
         ax_top.set_title("Baseline")
-        ax_top.set_ylabel("Payoff")
-        ax_top.set_xlabel("Underlying Price")
         ax_top.legend()
-        ax_top.grid(True, alpha=0.3)
-        ymin1, ymax1 = ax_top.get_ylim()
-        rng1 = ymax1 - ymin1
-        ytext1 = 0 + 0.06 * rng1
-        for bp in result.get("be_prices_baseline", []):
-            ax_top.axvline(x=bp, color="#ff9800", linestyle=":", alpha=0.7)
-            ax_top.scatter([bp], [0], color="#ff9800", s=25, zorder=5)
-            ax_top.annotate(
-                f"{bp:.2f}",
-                xy=(bp, 0),
-                xytext=(bp, ytext1),
-                ha="center",
-                va="bottom",
-                bbox=dict(
-                    boxstyle="square,pad=0.2", fc="#fff6cc", ec="#c8a600", lw=0.8
-                ),
-            )
-
-        ax_u1 = self.figure.add_subplot(gs[1, 0])
-        ax_u1.axhline(y=0, color="black", linestyle="--", alpha=0.5)
-        ax_u1.axhline(y=-result["setup_cost"], color="red", linestyle="--", alpha=0.7)
-        ax_u1.plot(
-            result.get("scenario_up_prices", []),
-            result.get("scenario_up_payoff", []),
-            linewidth=2,
-            label="Up 1% | VIX -3%",
-        )
-        ax_u1.axvline(
-            x=result.get("scenario_up_spot", self.underlying_spot_near),
-            color="blue",
-            linestyle=":",
-            alpha=0.7,
-            label="Spot",
-        )
-        ax_u1.axvline(
-            x=self.strike_price_near,
-            color="green",
-            linestyle="--",
-            alpha=0.6,
-            label="Near Strike",
-        )
-        ax_u1.axvline(
-            x=self.strike_price_far,
-            color="purple",
-            linestyle="--",
-            alpha=0.6,
-            label="Far Strike",
-        )
-        ax_u1.set_title("Up 1% | VIX -3% (near & far)")
-        ax_u1.set_ylabel("Payoff")
-        ax_u1.set_xlabel("Underlying Price")
-
-        ax_u1.grid(True, alpha=0.3)
-        ymin_u1, ymax_u1 = ax_u1.get_ylim()
-        rng_u1 = ymax_u1 - ymin_u1
-        ytext_u1 = 0 + 0.06 * rng_u1
-        for bp in result.get("be_prices_up", []):
-            ax_u1.axvline(x=bp, color="#ff9800", linestyle=":", alpha=0.7)
-            ax_u1.scatter([bp], [0], color="#ff9800", s=25, zorder=5)
-            ax_u1.annotate(
-                f"{bp:.2f}",
-                xy=(bp, 0),
-                xytext=(bp, ytext_u1),
-                ha="center",
-                va="bottom",
-                bbox=dict(
-                    boxstyle="square,pad=0.2", fc="#fff6cc", ec="#c8a600", lw=0.8
-                ),
-            )
 
-        ax_d1 = self.figure.add_subplot(gs[1, 1])
-        ax_d1.axhline(y=0, color="black", linestyle="--", alpha=0.5)
-        ax_d1.axhline(y=-result["setup_cost"], color="red", linestyle="--", alpha=0.7)
-        ax_d1.plot(
-            result.get("scenario_down_prices", []),
-            result.get("scenario_down_payoff", []),
-            linewidth=2,
-            label="Down 1% | VIX +3%",
-        )
-        ax_d1.axvline(
-            x=result.get("scenario_down_spot", self.underlying_spot_near),
-            color="blue",
-            linestyle=":",
-            alpha=0.7,
-            label="Spot",
-        )
-        ax_d1.axvline(
-            x=self.strike_price_near,
-            color="green",
-            linestyle="--",
-            alpha=0.6,
-            label="Near Strike",
-        )
-        ax_d1.axvline(
-            x=self.strike_price_far,
-            color="purple",
-            linestyle="--",
-            alpha=0.6,
-            label="Far Strike",
-        )
-        ax_d1.set_title("Down 1% | VIX +3% (near & far)")
-        ax_d1.set_ylabel("Payoff")
-        ax_d1.set_xlabel("Underlying Price")
-
-        ax_d1.grid(True, alpha=0.3)
-        ymin_d1, ymax_d1 = ax_d1.get_ylim()
-        rng_d1 = ymax_d1 - ymin_d1
-        ytext_d1 = 0 + 0.06 * rng_d1
-        for bp in result.get("be_prices_down", []):
-            ax_d1.axvline(x=bp, color="#ff9800", linestyle=":", alpha=0.7)
-            ax_d1.scatter([bp], [0], color="#ff9800", s=25, zorder=5)
-            ax_d1.annotate(
-                f"{bp:.2f}",
-                xy=(bp, 0),
-                xytext=(bp, ytext_d1),
-                ha="center",
-                va="bottom",
-                bbox=dict(
-                    boxstyle="square,pad=0.2", fc="#fff6cc", ec="#c8a600", lw=0.8
-                ),
+        for i, (name, title, _, _) in enumerate(SCENARIOS):
+            ax = self.figure.add_subplot(gs[1 + i // 2, i % 2])
+            self._plot_payoff(
+                ax,
+                result.get(f"scenario_{name}_prices", []),
+                result.get(f"scenario_{name}_payoff", []),
+                result.get(f"scenario_{name}_spot", self.underlying_spot_near),
+                result["setup_cost"],
+                result.get(f"be_prices_{name}", []),
+                title,
             )
-
-        ax_u2 = self.figure.add_subplot(gs[2, 0])
-        ax_u2.axhline(y=0, color="black", linestyle="--", alpha=0.5)
-        ax_u2.axhline(y=-result["setup_cost"], color="red", linestyle="--", alpha=0.7)
-        ax_u2.plot(
-            result.get("scenario_up2_prices", []),
-            result.get("scenario_up2_payoff", []),
-            linewidth=2,
-            label="Up 2% | VIX -6%",
-        )
-        ax_u2.axvline(
-            x=result.get("scenario_up2_spot", self.underlying_spot_near),
-            color="blue",
-            linestyle=":",
-            alpha=0.7,
-            label="Spot",
-        )
-        ax_u2.axvline(
+            ax.set_title(f"{title} (near & far)")
+
+    def _plot_payoff(self, ax, prices, payoff, spot, setup_cost, breakevens, label):
+        ax.axhline(y=0, color="black", linestyle="--", alpha=0.5)
+        ax.axhline(y=-setup_cost, color="red", linestyle="--", alpha=0.7)
+        ax.plot(prices, payoff, linewidth=2, label=label)
+        ax.axvline(x=spot, color="blue", linestyle=":", alpha=0.7, label="Spot")
+        ax.axvline(
             x=self.strike_price_near,
             color="green",
             linestyle="--",
             alpha=0.6,
             label="Near Strike",
         )
-        ax_u2.axvline(
+        ax.axvline(
             x=self.strike_price_far,
             color="purple",
             linestyle="--",
             alpha=0.6,
             label="Far Strike",
         )
-        ax_u2.set_title("Up 2% | VIX -6% (near & far)")
-        ax_u2.set_ylabel("Payoff")
-        ax_u2.set_xlabel("Underlying Price")
-
-        ax_u2.grid(True, alpha=0.3)
-        ymin_u2, ymax_u2 = ax_u2.get_ylim()
-        rng_u2 = ymax_u2 - ymin_u2
-        ytext_u2 = 0 + 0.06 * rng_u2
-        for bp in result.get("be_prices_up2", []):
-            ax_u2.axvline(x=bp, color="#ff9800", linestyle=":", alpha=0.7)
-            ax_u2.scatter([bp], [0], color="#ff9800", s=25, zorder=5)
-            ax_u2.annotate(
+        ax.set_ylabel("Payoff")
+        ax.set_xlabel("Underlying Price")
+        ax.grid(True, alpha=0.3)
+        ymin, ymax = ax.get_ylim()
+        ytext = 0 + 0.06 * (ymax - ymin)
+        for bp in breakevens:
+            ax.axvline(x=bp, color="#ff9800", linestyle=":", alpha=0.7)
+            ax.scatter([bp], [0], color="#ff9800", s=25, zorder=5)
+            ax.annotate(
                 f"{bp:.2f}",
                 xy=(bp, 0),
-                xytext=(bp, ytext_u2),
+                xytext=(bp, ytext),
                 ha="center",
                 va="bottom",
                 bbox=dict(
@@ -1289,163 +1028,50 @@ class CalendarSpreadInteractive(QMainWindow):
                 ),
             )
 
-        ax_d2 = self.figure.add_subplot(gs[2, 1])
-        ax_d2.axhline(y=0, color="black", linestyle="--", alpha=0.5)
-        ax_d2.axhline(y=-result["setup_cost"], color="red", linestyle="--", alpha=0.7)
-        ax_d2.plot(
-            result.get("scenario_down2_prices", []),
-            result.get("scenario_down2_payoff", []),
-            linewidth=2,
-            label="Down 2% | VIX +6%",
-        )
-        ax_d2.axvline(
-            x=result.get("scenario_down2_spot", self.underlying_spot_near),
-            color="blue",
-            linestyle=":",
-            alpha=0.7,
-            label="Spot",
+    def _plot_grid(self, result):
+        spots, rows, pnl = result["grid"]
+        ax = self.figure.add_subplot(111)
+        limit = max(float(np.nanmax(np.abs(pnl))), 1e-9)
+        mesh = ax.pcolormesh(
+            spots,
+            rows,
+            pnl,
+            cmap="RdYlGn",
+            norm=TwoSlopeNorm(vcenter=0.0, vmin=-limit, vmax=limit),
+            shading="auto",
         )
-        ax_d2.axvline(
-            x=self.strike_price_near,
-            color="green",
-            linestyle="--",
-            alpha=0.6,
-            label="Near Strike",
-        )
-        ax_d2.axvline(
-            x=self.strike_price_far,
-            color="purple",
-            linestyle="--",
-            alpha=0.6,
-            label="Far Strike",
-        )
-        ax_d2.set_title("Down 2% | VIX +6% (near & far)")
-        ax_d2.set_ylabel("Payoff")
-        ax_d2.set_xlabel("Underlying Price")
-
-        ax_d2.grid(True, alpha=0.3)
-        ymin_d2, ymax_d2 = ax_d2.get_ylim()
-        rng_d2 = ymax_d2 - ymin_d2
-        ytext_d2 = 0 + 0.06 * rng_d2
-        for bp in result.get("be_prices_down2", []):
-            ax_d2.axvline(x=bp, color="#ff9800", linestyle=":", alpha=0.7)
-            ax_d2.scatter([bp], [0], color="#ff9800", s=25, zorder=5)
-            ax_d2.annotate(
-                f"{bp:.2f}",
-                xy=(bp, 0),
-                xytext=(bp, ytext_d2),
-                ha="center",
-                va="bottom",
-                bbox=dict(
-                    boxstyle="square,pad=0.2", fc="#fff6cc", ec="#c8a600", lw=0.8
-                ),
-            )
-
-        ax_u3 = self.figure.add_subplot(gs[3, 0])
-        ax_u3.axhline(y=0, color="black", linestyle="--", alpha=0.5)
-        ax_u3.axhline(y=-result["setup_cost"], color="red", linestyle="--", alpha=0.7)
-        ax_u3.plot(
-            result.get("scenario_up3_prices", []),
-            result.get("scenario_up3_payoff", []),
-            linewidth=2,
-            label="Up 3% | VIX -9%",
-        )
-        ax_u3.axvline(
-            x=result.get("scenario_up3_spot", self.underlying_spot_near),
-            color="blue",
-            linestyle=":",
-            alpha=0.7,
-            label="Spot",
-        )
-        ax_u3.axvline(
-            x=self.strike_price_near,
-            color="green",
-            linestyle="--",
-            alpha=0.6,
-            label="Near Strike",
-        )
-        ax_u3.axvline(
-            x=self.strike_price_far,
-            color="purple",
-            linestyle="--",
-            alpha=0.6,
-            label="Far Strike",
-        )
-        ax_u3.set_title("Up 3% | VIX -9% (near & far)")
-        ax_u3.set_ylabel("Payoff")
-        ax_u3.set_xlabel("Underlying Price")
-
-        ax_u3.grid(True, alpha=0.3)
-        ymin_u3, ymax_u3 = ax_u3.get_ylim()
-        rng_u3 = ymax_u3 - ymin_u3
-        ytext_u3 = 0 + 0.06 * rng_u3
-        for bp in result.get("be_prices_up3", []):
-            ax_u3.axvline(x=bp, color="#ff9800", linestyle=":", alpha=0.7)
-            ax_u3.scatter([bp], [0], color="#ff9800", s=25, zorder=5)
-            ax_u3.annotate(
-                f"{bp:.2f}",
-                xy=(bp, 0),
-                xytext=(bp, ytext_u3),
-                ha="center",
-                va="bottom",
-                bbox=dict(
-                    boxstyle="square,pad=0.2", fc="#fff6cc", ec="#c8a600", lw=0.8
-                ),
-            )
-
-        ax_d3 = self.figure.add_subplot(gs[3, 1])
-        ax_d3.axhline(y=0, color="black", linestyle="--", alpha=0.5)
-        ax_d3.axhline(y=-result["setup_cost"], color="red", linestyle="--", alpha=0.7)
-        ax_d3.plot(
-            result.get("scenario_down3_prices", []),
-            result.get("scenario_down3_payoff", []),
-            linewidth=2,
-            label="Down 3% | VIX +9%",
-        )
-        ax_d3.axvline(
-            x=result.get("scenario_down3_spot", self.underlying_spot_near),
+        self.figure.colorbar(mesh, ax=ax, label="P&L")
+        if np.nanmin(pnl) < 0 < np.nanmax(pnl):
+            ax.contour(spots, rows, pnl, levels=[0.0], colors="black", linewidths=1)
+        ax.axvline(
+            x=self.underlying_spot_near,
             color="blue",
             linestyle=":",
             alpha=0.7,
             label="Spot",
         )
-        ax_d3.axvline(
+        ax.axvline(
             x=self.strike_price_near,
             color="green",
             linestyle="--",
             alpha=0.6,
             label="Near Strike",
         )
-        ax_d3.axvline(
+        ax.axvline(
             x=self.strike_price_far,
             color="purple",
             linestyle="--",
             alpha=0.6,
             label="Far Strike",
         )
-        ax_d3.set_title("Down 3% | VIX +9% (near & far)")
-        ax_d3.set_ylabel("Payoff")
-        ax_d3.set_xlabel("Underlying Price")
-
-        ax_d3.grid(True, alpha=0.3)
-        ymin_d3, ymax_d3 = ax_d3.get_ylim()
-        rng_d3 = ymax_d3 - ymin_d3
-        ytext_d3 = 0 + 0.06 * rng_d3
-        for bp in result.get("be_prices_down3", []):
-            ax_d3.axvline(x=bp, color="#ff9800", linestyle=":", alpha=0.7)
-            ax_d3.scatter([bp], [0], color="#ff9800", s=25, zorder=5)
-            ax_d3.annotate(
-                f"{bp:.2f}",
-                xy=(bp, 0),
-                xytext=(bp, ytext_d3),
-                ha="center",
-                va="bottom",
-                bbox=dict(
-                    boxstyle="square,pad=0.2", fc="#fff6cc", ec="#c8a600", lw=0.8
-                ),
-            )
-        self.figure.tight_layout()
-        self.canvas.draw_idle()
+        ax.set_xlabel("Underlying Price")
+        if result["grid_mode"] == "iv":
+            ax.set_ylabel("IV Shift (vol points, near & far)")
+            ax.set_title("P&L at Near Expiry by Spot and IV Shift (black = breakeven)")
+        else:
+            ax.set_ylabel("Days Elapsed")
+            ax.set_title("P&L by Spot and Days Elapsed (black = breakeven)")
+        ax.legend(loc="upper right")
 
 
 def parse_args():
@@ -0,0 +1,266 @@
+import numpy as np
+from scipy.special import ndtr
+
+# Greeks returned by bs_greeks. All are raw sensitivities: per unit of S, per 1.00 of
+# volatility/rate and per year of calendar time passing (theta, charm, veta and color
+# are d/dt = -d/dT, so they describe tomorrow's value with everything else unchanged).
+FIRST_ORDER_GREEKS = ["delta", "vega", "theta", "rho", "epsilon", "lambda"]
+SECOND_ORDER_GREEKS = ["gamma", "vanna", "charm", "vomma", "veta"]
+THIRD_ORDER_GREEKS = ["speed", "zomma", "color", "ultima"]
+GREEKS = FIRST_ORDER_GREEKS + SECOND_ORDER_GREEKS + THIRD_ORDER_GREEKS
+
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+
+def _unbox(x):
+    """0-d arrays become numpy scalars so scalar callers get scalars back"""
+    return x[()] if x.ndim == 0 else x
+
+
+def _norm_pdf(x):
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def _broadcast_inputs(S, K, T, sigma, r, q, is_call):
+    S, K, T, sigma, r, q, is_call = np.broadcast_arrays(
+        np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float),
+        np.asarray(T, dtype=float),
+        np.asarray(sigma, dtype=float),
+        np.asarray(r, dtype=float),
+        np.asarray(q, dtype=float),
+        np.asarray(is_call, dtype=bool),
+    )
+    return S, K, T, sigma, r, q, is_call
+
+
+def d1_d2(S, K, T, sigma, r=0.0, q=0.0):
+    """Black-Scholes-Merton d1 and d2. Undefined (inf/nan) when sigma * sqrt(T) is 0"""
+    S, K, T, sigma, r, q, _ = _broadcast_inputs(S, K, T, sigma, r, q, True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma_sqrt_t = sigma * np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / sigma_sqrt_t
+    return _unbox(d1), _unbox(d1 - sigma_sqrt_t)
+
+
+def bs_price(S, K, T, sigma, r=0.0, q=0.0, is_call=True):
+    """
+    Black-Scholes-Merton price of European calls/puts.
+
+    All inputs broadcast against each other, T is in years and sigma, r and q are
+    decimals (0.2 for 20%). At expiry (T <= 0) or zero volatility the price is the
+    discounted intrinsic value of the forward.
+    """
+    S, K, T, sigma, r, q, is_call = _broadcast_inputs(S, K, T, sigma, r, q, is_call)
+    T = np.maximum(T, 0.0)
+    sign = np.where(is_call, 1.0, -1.0)
+    pv_s = S * np.exp(-q * T)
+    pv_k = K * np.exp(-r * T)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma_sqrt_t = sigma * np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / sigma_sqrt_t
+        d2 = d1 - sigma_sqrt_t
+        price = sign * (pv_s * ndtr(sign * d1) - pv_k * ndtr(sign * d2))
+
+    intrinsic = np.maximum(sign * (pv_s - pv_k), 0.0)
+    return _unbox(np.where(sigma_sqrt_t > 0, price, intrinsic))
+
+
+def bs_vega(S, K, T, sigma, r=0.0, q=0.0):
+    """Vega per 1.00 change in volatility (same for calls and puts)"""
+    S, K, T, sigma, r, q, _ = _broadcast_inputs(S, K, T, sigma, r, q, True)
+    T = np.maximum(T, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_t = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * sqrt_t)
+        vega = S * np.exp(-q * T) * _norm_pdf(d1) * sqrt_t
+    return _unbox(np.where(sigma * sqrt_t > 0, vega, 0.0))
+
+
+def bs_gamma(S, K, T, sigma, r=0.0, q=0.0):
+    """Gamma per unit of S (same for calls and puts)"""
+    S, K, T, sigma, r, q, _ = _broadcast_inputs(S, K, T, sigma, r, q, True)
+    T = np.maximum(T, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma_sqrt_t = sigma * np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / sigma_sqrt_t
+        gamma = np.exp(-q * T) * _norm_pdf(d1) / (S * sigma_sqrt_t)
+    return _unbox(np.where(sigma_sqrt_t > 0, gamma, 0.0))
+
+
+def bs_greeks(S, K, T, sigma, r=0.0, q=0.0, is_call=True) -> dict:
+    """
+    Price and first, second and third order greeks in one pass.
+
+    Returns a dict with "price" and every name in GREEKS. Inputs broadcast like
+    bs_price. Greeks are raw: divide vega/vanna/rho by 100 for "per 1%" and
+    theta/charm/color by 365 for "per day". At expiry or zero volatility delta is the
+    step function of the intrinsic value and every other greek is 0.
+    """
+    S, K, T, sigma, r, q, is_call = _broadcast_inputs(S, K, T, sigma, r, q, is_call)
+    T = np.maximum(T, 0.0)
+    sign = np.where(is_call, 1.0, -1.0)
+    df_q = np.exp(-q * T)
+    df_r = np.exp(-r * T)
+    pv_s = S * df_q
+    pv_k = K * df_r
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        sqrt_t = np.sqrt(T)
+        sigma_sqrt_t = sigma * sqrt_t
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / sigma_sqrt_t
+        d2 = d1 - sigma_sqrt_t
+        n_d1 = ndtr(sign * d1)
+        n_d2 = ndtr(sign * d2)
+        pdf_d1 = _norm_pdf(d1)
+        d1_d2 = d1 * d2
+
+        price = sign * (pv_s * n_d1 - pv_k * n_d2)
+        delta = sign * df_q * n_d1
+        vega = pv_s * pdf_d1 * sqrt_t
+        gamma = df_q * pdf_d1 / (S * sigma_sqrt_t)
+        # Rate of change of d2 with calendar time shared by charm and color
+        d2_decay = (2 * (r - q) * T - d2 * sigma_sqrt_t) / (2 * T * sigma_sqrt_t)
+
+        greeks = {
+            "price": price,
+            "delta": delta,
+            "vega": vega,
+            "theta": -pv_s * pdf_d1 * sigma / (2 * sqrt_t)
+            - sign * r * pv_k * n_d2
+            + sign * q * pv_s * n_d1,
+            "rho": sign * K * T * df_r * n_d2,
+            "epsilon": -sign * S * T * df_q * n_d1,
+            "gamma": gamma,
+            "vanna": -df_q * pdf_d1 * d2 / sigma,
+            "charm": sign * q * df_q * n_d1 - df_q * pdf_d1 * d2_decay,
+            "vomma": vega * d1_d2 / sigma,
+            "veta": pv_s
+            * pdf_d1
+            * sqrt_t
+            * (q + (r - q) * d1 / sigma_sqrt_t - (1 + d1_d2) / (2 * T)),
+            "speed": -gamma / S * (d1 / sigma_sqrt_t + 1),
+            "zomma": gamma * (d1_d2 - 1) / sigma,
+            "color": df_q
+            * pdf_d1
+            / (2 * S * T * sigma_sqrt_t)
+            * (2 * q * T + 1 + 2 * T * d1 * d2_decay),
+            "ultima": -vega / sigma**2 * (d1_d2 * (1 - d1_d2) + d1**2 + d2**2),
+        }
+
+    # Degenerate options are worth their (discounted) intrinsic value
+    live = sigma_sqrt_t > 0
+    intrinsic = sign * (pv_s - pv_k)
+    expired = {
+        "price": np.maximum(intrinsic, 0.0),
+        "delta": np.where(intrinsic > 0, sign * df_q, 0.0),
+    }
+    greeks = {
+        name: np.where(live, value, expired.get(name, 0.0))
+        for name, value in greeks.items()
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        elasticity = greeks["delta"] * S / greeks["price"]
+    greeks["lambda"] = np.where(greeks["price"] > 0, elasticity, 0.0)
+    return {name: _unbox(greeks[name]) for name in ["price", *GREEKS]}
+
+
+def intrinsic_value(S, K, is_call=True):
+    """Value at expiry of European calls/puts"""
+    S, K, _, _, _, _, is_call = _broadcast_inputs(S, K, 0, 0, 0, 0, is_call)
+    return _unbox(np.maximum(np.where(is_call, S - K, K - S), 0.0))
+
+
+def _price_vega_vomma(S, K, T, sigma, r, q, sign):
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        sqrt_t = np.sqrt(T)
+        sigma_sqrt_t = sigma * sqrt_t
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / sigma_sqrt_t
+        d2 = d1 - sigma_sqrt_t
+        pv_s = S * np.exp(-q * T)
+        price = sign * (pv_s * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * d2))
+        vega = pv_s * _norm_pdf(d1) * sqrt_t
+        vomma = vega * d1 * d2 / sigma
+    return price, vega, vomma
+
+
+def implied_volatility(
+    price,
+    S,
+    K,
+    T,
+    r=0.0,
+    q=0.0,
+    is_call=True,
+    tol=1e-8,
+    max_iter=100,
+    max_vol=20.0,
+):
+    """
+    Implied volatility of European calls/puts for whole chains at once.
+
+    Starts from the Corrado-Miller closed form guess and takes Halley steps (Newton
+    with the vomma correction), falling back to bisection whenever a step leaves the
+    bracket of volatilities known to under/over price the option. Returns
+    (iv, converged) arrays. Contracts priced outside the no-arbitrage bounds, or with
+    T <= 0, get NaN and converged=False.
+    """
+    price, S, K, T, r, q, is_call = _broadcast_inputs(price, S, K, T, r, q, is_call)
+    shape = S.shape
+    price, S, K, T, r, q, is_call = (a.ravel() for a in (price, S, K, T, r, q, is_call))
+    sign = np.where(is_call, 1.0, -1.0)
+    pv_s = S * np.exp(-q * T)
+    pv_k = K * np.exp(-r * T)
+
+    lower_bound = np.maximum(sign * (pv_s - pv_k), 0.0)
+    upper_bound = np.where(is_call, pv_s, pv_k)
+    solvable = (T > 0) & (price > lower_bound) & (price < upper_bound)
+
+    # Corrado-Miller works on call prices, so convert puts through put-call parity
+    with np.errstate(divide="ignore", invalid="ignore"):
+        call_price = np.where(is_call, price, price + pv_s - pv_k)
+        half_moneyness = (pv_s - pv_k) / 2
+        excess = call_price - half_moneyness
+        root = np.sqrt(np.maximum(excess**2 - (pv_s - pv_k) ** 2 / np.pi, 0.0))
+        guess = np.sqrt(2 * np.pi / T) / (pv_s + pv_k) * (excess + root)
+    sigma = np.where(np.isfinite(guess) & (guess > 0), guess, 0.2)
+    sigma = np.clip(sigma, 1e-4, max_vol)
+
+    price_resolution = 64 * np.finfo(float).eps * upper_bound
+    lo = np.zeros_like(sigma)
+    hi = np.full_like(sigma, max_vol)
+    converged = np.zeros(sigma.shape, dtype=bool)
+    active = solvable.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = active.copy()
+        s = sigma[idx]
+        estimate, vega, vomma = _price_vega_vomma(
+            S[idx], K[idx], T[idx], s, r[idx], q[idx], sign[idx]
+        )
+        diff = estimate - price[idx]
+
+        # Shrink the bracket: too expensive means the volatility is too high
+        lo[idx] = np.where(diff < 0, s, lo[idx])
+        hi[idx] = np.where(diff > 0, s, hi[idx])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = diff / vega
+            step = newton / (1 - 0.5 * newton * vomma / vega)
+        candidate = s - step
+        in_bracket = (
+            np.isfinite(candidate) & (candidate > lo[idx]) & (candidate < hi[idx])
+        )
+        candidate = np.where(in_bracket, candidate, 0.5 * (lo[idx] + hi[idx]))
+
+        done = (np.abs(candidate - s) < tol) | (hi[idx] - lo[idx] < tol)
+        sigma[idx] = candidate
+        # Where vega is too flat the price cannot pin the volatility down to tol
+        converged[idx] = done & (vega * tol > price_resolution[idx])
+        active[idx] = ~done
+
+    iv = np.where(solvable, sigma, np.nan).reshape(shape)
+    return _unbox(iv), _unbox((converged & solvable).reshape(shape))
@@ -0,0 +1,281 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import brentq
+
+GAMMA_PROFILE_LEVELS = 500
+PROFILE_CHUNK_ELEMENTS = 2_000_000  # (levels x contracts) evaluated at a time
+
+# Net GEX of all expiries, ex-next expiry and ex-next monthly expiry
+GEX_COLUMNS = ["TotalGEX", "ExNextGEX", "ExMonthlyGEX"]
+GEX_HISTORY_TABLE = "gex_history"
+GEX_BY_STRIKE_TABLE = "gex_history_by_strike"
+
+
+def calculate_gamma_exposure(df, spot_price):
+    """Calculate gamma exposure for all options."""
+    logging.info("Calculating gamma exposure")
+    df["CallGEX"] = (
+        df["CallGamma"] * df["CallOpenInt"] * 100 * spot_price * spot_price * 0.01
+    )
+    df["PutGEX"] = (
+        df["PutGamma"] * df["PutOpenInt"] * 100 * spot_price * spot_price * 0.01 * -1
+    )
+    df["TotalGamma"] = (df.CallGEX + df.PutGEX) / 10**9
+    return df
+
+
+def days_till_expiry(expirations, today_date):
+    """Business days to expiry in years of 262 trading days, 0DTE counts as one day"""
+    busdays = np.busday_count(
+        np.datetime64(today_date.date()), expirations.to_numpy(dtype="datetime64[D]")
+    )
+    return np.where(busdays == 0, 1, busdays) / 262
+
+
+def gamma_exposure_profile(
+    levels, strikes, call_iv, put_iv, years, call_oi, put_oi, groups
+):
+    """
+    Net gamma exposure ($ billions/1% move) at every spot level, summed over each
+    boolean contract mask in groups. Returns a (levels x groups) array.
+
+    The (levels x contracts) gamma matrix is evaluated in chunks of levels to bound
+    memory. With r = q = 0, GEX = OI * 100 * S^2 * 0.01 * N'(d1) / (S * sigma * sqrt(T))
+    so the per-contract terms are folded into one weight per side. Contracts with a
+    missing strike, IV, expiry or open interest get zero weight, as pandas sums skip
+    NaN.
+    """
+    levels = np.atleast_1d(np.asarray(levels, dtype=float))
+    strikes = np.asarray(strikes, dtype=float)
+    valid_strike = np.isfinite(strikes) & (strikes > 0)
+    strikes = np.where(valid_strike, strikes, 1.0)
+    sides = []
+    for iv, oi in [(call_iv, call_oi), (put_iv, -np.asarray(put_oi, dtype=float))]:
+        with np.errstate(invalid="ignore"):
+            sigma_sqrt_t = np.asarray(iv, dtype=float) * np.sqrt(years)
+            valid = valid_strike & np.isfinite(oi) & (sigma_sqrt_t > 0)
+        sigma_sqrt_t = np.where(valid, sigma_sqrt_t, 1.0)
+        sides.append(
+            (
+                0.5 * sigma_sqrt_t**2,
+                sigma_sqrt_t,
+                np.where(valid, oi, 0.0) / sigma_sqrt_t,
+            )
+        )
+
+    chunk = max(1, PROFILE_CHUNK_ELEMENTS // max(len(strikes), 1))
+    profile = np.empty((len(levels), len(groups)))
+    for start in range(0, len(levels), chunk):
+        spot = levels[start : start + chunk, None]
+        log_moneyness = np.log(spot / strikes)
+        net = 0.0
+        for drift, sigma_sqrt_t, weight in sides:
+            d1 = (log_moneyness + drift) / sigma_sqrt_t
+            net = net + weight * np.exp(-0.5 * d1 * d1)
+        net *= spot / np.sqrt(2 * np.pi)
+        profile[start : start + chunk] = np.column_stack(
+            [net[:, group].sum(axis=1) for group in groups]
+        )
+    return profile / 10**9
+
+
+def find_gamma_flip(levels, total_gamma, gamma_at):
+    """
+    Spot level where total gamma first changes sign, refined with Brent's method.
+    Sign changes next to NaN levels are ignored; None when there is no usable one.
+    """
+    signs = np.sign(total_gamma)
+    finite = np.isfinite(total_gamma)
+    crossings = np.flatnonzero((signs[:-1] != signs[1:]) & finite[:-1] & finite[1:])
+    for idx in crossings:
+        try:
+            return brentq(gamma_at, levels[idx], levels[idx + 1], xtol=1e-6)
+        except ValueError as e:
+            logging.debug(
+                f"No gamma flip between {levels[idx]} and {levels[idx + 1]}: {e}"
+            )
+    return None
+
+
+def expiry_groups(df):
+    """Contract masks for all expiries, ex-next expiry and ex-next monthly expiry"""
+    next_expiry = df["ExpirationDate"].min()
+
+    df["IsThirdFriday"] = (df["ExpirationDate"].dt.weekday == 4) & df[
+        "ExpirationDate"
+    ].dt.day.between(15, 21)
+    next_monthly_exp = df.loc[df["IsThirdFriday"], "ExpirationDate"].min()
+
+    return [
+        np.ones(len(df), dtype=bool),
+        (df["ExpirationDate"] != next_expiry).to_numpy(),
+        (df["ExpirationDate"] != next_monthly_exp).to_numpy(),
+    ]
+
+
+def calculate_gamma_profile(
+    df, spot_price, from_strike, to_strike, today_date, num_levels=GAMMA_PROFILE_LEVELS
+):
+    """
+    Calculate the gamma exposure profile for a range of spot prices.
+
+    Returns the levels, the total, ex-next expiry and ex-next monthly expiry profiles
+    and the gamma flip level (None when the profile does not cross zero).
+    """
+    logging.info(f"Calculating gamma profile over {num_levels} levels")
+    levels = np.linspace(from_strike, to_strike, num_levels)
+
+    df["daysTillExp"] = days_till_expiry(df["ExpirationDate"], today_date)
+
+    contracts = (
+        df["StrikePrice"].to_numpy(),
+        df["CallIV"].to_numpy(),
+        df["PutIV"].to_numpy(),
+        df["daysTillExp"].to_numpy(),
+        df["CallOpenInt"].to_numpy(),
+        df["PutOpenInt"].to_numpy(),
+    )
+    groups = expiry_groups(df)
+    all_expiries = groups[0]
+    profile = gamma_exposure_profile(levels, *contracts, groups)
+    total_gamma = profile[:, 0]
+
+    zero_gamma = find_gamma_flip(
+        levels,
+        total_gamma,
+        lambda level: gamma_exposure_profile(level, *contracts, [all_expiries])[0, 0],
+    )
+
+    return levels, total_gamma, profile[:, 1], profile[:, 2], zero_gamma
+
+
+def create_gex_history_tables(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {GEX_HISTORY_TABLE} (
+            Source TEXT NOT NULL,
+            QuoteDate TEXT NOT NULL,
+            SpotPrice REAL,
+            TotalGEX REAL,
+            ExNextGEX REAL,
+            ExMonthlyGEX REAL,
+            GammaFlip REAL,
+            PRIMARY KEY (Source, QuoteDate)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {GEX_BY_STRIKE_TABLE} (
+            Source TEXT NOT NULL,
+            QuoteDate TEXT NOT NULL,
+            StrikePrice REAL NOT NULL,
+            TotalGEX REAL,
+            ExNextGEX REAL,
+            ExMonthlyGEX REAL,
+            PRIMARY KEY (Source, QuoteDate, StrikePrice)
+        ) WITHOUT ROWID
+    """)
+
+
+def summarise_gex(df, spot_price, from_strike, to_strike, zero_gamma):
+    """
+    Snapshot summary and GEX by strike of a chain processed by calculate_gamma_exposure.
+    Only strikes inside the profile range with some exposure are kept.
+    """
+    groups = expiry_groups(df)
+    by_strike = pd.DataFrame(
+        {
+            column: df["TotalGamma"].where(group, 0.0)
+            for column, group in zip(GEX_COLUMNS, groups)
+        }
+    )
+    by_strike["StrikePrice"] = df["StrikePrice"]
+    by_strike = by_strike.groupby("StrikePrice", as_index=False)[GEX_COLUMNS].sum()
+    by_strike = by_strike[
+        by_strike["StrikePrice"].between(from_strike, to_strike)
+        & (by_strike[GEX_COLUMNS] != 0).any(axis=1)
+    ]
+
+    summary = {
+        "SpotPrice": spot_price,
+        **{
+            column: float(df.loc[group, "TotalGamma"].sum())
+            for column, group in zip(GEX_COLUMNS, groups)
+        },
+        "GammaFlip": zero_gamma,
+    }
+    return summary, by_strike
+
+
+def save_gex_history(conn, source, quote_date, summary, by_strike):
+    """Replace the stored snapshot of source on quote_date"""
+    quote_date = pd.Timestamp(quote_date).strftime("%Y-%m-%d")
+    create_gex_history_tables(conn)
+    with conn:
+        conn.execute(
+            f"DELETE FROM {GEX_BY_STRIKE_TABLE} WHERE Source = ? AND QuoteDate = ?",
+            (source, quote_date),
+        )
+        conn.execute(
+            f"INSERT OR REPLACE INTO {GEX_HISTORY_TABLE} "
+            "(Source, QuoteDate, SpotPrice, TotalGEX, ExNextGEX, ExMonthlyGEX, GammaFlip) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                source,
+                quote_date,
+                summary["SpotPrice"],
+                *(summary[column] for column in GEX_COLUMNS),
+                summary["GammaFlip"],
+            ),
+        )
+        conn.executemany(
+            f"INSERT INTO {GEX_BY_STRIKE_TABLE} "
+            "(Source, QuoteDate, StrikePrice, TotalGEX, ExNextGEX, ExMonthlyGEX) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (source, quote_date, *row)
+                for row in by_strike[["StrikePrice", *GEX_COLUMNS]].itertuples(
+                    index=False
+                )
+            ],
+        )
+    logging.info(
+        f"Saved GEX history for {source} on {quote_date} ({len(by_strike)} strikes)"
+    )
+
+
+def _history_filters(source, start, end):
+    clauses, params = [], []
+    for clause, value in [
+        ("Source = ?", source),
+        ("QuoteDate >= ?", start),
+        ("QuoteDate <= ?", end),
+    ]:
+        if value is not None:
+            clauses.append(clause)
+            params.append(str(value))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def load_gex_history(conn, source=None, start=None, end=None):
+    """Flip level and net GEX time series ordered by quote date"""
+    create_gex_history_tables(conn)
+    where, params = _history_filters(source, start, end)
+    return pd.read_sql_query(
+        f"SELECT * FROM {GEX_HISTORY_TABLE}{where} ORDER BY QuoteDate, Source",
+        conn,
+        params=params,
+        parse_dates=["QuoteDate"],
+    )
+
+
+def load_gex_by_strike(conn, quote_date, source=None):
+    """GEX by strike of a single snapshot"""
+    create_gex_history_tables(conn)
+    quote_date = pd.Timestamp(quote_date).strftime("%Y-%m-%d")
+    where, params = _history_filters(source, quote_date, quote_date)
+    return pd.read_sql_query(
+        f"SELECT * FROM {GEX_BY_STRIKE_TABLE}{where} ORDER BY Source, StrikePrice",
+        conn,
+        params=params,
+    )
@@ -0,0 +1,250 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+WEEKLY_WINDOW = 5
+MONTHLY_WINDOW = 22
+FEATURES = ["const", "daily_rv", "daily_rv_rq", "weekly_rv", "monthly_rv"]
+# Days before the first complete (lagged) regressors: rv and its monthly mean
+FEATURE_WARMUP_DAYS = 2 * MONTHLY_WINDOW - 1
+# Initial RLS covariance: a flat prior on the coefficients, weaker than a day of data
+RLS_PRIOR_VARIANCE = 1e6
+
+
+def _as_frame(values):
+    if isinstance(values, pd.Series):
+        return values.to_frame()
+    return pd.DataFrame(values)
+
+
+def rolling_sum(values, window):
+    """
+    Rolling sum over the rows of a (days x symbols) array from cumulative sums.
+    NaN values are skipped; windows with fewer than window valid values are NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = np.isfinite(values)
+    zero_row = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([zero_row, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    counts = np.concatenate([zero_row, np.cumsum(valid, axis=0)])
+
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        complete = counts[window:] - counts[:-window] == window
+        out[window - 1 :] = np.where(complete, sums[window:] - sums[:-window], np.nan)
+    return out
+
+
+def rolling_mean(values, window):
+    return rolling_sum(values, window) / window
+
+
+def realised_measures(returns, window=MONTHLY_WINDOW):
+    """
+    Annualised realised volatility and realised quarticity of the trailing window
+    of daily returns, from rolling sums of r^2 and r^4.
+    """
+    returns = np.asarray(returns, dtype=float)
+    rv = np.sqrt(rolling_sum(returns**2, window) * TRADING_DAYS / window)
+    rq = rolling_sum(returns**4, window) * TRADING_DAYS**2
+    return rv, rq
+
+
+def harq_features(rv, rq):
+    """
+    (days x symbols x features) HARQ regressors of each day, in FEATURES order.
+    Row t only uses values up to t - 1, so it forecasts rv[t] out of sample.
+    """
+    rv = np.asarray(rv, dtype=float)
+    rq = np.asarray(rq, dtype=float)
+    current = np.stack(
+        [
+            np.ones_like(rv),
+            rv,
+            rv * rq,
+            rolling_mean(rv, WEEKLY_WINDOW),
+            rolling_mean(rv, MONTHLY_WINDOW),
+        ],
+        axis=-1,
+    )
+    features = np.full_like(current, np.nan)
+    features[1:] = current[:-1]
+    return features
+
+
+def _valid_rows(features, target):
+    return np.isfinite(features).all(axis=-1) & np.isfinite(target)
+
+
+def fit_ols(features, target):
+    """(symbols x features) least squares coefficients of every symbol at once"""
+    valid = _valid_rows(features, target)
+    x = np.where(valid[..., None], features, 0.0)
+    y = np.where(valid, target, 0.0)
+    xtx = np.einsum("tni,tnj->nij", x, x)
+    xty = np.einsum("tni,tn->ni", x, y)
+    return np.einsum("nij,nj->ni", np.linalg.pinv(xtx), xty)
+
+
+def rls_walk_forward(features, target, forgetting=1.0, min_obs=TRADING_DAYS):
+    """
+    Recursive least squares refit after every day, for all symbols at once.
+    Each day is first forecast with the coefficients fitted on the days before it,
+    then added to the fit. With forgetting < 1 older days are down-weighted.
+    Returns (days x symbols) forecasts, NaN until a symbol has min_obs days of
+    history, the (days x symbols x features) coefficients used for them and the
+    (symbols x features) coefficients after the last day.
+    """
+    n_days, n_symbols, n_features = features.shape
+    valid = _valid_rows(features, target)
+    beta = np.zeros((n_symbols, n_features))
+    cov = np.tile(np.eye(n_features) * RLS_PRIOR_VARIANCE, (n_symbols, 1, 1))
+    observations = np.zeros(n_symbols, dtype=int)
+    forecasts = np.full((n_days, n_symbols), np.nan)
+    betas = np.full((n_days, n_symbols, n_features), np.nan)
+
+    for t in range(n_days):
+        ok = valid[t]
+        if not ok.any():
+            continue
+        x = np.where(ok[:, None], features[t], 0.0)
+        y = np.where(ok, target[t], 0.0)
+
+        ready = ok & (observations >= min_obs)
+        forecasts[t, ready] = np.einsum("ni,ni->n", x, beta)[ready]
+        betas[t, ready] = beta[ready]
+
+        cov_x = np.einsum("nij,nj->ni", cov, x)
+        gain = cov_x / (forgetting + np.einsum("ni,ni->n", x, cov_x))[:, None]
+        error = y - np.einsum("ni,ni->n", x, beta)
+        beta = np.where(ok[:, None], beta + gain * error[:, None], beta)
+        updated = (cov - gain[:, :, None] * cov_x[:, None, :]) / forgetting
+        updated = 0.5 * (updated + updated.transpose(0, 2, 1))
+        cov = np.where(ok[:, None, None], updated, cov)
+        observations += ok
+
+    return forecasts, betas, beta
+
+
+def forecast_paths(rv, rq, beta, n_days):
+    """
+    (n_days x symbols) iterated forecasts from the last day of rv and rq. Each
+    forecast feeds the next day's daily term and the weekly and monthly averages;
+    quarticity is held at its last value.
+    """
+    rv = np.asarray(rv, dtype=float)
+    latest_rv = rv[-1]
+    latest_weekly = rv[-WEEKLY_WINDOW:].mean(axis=0)
+    latest_monthly = rv[-MONTHLY_WINDOW:].mean(axis=0)
+    latest_rq = np.asarray(rq, dtype=float)[-1]
+
+    forecasts = np.empty((n_days, rv.shape[1]))
+    for day in range(n_days):
+        features = np.stack(
+            [
+                np.ones_like(latest_rv),
+                latest_rv,
+                latest_rv * latest_rq,
+                latest_weekly,
+                latest_monthly,
+            ],
+            axis=-1,
+        )
+        forecasts[day] = np.einsum("ni,ni->n", features, beta)
+        latest_rv = forecasts[day]
+        latest_weekly = (
+            latest_weekly * (WEEKLY_WINDOW - 1) + latest_rv
+        ) / WEEKLY_WINDOW
+        latest_monthly = (
+            latest_monthly * (MONTHLY_WINDOW - 1) + latest_rv
+        ) / MONTHLY_WINDOW
+    return forecasts
+
+
+@dataclass
+class HARQBacktest:
+    """Walk-forward one day ahead HARQ forecasts of realised volatility"""
+
+    rv: pd.DataFrame
+    rq: pd.DataFrame
+    forecasts: pd.DataFrame
+    betas: np.ndarray
+    final_betas: np.ndarray
+
+    def latest_betas(self):
+        """(symbols x features) coefficients after the last day's update"""
+        return pd.DataFrame(self.final_betas, index=self.rv.columns, columns=FEATURES)
+
+    def losses(self):
+        """
+        Out of sample RMSE and QLIKE per symbol for HARQ and for the random walk
+        forecast (yesterday's realised volatility), over the days HARQ forecasts.
+        """
+        rv = self.rv.to_numpy()
+        naive = np.full_like(rv, np.nan)
+        naive[1:] = rv[:-1]
+        harq = self.forecasts.to_numpy()
+        scored = np.isfinite(harq) & np.isfinite(naive) & np.isfinite(rv) & (harq > 0)
+
+        def rmse(forecast):
+            error = np.where(scored, forecast - rv, np.nan)
+            return np.sqrt(np.nanmean(error**2, axis=0))
+
+        def qlike(forecast):
+            ratio = np.where(scored, rv**2 / forecast**2, np.nan)
+            return np.nanmean(ratio - np.log(ratio) - 1, axis=0)
+
+        return pd.DataFrame(
+            {
+                "days": scored.sum(axis=0),
+                "harq_rmse": rmse(harq),
+                "naive_rmse": rmse(naive),
+                "harq_qlike": qlike(harq),
+                "naive_qlike": qlike(naive),
+            },
+            index=self.rv.columns,
+        )
+
+
+def backtest_min_days(min_obs=TRADING_DAYS):
+    """Days of returns needed before the backtest scores its first forecast"""
+    return FEATURE_WARMUP_DAYS + min_obs + 1
+
+
+def backtest(returns, forgetting=1.0, min_obs=TRADING_DAYS):
+    """
+    Walk-forward HARQ backtest of daily returns (a Series, or a DataFrame with
+    one column per symbol), refitting every day with recursive least squares.
+    """
+    returns = _as_frame(returns)
+    if len(returns) < backtest_min_days(min_obs):
+        raise ValueError(
+            f"Backtest needs at least {backtest_min_days(min_obs)} days of returns "
+            f"({FEATURE_WARMUP_DAYS} warm-up + {min_obs} fitted + 1 scored), "
+            f"got {len(returns)}"
+        )
+    rv, rq = realised_measures(returns.to_numpy())
+    forecasts, betas, final_betas = rls_walk_forward(
+        harq_features(rv, rq), rv, forgetting=forgetting, min_obs=min_obs
+    )
+
+    def frame(values):
+        return pd.DataFrame(values, index=returns.index, columns=returns.columns)
+
+    return HARQBacktest(frame(rv), frame(rq), frame(forecasts), betas, final_betas)
+
+
+def forecast(returns, n_days, beta=None):
+    """
+    (n_days x symbols) HARQ volatility forecasts after the last day of returns.
+    Without beta the model is fitted by least squares on the full history.
+    """
+    returns = _as_frame(returns)
+    rv, rq = realised_measures(returns.to_numpy())
+    if beta is None:
+        beta = fit_ols(harq_features(rv, rq), rv)
+    return pd.DataFrame(
+        forecast_paths(rv, rq, np.asarray(beta), n_days), columns=returns.columns
+    )
@@ -0,0 +1,443 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+TRADING_DAYS = 252
+MA_TYPES = ("SMA", "EMA", "WMA", "HMA", "DEMA", "TEMA", "VWMA", "ZLMA", "ALMA")
+
+
+def _periods(periods):
+    return np.asarray(list(periods), dtype=int)
+
+
+def _rolling_sums(values, periods):
+    """(periods x days) trailing sums of values from one cumulative sum, NaN until full"""
+    values = np.asarray(values, dtype=float)
+    periods = _periods(periods)
+    sums = np.concatenate([[0.0], np.cumsum(values)])
+    ends = np.arange(1, len(values) + 1)
+    starts = ends[None, :] - periods[:, None]
+    out = sums[ends][None, :] - sums[np.maximum(starts, 0)]
+    return np.where(starts >= 0, out, np.nan)
+
+
+def _rolling_mean_rows(matrix, windows):
+    """Trailing mean of each row of matrix over its own window, NaN-aware"""
+    valid = np.isfinite(matrix)
+    zero = np.zeros((matrix.shape[0], 1))
+    sums = np.concatenate([zero, np.cumsum(np.where(valid, matrix, 0.0), axis=1)], 1)
+    counts = np.concatenate([zero, np.cumsum(valid, axis=1)], axis=1)
+
+    windows = np.asarray(windows, dtype=int)[:, None]
+    ends = np.arange(1, matrix.shape[1] + 1)[None, :]
+    starts = np.maximum(ends - windows, 0)
+    rows = np.arange(matrix.shape[0])[:, None]
+    total = sums[rows, ends] - sums[rows, starts]
+    complete = (counts[rows, ends] - counts[rows, starts] == windows) & (
+        ends >= windows
+    )
+    return np.where(complete, total / windows, np.nan)
+
+
+def _windowed(values, weights):
+    """
+    (periods x days) weighted sums of each trailing window, one row per weights
+    array with the oldest day first. All periods are one matrix product over a
+    sliding window view of the series.
+    """
+    values = np.asarray(values, dtype=float)
+    longest = max(len(w) for w in weights)
+    kernel = np.zeros((len(weights), longest))
+    for row, w in enumerate(weights):
+        kernel[row, longest - len(w) :] = w
+
+    padded = np.concatenate([np.zeros(longest - 1), values])
+    out = (sliding_window_view(padded, longest) @ kernel.T).T
+    lengths = np.array([len(w) for w in weights])[:, None]
+    return np.where(np.arange(len(values))[None, :] >= lengths - 1, out, np.nan)
+
+
+def sma(close, periods):
+    return _rolling_sums(close, periods) / _periods(periods)[:, None]
+
+
+def ema(values, periods):
+    """
+    (periods x days) exponential moving averages with span period, as
+    ewm(span=period, adjust=False). values is one series, or one row per period.
+    """
+    periods = _periods(periods)
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = np.broadcast_to(values, (len(periods), len(values)))
+    alpha = 2.0 / (periods + 1.0)
+
+    rows = values.T
+    out = np.empty_like(rows)
+    out[0] = rows[0]
+    for t in range(1, len(rows)):
+        out[t] = out[t - 1] + alpha * (rows[t] - out[t - 1])
+    return out.T
+
+
+def wma(close, periods):
+    return _windowed(
+        close, [np.arange(1, p + 1) / (p * (p + 1) / 2) for p in _periods(periods)]
+    )
+
+
+def hma(close, periods):
+    periods = _periods(periods)
+    raw = 2 * wma(close, periods // 2) - wma(close, periods)
+    return _rolling_mean_rows(raw, np.sqrt(periods).astype(int))
+
+
+def dema(close, periods):
+    ema1 = ema(close, periods)
+    return 2 * ema1 - ema(ema1, periods)
+
+
+def tema(close, periods):
+    ema1 = ema(close, periods)
+    ema2 = ema(ema1, periods)
+    return 3 * ema1 - 3 * ema2 + ema(ema2, periods)
+
+
+def vwma(close, volume, periods):
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _rolling_sums(close * volume, periods) / _rolling_sums(volume, periods)
+
+
+def zlma(close, periods):
+    periods = _periods(periods)
+    close = np.asarray(close, dtype=float)
+    lags = (periods - 1) // 2
+    days = np.arange(len(close))
+    lagged = np.where(
+        days[None, :] >= lags[:, None],
+        close[np.maximum(days - lags[:, None], 0)],
+        np.nan,
+    )
+    return ema(close, periods) + (close[None, :] - lagged)
+
+
+def alma(close, periods, offset=0.85, sigma=6):
+    weights = []
+    for p in _periods(periods):
+        window = np.arange(1, p + 1)
+        w = np.exp(-((window - offset * p) ** 2) / (2 * sigma**2))
+        weights.append(w / w.sum())
+    return _windowed(close, weights)
+
+
+def moving_averages(ma_type, close, volume, periods):
+    """(periods x days) moving averages of one MA_TYPES family"""
+    if ma_type == "VWMA":
+        return vwma(close, volume, periods)
+    families = {
+        "SMA": sma,
+        "EMA": ema,
+        "WMA": wma,
+        "HMA": hma,
+        "DEMA": dema,
+        "TEMA": tema,
+        "ZLMA": zlma,
+        "ALMA": alma,
+    }
+    return families[ma_type](close, periods)
+
+
+def warmup_days(periods):
+    """Days before every MA in the grid has a value and a position can follow it"""
+    longest = int(max(periods))
+    return longest + int(np.sqrt(longest)) + 1
+
+
+def signal_returns(close, ma, index_returns, leverage=3.0):
+    """
+    (periods x days) daily returns of holding the leveraged index on the days after
+    the close is above the moving average, and cash otherwise
+    """
+    above = np.asarray(close, dtype=float)[None, :] > ma
+    positions = np.zeros(above.shape)
+    positions[:, 1:] = above[:, :-1]
+    return positions * (leverage * np.nan_to_num(index_returns))[None, :]
+
+
+def sharpe_ratios(sums, squares, counts):
+    """Annualised Sharpe ratios from return moments, NaN without dispersion"""
+    counts = np.asarray(counts, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / counts
+        var = (squares - sums * mean) / (counts - 1)
+        std = np.sqrt(np.maximum(var, 0.0))
+        return np.where(std > 1e-9, mean / std * np.sqrt(TRADING_DAYS), np.nan)
+
+
+_worker_data = {}
+
+
+def _init_worker(close, volume, index_returns, masks, leverage):
+    _worker_data.update(
+        close=close,
+        volume=volume,
+        index_returns=index_returns,
+        masks=masks.astype(float),
+        leverage=leverage,
+    )
+
+
+def _family_moments(ma_type, periods):
+    data = _worker_data
+    ma = moving_averages(ma_type, data["close"], data["volume"], periods)
+    returns = signal_returns(data["close"], ma, data["index_returns"], data["leverage"])
+    return returns @ data["masks"].T, (returns * returns) @ data["masks"].T
+
+
+@dataclass
+class GridMoments:
+    """
+    Sums and sums of squares of the daily strategy returns of every
+    (MA type, period) over each day mask, additive across disjoint masks
+    """
+
+    ma_types: list
+    periods: np.ndarray
+    sums: np.ndarray  # (types x periods x masks)
+    squares: np.ndarray
+    counts: np.ndarray  # (masks,)
+
+    def sharpe(self, masks):
+        """(types x periods) Sharpe ratios over the union of disjoint masks"""
+        masks = np.atleast_1d(masks)
+        return sharpe_ratios(
+            self.sums[..., masks].sum(-1),
+            self.squares[..., masks].sum(-1),
+            self.counts[masks].sum(),
+        )
+
+
+def grid_moments(
+    close,
+    volume,
+    index_returns,
+    periods,
+    masks,
+    ma_types=MA_TYPES,
+    leverage=3.0,
+    workers=None,
+):
+    """
+    Return moments of the whole MA grid over each row of the (masks x days) boolean
+    masks. Each MA family is computed for all periods at once, in a process pool
+    unless a single worker is requested.
+    """
+    periods = _periods(periods)
+    masks = np.asarray(masks, dtype=bool)
+    initargs = (
+        np.asarray(close, dtype=float),
+        np.asarray(volume, dtype=float),
+        np.asarray(index_returns, dtype=float),
+        masks,
+        leverage,
+    )
+    workers = min(workers or os.cpu_count() or 1, len(ma_types))
+    if workers == 1:
+        _init_worker(*initargs)
+        results = [_family_moments(ma_type, periods) for ma_type in ma_types]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=initargs
+        ) as executor:
+            results = list(
+                executor.map(_family_moments, ma_types, [periods] * len(ma_types))
+            )
+
+    return GridMoments(
+        list(ma_types),
+        periods,
+        np.stack([sums for sums, _ in results]),
+        np.stack([squares for _, squares in results]),
+        masks.sum(axis=1),
+    )
+
+
+def walk_forward_folds(n_days, start, train_days, test_days):
+    """
+    (train, test) boolean day masks of rolling walk-forward folds: each model is
+    chosen on train_days days and traded on the test_days days after them
+    """
+    train, test = [], []
+    for fold_start in range(start, n_days - train_days, test_days):
+        split = fold_start + train_days
+        days = np.arange(n_days)
+        train.append((days >= fold_start) & (days < split))
+        test.append((days >= split) & (days < min(split + test_days, n_days)))
+    return np.array(train).reshape(-1, n_days), np.array(test).reshape(-1, n_days)
+
+
+def cpcv_splits(n_days, start, n_groups, n_test_groups, purge_days, embargo_days):
+    """
+    Combinatorially purged cross-validation: the days from start are cut into
+    n_groups contiguous groups and every combination of n_test_groups of them is a
+    test set. Training days within purge_days before or embargo_days after a test
+    group are dropped, so moving-average lookbacks and serially correlated returns
+    do not leak between train and test.
+    Returns (groups x days) group masks, (splits x days) train masks and the
+    test group indices of each split.
+    """
+    days = np.arange(n_days)
+    bounds = np.linspace(start, n_days, n_groups + 1).astype(int)
+    groups = np.array(
+        [(days >= lo) & (days < hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    )
+
+    test_groups = list(combinations(range(n_groups), n_test_groups))
+    train = []
+    for split in test_groups:
+        keep = (days >= start) & ~groups[list(split)].any(axis=0)
+        for g in split:
+            lo, hi = bounds[g], bounds[g + 1]
+            keep &= ~((days >= lo - purge_days) & (days < hi + embargo_days))
+        train.append(keep)
+    return groups, np.array(train), test_groups
+
+
+def cpcv_paths(n_groups, test_groups):
+    """
+    Backtest paths of a CPCV run as (paths x groups) split indices: each group is
+    tested in several splits, path j takes the j-th of them.
+    """
+    tested_in = [
+        [s for s, split in enumerate(test_groups) if g in split]
+        for g in range(n_groups)
+    ]
+    return np.array(tested_in).T
+
+
+def overfitting_probability(is_sharpe, oos_sharpe):
+    """
+    Probability of backtest overfitting over splits: how often the configuration
+    with the best in-sample Sharpe ranks in the bottom half out of sample.
+    is_sharpe and oos_sharpe are (splits x configurations).
+    Returns (PBO, relative out-of-sample rank of the in-sample best per split).
+    """
+    is_sharpe = np.nan_to_num(is_sharpe, nan=-np.inf)
+    oos_sharpe = np.nan_to_num(oos_sharpe, nan=-np.inf)
+    best = is_sharpe.argmax(axis=1)
+    ranks = oos_sharpe.argsort(axis=1).argsort(axis=1) + 1
+    omega = ranks[np.arange(len(best)), best] / (oos_sharpe.shape[1] + 1)
+    logits = np.log(omega / (1 - omega))
+    return float(np.mean(logits <= 0)), omega
+
+
+def _candidates(moments, ma_types):
+    rows = [moments.ma_types.index(t) for t in ma_types or moments.ma_types]
+    labels = [(moments.ma_types[r], int(p)) for r in rows for p in moments.periods]
+    sums = moments.sums[rows].reshape(len(labels), -1)
+    squares = moments.squares[rows].reshape(len(labels), -1)
+    return labels, sums, squares
+
+
+def _masks_sharpe(sums, squares, counts, masks):
+    """(len(masks) x configurations) Sharpe ratios, one mask index each"""
+    return sharpe_ratios(sums[:, masks].T, squares[:, masks].T, counts[masks][:, None])
+
+
+def _best(sharpe):
+    return np.nan_to_num(sharpe, nan=-np.inf).argmax(axis=-1)
+
+
+@dataclass
+class WalkForwardResult:
+    """Configurations chosen on each training window and how they traded after it"""
+
+    chosen: list  # (MA type, period) per fold
+    is_sharpe: np.ndarray
+    oos_sharpe: np.ndarray
+    stitched_sharpe: float  # of the out-of-sample days of all folds together
+
+
+def walk_forward(moments, train, test, ma_types=None):
+    """
+    Pick the best Sharpe configuration of ma_types (default all) on each train mask
+    and trade it on the matching test mask. train and test index the mask axis.
+    """
+    labels, sums, squares = _candidates(moments, ma_types)
+    is_sharpe = _masks_sharpe(sums, squares, moments.counts, train)
+    best = _best(is_sharpe)
+    folds = np.arange(len(best))
+    oos_sharpe = _masks_sharpe(sums, squares, moments.counts, test)[folds, best]
+    stitched = sharpe_ratios(
+        sums[best, test].sum(), squares[best, test].sum(), moments.counts[test].sum()
+    )
+    return WalkForwardResult(
+        [labels[b] for b in best],
+        is_sharpe[folds, best],
+        oos_sharpe,
+        float(stitched),
+    )
+
+
+@dataclass
+class CPCVResult:
+    """In-sample choice and out-of-sample outcome of every CPCV split"""
+
+    chosen: list  # (MA type, period) per split
+    is_sharpe: np.ndarray
+    oos_sharpe: np.ndarray
+    path_sharpe: np.ndarray  # of each stitched out-of-sample backtest path
+    pbo: float
+    oos_rank: np.ndarray  # relative out-of-sample rank of the chosen configuration
+
+
+def cpcv(moments, groups, train, test_groups, ma_types=None):
+    """
+    Combinatorially purged cross-validation of the grid restricted to ma_types.
+    groups index the group masks and train the purged train mask of each split,
+    both on the mask axis; test_groups are the group numbers of each split.
+    """
+    labels, sums, squares = _candidates(moments, ma_types)
+    counts = moments.counts
+    groups = np.asarray(groups)
+
+    all_is = _masks_sharpe(sums, squares, counts, train)
+    best = _best(all_is)
+    splits = np.arange(len(best))
+
+    test_masks = [groups[list(split)] for split in test_groups]
+    all_oos = np.array(
+        [
+            sharpe_ratios(
+                sums[:, masks].sum(1), squares[:, masks].sum(1), counts[masks].sum()
+            )
+            for masks in test_masks
+        ]
+    )
+    pbo, oos_rank = overfitting_probability(all_is, all_oos)
+
+    paths = cpcv_paths(len(groups), test_groups)
+    path_sharpe = np.array(
+        [
+            sharpe_ratios(
+                sums[best[path], groups].sum(),
+                squares[best[path], groups].sum(),
+                counts[groups].sum(),
+            )
+            for path in paths
+        ]
+    )
+    return CPCVResult(
+        [labels[b] for b in best],
+        all_is[splits, best],
+        all_oos[splits, best],
+        path_sharpe,
+        pbo,
+        oos_rank,
+    )
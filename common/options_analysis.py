@@ -1,9 +1,13 @@
 import logging
 import sqlite3
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import date
 from enum import Enum
-from typing import List, Optional
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterator, List, Optional
 
 import pandas as pd
 
@@ -171,6 +175,17 @@ class OptionsData:
     strike_distance_pct: float
 
 
+OPTIONS_DATA_INDEXES = {
+    "idx_options_expire_date": "EXPIRE_DATE",
+    # get_next_expiry_by_dte: filter on DTE while walking expiries in order
+    "idx_options_expiry_dte": "QUOTE_DATE, EXPIRE_DATE, DTE",
+    # get_options_by_delta: nearest strike is the first index entry, no sort
+    "idx_options_strike_distance": "QUOTE_DATE, EXPIRE_DATE, STRIKE_DISTANCE",
+    # get_current_prices: answered from the index alone
+    "idx_options_prices": "QUOTE_DATE, EXPIRE_DATE, STRIKE, UNDERLYING_LAST, C_LAST, P_LAST",
+}
+
+
 class OptionsDatabase:
     def __init__(self, db_path, table_tag):
         self.db_path = db_path
@@ -179,6 +194,10 @@ class OptionsDatabase:
         self.trades_table = f"trades_dte_{table_tag}"
         self.trade_legs_table = f"trade_legs_dte_{table_tag}"
         self.trade_history_table = f"trade_history_dte_{table_tag}"
+        self._next_trade_id = None
+        self._pending_writes = None
+        self._pending_days = set()
+        self._flush_every_days = None
 
     def __enter__(self) -> "OptionsDatabase":
         """Context manager entry point - connects to database"""
@@ -189,12 +208,81 @@ class OptionsDatabase:
         """Context manager exit point - ensures database is properly closed"""
         self.disconnect()
 
-    def connect(self):
+    def connect(self, read_only=False):
         """Establish database connection"""
-        logging.info(f"Connecting to database: {self.db_path}")
-        self.conn = sqlite3.connect(self.db_path)
+        logging.info(f"Connecting to database: {self.db_path} ({read_only=})")
+        if read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True)
+        else:
+            self.conn = sqlite3.connect(self.db_path)
+            # Lets report readers query the database while a backtest is writing
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
         self.cursor = self.conn.cursor()
 
+    @contextmanager
+    def batched_writes(self, flush_every_days=20):
+        """Queue trade writes and flush them with executemany in one transaction
+        every `flush_every_days` quote dates and always on exit"""
+        self._pending_writes = []
+        self._pending_days = set()
+        self._flush_every_days = flush_every_days
+        try:
+            yield self
+        finally:
+            self.flush()
+            self._pending_writes = None
+
+    def flush(self):
+        """Write any queued statements and commit them"""
+        if self._pending_writes is None:
+            return
+        self._apply_pending_writes()
+        self.conn.commit()
+        self._pending_days.clear()
+
+    def _apply_pending_writes(self):
+        """Run queued statements in the open transaction so reads on this connection see them"""
+        if not self._pending_writes:
+            return
+        for sql, rows in self._pending_writes:
+            self.cursor.executemany(sql, rows)
+        logging.debug(
+            f"Applied {sum(len(rows) for _, rows in self._pending_writes)} queued writes"
+        )
+        self._pending_writes.clear()
+
+    def _write(self, sql, params, quote_date):
+        """Execute and commit a write, or queue it inside batched_writes"""
+        if self._pending_writes is None:
+            self.cursor.execute(sql, params)
+            self.conn.commit()
+            return
+
+        if (
+            quote_date not in self._pending_days
+            and len(self._pending_days) >= self._flush_every_days
+        ):
+            self.flush()
+        self._pending_days.add(quote_date)
+
+        # Consecutive statements with the same SQL go into a single executemany
+        if self._pending_writes and self._pending_writes[-1][0] == sql:
+            self._pending_writes[-1][1].append(params)
+        else:
+            self._pending_writes.append((sql, [params]))
+
+    def _allocate_trade_id(self):
+        """Trade ids are assigned up front so trade inserts can be queued"""
+        if self._next_trade_id is None:
+            self._apply_pending_writes()
+            self.cursor.execute(f"SELECT MAX(TradeId) FROM {self.trades_table}")
+            self._next_trade_id = (self.cursor.fetchone()[0] or 0) + 1
+        trade_id = self._next_trade_id
+        self._next_trade_id += 1
+        return trade_id
+
     def setup_trades_table(self):
         """Drop and recreate trades and trade_history tables with DTE suffix"""
         # Drop existing tables (trade_history first due to foreign key constraint)
@@ -269,20 +357,136 @@ class OptionsDatabase:
         self.cursor.execute(create_history_table_sql)
         logging.info("Tables dropped and recreated successfully")
 
-        # Add indexes for options_data table
+        self.create_indexes()
+        self._next_trade_id = None
+
+    def create_indexes(self):
+        """Create the options_data and trade table indexes used by the queries below"""
+        # The covering indexes all start with (QUOTE_DATE, EXPIRE_DATE), so these are redundant
+        for name in ("idx_options_combined", "idx_options_quote_date"):
+            self.cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
         index_sql = [
-            "CREATE INDEX IF NOT EXISTS idx_options_quote_date ON options_data(QUOTE_DATE)",
-            "CREATE INDEX IF NOT EXISTS idx_options_expire_date ON options_data(EXPIRE_DATE)",
-            "CREATE INDEX IF NOT EXISTS idx_options_combined ON options_data(QUOTE_DATE, EXPIRE_DATE)",
+            f"CREATE INDEX IF NOT EXISTS {name} ON options_data({columns})"
+            for name, columns in OPTIONS_DATA_INDEXES.items()
         ]
 
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (self.trades_table,),
+        )
+        if self.cursor.fetchone():
+            index_sql += [
+                f"CREATE INDEX IF NOT EXISTS idx_{self.trades_table}_status ON {self.trades_table}(Status, Date)",
+                f"CREATE INDEX IF NOT EXISTS idx_{self.trade_legs_table}_trade ON {self.trade_legs_table}(TradeId, LegType)",
+                f"CREATE INDEX IF NOT EXISTS idx_{self.trade_history_table}_trade ON {self.trade_history_table}(TradeId, Date)",
+            ]
+
         for sql in index_sql:
+            logging.debug(sql)
             self.cursor.execute(sql)
 
         logging.info("Added indexes successfully")
 
         self.conn.commit()
 
+    def explain_queries(self, quote_date=None, min_dte=30):
+        """Run EXPLAIN QUERY PLAN over every statement this class issues.
+
+        Read methods are executed against a sample quote date with statement tracing on,
+        write methods are only queued (see batched_writes) and never committed. Returns
+        one row per plan step, with full scans and temp B-trees flagged.
+        """
+        statements = []
+
+        def capture(method, *args):
+            traced = []
+            self.conn.set_trace_callback(traced.append)
+            try:
+                result = method(*args)
+                if isinstance(result, Iterator):
+                    result = list(result)
+            except Exception as e:
+                logging.warning(f"Unable to run {method.__name__}: {e}")
+                result = None
+            finally:
+                self.conn.set_trace_callback(None)
+            statements.extend(
+                (method.__name__, sql, ())
+                for sql in traced
+                if sql.lstrip().upper().startswith(("SELECT", "WITH"))
+            )
+            return result
+
+        quote_dates = capture(self.get_quote_dates)
+        quote_date = quote_date or quote_dates[len(quote_dates) // 2]
+        expiry_date, dte = capture(self.get_next_expiry_by_dte, quote_date, min_dte)
+        call_df, _ = capture(self.get_options_by_delta, quote_date, expiry_date)
+        strike_price = call_df["CALL_STRIKE"].iloc[0]
+        underlying_price = call_df["UNDERLYING_LAST"].iloc[0]
+        capture(self.get_current_prices, quote_date, strike_price, expiry_date)
+        capture(self.get_current_options_data, quote_date, strike_price, expiry_date)
+        capture(self.get_open_trades)
+        capture(self.get_last_open_trade)
+        trades = capture(self.iter_all_trades)
+        if trades:
+            capture(
+                self.load_trade_with_multiple_legs, trades[0].id, LegType.TRADE_OPEN
+            )
+
+        leg = Leg(
+            leg_quote_date=quote_date,
+            leg_expiry_date=expiry_date,
+            contract_type=ContractType.PUT,
+            position_type=PositionType.SHORT,
+            leg_type=LegType.TRADE_AUDIT,
+            strike_price=strike_price,
+            underlying_price_open=underlying_price,
+            premium_open=0,
+        )
+        trade = Trade(quote_date, expiry_date, dte, "OPEN", 0, legs=[leg])
+        # Queue the writes without ever flushing them
+        self._pending_writes = []
+        self._flush_every_days = float("inf")
+        try:
+            trade_id = self.create_trade_with_multiple_legs(trade)
+            self.create_trade(quote_date, strike_price, 0, 0, 0, expiry_date, dte)
+            self.update_trade_leg(trade_id, leg)
+            self.update_trade_status(trade_id, 0, 0, 0, quote_date)
+            self.close_trade(trade_id, trade)
+            statements.extend(
+                ("write", sql, rows[0]) for sql, rows in self._pending_writes
+            )
+        except sqlite3.Error as e:
+            logging.warning(
+                f"Unable to queue trade writes for {self.trades_table}: {e}"
+            )
+        finally:
+            self._pending_writes = None
+            self._next_trade_id = None
+            self.conn.rollback()
+
+        plans = []
+        for method, sql, params in dict.fromkeys(statements):
+            statement = " ".join(sql.split())
+            for _, _, _, detail in self.conn.execute(
+                f"EXPLAIN QUERY PLAN {sql}", params
+            ):
+                flags = []
+                if detail.startswith("SCAN"):
+                    flags.append("SCAN")
+                if "TEMP B-TREE" in detail:
+                    flags.append("TEMP B-TREE")
+                plans.append(
+                    {
+                        "Method": method,
+                        "Statement": statement,
+                        "Plan": detail,
+                        "Flags": ", ".join(flags),
+                    }
+                )
+        return pd.DataFrame(plans)
+
     def update_trade_leg(self, existing_trade_id, updated_leg: Leg):
         update_leg_sql = f"""
         INSERT INTO {self.trade_legs_table} (
@@ -311,17 +515,18 @@ class OptionsDatabase:
             updated_leg.iv,
         )
 
-        self.cursor.execute(update_leg_sql, params)
-        self.conn.commit()
+        self._write(update_leg_sql, params, updated_leg.leg_quote_date)
 
     def create_trade_with_multiple_legs(self, trade):
+        trade_id = self._allocate_trade_id()
         trade_sql = f"""
         INSERT INTO {self.trades_table} (
-            Date, ExpireDate, DTE, Status, PremiumCaptured,
+            TradeId, Date, ExpireDate, DTE, Status, PremiumCaptured,
             ClosingPremium, ClosedTradeAt, CloseReason
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         trade_params = (
+            trade_id,
             trade.trade_date,
             trade.expire_date,
             trade.dte,
@@ -332,8 +537,7 @@ class OptionsDatabase:
             trade.close_reason,
         )
 
-        self.cursor.execute(trade_sql, trade_params)
-        trade_id = self.cursor.lastrowid
+        self._write(trade_sql, trade_params, trade.trade_date)
 
         leg_sql = f"""
         INSERT INTO {self.trade_legs_table} (
@@ -362,14 +566,15 @@ class OptionsDatabase:
                 leg.theta,
                 leg.iv,
             )
-            self.cursor.execute(leg_sql, leg_params)
+            self._write(leg_sql, leg_params, trade.trade_date)
 
-        self.conn.commit()
         return trade_id
 
     def load_trade_with_multiple_legs(
         self, trade_id: int, leg_type: Optional[LegType] = None
     ) -> Trade:
+        self._apply_pending_writes()
+
         # First get the trade
         trade_sql = f"""
         SELECT Date, ExpireDate, DTE, Status, PremiumCaptured,
@@ -460,70 +665,80 @@ class OptionsDatabase:
             existing_trade_id,
         )
 
-        self.cursor.execute(update_trade_sql, trade_params)
-        self.conn.commit()
+        self._write(update_trade_sql, trade_params, existing_trade.closed_trade_at)
 
     def load_all_trades(self) -> List[Trade]:
         """Load all trades from the database"""
-        # First get all trades
-        trades_sql = f"""
-        SELECT TradeId, Date, ExpireDate, DTE, Status, PremiumCaptured,
-               ClosingPremium, ClosedTradeAt, CloseReason
-        FROM {self.trades_table}
-        ORDER BY Date
-        """
-        self.cursor.execute(trades_sql)
-        columns = [description[0] for description in self.cursor.description]
-        trade_rows = [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        return list(self.iter_all_trades())
 
-        trades = []
-        for trade_row in trade_rows:
-            trade_id = trade_row["TradeId"]
+    def iter_all_trades(self, batch_size=1000) -> Iterator[Trade]:
+        """Stream trades with their legs using a single joined query.
 
-            # Get legs for this trade
-            legs_sql = f"""
-            SELECT Date, ExpiryDate, StrikePrice, ContractType, PositionType, PremiumOpen,
-                   PremiumCurrent, UnderlyingPriceOpen, UnderlyingPriceCurrent, LegType
-            FROM {self.trade_legs_table}
-            WHERE TradeId = ?
-            """
-            self.cursor.execute(legs_sql, (trade_id,))
-            leg_columns = [description[0] for description in self.cursor.description]
-            leg_rows = [dict(zip(leg_columns, row)) for row in self.cursor.fetchall()]
-
-            # Create legs
-            trade_legs = []
-            for leg_row in leg_rows:
-                leg = Leg(
-                    leg_quote_date=leg_row["Date"],
-                    leg_expiry_date=leg_row["ExpiryDate"],
-                    leg_type=LegType(leg_row["LegType"]),
-                    contract_type=ContractType(leg_row["ContractType"]),
-                    position_type=PositionType(leg_row["PositionType"]),
-                    strike_price=leg_row["StrikePrice"],
-                    underlying_price_open=leg_row["UnderlyingPriceOpen"],
-                    premium_open=leg_row["PremiumOpen"],
-                    underlying_price_current=leg_row["UnderlyingPriceCurrent"],
-                    premium_current=leg_row["PremiumCurrent"],
-                )
-                trade_legs.append(leg)
-
-            # Create trade
-            trade = Trade(
-                trade_date=trade_row["Date"],
-                expire_date=trade_row["ExpireDate"],
-                dte=trade_row["DTE"],
-                status=trade_row["Status"],
-                premium_captured=trade_row["PremiumCaptured"],
-                closing_premium=trade_row["ClosingPremium"],
-                closed_trade_at=trade_row["ClosedTradeAt"],
-                close_reason=trade_row["CloseReason"],
-                legs=trade_legs,
-            )
-            trade.id = trade_id  # Add the trade ID to the trade object
-            trades.append(trade)
+        Rows are fetched `batch_size` at a time and grouped into Trade objects as they
+        arrive, so large trade sets never need to be held in memory at once.
+        """
+        self._apply_pending_writes()
 
-        return trades
+        query = f"""
+        SELECT t.TradeId, t.Date AS TradeDate, t.ExpireDate, t.DTE, t.Status,
+               t.PremiumCaptured, t.ClosingPremium, t.ClosedTradeAt, t.CloseReason,
+               l.HistoryId, l.Date, l.ExpiryDate, l.StrikePrice, l.ContractType,
+               l.PositionType, l.PremiumOpen, l.PremiumCurrent, l.UnderlyingPriceOpen,
+               l.UnderlyingPriceCurrent, l.LegType, l.Delta, l.Gamma, l.Vega, l.Theta,
+               l.Iv
+        FROM {self.trades_table} t
+        LEFT JOIN {self.trade_legs_table} l ON l.TradeId = t.TradeId
+        ORDER BY t.Date, t.TradeId, l.HistoryId
+        """
+        # Separate cursor so callers can keep using self.cursor while iterating
+        cursor = self.conn.cursor()
+        cursor.execute(query)
+        columns = [description[0] for description in cursor.description]
+
+        def rows():
+            while batch := cursor.fetchmany(batch_size):
+                yield from (dict(zip(columns, row)) for row in batch)
+
+        try:
+            for trade_id, trade_rows in groupby(rows(), key=itemgetter("TradeId")):
+                trade_rows = list(trade_rows)
+                trade_row = trade_rows[0]
+                trade = Trade(
+                    trade_date=trade_row["TradeDate"],
+                    expire_date=trade_row["ExpireDate"],
+                    dte=trade_row["DTE"],
+                    status=trade_row["Status"],
+                    premium_captured=trade_row["PremiumCaptured"],
+                    closing_premium=trade_row["ClosingPremium"],
+                    closed_trade_at=trade_row["ClosedTradeAt"],
+                    close_reason=trade_row["CloseReason"],
+                    legs=[
+                        Leg(
+                            leg_quote_date=leg_row["Date"],
+                            leg_expiry_date=leg_row["ExpiryDate"],
+                            leg_type=LegType(leg_row["LegType"]),
+                            contract_type=ContractType(leg_row["ContractType"]),
+                            position_type=PositionType(leg_row["PositionType"]),
+                            strike_price=leg_row["StrikePrice"],
+                            underlying_price_open=leg_row["UnderlyingPriceOpen"],
+                            premium_open=leg_row["PremiumOpen"],
+                            underlying_price_current=leg_row["UnderlyingPriceCurrent"],
+                            premium_current=leg_row["PremiumCurrent"],
+                            delta=leg_row["Delta"],
+                            gamma=leg_row["Gamma"],
+                            vega=leg_row["Vega"],
+                            theta=leg_row["Theta"],
+                            iv=leg_row["Iv"],
+                        )
+                        # Trades without legs come back as a single row of NULL leg columns
+                        for leg_row in trade_rows
+                        if leg_row["HistoryId"] is not None
+                    ],
+                )
+                trade.id = trade_id  # Add the trade ID to the trade object
+                yield trade
+        finally:
+            cursor.close()
 
     def create_trade(
         self,
@@ -539,16 +754,18 @@ class OptionsDatabase:
         logging.info(
             f"Creating trade for {date} with {strike_price=}, {call_price=}, {put_price=}, {underlying_price=}"
         )
+        trade_id = self._allocate_trade_id()
         insert_sql = f"""
         INSERT INTO {self.trades_table} (
-            Date, ExpireDate, DTE, StrikePrice, Status,
+            TradeId, Date, ExpireDate, DTE, StrikePrice, Status,
             UnderlyingPriceOpen, CallPriceOpen, PutPriceOpen, PremiumCaptured
-        ) VALUES (?, ?, ?, ?, 'OPEN', ?, ?, ?, ?)
+        ) VALUES (?, ?, ?, ?, ?, 'OPEN', ?, ?, ?, ?)
         """
         premium_captured = call_price + put_price
-        self.cursor.execute(
+        self._write(
             insert_sql,
             (
+                trade_id,
                 date,
                 expire_date,
                 dte,
@@ -558,13 +775,12 @@ class OptionsDatabase:
                 put_price,
                 premium_captured,
             ),
+            date,
         )
-        trade_id = self.cursor.lastrowid
 
         # Add first history record
         self.add_trade_history(trade_id, date, underlying_price, call_price, put_price)
 
-        self.conn.commit()
         logging.info(
             f"Created new trade {trade_id} for date {date} at strike {strike_price}"
         )
@@ -578,13 +794,13 @@ class OptionsDatabase:
         INSERT INTO {self.trade_history_table} (TradeId, Date, UnderlyingPrice, CallPrice, PutPrice)
         VALUES (?, ?, ?, ?, ?)
         """
-        self.cursor.execute(
-            insert_sql, (trade_id, date, underlying_price, call_price, put_price)
+        self._write(
+            insert_sql, (trade_id, date, underlying_price, call_price, put_price), date
         )
-        self.conn.commit()
 
     def get_open_trades(self):
         """Get all open trades"""
+        self._apply_pending_writes()
         query = f"""
             SELECT *
             FROM {self.trades_table}
@@ -593,6 +809,7 @@ class OptionsDatabase:
         return pd.read_sql_query(query, self.conn)
 
     def get_last_open_trade(self):
+        self._apply_pending_writes()
         query = f"""
             SELECT *
             FROM {self.trades_table}
@@ -662,7 +879,7 @@ class OptionsDatabase:
             CloseReason = ?
         WHERE TradeId = ?
         """
-        self.cursor.execute(
+        self._write(
             update_sql,
             (
                 status,
@@ -674,12 +891,47 @@ class OptionsDatabase:
                 close_reason,
                 trade_id,
             ),
+            quote_date,
+        )
+
+    def get_options_chain(self, columns):
+        """Load the given columns of every options_data row in storage order"""
+        query = f"SELECT {', '.join(columns)} FROM options_data"
+        df = pd.read_sql_query(query, self.conn)
+        logging.info(f"Loaded {len(df)} options_data rows")
+        return df
+
+    def save_backtest_results(self, trades_df, history_df):
+        """Insert precomputed trades and trade history rows in a single transaction"""
+
+        def to_rows(df):
+            return (
+                df.astype(object)
+                .where(df.notna(), None)
+                .itertuples(index=False, name=None)
+            )
+
+        trade_columns = ", ".join(trades_df.columns)
+        history_columns = ", ".join(history_df.columns)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {self.trades_table} ({trade_columns}) "
+                f"VALUES ({', '.join('?' * len(trades_df.columns))})",
+                to_rows(trades_df),
+            )
+            self.conn.executemany(
+                f"INSERT INTO {self.trade_history_table} ({history_columns}) "
+                f"VALUES ({', '.join('?' * len(history_df.columns))})",
+                to_rows(history_df),
+            )
+        logging.info(
+            f"Saved {len(trades_df)} trades and {len(history_df)} history rows"
         )
-        self.conn.commit()
 
     def disconnect(self):
         """Close database connection"""
         if self.conn:
+            self.flush()
             logging.info("Closing database connection")
             self.conn.close()
 
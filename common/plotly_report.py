@@ -0,0 +1,380 @@
+import base64
+import hashlib
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+# A chart is a few hundred to a thousand pixels wide, more points than this per
+# line only add bytes to the page and work for the browser
+MAX_POINTS = 1000
+# The most recent year of every downsampled line is kept at full resolution so
+# zooming into the latest data (where the reports are read) shows every bar
+FULL_RESOLUTION_POINTS = 252
+
+# Per-point trace attributes that have to be indexed together with x and y
+POINT_ATTRIBUTES = ("text", "hovertext", "customdata", "ids")
+MARKER_POINT_ATTRIBUTES = ("color", "size", "symbol", "opacity")
+
+# Size of rasterised charts when the figure layout doesn't set one
+PNG_WIDTH = 1400
+PNG_HEIGHT = 600
+# Cached PNGs not used for this many days are removed
+PNG_CACHE_DAYS = 7
+
+INTEGER_TYPES = (
+    (np.int8, "i1"),
+    (np.int16, "i2"),
+    (np.int32, "i4"),
+)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points picked by Largest-Triangle-Three-Buckets downsampling.
+    The first and last points are always kept, NaN values are ignored.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(finite) <= n_out or n_out < 3:
+        return finite
+
+    fx = x[finite]
+    fy = y[finite]
+    edges = np.linspace(1, len(finite) - 1, n_out - 1).astype(int)
+    picked = np.empty(n_out, dtype=int)
+    picked[0] = 0
+    a = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else len(finite)
+        next_start = stop if bucket + 2 < len(edges) else len(finite) - 1
+        avg_x = fx[next_start:next_stop].mean()
+        avg_y = fy[next_start:next_stop].mean()
+        area = np.abs(
+            (fx[a] - avg_x) * (fy[start:stop] - fy[a])
+            - (fx[a] - fx[start:stop]) * (avg_y - fy[a])
+        )
+        a = start + int(np.argmax(area))
+        picked[bucket + 1] = a
+    picked[-1] = len(finite) - 1
+    return finite[picked]
+
+
+def minmax_indices(y, n_out):
+    """Indices of the minimum and maximum of n_out / 2 equal buckets plus both ends"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+
+    picked = [0, n - 1]
+    for chunk in np.array_split(np.arange(n), max(n_out // 2, 1)):
+        values = y[chunk]
+        if np.isnan(values).all():
+            picked.append(chunk[0])
+            continue
+        picked.append(chunk[np.nanargmin(values)])
+        picked.append(chunk[np.nanargmax(values)])
+    return np.unique(picked)
+
+
+def step_indices(y):
+    """Indices that draw the same horizontal-vertical step line: one per run of equal values"""
+    y = np.asarray(y, dtype=float)
+    if len(y) < 3:
+        return np.arange(len(y))
+    same = (y[1:] == y[:-1]) | (np.isnan(y[1:]) & np.isnan(y[:-1]))
+    keep = np.concatenate([[True], ~same])
+    keep[-1] = True
+    return np.flatnonzero(keep)
+
+
+def _gap_indices(y):
+    # First NaN of every gap keeps lines broken where the data is missing
+    missing = np.isnan(np.asarray(y, dtype=float))
+    return np.flatnonzero(missing & ~np.concatenate([[False], missing[:-1]]))
+
+
+def _as_datetime64(values):
+    """datetime64 array of date-like values, None for anything else"""
+    if len(values) == 0:
+        return None
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return None
+    if not isinstance(values[0], (date, np.datetime64)):
+        return None
+    try:
+        return pd.DatetimeIndex(values).tz_localize(None).to_numpy()
+    except (TypeError, ValueError):
+        return None
+
+
+def _positions(x, n):
+    """Numeric positions of x for downsampling, None when x is categorical"""
+    if x is None:
+        return np.arange(n, dtype=float)
+    dates = _as_datetime64(x)
+    if dates is not None:
+        return dates.astype("datetime64[ns]").astype(np.int64).astype(float)
+    x = np.asarray(x)
+    if x.dtype.kind in "iuf":
+        return x.astype(float)
+    return None
+
+
+def _downsampled(trace, max_points, full_resolution_points):
+    """Indices of the points of a line trace to keep, None to keep all of them"""
+    if trace.get("type", "scatter") not in ("scatter", "scattergl"):
+        return None
+    if trace.get("mode", "lines") != "lines" or trace.get("stackgroup"):
+        return None
+    if trace.get("fill") in ("tonexty", "tonextx", "tonext", "toself"):
+        return None
+    y = trace.get("y")
+    if y is None:
+        return None
+    y = np.asarray(y)
+    n = len(y)
+    if n <= max_points or y.dtype.kind not in "iuf":
+        return None
+    x = _positions(trace.get("x"), n)
+    if x is None or len(x) != n:
+        return None
+
+    head = n - min(full_resolution_points, n)
+    if trace.get("line", {}).get("shape") == "hv":
+        kept = step_indices(y[:head])
+        if len(kept) > max_points:
+            kept = kept[minmax_indices(y[kept], max_points)]
+    else:
+        kept = np.union1d(
+            lttb_indices(x[:head], y[:head], max_points), _gap_indices(y[:head])
+        )
+    return np.concatenate([kept, np.arange(head, n)])
+
+
+def _take(values, indices, n):
+    if isinstance(values, np.ndarray) and len(values) == n:
+        return values[indices]
+    if isinstance(values, (list, tuple)) and len(values) == n:
+        return [values[i] for i in indices]
+    return values
+
+
+def _downsample_trace(trace, indices):
+    n = len(trace["y"])
+    for key in ("x", "y", *POINT_ATTRIBUTES):
+        if key in trace:
+            trace[key] = _take(trace[key], indices, n)
+    marker = trace.get("marker")
+    if isinstance(marker, dict):
+        for key in MARKER_POINT_ATTRIBUTES:
+            if key in marker:
+                marker[key] = _take(marker[key], indices, n)
+
+
+def _typed_array(values, dtype, code):
+    values = np.ascontiguousarray(values, dtype=dtype)
+    encoded = {
+        "dtype": code,
+        "bdata": base64.b64encode(values.tobytes()).decode("ascii"),
+    }
+    if values.ndim > 1:
+        encoded["shape"] = ", ".join(str(size) for size in values.shape)
+    return encoded
+
+
+def _date_strings(dates):
+    dates = dates.astype("datetime64[ns]")
+    days = dates.astype("datetime64[D]")
+    unit = "D" if (dates == days)[~np.isnat(dates)].all() else "s"
+    return np.datetime_as_string(dates, unit=unit).astype(object)
+
+
+def compact_array(values):
+    """
+    Plotly typed array of a numpy array: float32 for floats, the smallest integer
+    type that holds integers. Dates become ISO strings without nanoseconds.
+    Lists are left alone, plotly uses them for fixed size settings like domains too.
+    """
+    if not isinstance(values, (list, tuple, np.ndarray)):
+        return values
+    dates = _as_datetime64(values)
+    if dates is not None:
+        return _date_strings(dates)
+    if not isinstance(values, np.ndarray):
+        return values
+    if values.dtype.kind == "f":
+        return _typed_array(values, np.float32, "f4")
+    if values.dtype.kind in "iu" and values.size:
+        low, high = values.min(), values.max()
+        for dtype, code in INTEGER_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return _typed_array(values, dtype, code)
+        return _typed_array(values, np.float64, "f8")
+    return values
+
+
+def _compact(node):
+    if isinstance(node, dict):
+        return {key: _compact(value) for key, value in node.items()}
+    if isinstance(node, (list, tuple)) and node and isinstance(node[0], dict):
+        return [_compact(value) for value in node]
+    return compact_array(node)
+
+
+def compact_traces(
+    fig, max_points=MAX_POINTS, full_resolution_points=FULL_RESOLUTION_POINTS
+):
+    """Trace dicts of fig with long lines downsampled and arrays as typed arrays"""
+    traces = []
+    for trace in fig.data:
+        trace = trace.to_plotly_json()
+        indices = _downsampled(trace, max_points, full_resolution_points)
+        if indices is not None:
+            _downsample_trace(trace, indices)
+        traces.append(_compact(trace))
+    return traces
+
+
+def _script_json(obj):
+    # Keep "</script>" inside string values from closing the script tag
+    return to_json_plotly(obj).replace("</", "<\\/")
+
+
+class PlotlyReport:
+    """
+    Renders the Plotly figures of a single HTML page. plotly.js and the layout
+    templates shared by the figures are written once by head_html, which has to be
+    called after all figures are rendered. Safe to use from several threads.
+    """
+
+    def __init__(
+        self,
+        plotlyjs="cdn",
+        max_points=MAX_POINTS,
+        full_resolution_points=FULL_RESOLUTION_POINTS,
+    ):
+        if plotlyjs not in ("cdn", "inline"):
+            raise ValueError(f"plotlyjs must be 'cdn' or 'inline', got {plotlyjs!r}")
+        self.plotlyjs = plotlyjs
+        self.max_points = max_points
+        self.full_resolution_points = full_resolution_points
+        self._templates = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _template_key(self, layout):
+        template = layout.pop("template", None)
+        if not template:
+            return None
+        template_json = _script_json(template)
+        key = hashlib.sha1(template_json.encode()).hexdigest()[:12]
+        with self._lock:
+            self._templates.setdefault(key, template_json)
+        return key
+
+    def figure_html(self, fig, config=None):
+        """Div and Plotly.newPlot script of fig"""
+        with self._lock:
+            div_id = f"plotly-chart-{next(self._ids)}"
+        traces = compact_traces(fig, self.max_points, self.full_resolution_points)
+        layout = fig.layout.to_plotly_json()
+        template_key = self._template_key(layout)
+        layout_js = _script_json(layout)
+        if template_key is not None:
+            layout_js = f'Object.assign({layout_js}, {{template: structuredClone(plotlyTemplates["{template_key}"])}})'
+        config = {"responsive": True, **(config or {})}
+        return (
+            f'<div id="{div_id}" class="plotly-graph-div" style="height:100%; width:100%;"></div>\n'
+            f"<script>\n"
+            f'Plotly.newPlot("{div_id}", {_script_json(traces)}, {layout_js}, {_script_json(config)});\n'
+            f"</script>"
+        )
+
+    def head_html(self):
+        """plotly.js and the shared layout templates, for the page <head>"""
+        if self.plotlyjs == "inline":
+            plotlyjs = f'<script charset="utf-8">{get_plotlyjs()}</script>'
+        else:
+            plotlyjs = (
+                f'<script charset="utf-8" src="https://cdn.plot.ly/'
+                f'plotly-{get_plotlyjs_version()}.min.js"></script>'
+            )
+        with self._lock:
+            templates = ",\n".join(
+                f'"{key}": {template}' for key, template in self._templates.items()
+            )
+        return f"{plotlyjs}\n<script>\nvar plotlyTemplates = {{\n{templates}\n}};\n</script>"
+
+
+def _write_png(fig_json, path, width, height, scale):
+    png = pio.to_image(
+        pio.from_json(fig_json), format="png", width=width, height=height, scale=scale
+    )
+    # Write next to the final name first so a concurrent run never reads half a file
+    partial = f"{path}.{os.getpid()}.part"
+    with open(partial, "wb") as f:
+        f.write(png)
+    os.replace(partial, path)
+    return path
+
+
+def _prune_png_cache(cache_dir, keep_days):
+    cutoff = time.time() - keep_days * 86400
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".png") and entry.stat().st_mtime < cutoff:
+            os.unlink(entry.path)
+
+
+def rasterise_figures(
+    figs, cache_dir, scale=1.0, workers=None, keep_days=PNG_CACHE_DAYS
+):
+    """
+    PNG files of figs (name -> figure) rendered with kaleido in parallel worker
+    processes. Images are cached in cache_dir by a hash of the figure JSON and the
+    image size, so charts that did not change are not rendered again.
+    Returns (name -> PNG path, number of cache hits).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    paths = {}
+    pending = {}
+    for name, fig in figs.items():
+        fig_json = fig.to_json()
+        width = fig.layout.width or PNG_WIDTH
+        height = fig.layout.height or PNG_HEIGHT
+        key = hashlib.sha256(
+            f"{width}x{height}@{scale}\n{fig_json}".encode()
+        ).hexdigest()
+        path = os.path.join(cache_dir, f"{key}.png")
+        paths[name] = path
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            pending[path] = (fig_json, path, width, height, scale)
+
+    if len(pending) == 1:
+        _write_png(*next(iter(pending.values())))
+    elif pending:
+        max_workers = min(len(pending), workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for future in [
+                executor.submit(_write_png, *args) for args in pending.values()
+            ]:
+                future.result()
+
+    _prune_png_cache(cache_dir, keep_days)
+    return paths, len(set(paths.values())) - len(pending)
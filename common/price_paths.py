@@ -0,0 +1,102 @@
+import numpy as np
+
+TRADING_DAYS = 252
+CALENDAR_DAYS = 365
+PNL_PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+
+
+def gbm_log_returns(
+    n_paths,
+    steps,
+    dt,
+    sigma,
+    mu=0.0,
+    jump_intensity=0.0,
+    jump_mean=0.0,
+    jump_std=0.0,
+    rng=None,
+):
+    """
+    (paths x steps) log returns of geometric Brownian motion with annual drift mu and
+    volatility sigma. With jump_intensity (jumps per year) > 0, Merton jumps with
+    normally distributed log sizes are added and the drift is compensated so the
+    expected growth is still mu.
+    """
+    rng = rng or np.random.default_rng()
+    log_returns = rng.standard_normal((n_paths, steps))
+    log_returns *= sigma * np.sqrt(dt)
+    drift = (mu - 0.5 * sigma**2) * dt
+
+    if jump_intensity > 0:
+        drift -= jump_intensity * dt * (np.exp(jump_mean + 0.5 * jump_std**2) - 1)
+        jumps = rng.poisson(jump_intensity * dt, (n_paths, steps))
+        has_jump = jumps > 0
+        log_returns[has_jump] += jumps[has_jump] * jump_mean + np.sqrt(
+            jumps[has_jump]
+        ) * jump_std * rng.standard_normal(has_jump.sum())
+
+    log_returns += drift
+    return log_returns
+
+
+def bootstrap_log_returns(historical_returns, n_paths, steps, block_size=1, rng=None):
+    """
+    (paths x steps) log returns resampled with replacement from historical_returns.
+    Blocks of consecutive days are drawn together to keep volatility clustering.
+    """
+    rng = rng or np.random.default_rng()
+    historical_returns = np.asarray(historical_returns, dtype=float)
+    block_size = max(1, min(block_size, len(historical_returns)))
+    blocks = -(-steps // block_size)
+    starts = rng.integers(
+        0, len(historical_returns) - block_size + 1, (n_paths, blocks)
+    )
+    idx = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)
+    return historical_returns[idx[:, :steps]]
+
+
+def price_paths(spot, log_returns):
+    """(paths x steps + 1) prices starting at spot"""
+    paths = np.empty((log_returns.shape[0], log_returns.shape[1] + 1))
+    paths[:, 0] = 0.0
+    np.cumsum(log_returns, axis=1, out=paths[:, 1:])
+    np.exp(paths, out=paths)
+    paths *= spot
+    return paths
+
+
+def touch_probabilities(paths, levels):
+    """
+    Share of paths that trade through each level at any step. Levels above the
+    starting price are touched from below, levels below it from above.
+    """
+    spot = paths[0, 0]
+    path_max = paths.max(axis=1)
+    path_min = paths.min(axis=1)
+    return {
+        level: float(
+            np.mean(path_max >= level) if level >= spot else np.mean(path_min <= level)
+        )
+        for level in levels
+    }
+
+
+def pnl_summary(pnl, alpha=0.05):
+    """Distribution, probability of profit, value at risk and expected shortfall"""
+    pnl = np.asarray(pnl, dtype=float)
+    var = np.quantile(pnl, alpha)
+    tail = pnl[pnl <= var]
+    return {
+        "Paths": len(pnl),
+        "Mean": float(pnl.mean()),
+        "Std": float(pnl.std()),
+        "Min": float(pnl.min()),
+        **{
+            f"P{p}": float(v)
+            for p, v in zip(PNL_PERCENTILES, np.percentile(pnl, PNL_PERCENTILES))
+        },
+        "Max": float(pnl.max()),
+        "ProbProfit": float(np.mean(pnl > 0)),
+        f"VaR{alpha:.0%}": float(-var),
+        f"ES{alpha:.0%}": float(-tail.mean()),
+    }
@@ -0,0 +1,299 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CHAIN_COLUMNS = [
+    "QUOTE_DATE",
+    "EXPIRE_DATE",
+    "DTE",
+    "STRIKE",
+    "STRIKE_DISTANCE",
+    "UNDERLYING_LAST",
+    "C_LAST",
+    "P_LAST",
+]
+
+TRADE_COLUMNS = [
+    "TradeId",
+    "Date",
+    "ExpireDate",
+    "DTE",
+    "StrikePrice",
+    "Status",
+    "UnderlyingPriceOpen",
+    "CallPriceOpen",
+    "PutPriceOpen",
+    "CallPriceClose",
+    "PutPriceClose",
+    "UnderlyingPriceClose",
+    "PremiumCaptured",
+    "ClosingPremium",
+    "ClosedTradeAt",
+    "CloseReason",
+]
+
+
+@dataclass
+class StraddleBacktestParams:
+    """Parameters for a short straddle backtest.
+
+    Leaving both profit_take and stop_loss unset reproduces options-straddle-simple.py
+    (hold to expiry). Setting them reproduces the early exit rules of
+    options-straddle-profit-take-stop-loss-adjustment.py.
+    """
+
+    dte: int = 30
+    trade_delay: int = -1
+    max_open_trades: int = 99
+    profit_take: Optional[float] = None
+    stop_loss: Optional[float] = None
+
+    @property
+    def closes_early(self) -> bool:
+        return self.profit_take is not None or self.stop_loss is not None
+
+
+def find_entry_candidates(chain: pd.DataFrame, min_dte: float) -> pd.DataFrame:
+    """One candidate per quote date: next expiry with DTE >= min_dte at the nearest strike"""
+    next_expiry = (
+        chain.loc[chain["DTE"] >= min_dte]
+        .groupby("QUOTE_DATE", as_index=False)["EXPIRE_DATE"]
+        .min()
+    )
+    rows = chain.merge(next_expiry, on=["QUOTE_DATE", "EXPIRE_DATE"])
+
+    # SQLite sorts NULLs first and breaks ties by row order
+    rows = rows.sort_values(
+        ["STRIKE_DISTANCE", "ROW_ID"], na_position="first", kind="mergesort"
+    )
+    candidates = rows.drop_duplicates("QUOTE_DATE").sort_values("QUOTE_DATE")
+
+    # Same rule as `if not call_price or not put_price`
+    call_price = candidates["C_LAST"].fillna(0)
+    put_price = candidates["P_LAST"].fillna(0)
+    has_prices = call_price.ne(0) & put_price.ne(0)
+    logging.info(
+        f"Found {has_prices.sum()} entry candidates across {len(next_expiry)} quote dates"
+    )
+    return candidates.loc[has_prices].reset_index(drop=True)
+
+
+def build_price_paths(chain: pd.DataFrame, candidates: pd.DataFrame) -> pd.DataFrame:
+    """Join every candidate to all later quotes of its strike/expiry in a single merge"""
+    prices = chain.drop_duplicates(["QUOTE_DATE", "STRIKE", "EXPIRE_DATE"])[
+        ["QUOTE_DATE", "STRIKE", "EXPIRE_DATE", "UNDERLYING_LAST", "C_LAST", "P_LAST"]
+    ]
+    entries = pd.DataFrame(
+        {
+            "CANDIDATE": candidates.index,
+            "ENTRY_DATE": candidates["QUOTE_DATE"],
+            "STRIKE": candidates["STRIKE"],
+            "EXPIRE_DATE": candidates["EXPIRE_DATE"],
+            "PREMIUM": candidates["C_LAST"] + candidates["P_LAST"],
+        }
+    )
+    paths = entries.merge(prices, on=["STRIKE", "EXPIRE_DATE"])
+    paths = paths.loc[paths["QUOTE_DATE"] > paths["ENTRY_DATE"]]
+    return paths.sort_values(["CANDIDATE", "QUOTE_DATE"], kind="mergesort").reset_index(
+        drop=True
+    )
+
+
+def evaluate_exits(
+    paths: pd.DataFrame, params: StraddleBacktestParams
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Mark the closing quote of every candidate path.
+
+    Returns the (possibly filtered) paths and one exit row per candidate that closes.
+    """
+    underlying = paths["UNDERLYING_LAST"]
+    call_price = paths["C_LAST"]
+    put_price = paths["P_LAST"]
+    expired = paths["QUOTE_DATE"] >= paths["EXPIRE_DATE"]
+
+    if not params.closes_early:
+        paths = paths.assign(
+            CLOSE=expired.to_numpy(),
+            STATUS="EXPIRED",
+            REASON=np.where(underlying == 0, "Invalid Close", "Option Expired"),
+        )
+    else:
+        # Days without a full set of prices are skipped entirely
+        priced = underlying.notna() & call_price.notna() & put_price.notna()
+        paths = paths.loc[priced]
+        expired = expired.loc[priced]
+        call_price = call_price.loc[priced]
+        put_price = put_price.loc[priced]
+
+        premium = paths["PREMIUM"]
+        premium_diff_pct = (premium - (call_price + put_price)) / premium * 100
+        profit_take = premium_diff_pct >= (
+            params.profit_take if params.profit_take is not None else np.inf
+        )
+        stop_loss = premium_diff_pct <= -(
+            params.stop_loss if params.stop_loss is not None else np.inf
+        )
+        both_priced = call_price.ne(0) & put_price.ne(0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skewed = (call_price / put_price > 4) | (put_price / call_price > 4)
+        adjustment = both_priced & skewed
+
+        paths = paths.assign(
+            CLOSE=(expired | profit_take | stop_loss | adjustment).to_numpy(),
+            STATUS="CLOSED",
+            REASON=np.select(
+                [profit_take, stop_loss, adjustment],
+                ["PROFIT_TAKE", "STOP_LOSS", "REQUIRE_ADJUSTMENT"],
+                default="Option Expired",
+            ),
+        )
+
+    exits = paths.loc[paths["CLOSE"]].drop_duplicates("CANDIDATE")
+    return paths, exits.set_index("CANDIDATE")
+
+
+def select_trades(
+    quote_dates: np.ndarray,
+    entry_idx: np.ndarray,
+    exit_idx: np.ndarray,
+    params: StraddleBacktestParams,
+) -> np.ndarray:
+    """Apply trade delay and max open trades in date order.
+
+    This is the only path dependent step, so it runs over integer indices only.
+    Returns positions (into entry_idx) of the candidates that become trades.
+    """
+    day_numbers = (
+        pd.to_datetime(pd.Series(quote_dates)).to_numpy().astype("datetime64[D]")
+    ).astype(np.int64)
+    candidate_at = np.full(len(quote_dates), -1, dtype=np.int64)
+    candidate_at[entry_idx] = np.arange(len(entry_idx))
+
+    selected = []
+    open_trades = []  # (entry_idx, exit_idx) in creation order
+    for i in range(len(quote_dates)):
+        open_trades = [t for t in open_trades if t[1] > i]
+
+        if params.trade_delay >= 0 and open_trades:
+            days_since_last_trade = day_numbers[i] - day_numbers[open_trades[-1][0]]
+            if days_since_last_trade < params.trade_delay:
+                continue
+
+        candidate = candidate_at[i]
+        if candidate < 0:
+            continue
+
+        if len(open_trades) >= params.max_open_trades:
+            continue
+
+        selected.append(candidate)
+        open_trades.append((i, exit_idx[candidate]))
+
+    return np.asarray(selected, dtype=np.int64)
+
+
+def run_straddle_backtest(
+    chain: pd.DataFrame, params: StraddleBacktestParams
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Run a short straddle backtest over an options chain.
+
+    Returns (trades, history) frames with the same rows and ids as the day-by-day loop
+    would have written to the trades and trade_history tables.
+    """
+    chain = chain.reset_index(drop=True).assign(ROW_ID=lambda df: df.index)
+    quote_dates = np.sort(chain["QUOTE_DATE"].unique())
+
+    candidates = find_entry_candidates(chain, params.dte)
+    paths, exits = evaluate_exits(build_price_paths(chain, candidates), params)
+
+    entry_idx = np.searchsorted(quote_dates, candidates["QUOTE_DATE"].to_numpy())
+    exit_dates = exits["QUOTE_DATE"].reindex(candidates.index)
+    exit_idx = np.where(
+        exit_dates.notna(),
+        np.searchsorted(quote_dates, exit_dates.fillna("").to_numpy()),
+        len(quote_dates),
+    )
+
+    selected = select_trades(quote_dates, entry_idx, exit_idx, params)
+    trade_ids = pd.Series(np.arange(1, len(selected) + 1), index=selected)
+
+    opened = candidates.loc[selected]
+    closed = exits.reindex(selected)
+    trades = pd.DataFrame(
+        {
+            "TradeId": trade_ids.to_numpy(),
+            "Date": opened["QUOTE_DATE"].to_numpy(),
+            "ExpireDate": opened["EXPIRE_DATE"].to_numpy(),
+            "DTE": opened["DTE"].to_numpy(),
+            "StrikePrice": opened["STRIKE"].to_numpy(),
+            "Status": closed["STATUS"].fillna("OPEN").to_numpy(),
+            "UnderlyingPriceOpen": opened["UNDERLYING_LAST"].to_numpy(),
+            "CallPriceOpen": opened["C_LAST"].to_numpy(),
+            "PutPriceOpen": opened["P_LAST"].to_numpy(),
+            "CallPriceClose": closed["C_LAST"].to_numpy(),
+            "PutPriceClose": closed["P_LAST"].to_numpy(),
+            "UnderlyingPriceClose": closed["UNDERLYING_LAST"].to_numpy(),
+            "PremiumCaptured": (opened["C_LAST"] + opened["P_LAST"]).to_numpy(),
+            "ClosingPremium": (closed["C_LAST"] + closed["P_LAST"]).to_numpy(),
+            "ClosedTradeAt": closed["QUOTE_DATE"].to_numpy(),
+            "CloseReason": closed["REASON"].to_numpy(),
+        },
+        columns=TRADE_COLUMNS,
+    )
+
+    # Daily updates run before new trades are opened, so entry rows sort last on a date
+    taken_paths = paths.loc[paths["CANDIDATE"].isin(selected)]
+    last_date = (
+        exit_dates.reindex(taken_paths["CANDIDATE"]).fillna(quote_dates[-1]).to_numpy()
+    )
+    taken_paths = taken_paths.loc[taken_paths["QUOTE_DATE"].to_numpy() <= last_date]
+    updates = pd.DataFrame(
+        {
+            "TradeId": trade_ids.loc[taken_paths["CANDIDATE"]].to_numpy(),
+            "Date": taken_paths["QUOTE_DATE"].to_numpy(),
+            "UnderlyingPrice": taken_paths["UNDERLYING_LAST"].to_numpy(),
+            "CallPrice": taken_paths["C_LAST"].to_numpy(),
+            "PutPrice": taken_paths["P_LAST"].to_numpy(),
+            "IsEntry": 0,
+        }
+    )
+    entries = trades[["TradeId", "Date"]].assign(
+        UnderlyingPrice=trades["UnderlyingPriceOpen"],
+        CallPrice=trades["CallPriceOpen"],
+        PutPrice=trades["PutPriceOpen"],
+        IsEntry=1,
+    )
+    history = (
+        pd.concat([updates, entries], ignore_index=True)
+        .sort_values(["Date", "IsEntry", "TradeId"], kind="mergesort")
+        .reset_index(drop=True)
+    )
+    history.insert(0, "HistoryId", np.arange(1, len(history) + 1))
+
+    logging.info(
+        f"Backtest created {len(trades)} trades with {len(history)} history rows"
+    )
+    return trades, history.drop(columns="IsEntry")
+
+
+def summarise_trades(trades: pd.DataFrame) -> dict:
+    """P&L, win rate and max drawdown of the closed short straddles"""
+    closed = trades.loc[trades["ClosingPremium"].notna()].sort_values(
+        ["ClosedTradeAt", "TradeId"]
+    )
+    pnl = closed["PremiumCaptured"] - closed["ClosingPremium"]
+    equity = pnl.cumsum()
+    max_drawdown = (equity.cummax().clip(lower=0) - equity).max() if len(pnl) else 0.0
+    total_pnl = pnl.sum()
+    return {
+        "Trades": len(trades),
+        "ClosedTrades": len(closed),
+        "TotalPnL": total_pnl,
+        "AvgPnL": pnl.mean() if len(pnl) else 0.0,
+        "WinRate": (pnl > 0).mean() * 100 if len(pnl) else 0.0,
+        "MaxDrawdown": max_drawdown,
+        "PnLToDrawdown": total_pnl / max_drawdown if max_drawdown > 0 else np.inf,
+    }
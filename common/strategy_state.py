@@ -0,0 +1,176 @@
+import logging
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+STATE_TABLE = "strategy_state"
+BARS_TABLE = "strategy_bars"
+BAR_COLUMNS = ["Open", "High", "Low", "Close"]
+# ATR(20) window + 252-day vol median shifted by one day + previous close, with slack
+STATE_BARS = 300
+
+
+@dataclass
+class StrategyCheckpoint:
+    """
+    Incremental state of a daily strategy bot: the state machine state and counter
+    after the last processed bar, the tail of signal bars the ATR window and rolling
+    median buffer are rebuilt from, and the daily results produced so far.
+    """
+
+    name: str
+    state: int
+    count: int
+    verified_at: pd.Timestamp
+    bars: pd.DataFrame
+    results: pd.DataFrame
+
+    @classmethod
+    def initial(cls, name, state, verified_at):
+        """Checkpoint before the first bar, advancing it processes the full history"""
+        return cls(
+            name,
+            state,
+            0,
+            pd.Timestamp(verified_at),
+            pd.DataFrame(columns=BAR_COLUMNS, dtype=float),
+            pd.DataFrame(),
+        )
+
+    @property
+    def last_date(self):
+        return self.results.index[-1]
+
+    def full_recompute_due(self, today, every_days):
+        return (pd.Timestamp(today) - self.verified_at).days >= every_days
+
+
+def _results_table(name):
+    return "results_" + re.sub(r"\W", "_", name)
+
+
+def create_state_tables(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            name TEXT PRIMARY KEY,
+            state INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            verified_at TEXT NOT NULL
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {BARS_TABLE} (
+            name TEXT NOT NULL,
+            Date TEXT NOT NULL,
+            Open REAL,
+            High REAL,
+            Low REAL,
+            Close REAL,
+            PRIMARY KEY (name, Date)
+        ) WITHOUT ROWID
+    """)
+
+
+def _read_dated(conn, query, params=()):
+    df = pd.read_sql_query(query, conn, params=params, parse_dates=["Date"])
+    return df.set_index("Date").rename_axis(None)
+
+
+def load_checkpoint(conn, name):
+    """Stored checkpoint of name, None when the bot has not been checkpointed yet"""
+    create_state_tables(conn)
+    row = conn.execute(
+        f"SELECT state, count, verified_at FROM {STATE_TABLE} WHERE name = ?",
+        (name,),
+    ).fetchone()
+    if row is None:
+        return None
+
+    bars = _read_dated(
+        conn,
+        f"SELECT Date, {', '.join(BAR_COLUMNS)} FROM {BARS_TABLE} "
+        "WHERE name = ? ORDER BY Date",
+        (name,),
+    )
+    results = _read_dated(conn, f"SELECT * FROM {_results_table(name)} ORDER BY Date")
+    if bars.empty or results.empty:
+        return None
+
+    state, count, verified_at = row
+    return StrategyCheckpoint(
+        name, state, count, pd.Timestamp(verified_at), bars, results
+    )
+
+
+def save_checkpoint(conn, checkpoint, full=False):
+    """
+    Store checkpoint. Only results after the stored last date are appended unless
+    full is set, in which case the stored results are replaced.
+    """
+    create_state_tables(conn)
+    table = _results_table(checkpoint.name)
+    results = checkpoint.results
+    if not full:
+        stored_last = conn.execute(f"SELECT MAX(Date) FROM {table}").fetchone()[0]
+        results = results[results.index > pd.Timestamp(stored_last)]
+
+    bars = checkpoint.bars[BAR_COLUMNS].tail(STATE_BARS)
+    with conn:
+        conn.execute(
+            f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, ?, ?)",
+            (
+                checkpoint.name,
+                int(checkpoint.state),
+                int(checkpoint.count),
+                checkpoint.verified_at.strftime("%Y-%m-%d"),
+            ),
+        )
+        conn.execute(f"DELETE FROM {BARS_TABLE} WHERE name = ?", (checkpoint.name,))
+        bars.rename_axis("Date").reset_index().assign(name=checkpoint.name).to_sql(
+            BARS_TABLE, conn, if_exists="append", index=False
+        )
+        results.rename_axis("Date").reset_index().to_sql(
+            table, conn, if_exists="replace" if full else "append", index=False
+        )
+
+
+def extend_bars(bars, fresh):
+    """
+    Append the fresh bars after the checkpoint tail. Returns None when fresh does not
+    overlap the tail or the closes of shared dates disagree (split, restatement),
+    in which case the incremental state can't be trusted.
+    """
+    shared = bars.index.intersection(fresh.index)
+    if shared.empty or not np.allclose(
+        bars.loc[shared, "Close"], fresh.loc[shared, "Close"], rtol=1e-6
+    ):
+        return None
+    return pd.concat([bars, fresh.loc[fresh.index > bars.index[-1], BAR_COLUMNS]])
+
+
+def compare_results(incremental, full, columns, rtol=1e-9):
+    """Log and return the dates where incrementally built results differ from full"""
+    shared = incremental.index.intersection(full.index)
+    mismatched = pd.Series(False, index=shared)
+    for column in columns:
+        left = incremental.loc[shared, column]
+        right = full.loc[shared, column]
+        if pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right):
+            same = np.isclose(left, right, rtol=rtol, equal_nan=True)
+        else:
+            same = left.to_numpy() == right.to_numpy()
+        mismatched |= ~same
+
+    dates = shared[mismatched.to_numpy()]
+    if len(dates):
+        logging.warning(
+            f"Incremental results differ from the full recompute on {len(dates)} "
+            f"of {len(shared)} days, first on {dates[0].date()}"
+        )
+    else:
+        logging.info(
+            f"Incremental results match the full recompute on {len(shared)} days"
+        )
+    return dates
@@ -0,0 +1,290 @@
+import numpy as np
+
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover
+    HAS_NUMBA = False
+
+# int8 regime codes, ordered from lowest to highest volatility
+CALM, NORMAL, STRESS, PANIC = 0, 1, 2, 3
+REGIME_NAMES = ("CALM", "NORMAL", "STRESS", "PANIC")
+
+# int8 exposure bucket codes index the bucket list, -1 marks a missing vol ratio.
+# Bucket 0 is expected to be the flat (0% exposure) bucket.
+NO_BUCKET = -1
+
+
+def _kernel(func):
+    """Compile with numba when installed, otherwise run the loop as plain Python"""
+    if HAS_NUMBA:
+        return njit(cache=True, error_model="numpy")(func)
+    return func
+
+
+def _kernel_input(values, dtype=np.float64):
+    # Python loops are much faster over lists than over numpy scalars
+    values = np.ascontiguousarray(values, dtype=dtype)
+    return values if HAS_NUMBA else values.tolist()
+
+
+@_kernel
+def _transition_regimes_kernel(
+    vol_ratio,
+    close,
+    calm_enter,
+    normal_enter,
+    stress_enter,
+    panic_enter,
+    calm_days,
+    normal_days,
+    stress_days,
+    panic_drop,
+    state,
+    count,
+    prev_close,
+):
+    n = len(vol_ratio)
+    regimes = np.empty(n, np.int8)
+    for i in range(n):
+        vr = vol_ratio[i]
+        prev = close[i - 1] if i > 0 else prev_close
+        daily_return = close[i] / prev - 1 if prev == prev else 0.0
+
+        if vr >= panic_enter or daily_return <= panic_drop:
+            state = PANIC
+            count = 0
+            regimes[i] = state
+            continue
+
+        if state == PANIC:
+            if vr < stress_enter:
+                count += 1
+                if count >= stress_days:
+                    state = STRESS
+                    count = 0
+            else:
+                count = 0
+        elif state == STRESS:
+            if vr >= panic_enter:
+                state = PANIC
+                count = 0
+            elif vr < normal_enter:
+                count += 1
+                if count >= normal_days:
+                    state = NORMAL
+                    count = 0
+            else:
+                count = 0
+        elif state == NORMAL:
+            if vr >= stress_enter:
+                count += 1
+                if count >= stress_days:
+                    state = STRESS
+                    count = 0
+            elif vr < calm_enter:
+                count += 1
+                if count >= calm_days:
+                    state = CALM
+                    count = 0
+            else:
+                count = 0
+        else:
+            if vr >= normal_enter:
+                count += 1
+                if count >= normal_days:
+                    state = NORMAL
+                    count = 0
+            else:
+                count = 0
+
+        regimes[i] = state
+    return regimes, state, count
+
+
+@_kernel
+def _target_regimes_kernel(
+    vol_ratio,
+    close,
+    calm_enter,
+    normal_enter,
+    stress_enter,
+    panic_enter,
+    persistence_days,
+    panic_drop,
+    state,
+    count,
+    prev_close,
+):
+    n = len(vol_ratio)
+    regimes = np.empty(n, np.int8)
+    for i in range(n):
+        vr = vol_ratio[i]
+        if vr != vr:
+            regimes[i] = state
+            continue
+
+        if i > 0 or prev_close == prev_close:
+            prev = close[i - 1] if i > 0 else prev_close
+            daily_return = close[i] / prev - 1
+            if daily_return <= panic_drop or vr >= panic_enter:
+                state = PANIC
+                count = 0
+                regimes[i] = state
+                continue
+
+        if vr < calm_enter:
+            target = CALM
+        elif vr < normal_enter or vr < stress_enter:
+            target = NORMAL
+        elif vr < panic_enter:
+            target = STRESS
+        else:
+            target = PANIC
+
+        if target == state:
+            count = 0
+        else:
+            count += 1
+            if count >= persistence_days[target]:
+                state = target
+                count = 0
+        regimes[i] = state
+    return regimes, state, count
+
+
+@_kernel
+def _hysteresis_kernel(targets, hysteresis_days, top_bucket, current, count):
+    n = len(targets)
+    buckets = np.empty(n, np.int8)
+    for i in range(n):
+        target = targets[i]
+        if target < 0:
+            buckets[i] = NO_BUCKET
+            continue
+
+        if current == 0:
+            current = target
+            count = 1
+        elif target < current:
+            current = target
+            count = 1
+        elif target > current:
+            count += 1
+            if count >= hysteresis_days:
+                if current < top_bucket:
+                    current += 1
+                count = 1
+        else:
+            count += 1
+        buckets[i] = current
+    return buckets, current, count
+
+
+def transition_regimes(
+    vol_ratio,
+    close,
+    thresholds,
+    persistence_days,
+    panic_drop,
+    state=NORMAL,
+    count=0,
+    prev_close=np.nan,
+):
+    """
+    Regime state machine of tqqq-vol-regimes.py: each regime has its own exit rules
+    and a PANIC override on a vol ratio spike or a daily drop of panic_drop.
+    thresholds are the (CALM, NORMAL, STRESS, PANIC) enter levels and
+    persistence_days the days needed to confirm each regime, both by regime code.
+    state, count and prev_close (the close before the first bar) resume a previous run.
+    Returns (int8 regime codes, final regime, final persistence counter).
+    """
+    calm_enter, normal_enter, stress_enter, panic_enter = map(float, thresholds)
+    regimes, state, count = _transition_regimes_kernel(
+        _kernel_input(vol_ratio),
+        _kernel_input(close),
+        calm_enter,
+        normal_enter,
+        stress_enter,
+        panic_enter,
+        int(persistence_days[CALM]),
+        int(persistence_days[NORMAL]),
+        int(persistence_days[STRESS]),
+        float(panic_drop),
+        int(state),
+        int(count),
+        float(prev_close),
+    )
+    return regimes, int(state), int(count)
+
+
+def target_regimes(
+    vol_ratio,
+    close,
+    thresholds,
+    persistence_days,
+    panic_drop,
+    state=NORMAL,
+    count=0,
+    prev_close=np.nan,
+):
+    """
+    Regime state machine of daily-rebalance-report.py: the vol ratio maps to a target
+    regime that has to hold for its persistence days before switching, with the same
+    PANIC override. Days without a vol ratio keep the current regime.
+    state, count and prev_close resume a previous run as in transition_regimes.
+    Returns (int8 regime codes, final regime, final persistence counter).
+    """
+    calm_enter, normal_enter, stress_enter, panic_enter = map(float, thresholds)
+    regimes, state, count = _target_regimes_kernel(
+        _kernel_input(vol_ratio),
+        _kernel_input(close),
+        calm_enter,
+        normal_enter,
+        stress_enter,
+        panic_enter,
+        _kernel_input(persistence_days, np.int64),
+        float(panic_drop),
+        int(state),
+        int(count),
+        float(prev_close),
+    )
+    return regimes, int(state), int(count)
+
+
+def exposure_buckets(vol_ratio, low_threshold, high_threshold):
+    """int8 target bucket of each vol ratio: 2 below low, 1 below high, else 0"""
+    vol_ratio = np.asarray(vol_ratio, dtype=float)
+    buckets = np.where(
+        vol_ratio < low_threshold, 2, np.where(vol_ratio < high_threshold, 1, 0)
+    )
+    return np.where(np.isnan(vol_ratio), NO_BUCKET, buckets).astype(np.int8)
+
+
+def hysteresis_buckets(target_buckets, hysteresis_days, n_buckets, current=0, count=0):
+    """
+    Size down to the target bucket at once, size up one bucket at a time after
+    hysteresis_days days above the current one. From the flat bucket the target is
+    taken straight away. Returns (int8 bucket codes, final bucket, final counter).
+    """
+    buckets, current, count = _hysteresis_kernel(
+        _kernel_input(target_buckets, np.int64),
+        int(hysteresis_days),
+        int(n_buckets) - 1,
+        int(current),
+        int(count),
+    )
+    return buckets, int(current), int(count)
+
+
+def bucket_values(buckets, levels):
+    """Exposure of each bucket code, NaN for NO_BUCKET"""
+    return np.append(np.asarray(levels, dtype=float), np.nan)[buckets]
+
+
+def bucket_codes(exposures, levels):
+    """Bucket code of each exposure in levels, NO_BUCKET for NaN"""
+    exposures = np.asarray(exposures, dtype=float)
+    codes = np.searchsorted(np.asarray(levels, dtype=float), exposures)
+    return np.where(np.isnan(exposures), NO_BUCKET, codes).astype(np.int8)
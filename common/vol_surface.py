@@ -0,0 +1,287 @@
+import logging
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import ndtr
+
+SVI_TABLE = "svi_params"
+# Candidate (m, sigma) pairs solved at once before refining the best one
+SVI_M_STEPS = 21
+SVI_SIGMA_GRID = np.geomspace(0.005, 1.0, 21)
+SVI_SIGMA_BOUNDS = (1e-4, 10.0)
+MIN_SLICE_QUOTES = 5
+# Lookup table resolution for IV by delta, in standard deviations of log moneyness
+DELTA_TABLE_POINTS = 801
+DELTA_TABLE_WIDTH = 8.0
+
+
+@dataclass
+class SVISlice:
+    """
+    Raw SVI total implied variance of one expiry:
+    w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2)), k = log(K / F)
+    """
+
+    expiration: str
+    years: float
+    forward: float
+    a: float
+    b: float
+    rho: float
+    m: float
+    sigma: float
+    rmse: float = 0.0  # of the fitted total variance w, not of implied volatility
+    _delta_table: tuple = field(default=None, init=False, repr=False, compare=False)
+
+    def total_variance(self, k):
+        x = np.asarray(k, dtype=float) - self.m
+        return self.a + self.b * (self.rho * x + np.sqrt(x * x + self.sigma**2))
+
+    def iv(self, k):
+        """Implied volatility at log moneyness k = log(K / F)"""
+        return np.sqrt(np.maximum(self.total_variance(k), 0.0) / self.years)
+
+    def iv_at_strike(self, strike):
+        return self.iv(np.log(np.asarray(strike, dtype=float) / self.forward))
+
+    def _call_deltas(self):
+        """Forward call delta on a fixed log moneyness grid, built once per slice"""
+        if self._delta_table is None:
+            width = DELTA_TABLE_WIDTH * np.sqrt(max(self.total_variance(0.0), 1e-8))
+            k = np.linspace(-width, width, DELTA_TABLE_POINTS)
+            w = np.maximum(self.total_variance(k), 1e-12)
+            deltas = ndtr((-k + 0.5 * w) / np.sqrt(w))
+            # Keep the table monotone so interpolation is well defined
+            self._delta_table = (k[::-1], np.maximum.accumulate(deltas[::-1]))
+        return self._delta_table
+
+    def moneyness_at_delta(self, delta):
+        """Log moneyness of the call (delta > 0) or put (delta < 0) with this delta"""
+        delta = np.asarray(delta, dtype=float)
+        k, call_deltas = self._call_deltas()
+        return np.interp(np.where(delta < 0, 1 + delta, delta), call_deltas, k)
+
+    def strike_at_delta(self, delta):
+        return self.forward * np.exp(self.moneyness_at_delta(delta))
+
+    def iv_at_delta(self, delta):
+        return self.iv(self.moneyness_at_delta(delta))
+
+
+def _solve_svi_linear(k, w, m, sigma):
+    """
+    For each candidate (m, sigma) the SVI slice is linear in (a, d, c) with
+    y = (k - m) / sigma: w = a + d * y + c * sqrt(y^2 + 1). All candidates are solved
+    in one batch of 3x3 normal equations, then projected onto c >= 0, |d| <= c,
+    c + |d| <= 4 * sigma (Lee's wing bound in total variance,
+    b * (1 + |rho|) <= 4) and a non-negative minimum variance.
+    Returns (a, d, c, sse) arrays.
+    """
+    m = np.asarray(m, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+    y = (k[None, :] - m[:, None]) / sigma[:, None]
+    r = np.sqrt(y * y + 1)
+    X = np.stack([np.ones_like(y), y, r], axis=-1)
+    XtX = np.einsum("cni,cnj->cij", X, X)
+    # Relative ridge keeps nearly collinear candidates (tiny or huge sigma) solvable
+    XtX += 1e-10 * np.trace(XtX, axis1=1, axis2=2)[:, None, None] * np.eye(3)
+    Xtw = np.einsum("cni,n->ci", X, w)
+    a, d, c = np.linalg.solve(XtX, Xtw[..., None])[..., 0].T
+
+    max_wing = 4 * sigma
+    c = np.clip(c, 0.0, max_wing)
+    d = np.clip(d, -c, c)
+    wing = c + np.abs(d)
+    scale = np.minimum(1.0, max_wing / np.maximum(wing, 1e-300))
+    c, d = c * scale, d * scale
+    a = (w[None, :] - d[:, None] * y - c[:, None] * r).mean(axis=1)
+    a = np.maximum(a, -np.sqrt(np.maximum(c * c - d * d, 0.0)))
+
+    residuals = a[:, None] + d[:, None] * y + c[:, None] * r - w[None, :]
+    return a, d, c, (residuals * residuals).sum(axis=1)
+
+
+def fit_svi_slice(expiration, years, forward, strikes, ivs):
+    """Fit one expiry from strikes and implied volatilities (decimal)"""
+    k = np.log(np.asarray(strikes, dtype=float) / forward)
+    w = np.asarray(ivs, dtype=float) ** 2 * years
+
+    m_grid, sigma_grid = np.meshgrid(
+        np.linspace(k.min(), k.max(), SVI_M_STEPS), SVI_SIGMA_GRID
+    )
+    *_, sse = _solve_svi_linear(k, w, m_grid.ravel(), sigma_grid.ravel())
+    best = np.argmin(sse)
+
+    m_bounds = (k.min() - 1.0, k.max() + 1.0)
+    log_sigma_bounds = np.log(SVI_SIGMA_BOUNDS)
+
+    def objective(x):
+        return _solve_svi_linear(k, w, x[:1], np.exp(x[1:]))[3][0]
+
+    refined = minimize(
+        objective,
+        [m_grid.ravel()[best], np.log(sigma_grid.ravel()[best])],
+        method="Nelder-Mead",
+        bounds=[m_bounds, log_sigma_bounds],
+        options={"xatol": 1e-6, "fatol": 1e-12, "maxiter": 400},
+    )
+    m, sigma = refined.x[0], float(np.exp(refined.x[1]))
+    a, d, c, sse = (v[0] for v in _solve_svi_linear(k, w, [m], [sigma]))
+
+    return SVISlice(
+        expiration=str(expiration),
+        years=float(years),
+        forward=float(forward),
+        a=float(a),
+        b=float(c / sigma),
+        rho=float(d / c) if c > 0 else 0.0,
+        m=float(m),
+        sigma=sigma,
+        rmse=float(np.sqrt(sse / len(k))),
+    )
+
+
+def otm_quotes(chain, strike_col, call_iv_col, put_iv_col, forward):
+    """Strikes and IVs of the out of the money side, puts below the forward"""
+    strikes = chain[strike_col].to_numpy(dtype=float)
+    ivs = np.where(
+        strikes < forward,
+        chain[put_iv_col].to_numpy(dtype=float),
+        chain[call_iv_col].to_numpy(dtype=float),
+    )
+    valid = np.isfinite(ivs) & (ivs > 0) & (strikes > 0)
+    return strikes[valid], ivs[valid]
+
+
+class SVISurface:
+    """Fitted SVI slices by expiration answering IV by moneyness or delta"""
+
+    def __init__(self, slices):
+        self.slices = {s.expiration: s for s in slices}
+
+    def __len__(self):
+        return len(self.slices)
+
+    def __iter__(self):
+        return iter(self.slices.values())
+
+    def __getitem__(self, expiration):
+        return self.slices[str(expiration)]
+
+    def iv(self, expiration, k):
+        return self[expiration].iv(k)
+
+    def iv_at_delta(self, expiration, delta):
+        return self[expiration].iv_at_delta(delta)
+
+    def to_frame(self):
+        return pd.DataFrame(
+            [
+                {
+                    name: value
+                    for name, value in asdict(s).items()
+                    if name != "_delta_table"
+                }
+                for s in self
+            ]
+        )
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(
+            SVISlice(
+                expiration=row.expiration,
+                years=row.years,
+                forward=row.forward,
+                a=row.a,
+                b=row.b,
+                rho=row.rho,
+                m=row.m,
+                sigma=row.sigma,
+                rmse=row.rmse,
+            )
+            for row in df.itertuples(index=False)
+        )
+
+
+def fit_svi_surface(quotes):
+    """
+    Fit every expiry of quotes, a frame of Expiration, Years, Forward, Strike and IV
+    (decimal) rows. Expiries with too few quotes or no time left are skipped.
+    """
+    slices = []
+    for expiration, group in quotes.groupby("Expiration", sort=True):
+        years = float(group["Years"].iloc[0])
+        if len(group) < MIN_SLICE_QUOTES or years <= 0:
+            logging.debug(f"Skipping SVI fit for {expiration}: {len(group)} quotes")
+            continue
+        slices.append(
+            fit_svi_slice(
+                expiration,
+                years,
+                group["Forward"].iloc[0],
+                group["Strike"],
+                group["IV"],
+            )
+        )
+    return SVISurface(slices)
+
+
+def create_svi_table(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SVI_TABLE} (
+            Symbol TEXT NOT NULL,
+            QuoteTime TEXT NOT NULL,
+            expiration TEXT NOT NULL,
+            years REAL,
+            forward REAL,
+            a REAL,
+            b REAL,
+            rho REAL,
+            m REAL,
+            sigma REAL,
+            rmse REAL,
+            PRIMARY KEY (Symbol, QuoteTime, expiration)
+        ) WITHOUT ROWID
+    """)
+
+
+def load_svi_surface(conn, symbol, quote_time):
+    create_svi_table(conn)
+    df = pd.read_sql_query(
+        f"SELECT * FROM {SVI_TABLE} WHERE Symbol = ? AND QuoteTime = ? "
+        "ORDER BY expiration",
+        conn,
+        params=(symbol, str(quote_time)),
+    )
+    return SVISurface.from_frame(df) if not df.empty else None
+
+
+def save_svi_surface(conn, symbol, quote_time, surface):
+    create_svi_table(conn)
+    df = surface.to_frame()
+    df.insert(0, "QuoteTime", str(quote_time))
+    df.insert(0, "Symbol", symbol)
+    with conn:
+        conn.execute(
+            f"DELETE FROM {SVI_TABLE} WHERE Symbol = ? AND QuoteTime = ?",
+            (symbol, str(quote_time)),
+        )
+        df.to_sql(SVI_TABLE, conn, if_exists="append", index=False)
+
+
+def cached_svi_surface(conn, symbol, quote_time, build_quotes):
+    """Fitted surface of symbol at quote_time, fitting build_quotes() on a cache miss"""
+    surface = load_svi_surface(conn, symbol, quote_time)
+    if surface is not None:
+        logging.info(
+            f"Loaded {len(surface)} cached SVI slices for {symbol} {quote_time}"
+        )
+        return surface
+
+    surface = fit_svi_surface(build_quotes())
+    save_svi_surface(conn, symbol, quote_time, surface)
+    logging.info(f"Fitted {len(surface)} SVI slices for {symbol} {quote_time}")
+    return surface
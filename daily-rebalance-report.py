@@ -3,11 +3,14 @@
 # dependencies = [
 #   "pandas",
 #   "numpy",
+#   "numba",
 #   "yfinance",
 #   "stockstats",
 #   "persistent-cache@git+https://github.com/namuan/persistent-cache",
 #   "plotly",
 #   "playwright",
+#   "kaleido",
+#   "reportlab",
 #   "requests",
 #   "python-dotenv",
 #   "schedule"
@@ -26,22 +29,30 @@ Usage:
 ./daily-rebalance-report.py --start-date 2024-01-01 --report-path report.html --open
 ./daily-rebalance-report.py --start-date 2024-01-01 --pdf --open
 ./daily-rebalance-report.py --start-date 2024-01-01 --pdf --send-telegram
+./daily-rebalance-report.py --start-date 2024-01-01 --pdf --pdf-mode static  # PNG charts, no browser
+./daily-rebalance-report.py --start-date 2024-01-01 --pdf --pdf-mode compare -v  # time both PDF paths
 ./daily-rebalance-report.py --start-date 2024-01-01 -v # INFO logging
 ./daily-rebalance-report.py --start-date 2024-01-01 -vv # DEBUG logging
 ./daily-rebalance-report.py -b  # Run as bot (scheduled at 9:00 AM on weekdays)
 ./daily-rebalance-report.py --once  # Generate & send report via Telegram once and exit
 """
 
+import html
 import logging
 import os
+import sqlite3
 import sys
 import tempfile
 import time
 import webbrowser
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from dataclasses import replace
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, List
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -55,7 +66,25 @@ from plotly.subplots import make_subplots
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from stockstats import wrap as stockstats_wrap
 
+from common.market_data import output_dir
+from common.plotly_report import PlotlyReport, rasterise_figures
+from common.strategy_state import (
+    BAR_COLUMNS,
+    StrategyCheckpoint,
+    compare_results,
+    extend_bars,
+    load_checkpoint,
+    save_checkpoint,
+)
 from common.tele_notifier import send_file_to_telegram
+from common.vol_regimes import (
+    NORMAL,
+    REGIME_NAMES,
+    bucket_codes,
+    bucket_values,
+    hysteresis_buckets,
+    target_regimes,
+)
 
 # TQQQ Volatility Buckets Strategy Configuration
 EXPOSURE_LEVELS = [0.00, 0.25, 0.70]  # Available exposure buckets
@@ -64,6 +93,26 @@ VOL_THRESHOLD_LOW = 1.30  # vol_ratio threshold for max exposure
 VOL_THRESHOLD_HIGH = 1.60  # vol_ratio threshold for 25% exposure
 ALTERNATE_TICKER = "GLD"
 
+# Symbols needed by each report section. The union is fetched in one batched download,
+# and every section slices out its own symbols and date range.
+VIX_SYMBOLS = ["^VIX9D", "^VIX", "SPY"]
+CREDIT_SYMBOLS = ["SPY", "LQD", "IEF"]
+TQQQ_SYMBOLS = ["SPY", "LQD", "IEF", "QQQ", "TQQQ", ALTERNATE_TICKER]
+# Need at least 252 trading days for vol_ratio + buffer for ATR warmup
+# Use 800 calendar days to be safe across different periods
+TQQQ_WARMUP_DAYS = 800
+
+# Bot checkpoint of the TQQQ sections: daily runs advance the stored state by the
+# new bars only and rebuild it from the full history every FULL_RECOMPUTE_DAYS
+STATE_DB = "strategy_state.db"
+FULL_RECOMPUTE_DAYS = 30
+
+# PDF modes: "browser" prints the HTML report with Playwright, "static" assembles
+# rasterised charts and the statistics text, "compare" renders and times both
+PDF_MODES = ("browser", "static", "compare")
+CHART_CACHE_DIR = "chart_cache"
+PDF_CHART_SCALE = 1.5
+
 
 # TQQQ Volatility Regimes Strategy Configuration
 class Regime(Enum):
@@ -75,6 +124,9 @@ class Regime(Enum):
     PANIC = "PANIC"
 
 
+# Regimes by the int8 code of the state machine kernel
+REGIMES = np.array([Regime(name) for name in REGIME_NAMES], dtype=object)
+
 # Exposure allocation per regime
 REGIME_EXPOSURE = {
     Regime.CALM: 1.00,
@@ -117,21 +169,60 @@ def setup_logging(verbosity):
 
 
 @PersistentCache()
-def fetch_market_data(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-    """Fetch market data for a symbol between start and end dates."""
-    logging.info(f"Fetching data for {symbol} from {start_date} to {end_date}")
-    return yf.download(symbol, start=start_date, end=end_date, progress=False)
+def fetch_market_data(
+    symbols: Tuple[str, ...], start_date: str, end_date: str
+) -> pd.DataFrame:
+    """Fetch market data for symbols between start and end dates, grouped by ticker."""
+    logging.info(
+        f"Fetching data for {', '.join(symbols)} from {start_date} to {end_date}"
+    )
+    return yf.download(
+        list(symbols),
+        start=start_date,
+        end=end_date,
+        group_by="ticker",
+        threads=True,
+        progress=False,
+    )
 
 
 def fetch_all_symbols(
     symbols: List[str], start_date: str, end_date: str
 ) -> Dict[str, pd.DataFrame]:
-    """Fetch data for all symbols."""
+    """Fetch data for all symbols in one batched download and split it per symbol.
+
+    yf.download keeps module-global state, so it must not be called from several
+    threads; the batch downloads on yfinance's own threads instead. Each frame has
+    the columns and dates of a single-symbol download.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    data = fetch_market_data(tuple(symbols), start_date, end_date)
+    downloaded = set(data.columns.get_level_values(0))
     return {
-        symbol: fetch_market_data(symbol, start_date, end_date) for symbol in symbols
+        symbol: (
+            data[[symbol]].swaplevel(0, 1, axis=1).dropna(how="all")
+            if symbol in downloaded
+            else pd.DataFrame()
+        )
+        for symbol in symbols
     }
 
 
+def select_market_data(
+    market_data: Dict[str, pd.DataFrame], symbols: List[str], start_date, end_date
+) -> Dict[str, pd.DataFrame]:
+    """Slice pre-fetched data to [start_date, end_date), matching a direct download."""
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+    selected = {}
+    for symbol in symbols:
+        df = market_data[symbol]
+        selected[symbol] = (
+            df if df.empty else df[(df.index >= start) & (df.index < end)]
+        )
+    return selected
+
+
 # ============================================================================
 # VIX Signals Analysis
 # ============================================================================
@@ -248,16 +339,18 @@ def create_vix_signals_chart(df: pd.DataFrame, window1: int = 3, window2: int =
             row=row_idx,
             col=1,
         )
-        # Add colored background bands where signal is long/short
-        for i in range(len(df.index) - 1):
+        # Add colored background bands where signal is long/short, one band per
+        # run of equal signals rather than one per day
+        values = signals.to_numpy()[:-1]
+        run_starts = np.flatnonzero(np.diff(values, prepend=np.nan) != 0)
+        run_ends = np.append(run_starts[1:], len(df.index) - 1)
+        for start, end in zip(run_starts, run_ends):
             color = (
-                "rgba(0, 255, 0, 0.2)"
-                if signals.iloc[i] == 1
-                else "rgba(255, 0, 0, 0.2)"
+                "rgba(0, 255, 0, 0.2)" if values[start] == 1 else "rgba(255, 0, 0, 0.2)"
             )
             fig.add_vrect(
-                x0=df.index[i],
-                x1=df.index[i + 1],
+                x0=df.index[start],
+                x1=df.index[end],
                 fillcolor=color,
                 line_width=0,
                 opacity=0.3,
@@ -319,13 +412,14 @@ def generate_vix_signals_stats(
 # ============================================================================
 
 
-def get_credit_market_data(start_date, end_date):
-    """Download and prepare data for credit market canary analysis using stockstats"""
-    logging.info("Downloading ticker data for credit market canary...")
+def get_credit_market_data(market_data, start_date, end_date):
+    """Prepare data for credit market canary analysis using stockstats"""
+    logging.info("Preparing ticker data for credit market canary...")
 
-    # Download data for SPX, LQD, and IEF
-    credit_symbols = ["SPY", "LQD", "IEF"]
-    credit_market_data = fetch_all_symbols(credit_symbols, start_date, end_date)
+    # Data for SPX, LQD, and IEF
+    credit_market_data = select_market_data(
+        market_data, CREDIT_SYMBOLS, start_date, end_date
+    )
 
     if not credit_market_data or any(df.empty for df in credit_market_data.values()):
         logging.error("Failed to download required ticker data")
@@ -622,43 +716,26 @@ def apply_hysteresis(target_exposures):
     - Sizing DOWN: immediate
     - Sizing UP: requires HYSTERESIS_DAYS consecutive days in lower-vol bucket
     """
-    current_exposure = []
-    days_in_bucket = 0
-    prev_exposure = 0.0
-
-    for target in target_exposures:
-        if pd.isna(target):
-            current_exposure.append(np.nan)
-            continue
+    actual_exposure, _, _ = advance_hysteresis(target_exposures)
+    return actual_exposure
 
-        # First valid target
-        if prev_exposure == 0.0 and not pd.isna(target):
-            prev_exposure = target
-            current_exposure.append(target)
-            days_in_bucket = 1
-            continue
 
-        # Sizing DOWN - immediate
-        if target < prev_exposure:
-            prev_exposure = target
-            current_exposure.append(target)
-            days_in_bucket = 1
-        # Sizing UP - need HYSTERESIS_DAYS consecutive days
-        elif target > prev_exposure:
-            days_in_bucket += 1
-            if days_in_bucket >= HYSTERESIS_DAYS:
-                # Increase by ONE bucket at a time
-                current_idx = EXPOSURE_LEVELS.index(prev_exposure)
-                if current_idx < len(EXPOSURE_LEVELS) - 1:
-                    prev_exposure = EXPOSURE_LEVELS[current_idx + 1]
-                days_in_bucket = 1
-            current_exposure.append(prev_exposure)
-        else:
-            # No change
-            current_exposure.append(prev_exposure)
-            days_in_bucket += 1
-
-    return pd.Series(current_exposure, index=target_exposures.index)
+def advance_hysteresis(target_exposures, current=0, count=0):
+    """
+    Apply hysteresis starting from the given bucket and counter.
+    Returns (actual exposures, final bucket, final counter).
+    """
+    buckets, current, count = hysteresis_buckets(
+        bucket_codes(target_exposures, EXPOSURE_LEVELS),
+        HYSTERESIS_DAYS,
+        len(EXPOSURE_LEVELS),
+        current,
+        count,
+    )
+    actual_exposure = pd.Series(
+        bucket_values(buckets, EXPOSURE_LEVELS), index=target_exposures.index
+    )
+    return actual_exposure, current, count
 
 
 def calculate_strategy_returns(actual_exposure, tqqq_returns, alternate_returns):
@@ -676,8 +753,34 @@ def get_common_index(series_list):
     return common
 
 
-def run_tqqq_analysis(market_data: Dict[str, pd.DataFrame], use_alternate: bool = True):
-    """Run TQQQ volatility bucket analysis."""
+def market_bars(df):
+    """OHLC bars of downloaded market data."""
+    return pd.DataFrame({column: extract_column(df, column) for column in BAR_COLUMNS})
+
+
+def new_checkpoint_bars(checkpoint, qqq_data):
+    """
+    Checkpoint bars extended by the downloaded QQQ bars and the dates still to be
+    processed, or None when the checkpoint can't be advanced with this data.
+    """
+    bars = market_bars(qqq_data)
+    if checkpoint.results.empty:
+        return bars, bars.index
+
+    if checkpoint.bars.index[-1] != checkpoint.last_date:
+        return None
+    bars = extend_bars(checkpoint.bars, bars)
+    if bars is None:
+        logging.warning(f"Downloaded QQQ bars disagree with {checkpoint.name}")
+        return None
+    return bars, bars.index[bars.index > checkpoint.last_date]
+
+
+def advance_tqqq_analysis(market_data, use_alternate, checkpoint):
+    """
+    Advance the TQQQ volatility bucket checkpoint by the QQQ bars after its last
+    date. An empty checkpoint processes the full history.
+    """
     qqq_data = market_data.get("QQQ", pd.DataFrame())
     tqqq_data = market_data.get("TQQQ", pd.DataFrame())
     alternate_data = (
@@ -690,9 +793,16 @@ def run_tqqq_analysis(market_data: Dict[str, pd.DataFrame], use_alternate: bool
         logging.error("Failed to get TQQQ analysis data from market data")
         return None
 
-    vol_ratio = calculate_vol_ratio(qqq_data)
+    advance = new_checkpoint_bars(checkpoint, qqq_data)
+    if advance is None:
+        return None
+    bars, new_dates = advance
+
+    vol_ratio = calculate_vol_ratio(bars).loc[new_dates]
     target_exposure = vol_ratio.apply(get_target_exposure)
-    actual_exposure = apply_hysteresis(target_exposure)
+    actual_exposure, current, count = advance_hysteresis(
+        target_exposure, checkpoint.state, checkpoint.count
+    )
 
     tqqq_returns = extract_column(tqqq_data, "Close").pct_change()
     alternate_returns = (
@@ -707,10 +817,6 @@ def run_tqqq_analysis(market_data: Dict[str, pd.DataFrame], use_alternate: bool
 
     common_index = get_common_index(series_to_align)
 
-    if len(common_index) == 0:
-        logging.error("No common dates found between datasets")
-        return None
-
     actual_exposure = actual_exposure.loc[common_index]
     tqqq_returns = tqqq_returns.loc[common_index]
     alternate_returns = (
@@ -722,11 +828,10 @@ def run_tqqq_analysis(market_data: Dict[str, pd.DataFrame], use_alternate: bool
     strategy_returns = calculate_strategy_returns(
         actual_exposure, tqqq_returns, alternate_returns
     )
-    qqq_close = extract_column(qqq_data, "Close")
 
     results_df = pd.DataFrame(
         {
-            "qqq_close": qqq_close.loc[common_index],
+            "qqq_close": bars["Close"].loc[common_index],
             "vol_ratio": vol_ratio.loc[common_index],
             "target_exposure": target_exposure.loc[common_index],
             "actual_exposure": actual_exposure,
@@ -735,12 +840,28 @@ def run_tqqq_analysis(market_data: Dict[str, pd.DataFrame], use_alternate: bool
             "alternate_returns": alternate_returns,
         }
     )
+    if not checkpoint.results.empty:
+        results_df = pd.concat([checkpoint.results, results_df])
 
     if results_df.empty:
         logging.error("Results dataframe is empty - no common index found")
         return None
 
-    return results_df, use_alternate
+    return StrategyCheckpoint(
+        checkpoint.name, current, count, checkpoint.verified_at, bars, results_df
+    )
+
+
+def run_tqqq_analysis(market_data: Dict[str, pd.DataFrame], use_alternate: bool = True):
+    """Run TQQQ volatility bucket analysis."""
+    checkpoint = advance_tqqq_analysis(
+        market_data,
+        use_alternate,
+        StrategyCheckpoint.initial("tqqq-buckets", 0, datetime.now()),
+    )
+    if checkpoint is None:
+        return None
+    return checkpoint.results, use_alternate
 
 
 def create_tqqq_chart(results_df, use_alternate: bool = True):
@@ -822,69 +943,36 @@ def run_regime_state_machine(df, vol_ratio):
     Run the regime state machine day by day.
     Returns a series with the regime for each day.
     """
-    n = len(df)
-    regimes = [None] * n
-    current_state = Regime.NORMAL
-    days_condition_met = 0
-
-    for i in range(n):
-        current_vol = vol_ratio.iloc[i]
-
-        if pd.isna(current_vol):
-            regimes[i] = current_state
-            continue
-
-        # Check for PANIC override
-        if i > 0:
-            # Handle MultiIndex columns if present
-            if isinstance(df.columns, pd.MultiIndex):
-                current_close = df["Close"].iloc[i, 0]
-                prev_close = df["Close"].iloc[i - 1, 0]
-            else:
-                current_close = df["Close"].iloc[i]
-                prev_close = df["Close"].iloc[i - 1]
-
-            daily_return = current_close / prev_close - 1
-            if (
-                daily_return <= PANIC_DAILY_DROP
-                or current_vol >= REGIME_VOL_THRESHOLDS["PANIC_ENTER"]
-            ):
-                current_state = Regime.PANIC
-                days_condition_met = 0
-                regimes[i] = current_state
-                continue
-
-        # Determine target regime based on vol_ratio
-        if current_vol < REGIME_VOL_THRESHOLDS["CALM_ENTER"]:
-            target = Regime.CALM
-        elif current_vol < REGIME_VOL_THRESHOLDS["NORMAL_ENTER"]:
-            target = Regime.NORMAL
-        elif current_vol < REGIME_VOL_THRESHOLDS["STRESS_ENTER"]:
-            target = Regime.NORMAL
-        elif current_vol < REGIME_VOL_THRESHOLDS["PANIC_ENTER"]:
-            target = Regime.STRESS
-        else:
-            target = Regime.PANIC
-
-        # State machine logic
-        if target == current_state:
-            days_condition_met = 0
-            regimes[i] = current_state
-        else:
-            days_condition_met += 1
-            required_days = REGIME_PERSISTENCE_DAYS.get(target, 1)
+    regimes, _, _ = advance_regime_state_machine(df, vol_ratio)
+    return regimes
 
-            if days_condition_met >= required_days:
-                current_state = target
-                days_condition_met = 0
 
-            regimes[i] = current_state
-
-    return pd.Series(regimes, index=df.index)
+def advance_regime_state_machine(
+    df, vol_ratio, state=NORMAL, count=0, prev_close=np.nan
+):
+    """
+    Run the regime state machine from the given regime code, persistence counter
+    and the close before the first day.
+    Returns (regime series, final regime code, final counter).
+    """
+    codes, state, count = target_regimes(
+        vol_ratio.to_numpy(dtype=float),
+        extract_column(df, "Close").to_numpy(dtype=float),
+        [REGIME_VOL_THRESHOLDS[f"{regime.value}_ENTER"] for regime in REGIMES],
+        [REGIME_PERSISTENCE_DAYS.get(regime, 1) for regime in REGIMES],
+        PANIC_DAILY_DROP,
+        state,
+        count,
+        prev_close,
+    )
+    return pd.Series(REGIMES[codes], index=df.index), state, count
 
 
-def run_regime_analysis(market_data: Dict[str, pd.DataFrame]):
-    """Run TQQQ volatility regime analysis."""
+def advance_regime_analysis(market_data, checkpoint):
+    """
+    Advance the TQQQ volatility regime checkpoint by the QQQ bars after its last
+    date. An empty checkpoint processes the full history.
+    """
     qqq_data = market_data.get("QQQ", pd.DataFrame())
     tqqq_data = market_data.get("TQQQ", pd.DataFrame())
 
@@ -892,40 +980,55 @@ def run_regime_analysis(market_data: Dict[str, pd.DataFrame]):
         logging.error("Failed to get regime analysis data from market data")
         return None
 
-    vol_ratio = calculate_vol_ratio(qqq_data)
-    regimes = run_regime_state_machine(qqq_data, vol_ratio)
+    advance = new_checkpoint_bars(checkpoint, qqq_data)
+    if advance is None:
+        return None
+    bars, new_dates = advance
+
+    if checkpoint.results.empty:
+        prev_close = prev_exposure = np.nan
+    else:
+        prev_close = bars["Close"].loc[checkpoint.last_date]
+        prev_exposure = REGIME_EXPOSURE[REGIMES[checkpoint.state]]
+
+    vol_ratio = calculate_vol_ratio(bars).loc[new_dates]
+    regimes, state, count = advance_regime_state_machine(
+        bars.loc[new_dates], vol_ratio, checkpoint.state, checkpoint.count, prev_close
+    )
     tqqq_returns = extract_column(tqqq_data, "Close").pct_change()
     exposure = regimes.map(REGIME_EXPOSURE)
-    strategy_returns = exposure.shift(1) * tqqq_returns
+    strategy_returns = exposure.shift(1, fill_value=prev_exposure) * tqqq_returns
 
     common_index = get_common_index([regimes, tqqq_returns])
-    if len(common_index) == 0:
-        logging.error("No common dates for regime analysis")
-        return None
-
-    regimes = regimes.loc[common_index]
-    vol_ratio = vol_ratio.loc[common_index]
-    exposure = exposure.loc[common_index]
-    strategy_returns = strategy_returns.loc[common_index]
-    tqqq_returns = tqqq_returns.loc[common_index]
-    qqq_close = extract_column(qqq_data, "Close")
 
     results_df = pd.DataFrame(
         {
-            "qqq_close": qqq_close.loc[common_index],
-            "vol_ratio": vol_ratio,
-            "regime": regimes,
-            "exposure": exposure,
-            "strategy_returns": strategy_returns,
-            "tqqq_returns": tqqq_returns,
+            "qqq_close": bars["Close"].loc[common_index],
+            "vol_ratio": vol_ratio.loc[common_index],
+            "regime": regimes.loc[common_index],
+            "exposure": exposure.loc[common_index],
+            "strategy_returns": strategy_returns.loc[common_index],
+            "tqqq_returns": tqqq_returns.loc[common_index],
         }
     )
+    if not checkpoint.results.empty:
+        results_df = pd.concat([checkpoint.results, results_df])
 
     if results_df.empty:
         logging.error("Regime results dataframe is empty")
         return None
 
-    return results_df
+    return StrategyCheckpoint(
+        checkpoint.name, state, count, checkpoint.verified_at, bars, results_df
+    )
+
+
+def run_regime_analysis(market_data: Dict[str, pd.DataFrame]):
+    """Run TQQQ volatility regime analysis."""
+    checkpoint = advance_regime_analysis(
+        market_data, StrategyCheckpoint.initial("tqqq-regimes", NORMAL, datetime.now())
+    )
+    return checkpoint.results if checkpoint is not None else None
 
 
 def create_regime_chart(results_df):
@@ -1039,10 +1142,10 @@ YIELD_COLORS = {
 }
 
 
-def fetch_treasury_data(start_date, end_date):
+def extract_treasury_data(market_data):
     data = {}
     for ticker in YIELD_TICKERS:
-        df = fetch_market_data(ticker, start_date, end_date)
+        df = market_data[ticker]
         if not df.empty:
             close = df["Close"]
             data[ticker] = (
@@ -1303,47 +1406,149 @@ def generate_treasury_stats(frame) -> str:
 # ============================================================================
 
 
-def fig_to_html(fig):
-    """Convert Plotly figure to HTML div string."""
-    # Include Plotly.js from CDN for interactivity
-    html = fig.to_html(
-        full_html=False,
-        include_plotlyjs="cdn",
-        config={"displayModeBar": True, "displaylogo": False},
+def fig_to_html(fig, report):
+    """Convert Plotly figure to HTML div string, plotly.js is loaded once by the report head."""
+    return report.figure_html(
+        fig, config={"displayModeBar": True, "displaylogo": False}
     )
-    return html
+
+
+def report_section_text(alternate_label):
+    """Name, title and description paragraphs of each report section, in report order.
+
+    Paragraphs are (bold label or None, text) pairs, shared by the HTML report and
+    the static PDF report.
+    """
+    return [
+        (
+            "VIX signals",
+            "1. VIX Signals Analysis",
+            [
+                (
+                    None,
+                    "Analysis of VIX term structure signals using IVTS "
+                    "(Implied Volatility Term Structure) ratio.",
+                ),
+                (
+                    "Trading Rules:",
+                    "Go LONG when IVTS < 1 (backwardation), "
+                    "Go SHORT when IVTS > 1 (contango)",
+                ),
+            ],
+        ),
+        (
+            "Credit",
+            "2. Credit Market Canary",
+            [
+                (
+                    None,
+                    "LQD:IEF ratio analysis as an early warning indicator for equity risk.",
+                ),
+            ],
+        ),
+        (
+            "TQQQ buckets",
+            "3. TQQQ Volatility Bucket Strategy",
+            [
+                (
+                    None,
+                    "Dynamic position sizing for TQQQ based on QQQ volatility regimes "
+                    "with hysteresis to avoid overtrading.",
+                ),
+                (
+                    "Strategy:",
+                    "Adjusts TQQQ exposure based on ATR-normalized volatility. "
+                    f"Uninvested portion allocated to {alternate_label}.",
+                ),
+            ],
+        ),
+        (
+            "TQQQ regimes",
+            "4. TQQQ Volatility Regime Strategy",
+            [
+                (
+                    None,
+                    "State machine-based trading strategy for TQQQ using four "
+                    "volatility regimes: CALM, NORMAL, STRESS, and PANIC.",
+                ),
+                (
+                    "Strategy:",
+                    "Uses ATR-based volatility normalization with persistence "
+                    "requirements to confirm regime changes.",
+                ),
+            ],
+        ),
+        (
+            "Treasury",
+            "5. Treasury Yield Analysis",
+            [
+                (
+                    None,
+                    "US Treasury yields across the curve: 3-month T-Bill, 5-year, "
+                    "10-year, and 30-year bonds.",
+                ),
+                (
+                    "Treasury regime:",
+                    "Classifies 20-day changes in the 10-year yield and the 10y–3mo "
+                    "spread as bull/bear steepening or flattening. Regime changes "
+                    f"require {TREASURY_REGIME_PERSISTENCE_DAYS} consecutive trading "
+                    "days; an inverted curve is labelled separately.",
+                ),
+            ],
+        ),
+    ]
 
 
 def generate_html_report(
-    vix_signals_fig,
+    vix_signals_html,
     vix_signals_stats,
-    credit_market_fig,
+    credit_market_html,
     credit_market_stats,
-    tqqq_fig,
+    tqqq_html,
     tqqq_stats,
     alternate_label,
-    regime_fig,
+    regime_html,
     regime_stats,
-    treasury_fig,
+    treasury_html,
     treasury_stats,
     start_date,
     end_date,
+    plotly_head,
 ):
-    """Generate HTML report with all plots and statistics."""
+    """Generate HTML report from the rendered plots and statistics of each section.
 
-    # Convert figures to HTML
-    vix_signals_html = fig_to_html(vix_signals_fig)
-    credit_market_html = fig_to_html(credit_market_fig)
-    tqqq_html = fig_to_html(tqqq_fig)
-    regime_html = fig_to_html(regime_fig)
-    treasury_html = fig_to_html(treasury_fig)
+    plotly_head is the plotly.js and shared chart template markup of the report
+    that rendered the plots.
+    """
+    section_content = {
+        "VIX signals": (vix_signals_stats, vix_signals_html),
+        "Credit": (credit_market_stats, credit_market_html),
+        "TQQQ buckets": (tqqq_stats, tqqq_html),
+        "TQQQ regimes": (regime_stats, regime_html),
+        "Treasury": (treasury_stats, treasury_html),
+    }
+    sections_html = ""
+    for name, title, paragraphs in report_section_text(alternate_label):
+        stats, chart_html = section_content[name]
+        paragraphs_html = "".join(
+            f"""
+                <p>{f"<strong>{label}</strong> " if label else ""}{html.escape(text)}</p>"""
+            for label, text in paragraphs
+        )
+        sections_html += f"""
+            <div class="section">
+                <h2>{title}</h2>{paragraphs_html}
+                {stats}
+                <div class="plotly-chart">{chart_html}</div>
+            </div>
+"""
 
     html_content = f"""
     <!DOCTYPE html>
     <html>
     <head>
         <title>Daily Rebalance Report - {end_date.strftime("%Y-%m-%d")}</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+        {plotly_head}
         <style>
             body {{
                 font-family: Arial, sans-serif;
@@ -1423,45 +1628,7 @@ def generate_html_report(
                 <p><strong>Analysis Period:</strong> {start_date.strftime("%Y-%m-%d")} to {end_date.strftime("%Y-%m-%d")}</p>
             </div>
 
-            <div class="section">
-                <h2>1. VIX Signals Analysis</h2>
-                <p>Analysis of VIX term structure signals using IVTS (Implied Volatility Term Structure) ratio.</p>
-                <p><strong>Trading Rules:</strong> Go LONG when IVTS < 1 (backwardation), Go SHORT when IVTS > 1 (contango)</p>
-                {vix_signals_stats}
-                <div class="plotly-chart">{vix_signals_html}</div>
-            </div>
-
-            <div class="section">
-                <h2>2. Credit Market Canary</h2>
-                <p>LQD:IEF ratio analysis as an early warning indicator for equity risk.</p>
-                {credit_market_stats}
-                <div class="plotly-chart">{credit_market_html}</div>
-            </div>
-
-            <div class="section">
-                <h2>3. TQQQ Volatility Bucket Strategy</h2>
-                <p>Dynamic position sizing for TQQQ based on QQQ volatility regimes with hysteresis to avoid overtrading.</p>
-                <p><strong>Strategy:</strong> Adjusts TQQQ exposure based on ATR-normalized volatility. Uninvested portion allocated to {alternate_label}.</p>
-                {tqqq_stats}
-                <div class="plotly-chart">{tqqq_html}</div>
-            </div>
-
-            <div class="section">
-                <h2>4. TQQQ Volatility Regime Strategy</h2>
-                <p>State machine-based trading strategy for TQQQ using four volatility regimes: CALM, NORMAL, STRESS, and PANIC.</p>
-                <p><strong>Strategy:</strong> Uses ATR-based volatility normalization with persistence requirements to confirm regime changes.</p>
-                {regime_stats}
-                <div class="plotly-chart">{regime_html}</div>
-            </div>
-
-            <div class="section">
-                <h2>5. Treasury Yield Analysis</h2>
-                <p>US Treasury yields across the curve: 3-month T-Bill, 5-year, 10-year, and 30-year bonds.</p>
-                <p><strong>Treasury regime:</strong> Classifies 20-day changes in the 10-year yield and the 10y–3mo spread as bull/bear steepening or flattening. Regime changes require {TREASURY_REGIME_PERSISTENCE_DAYS} consecutive trading days; an inverted curve is labelled separately.</p>
-                {treasury_stats}
-                <div class="plotly-chart">{treasury_html}</div>
-            </div>
-
+{sections_html}
             <div class="footer">
                 <p>Generated by Daily Rebalance Report Script</p>
             </div>
@@ -1478,24 +1645,112 @@ def generate_html_report(
 # ============================================================================
 
 
-def run_vix_signals_analysis(start_date, end_date):
+def fetch_report_data(start_date, end_date, history_start=None):
+    """Fetch every symbol used by the report in one batched download.
+
+    The batch covers the widest range any section needs (the TQQQ warmup window,
+    or history_start when that history comes from a checkpoint); sections slice
+    their own range out of it.
+    """
+    if history_start is None:
+        history_start = start_date - timedelta(days=TQQQ_WARMUP_DAYS)
+    symbols = VIX_SYMBOLS + CREDIT_SYMBOLS + TQQQ_SYMBOLS + list(YIELD_TICKERS)
+    return fetch_all_symbols(
+        symbols, history_start.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+    )
+
+
+def tqqq_checkpoint_names(use_alternate):
+    suffix = "" if use_alternate else "-cash"
+    return f"daily-rebalance-report-buckets{suffix}", "daily-rebalance-report-regimes"
+
+
+def load_tqqq_checkpoints(state_db, use_alternate):
+    """Stored (bucket, regime) checkpoints, None for the ones not stored yet."""
+    with closing(sqlite3.connect(state_db)) as conn:
+        buckets, regimes = (
+            load_checkpoint(conn, name) for name in tqqq_checkpoint_names(use_alternate)
+        )
+    if regimes is not None:
+        regimes.results["regime"] = regimes.results["regime"].map(Regime)
+    return buckets, regimes
+
+
+def save_tqqq_checkpoints(state_db, checkpoints, full):
+    buckets, regimes = checkpoints
+    regime_results = regimes.results.assign(
+        regime=regimes.results["regime"].map(lambda regime: regime.value)
+    )
+    with closing(sqlite3.connect(state_db)) as conn:
+        save_checkpoint(conn, buckets, full)
+        save_checkpoint(conn, replace(regimes, results=regime_results), full)
+
+
+def advance_tqqq_checkpoints(market_data, use_alternate, checkpoints):
+    buckets, regimes = checkpoints
+    buckets = advance_tqqq_analysis(market_data, use_alternate, buckets)
+    regimes = advance_regime_analysis(market_data, regimes)
+    return None if buckets is None or regimes is None else (buckets, regimes)
+
+
+def fetch_checkpointed_data(state_db, start_date, end_date, use_alternate):
+    """
+    Fetch the report data and advance the stored TQQQ bucket and regime checkpoints
+    by the new bars. While the checkpoints are current, the TQQQ warmup history
+    comes from them instead of the download. The checkpoints are rebuilt from the
+    full history every FULL_RECOMPUTE_DAYS and compared with the stored ones.
+
+    Returns (market_data, checkpoints), checkpoints being None when the TQQQ
+    sections have to be computed from the market data.
+    """
+    previous = load_tqqq_checkpoints(state_db, use_alternate)
+    if all(
+        checkpoint is not None
+        and not checkpoint.full_recompute_due(end_date, FULL_RECOMPUTE_DAYS)
+        and checkpoint.results.index[0] <= start_date
+        for checkpoint in previous
+    ):
+        history_start = min(start_date, *(cp.last_date for cp in previous))
+        market_data = fetch_report_data(start_date, end_date, history_start)
+        checkpoints = advance_tqqq_checkpoints(market_data, use_alternate, previous)
+        if checkpoints is not None:
+            save_tqqq_checkpoints(state_db, checkpoints, full=False)
+            return market_data, checkpoints
+
+    logging.info("Recomputing the TQQQ sections from the full history")
+    market_data = fetch_report_data(start_date, end_date)
+    initial = [
+        StrategyCheckpoint.initial(name, state, end_date)
+        for name, state in zip(tqqq_checkpoint_names(use_alternate), (0, NORMAL))
+    ]
+    checkpoints = advance_tqqq_checkpoints(market_data, use_alternate, initial)
+    if checkpoints is None:
+        return market_data, None
+
+    compared_columns = (
+        ["vol_ratio", "target_exposure", "actual_exposure"],
+        ["vol_ratio", "regime"],
+    )
+    for old, new, columns in zip(previous, checkpoints, compared_columns):
+        if old is not None:
+            compare_results(old.results, new.results, columns)
+    save_tqqq_checkpoints(state_db, checkpoints, full=True)
+    return market_data, checkpoints
+
+
+def run_vix_signals_analysis(market_data, start_date, end_date):
     """Run VIX signals analysis."""
     logging.info("Running VIX Signals Analysis...")
-    vix_symbols = ["^VIX9D", "^VIX", "SPY"]
-    vix_market_data = fetch_all_symbols(
-        vix_symbols, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
-    )
+    vix_market_data = select_market_data(market_data, VIX_SYMBOLS, start_date, end_date)
     vix_df = calculate_ivts(vix_market_data)
     vix_df = calculate_vix_signals(vix_df)
     return create_vix_signals_chart(vix_df), generate_vix_signals_stats(vix_df)
 
 
-def run_credit_analysis(start_date, end_date):
+def run_credit_analysis(market_data, start_date, end_date):
     """Run credit market canary analysis."""
     logging.info("Running Credit Market Canary Analysis...")
-    credit_data = get_credit_market_data(
-        start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
-    )
+    credit_data = get_credit_market_data(market_data, start_date, end_date)
     if credit_data is None or credit_data.empty:
         logging.error("Failed to retrieve credit market data")
         return None, None
@@ -1504,23 +1759,16 @@ def run_credit_analysis(start_date, end_date):
     )
 
 
-def fetch_tqqq_data(start_date, end_date):
-    """Fetch all required market data for TQQQ analysis."""
-    from datetime import timedelta
-
-    # Need at least 252 trading days for vol_ratio + buffer for ATR warmup
-    # Use 800 calendar days to be safe across different periods
-    tqqq_start_date = (start_date - timedelta(days=800)).strftime("%Y-%m-%d")
-    all_symbols = ["SPY", "LQD", "IEF", "QQQ", "TQQQ", ALTERNATE_TICKER]
-    return fetch_all_symbols(
-        all_symbols, tqqq_start_date, end_date.strftime("%Y-%m-%d")
-    )
-
-
-def run_tqqq_bucket_analysis(all_market_data, start_date, use_alternate=True):
-    """Run TQQQ volatility bucket analysis."""
+def run_tqqq_bucket_analysis(
+    all_market_data, start_date, use_alternate=True, results_df=None
+):
+    """Run TQQQ volatility bucket analysis, unless results_df is already computed."""
     logging.info("Running TQQQ Volatility Bucket Analysis...")
-    tqqq_result = run_tqqq_analysis(all_market_data, use_alternate)
+    tqqq_result = (
+        run_tqqq_analysis(all_market_data, use_alternate)
+        if results_df is None
+        else (results_df, use_alternate)
+    )
 
     if tqqq_result is None:
         logging.error("Failed to run TQQQ analysis")
@@ -1539,10 +1787,12 @@ def run_tqqq_bucket_analysis(all_market_data, start_date, use_alternate=True):
     return tqqq_fig, tqqq_stats, alternate_label
 
 
-def run_tqqq_regime_analysis(all_market_data, start_date):
-    """Run TQQQ volatility regime analysis."""
+def run_tqqq_regime_analysis(all_market_data, start_date, results_df=None):
+    """Run TQQQ volatility regime analysis, unless results_df is already computed."""
     logging.info("Running TQQQ Volatility Regime Analysis...")
-    regime_results_df = run_regime_analysis(all_market_data)
+    regime_results_df = (
+        run_regime_analysis(all_market_data) if results_df is None else results_df
+    )
 
     if regime_results_df is None:
         logging.error("Failed to run TQQQ regime analysis")
@@ -1559,20 +1809,59 @@ def run_tqqq_regime_analysis(all_market_data, start_date):
     )
 
 
-def run_treasury_analysis(start_date, end_date):
-    sd = start_date.strftime("%Y-%m-%d")
-    ed = end_date.strftime("%Y-%m-%d")
-    data = fetch_treasury_data(sd, ed)
-    frame = build_treasury_frame(data)
+def run_treasury_analysis(market_data, start_date, end_date):
+    """Run treasury yield analysis."""
+    logging.info("Running Treasury Yield Analysis...")
+    treasury_market_data = select_market_data(
+        market_data, list(YIELD_TICKERS) + ["SPY"], start_date, end_date
+    )
+    frame = build_treasury_frame(extract_treasury_data(treasury_market_data))
     if frame.empty:
         return None, None
-    spy_close = fetch_market_data("SPY", sd, ed)["Close"]
+    spy_close = treasury_market_data["SPY"]["Close"]
     spy = (
         spy_close.iloc[:, 0] if isinstance(spy_close, pd.DataFrame) else spy_close
     ).rename("SPY")
     return create_treasury_chart(frame, spy), generate_treasury_stats(frame)
 
 
+def run_report_sections(sections, report):
+    """Run independent report sections in parallel, rendering each chart as it completes.
+
+    sections maps a section name to (function, args); every function returns a tuple
+    whose first item is the Plotly figure (or None on failure). Charts are rendered
+    with report, a PlotlyReport, or not at all when report is None (the static PDF
+    rasterises the figures instead). Returns a dict of name -> (result tuple, chart HTML).
+    """
+
+    def timed(func, args):
+        started = time.perf_counter()
+        return func(*args), time.perf_counter() - started
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        futures = {
+            executor.submit(timed, func, args): name
+            for name, (func, args) in sections.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            result, elapsed = future.result()
+            started = time.perf_counter()
+            fig = result[0]
+            chart_html = (
+                fig_to_html(fig, report)
+                if fig is not None and report is not None
+                else ""
+            )
+            logging.info(
+                f"{name} section: analysis {elapsed:.2f}s, "
+                f"render {time.perf_counter() - started:.2f}s"
+            )
+            results[name] = (result, chart_html)
+    return results
+
+
 def save_report(html_content, report_path):
     """Save HTML report to file."""
     if report_path == "daily_rebalance_report.html":
@@ -1588,7 +1877,18 @@ def save_report(html_content, report_path):
     return report_path
 
 
-def generate_pdf_report(html_content, report_path):
+def pdf_output_path(report_path, suffix=""):
+    """PDF path next to report_path, a temp file for the default report path."""
+    if report_path == "daily_rebalance_report.html":
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=f"{suffix}.pdf")
+        tmp.close()
+        return tmp.name
+    if report_path.lower().endswith(".html"):
+        return report_path[:-5] + f"{suffix}.pdf"
+    return report_path + f"{suffix}.pdf"
+
+
+def generate_pdf_report(html_content, report_path, suffix=""):
     """Generate PDF from HTML content using Playwright."""
     try:
         from playwright.sync_api import sync_playwright
@@ -1599,15 +1899,7 @@ def generate_pdf_report(html_content, report_path):
             "Then install browsers: uv run playwright install chromium"
         ) from e
 
-    # Determine output path
-    if report_path == "daily_rebalance_report.html":
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        tmp.close()
-        pdf_path = tmp.name
-    elif report_path.lower().endswith(".html"):
-        pdf_path = report_path[:-5] + ".pdf"
-    else:
-        pdf_path = report_path + ".pdf"
+    pdf_path = pdf_output_path(report_path, suffix)
 
     # Write HTML to a temp file so Playwright can render it
     with tempfile.NamedTemporaryFile(
@@ -1644,6 +1936,161 @@ def generate_pdf_report(html_content, report_path):
             logging.warning(f"Failed to delete temporary HTML file {html_path}: {e}")
 
 
+class StatsParser(HTMLParser):
+    """Headings, paragraphs and tables of a statistics HTML fragment, in order.
+
+    blocks holds ("h3" | "p", text) and ("table", [(cells, is_header_row), ...]).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.blocks = []
+        self._text = None
+        self._row = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("h3", "p", "th", "td"):
+            self._text = []
+        elif tag == "table":
+            self.blocks.append(("table", []))
+        elif tag == "tr":
+            self._row = ([], False)
+
+    def handle_endtag(self, tag):
+        if self._text is not None and tag in ("h3", "p"):
+            self.blocks.append((tag, "".join(self._text).strip()))
+            self._text = None
+        elif self._text is not None and tag in ("th", "td"):
+            cells, is_header = self._row
+            cells.append("".join(self._text).strip())
+            self._row = (cells, is_header or tag == "th")
+            self._text = None
+        elif tag == "tr" and self._row is not None:
+            self.blocks[-1][1].append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+
+def stats_flowables(stats_html, styles):
+    """reportlab flowables of a section statistics HTML fragment."""
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+    parser = StatsParser()
+    parser.feed(stats_html)
+    flowables = []
+    for kind, content in parser.blocks:
+        if kind == "h3":
+            flowables.append(Paragraph(html.escape(content), styles["Heading3"]))
+        elif kind == "p":
+            flowables.append(Paragraph(html.escape(content), styles["Normal"]))
+        elif content:
+            table = Table([cells for cells, _ in content], hAlign="LEFT")
+            style = [
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#dddddd")),
+                ("FONTSIZE", (0, 0), (-1, -1), 9),
+                (
+                    "ROWBACKGROUNDS",
+                    (0, 0),
+                    (-1, -1),
+                    [colors.white, colors.HexColor("#f2f2f2")],
+                ),
+            ]
+            if content[0][1]:
+                style += [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4CAF50")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ]
+            table.setStyle(TableStyle(style))
+            flowables += [table, Spacer(1, 8)]
+    return flowables
+
+
+def generate_static_pdf_report(
+    sections, alternate_label, start_date, end_date, report_path, suffix=""
+):
+    """Assemble a PDF from rasterised charts and the statistics text, without a browser.
+
+    sections is the output of run_report_sections. Charts are rendered to PNG in
+    parallel worker processes and cached by figure content, so unchanged charts
+    cost nothing on the next run.
+    """
+    try:
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Image, PageBreak, Paragraph, SimpleDocTemplate
+    except ImportError as e:
+        raise ImportError(
+            "Static PDF generation requires reportlab and kaleido. "
+            "Install them with: uv add reportlab kaleido"
+        ) from e
+
+    pdf_path = pdf_output_path(report_path, suffix)
+    started = time.perf_counter()
+    figs = {
+        name: result[0]
+        for name, (result, _) in sections.items()
+        if result[0] is not None
+    }
+    images, cached = rasterise_figures(
+        figs, os.path.join(output_dir(), CHART_CACHE_DIR), scale=PDF_CHART_SCALE
+    )
+    rasterised = time.perf_counter()
+
+    styles = getSampleStyleSheet()
+    doc = SimpleDocTemplate(
+        pdf_path,
+        pagesize=landscape(A4),
+        leftMargin=20,
+        rightMargin=20,
+        topMargin=20,
+        bottomMargin=20,
+        title=f"Daily Rebalance Report - {end_date.strftime('%Y-%m-%d')}",
+    )
+    story = [
+        Paragraph("Daily Rebalance Report", styles["Title"]),
+        Paragraph(
+            f"<b>Report Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            styles["Normal"],
+        ),
+        Paragraph(
+            f"<b>Analysis Period:</b> {start_date.strftime('%Y-%m-%d')} to "
+            f"{end_date.strftime('%Y-%m-%d')}",
+            styles["Normal"],
+        ),
+    ]
+    for name, title, paragraphs in report_section_text(alternate_label):
+        if len(story) > 3:
+            story.append(PageBreak())
+        story.append(Paragraph(html.escape(title), styles["Heading2"]))
+        for label, text in paragraphs:
+            label_markup = f"<b>{html.escape(label)}</b> " if label else ""
+            story.append(Paragraph(label_markup + html.escape(text), styles["Normal"]))
+        stats = sections[name][0][1]
+        if stats:
+            story += stats_flowables(stats, styles)
+        if name in images:
+            image = Image(images[name])
+            fit = min(
+                doc.width / image.imageWidth, doc.height * 0.95 / image.imageHeight
+            )
+            image.drawWidth = image.imageWidth * fit
+            image.drawHeight = image.imageHeight * fit
+            story.append(image)
+    doc.build(story)
+
+    logging.info(
+        f"Static PDF: rasterised {len(figs)} charts ({cached} cached) in "
+        f"{rasterised - started:.2f}s, assembled in "
+        f"{time.perf_counter() - rasterised:.2f}s"
+    )
+    logging.info(f"PDF report saved to {pdf_path}")
+    return pdf_path
+
+
 def prepare_pdf_for_telegram(pdf_path):
     """Copy PDF to a temp file with current date for Telegram sending."""
     import shutil
@@ -1696,6 +2143,14 @@ def parse_args():
         action="store_true",
         help="Generate a PDF report instead of HTML (requires Playwright)",
     )
+    parser.add_argument(
+        "--pdf-mode",
+        choices=PDF_MODES,
+        default="browser",
+        help="PDF pipeline: browser prints the HTML report with Playwright, static "
+        "assembles PNG charts (kaleido) and text with reportlab, compare renders "
+        "both and logs their timings (default: browser)",
+    )
     parser.add_argument(
         "--send-telegram",
         action="store_true",
@@ -1729,8 +2184,14 @@ def generate_report(
     send_telegram=False,
     open_report=False,
     use_alternate=True,
+    state_db=None,
+    pdf_mode="browser",
 ):
-    """Shared pipeline: fetch data, analyze, generate report, optionally send/open."""
+    """
+    Shared pipeline: fetch data, analyze, generate report, optionally send/open.
+    With state_db the TQQQ sections advance their stored checkpoints. pdf_mode
+    picks the PDF pipeline, one of PDF_MODES.
+    """
     if end_date is None:
         end_date = datetime.now()
 
@@ -1738,49 +2199,102 @@ def generate_report(
     end_dt = pd.to_datetime(end_date)
     logging.info(f"Analysis period: {start_dt.date()} to {end_dt.date()}")
 
-    vix_signals_fig, vix_signals_stats = run_vix_signals_analysis(start_dt, end_dt)
-    credit_market_fig, credit_market_stats = run_credit_analysis(start_dt, end_dt)
-
-    if credit_market_fig is None:
-        logging.error("Credit analysis failed")
-        return None
-
-    all_market_data = fetch_tqqq_data(start_dt, end_dt)
-    tqqq_fig, tqqq_stats, alternate_label = run_tqqq_bucket_analysis(
-        all_market_data, start_dt, use_alternate=use_alternate
+    pipeline_start = time.perf_counter()
+    tqqq_results = (None, None)
+    if state_db is None:
+        market_data = fetch_report_data(start_dt, end_dt)
+    else:
+        market_data, checkpoints = fetch_checkpointed_data(
+            state_db, start_dt, end_dt, use_alternate
+        )
+        if checkpoints is not None:
+            tqqq_results = tuple(checkpoint.results for checkpoint in checkpoints)
+    logging.info(
+        f"Fetched {len(market_data)} symbols in "
+        f"{time.perf_counter() - pipeline_start:.2f}s"
     )
 
-    if tqqq_fig is None:
-        logging.error("TQQQ analysis failed")
-        return None
-
-    regime_fig, regime_stats = run_tqqq_regime_analysis(all_market_data, start_dt)
-
-    if regime_fig is None:
-        logging.error("Regime analysis failed")
-        return None
-
-    treasury_fig, treasury_stats = run_treasury_analysis(start_dt, end_dt)
-
-    html_content = generate_html_report(
-        vix_signals_fig,
-        vix_signals_stats,
-        credit_market_fig,
-        credit_market_stats,
-        tqqq_fig,
-        tqqq_stats,
-        alternate_label,
-        regime_fig,
-        regime_stats,
-        treasury_fig,
-        treasury_stats,
-        start_dt,
-        end_dt,
+    static_pdf_only = use_pdf and pdf_mode == "static"
+    report = None if static_pdf_only else PlotlyReport()
+    sections = run_report_sections(
+        {
+            "VIX signals": (run_vix_signals_analysis, (market_data, start_dt, end_dt)),
+            "Credit": (run_credit_analysis, (market_data, start_dt, end_dt)),
+            "TQQQ buckets": (
+                run_tqqq_bucket_analysis,
+                (market_data, start_dt, use_alternate, tqqq_results[0]),
+            ),
+            "TQQQ regimes": (
+                run_tqqq_regime_analysis,
+                (market_data, start_dt, tqqq_results[1]),
+            ),
+            "Treasury": (run_treasury_analysis, (market_data, start_dt, end_dt)),
+        },
+        report,
+    )
+    logging.info(
+        f"Report sections completed in {time.perf_counter() - pipeline_start:.2f}s"
     )
 
+    for name, label in (
+        ("Credit", "Credit"),
+        ("TQQQ buckets", "TQQQ"),
+        ("TQQQ regimes", "Regime"),
+    ):
+        if sections[name][0][0] is None:
+            logging.error(f"{label} analysis failed")
+            return None
+
+    (_, vix_signals_stats), vix_signals_html = sections["VIX signals"]
+    (_, credit_market_stats), credit_market_html = sections["Credit"]
+    (_, tqqq_stats, alternate_label), tqqq_html = sections["TQQQ buckets"]
+    (_, regime_stats), regime_html = sections["TQQQ regimes"]
+    (_, treasury_stats), treasury_html = sections["Treasury"]
+
+    html_content = None
+    if not static_pdf_only:
+        html_content = generate_html_report(
+            vix_signals_html,
+            vix_signals_stats,
+            credit_market_html,
+            credit_market_stats,
+            tqqq_html,
+            tqqq_stats,
+            alternate_label,
+            regime_html,
+            regime_stats,
+            treasury_html,
+            treasury_stats,
+            start_dt,
+            end_dt,
+            report.head_html(),
+        )
+
     if use_pdf:
-        logging.info("Generating PDF report...")
-        result_path = generate_pdf_report(html_content, report_path)
+        timings = {}
+        if pdf_mode in ("browser", "compare"):
+            logging.info("Generating PDF report...")
+            started = time.perf_counter()
+            result_path = generate_pdf_report(
+                html_content, report_path, "-browser" if pdf_mode == "compare" else ""
+            )
+            timings["browser"] = time.perf_counter() - started
+        if pdf_mode in ("static", "compare"):
+            logging.info("Generating static PDF report...")
+            started = time.perf_counter()
+            result_path = generate_static_pdf_report(
+                sections, alternate_label, start_dt, end_dt, report_path
+            )
+            timings["static"] = time.perf_counter() - started
+        logging.info(
+            "PDF render time: "
+            + ", ".join(f"{mode} {seconds:.2f}s" for mode, seconds in timings.items())
+        )
+        if len(timings) == 2:
+            logging.info(
+                f"Static PDF is {timings['browser'] / timings['static']:.1f}x "
+                "faster than the browser PDF"
+            )
     else:
         logging.info("Generating HTML report...")
         result_path = save_report(html_content, report_path)
@@ -1803,7 +2317,7 @@ def generate_report(
     return result_path
 
 
-def run_bot(start_date, use_alternate=True, use_pdf=False):
+def run_bot(start_date, use_alternate=True, use_pdf=False, pdf_mode="browser"):
     """Run the daily report and send to Telegram."""
     if not is_weekday():
         logging.info("Not a weekday, skipping...")
@@ -1815,25 +2329,27 @@ def run_bot(start_date, use_alternate=True, use_pdf=False):
         generate_report(
             start_date=start_date,
             use_pdf=use_pdf,
+            pdf_mode=pdf_mode,
             send_telegram=True,
             use_alternate=use_alternate,
+            state_db=os.path.join(output_dir(), STATE_DB),
         )
     except Exception as e:
         logging.error(f"Error in run_bot: {e}", exc_info=True)
 
 
-def schedule_bot(start_date, use_pdf=False):
+def schedule_bot(start_date, use_pdf=False, pdf_mode="browser"):
     """Schedule the bot to run at 9:00 AM on weekdays."""
     logging.info("Starting Daily Rebalance Report Bot...")
     logging.info("Scheduled to run at 9:00 AM on weekdays")
 
     for day in ("monday", "tuesday", "wednesday", "thursday", "friday"):
         getattr(schedule.every(), day).at("09:00").do(
-            lambda: run_bot(start_date=start_date, use_pdf=use_pdf)
+            lambda: run_bot(start_date=start_date, use_pdf=use_pdf, pdf_mode=pdf_mode)
         )
 
     logging.info("Running initial check...")
-    run_bot(start_date=start_date, use_pdf=use_pdf)
+    run_bot(start_date=start_date, use_pdf=use_pdf, pdf_mode=pdf_mode)
 
     while True:
         schedule.run_pending()
@@ -1848,6 +2364,7 @@ def main(args):
             start_date=args.start_date,
             end_date=args.end_date,
             use_pdf=args.pdf,
+            pdf_mode=args.pdf_mode,
             report_path=args.report_path,
             send_telegram=args.send_telegram,
             open_report=args.open,
@@ -1876,6 +2393,8 @@ if __name__ == "__main__":
         args.send_telegram = True
 
     if args.run_as_bot:
-        schedule_bot(start_date=args.start_date, use_pdf=args.pdf)
+        schedule_bot(
+            start_date=args.start_date, use_pdf=args.pdf, pdf_mode=args.pdf_mode
+        )
     else:
         sys.exit(main(args))
@@ -17,8 +17,11 @@ Download CSV from https://www.cboe.com/delayed_quotes/spx/quote_table
 Options Range -> "All"
 View Chain -> Scroll Down -> Download CSV
 
+Each import also stores the GEX by strike and the gamma flip level in the gex_history
+tables of the database, see gex-history.py to query them.
+
 Usage:
-./gamma-calculations.py --file ~/Downloads/spx_quotedata.csv
+./gamma-calculations.py --file ~/Downloads/spx_quotedata.csv --database data_spx/gamma_calculations.db
 
 ./gamma_calculations.py -v # To log INFO messages
 ./gamma_calculations.py -vv # To log DEBUG messages
@@ -27,15 +30,21 @@ Usage:
 import logging
 import sqlite3
 from argparse import ArgumentParser
+from contextlib import closing
 from datetime import timedelta
 from pathlib import Path
 
 import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
-from scipy.stats import norm
 
 from common import RawTextWithDefaultsFormatter
+from common.gamma_exposure import (
+    GAMMA_PROFILE_LEVELS,
+    calculate_gamma_exposure,
+    calculate_gamma_profile,
+    save_gex_history,
+    summarise_gex,
+)
 from common.logger import setup_logging
 
 pd.options.display.float_format = "{:,.4f}".format
@@ -71,30 +80,15 @@ def parse_args():
         action="store_true",
         help="Flag to determine if the plot should be displayed",
     )
+    parser.add_argument(
+        "--levels",
+        type=int,
+        default=GAMMA_PROFILE_LEVELS,
+        help="Number of spot levels in the gamma profile",
+    )
     return parser.parse_args()
 
 
-def calc_gamma_ex(s, k, vol, t, r, q, opt_type, oi):
-    """Calculate gamma exposure for an option."""
-    if t == 0 or vol == 0:
-        return 0
-
-    dp = (np.log(s / k) + (r - q + 0.5 * vol**2) * t) / (vol * np.sqrt(t))
-    dm = dp - vol * np.sqrt(t)
-
-    if opt_type == "call":
-        gamma = np.exp(-q * t) * norm.pdf(dp) / (s * vol * np.sqrt(t))
-        return oi * 100 * s * s * 0.01 * gamma
-    else:  # Gamma is same for calls and puts. This is just to cross-check
-        gamma = k * np.exp(-r * t) * norm.pdf(dm) / (s * s * vol * np.sqrt(t))
-        return oi * 100 * s * s * 0.01 * gamma
-
-
-def is_third_friday(d):
-    """Check if a given date is the third Friday of the month."""
-    return d.weekday() == 4 and 15 <= d.day <= 21
-
-
 def load_and_process_data(file_path):
     """Load and pre-process the options data from the CSV file."""
     logging.info(f"Loading data from {file_path}")
@@ -148,89 +142,6 @@ def load_and_process_data(file_path):
     return df, spot_price, today_date
 
 
-def calculate_gamma_exposure(df, spot_price):
-    """Calculate gamma exposure for all options."""
-    logging.info("Calculating gamma exposure")
-    df["CallGEX"] = (
-        df["CallGamma"] * df["CallOpenInt"] * 100 * spot_price * spot_price * 0.01
-    )
-    df["PutGEX"] = (
-        df["PutGamma"] * df["PutOpenInt"] * 100 * spot_price * spot_price * 0.01 * -1
-    )
-    df["TotalGamma"] = (df.CallGEX + df.PutGEX) / 10**9
-    return df
-
-
-def calculate_gamma_profile(df, spot_price, from_strike, to_strike, today_date):
-    """Calculate the gamma exposure profile for a range of spot prices."""
-    logging.info("Calculating gamma profile")
-    levels = np.linspace(from_strike, to_strike, 60)
-
-    df["daysTillExp"] = [
-        1 / 262
-        if (np.busday_count(today_date.date(), x.date())) == 0
-        else np.busday_count(today_date.date(), x.date()) / 262
-        for x in df.ExpirationDate
-    ]
-
-    next_expiry = df["ExpirationDate"].min()
-
-    df["IsThirdFriday"] = [is_third_friday(x) for x in df.ExpirationDate]
-    third_fridays = df.loc[df["IsThirdFriday"] == True]
-    next_monthly_exp = third_fridays["ExpirationDate"].min()
-
-    total_gamma = []
-    total_gamma_ex_next = []
-    total_gamma_ex_fri = []
-
-    for level in levels:
-        df["callGammaEx"] = df.apply(
-            lambda row: calc_gamma_ex(
-                level,
-                row["StrikePrice"],
-                row["CallIV"],
-                row["daysTillExp"],
-                0,
-                0,
-                "call",
-                row["CallOpenInt"],
-            ),
-            axis=1,
-        )
-
-        df["putGammaEx"] = df.apply(
-            lambda row: calc_gamma_ex(
-                level,
-                row["StrikePrice"],
-                row["PutIV"],
-                row["daysTillExp"],
-                0,
-                0,
-                "put",
-                row["PutOpenInt"],
-            ),
-            axis=1,
-        )
-
-        total_gamma.append(df["callGammaEx"].sum() - df["putGammaEx"].sum())
-
-        ex_nxt = df.loc[df["ExpirationDate"] != next_expiry]
-        total_gamma_ex_next.append(
-            ex_nxt["callGammaEx"].sum() - ex_nxt["putGammaEx"].sum()
-        )
-
-        ex_fri = df.loc[df["ExpirationDate"] != next_monthly_exp]
-        total_gamma_ex_fri.append(
-            ex_fri["callGammaEx"].sum() - ex_fri["putGammaEx"].sum()
-        )
-
-    total_gamma = np.array(total_gamma) / 10**9
-    total_gamma_ex_next = np.array(total_gamma_ex_next) / 10**9
-    total_gamma_ex_fri = np.array(total_gamma_ex_fri) / 10**9
-
-    return levels, total_gamma, total_gamma_ex_next, total_gamma_ex_fri
-
-
 def plot_combined_gamma(
     df,
     spot_price,
@@ -241,6 +152,7 @@ def plot_combined_gamma(
     total_gamma,
     total_gamma_ex_next,
     total_gamma_ex_fri,
+    zero_gamma,
 ):
     """Generate and display the combined gamma analysis chart."""
     logging.info("Plotting combined gamma figure")
@@ -308,16 +220,7 @@ def plot_combined_gamma(
     ax2.legend(fontsize=legend_fontsize)
     ax2.tick_params(axis="both", which="major", labelsize=tick_fontsize)
 
-    # Calculate zero gamma point
-    zero_cross_idx = np.where(np.diff(np.sign(total_gamma)))[0]
-    if len(zero_cross_idx) > 0:
-        neg_gamma = total_gamma[zero_cross_idx[0]]
-        pos_gamma = total_gamma[zero_cross_idx[0] + 1]
-        neg_strike = levels[zero_cross_idx[0]]
-        pos_strike = levels[zero_cross_idx[0] + 1]
-        zero_gamma = pos_strike - (
-            (pos_strike - neg_strike) * pos_gamma / (pos_gamma - neg_gamma)
-        )
+    if zero_gamma is not None:
         ax2.axvline(
             x=zero_gamma,
             color="g",
@@ -369,19 +272,28 @@ def main(args):
 
     save_to_database(args.database, file_path, df, today_date)
 
-    if args.show_plot:
-        from_strike = 0.8 * spot_price
-        to_strike = 1.2 * spot_price
+    from_strike = 0.8 * spot_price
+    to_strike = 1.2 * spot_price
 
-        df = calculate_gamma_exposure(df, spot_price)
+    df = calculate_gamma_exposure(df, spot_price)
 
-        (
-            levels,
-            total_gamma,
-            total_gamma_ex_next,
-            total_gamma_ex_fri,
-        ) = calculate_gamma_profile(df, spot_price, from_strike, to_strike, today_date)
+    (
+        levels,
+        total_gamma,
+        total_gamma_ex_next,
+        total_gamma_ex_fri,
+        zero_gamma,
+    ) = calculate_gamma_profile(
+        df, spot_price, from_strike, to_strike, today_date, args.levels
+    )
+
+    summary, by_strike = summarise_gex(
+        df, spot_price, from_strike, to_strike, zero_gamma
+    )
+    with closing(sqlite3.connect(args.database)) as conn:
+        save_gex_history(conn, Path(file_path).stem, today_date, summary, by_strike)
 
+    if args.show_plot:
         plot_combined_gamma(
             df,
             spot_price,
@@ -392,6 +304,7 @@ def main(args):
             total_gamma,
             total_gamma_ex_next,
             total_gamma_ex_fri,
+            zero_gamma,
         )
 
 
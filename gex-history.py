@@ -0,0 +1,250 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "pandas",
+#   "matplotlib",
+#   "numpy",
+#   "scipy",
+# ]
+# ///
+"""
+Gamma Exposure History
+
+Queries the GEX history stored by gamma-calculations.py. Each snapshot holds the net
+GEX (all expiries, ex-next expiry, ex-next monthly expiry) and the gamma flip level,
+keyed by quote date, with the GEX by strike kept alongside.
+
+Snapshots imported before the history tables existed can be rebuilt from the daily
+chain tables saved in the same database with --backfill.
+
+Usage:
+./gex-history.py -h
+
+./gex-history.py --database data_spx/gamma_calculations.db
+./gex-history.py --database data_spx/gamma_calculations.db --start 2024-01-01 --plot
+./gex-history.py --database data_spx/gamma_calculations.db --plot --output gex_history.png
+./gex-history.py --database data_spx/gamma_calculations.db --strikes 2025-01-10
+./gex-history.py --database data_spx/gamma_calculations.db --backfill -v # Import missing snapshots
+./gex-history.py --database data_spx/gamma_calculations.db --backfill --rebuild # Recompute every snapshot
+"""
+
+import logging
+import re
+import sqlite3
+from argparse import ArgumentParser
+from contextlib import closing
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from common import RawTextWithDefaultsFormatter
+from common.gamma_exposure import (
+    GAMMA_PROFILE_LEVELS,
+    GEX_COLUMNS,
+    GEX_HISTORY_TABLE,
+    calculate_gamma_exposure,
+    calculate_gamma_profile,
+    load_gex_by_strike,
+    load_gex_history,
+    save_gex_history,
+    summarise_gex,
+)
+from common.logger import setup_logging
+
+pd.options.display.float_format = "{:,.4f}".format
+
+# Daily chain tables saved by gamma-calculations.py: <file stem>_<YYYYMMDD>
+SNAPSHOT_TABLE_PATTERN = re.compile(r"^(?P<source>.+)_(?P<date>\d{8})$")
+SNAPSHOT_COLUMNS = [
+    "ExpirationDate",
+    "StrikePrice",
+    "CallIV",
+    "PutIV",
+    "CallGamma",
+    "PutGamma",
+    "CallOpenInt",
+    "PutOpenInt",
+    "SpotPrice",
+    "QuoteDate",
+]
+
+
+def parse_args():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=RawTextWithDefaultsFormatter
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        dest="verbose",
+        help="Increase verbosity of logging output",
+    )
+    parser.add_argument(
+        "-d",
+        "--database",
+        required=True,
+        type=Path,
+        help="Database file path",
+    )
+    parser.add_argument(
+        "--source",
+        help="Only use snapshots of this source (CSV file stem, e.g. spx_quotedata)",
+    )
+    parser.add_argument("--start", help="First quote date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Last quote date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--strikes",
+        metavar="QUOTE_DATE",
+        help="Print the GEX by strike of a single quote date",
+    )
+    parser.add_argument(
+        "--plot",
+        action="store_true",
+        help="Plot the flip level and net GEX time series",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Save the plot to this file instead of displaying it",
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Add snapshots for daily chain tables missing from the history",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="With --backfill, recompute snapshots already in the history",
+    )
+    parser.add_argument(
+        "--levels",
+        type=int,
+        default=GAMMA_PROFILE_LEVELS,
+        help="Number of spot levels in the gamma profile used to find the flip",
+    )
+    return parser.parse_args()
+
+
+def find_snapshot_tables(conn, source=None):
+    """(table, source, quote date) of every daily chain table in the database"""
+    tables = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
+    ).fetchall()
+    snapshots = []
+    for (table,) in tables:
+        match = SNAPSHOT_TABLE_PATTERN.match(table)
+        if not match or (source and match["source"] != source):
+            continue
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        if set(SNAPSHOT_COLUMNS) <= columns:
+            snapshots.append(
+                (table, match["source"], pd.Timestamp(match["date"]).date())
+            )
+    return snapshots
+
+
+def backfill_history(conn, source, rebuild, num_levels):
+    existing = load_gex_history(conn, source)
+    stored = set(zip(existing["Source"], existing["QuoteDate"].dt.date))
+
+    snapshots = find_snapshot_tables(conn, source)
+    pending = [s for s in snapshots if rebuild or (s[1], s[2]) not in stored]
+    logging.info(f"Backfilling {len(pending)} of {len(snapshots)} daily chain tables")
+
+    for table, table_source, _ in pending:
+        columns = ", ".join(SNAPSHOT_COLUMNS)
+        df = pd.read_sql_query(
+            f'SELECT {columns} FROM "{table}"',
+            conn,
+            parse_dates=["ExpirationDate", "QuoteDate"],
+        )
+        spot_price = float(df["SpotPrice"].iloc[0])
+        today_date = df["QuoteDate"].iloc[0]
+        from_strike = 0.8 * spot_price
+        to_strike = 1.2 * spot_price
+
+        df = calculate_gamma_exposure(df, spot_price)
+        *_, zero_gamma = calculate_gamma_profile(
+            df, spot_price, from_strike, to_strike, today_date, num_levels
+        )
+        summary, by_strike = summarise_gex(
+            df, spot_price, from_strike, to_strike, zero_gamma
+        )
+        save_gex_history(conn, table_source, today_date, summary, by_strike)
+
+    return len(pending)
+
+
+def plot_history(history, output=None):
+    fig, (ax1, ax2) = plt.subplots(
+        2, 1, figsize=(12, 8), sharex=True, gridspec_kw={"height_ratios": [2, 1]}
+    )
+
+    for source, snapshots in history.groupby("Source"):
+        label = f" ({source})" if history["Source"].nunique() > 1 else ""
+        ax1.plot(snapshots["QuoteDate"], snapshots["SpotPrice"], label="Spot" + label)
+        ax1.plot(
+            snapshots["QuoteDate"],
+            snapshots["GammaFlip"],
+            linestyle="--",
+            label="Gamma Flip" + label,
+        )
+        for column in GEX_COLUMNS:
+            ax2.plot(snapshots["QuoteDate"], snapshots[column], label=column + label)
+
+    ax1.set_title("Spot vs Gamma Flip Level")
+    ax1.set_ylabel("Index Price")
+    ax1.grid(True)
+    ax1.legend(fontsize=8)
+
+    ax2.set_title("Net Gamma Exposure")
+    ax2.set_ylabel("$ billions/1% move")
+    ax2.axhline(y=0, color="grey", lw=1)
+    ax2.grid(True)
+    ax2.legend(fontsize=8)
+
+    plt.tight_layout()
+    if output:
+        fig.savefig(output)
+        logging.info(f"Saved plot to {output}")
+    else:
+        plt.show()
+
+
+def main(args):
+    with closing(sqlite3.connect(args.database)) as conn:
+        if args.backfill:
+            count = backfill_history(conn, args.source, args.rebuild, args.levels)
+            print(f"Backfilled {count} snapshots into {GEX_HISTORY_TABLE}")
+
+        if args.strikes:
+            by_strike = load_gex_by_strike(conn, args.strikes, args.source)
+            if by_strike.empty:
+                print(f"No GEX history for {args.strikes}")
+            else:
+                print(by_strike.to_string(index=False))
+            return
+
+        history = load_gex_history(conn, args.source, args.start, args.end)
+
+    if history.empty:
+        print("No GEX history found")
+        return
+
+    history["FlipDistancePct"] = (
+        (history["GammaFlip"] - history["SpotPrice"]) / history["SpotPrice"] * 100
+    )
+    print(history.to_string(index=False))
+
+    if args.plot:
+        plot_history(history, args.output)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging(args.verbose)
+    main(args)
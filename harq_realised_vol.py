@@ -10,22 +10,34 @@
 """
 HARQ Model Implementation with Future Volatility Predictions
 
+Realised volatility and quarticity come from rolling sums of squared and
+fourth-power daily returns. Several symbols are fitted and forecast together.
+With --backtest the model is refitted every day by recursive least squares and
+its one day ahead forecasts are scored against the random walk forecast.
+
 Usage:
 ./harq_realised_vol.py -h
-./harq_realised_vol.py --symbol SPY --days 5
+./harq_realised_vol.py --symbols SPY --days 5
+./harq_realised_vol.py --symbols SPY QQQ IWM TLT GLD --days 10 --years 5
+./harq_realised_vol.py --symbols SPY QQQ IWM --years 20 --backtest
+./harq_realised_vol.py --symbols SPY QQQ --years 20 --backtest --forgetting 0.999
 """
 
 import logging
+import time
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
 from datetime import datetime, timedelta
 
 import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from common import harq
 from common.logger import setup_logging
 
+# Default history of --backtest: the first year and a bit is warm-up and initial fit
+BACKTEST_YEARS = 5
+
 
 def parse_args():
     parser = ArgumentParser(
@@ -41,10 +53,11 @@ def parse_args():
     )
     parser.add_argument(
         "-s",
-        "--symbol",
+        "--symbols",
         type=str,
-        default="SPY",
-        help="Stock symbol to analyze (default: SPY)",
+        nargs="+",
+        default=["SPY"],
+        help="Stock symbols to analyze (default: SPY)",
     )
     parser.add_argument(
         "-d",
@@ -53,159 +66,137 @@ def parse_args():
         default=5,
         help="Number of days to forecast (default: 5)",
     )
+    parser.add_argument(
+        "-y",
+        "--years",
+        type=int,
+        default=None,
+        help="Years of history to fit on (default: 1, or 5 with --backtest)",
+    )
+    parser.add_argument(
+        "--backtest",
+        action="store_true",
+        help="Walk-forward backtest refitting the model every day",
+    )
+    parser.add_argument(
+        "--forgetting",
+        type=float,
+        default=1.0,
+        help="RLS forgetting factor of the backtest, below 1 favours recent days "
+        "(default: 1.0)",
+    )
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="Skip the forecast chart",
+    )
     return parser.parse_args()
 
 
 class HARQModel:
+    """HARQ model of one or more symbols, fitted by least squares on all days"""
+
     def __init__(self):
         self.params = None
-        self.beta0 = None
-        self.beta1 = None
-        self.beta1q = None
-        self.beta2 = None
-        self.beta3 = None
-
-    def compute_realized_volatility(self, returns):
-        """Compute realized volatility"""
-        return np.sqrt(np.sum(returns**2)) * np.sqrt(252)
-
-    def compute_realized_quarticity(self, returns):
-        """Compute realized quarticity"""
-        return np.sum(returns**4) * (252**2)
-
-    def prepare_features(self, rv_series):
-        """Prepare HAR features"""
-        features = pd.DataFrame(index=rv_series.index)
-
-        # Daily (previous day) volatility
-        features["daily_rv"] = rv_series.shift(1)
-
-        # Weekly (previous 5 days) average volatility
-        features["weekly_rv"] = rv_series.rolling(window=5).mean().shift(1)
-
-        # Monthly (previous 22 days) average volatility
-        features["monthly_rv"] = rv_series.rolling(window=22).mean().shift(1)
-
-        return features.fillna(method="ffill")
-
-    def fit(self, returns, rv_series):
-        """Fit the HARQ model"""
-        # Calculate realized quarticity
-        rq_series = returns.rolling(window=22).apply(self.compute_realized_quarticity)
-
-        # Prepare features
-        features = self.prepare_features(rv_series)
-        features["daily_rv_rq"] = features["daily_rv"] * rq_series
-
-        # Remove NaN values
-        features = features.dropna()
-        y = rv_series[features.index]
-
-        # Fit model using OLS
-        X = features.values
-        X = np.column_stack([np.ones(len(X)), X])
-        betas = np.linalg.pinv(X.T @ X) @ X.T @ y
-
-        # Store parameters
-        self.beta0 = betas[0]
-        self.beta1 = betas[1]
-        self.beta1q = betas[2]
-        self.beta2 = betas[3]
-        self.beta3 = betas[4]
-
-        self.params = {
-            "beta0": self.beta0,
-            "beta1": self.beta1,
-            "beta1q": self.beta1q,
-            "beta2": self.beta2,
-            "beta3": self.beta3,
-        }
-
-        return features, y
-
-    def forecast_n_days(self, returns, rv_series, n_days=5):
-        """Forecast volatility for next n days"""
+
+    def fit(self, returns):
+        """Fit the HARQ model of each column of returns"""
+        returns = pd.DataFrame(returns)
+        rv, rq = harq.realised_measures(returns.to_numpy())
+        betas = harq.fit_ols(harq.harq_features(rv, rq), rv)
+        self.params = pd.DataFrame(betas, index=returns.columns, columns=harq.FEATURES)
+        return self.params
+
+    def forecast_n_days(self, returns, n_days=5):
+        """(n_days x symbols) volatility forecasts after the last day of returns"""
         if self.params is None:
             raise ValueError("Model must be fitted before forecasting")
+        returns = pd.DataFrame(returns)
+        return harq.forecast(returns, n_days, self.params.loc[returns.columns])
 
-        # Initialize forecasts
-        forecasts = []
-
-        # Get latest values
-        latest_rv = rv_series.iloc[-1]
-        latest_weekly = rv_series.iloc[-5:].mean()
-        latest_monthly = rv_series.iloc[-22:].mean()
-        latest_rq = self.compute_realized_quarticity(returns.iloc[-22:])
-
-        # Generate forecasts
-        for _ in range(n_days):
-            forecast = (
-                self.beta0
-                + self.beta1 * latest_rv
-                + self.beta1q * (latest_rv * latest_rq)
-                + self.beta2 * latest_weekly
-                + self.beta3 * latest_monthly
-            )
 
-            forecasts.append(forecast)
+def download_returns(symbols, years):
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=365 * years)
 
-            # Update for next iteration
-            latest_rv = forecast
-            latest_weekly = (latest_weekly * 4 + forecast) / 5
-            latest_monthly = (latest_monthly * 21 + forecast) / 22
+    logging.info(f"Downloading data for {', '.join(symbols)}")
+    df = yf.download(
+        symbols, start=start_date, end=end_date, progress=False, auto_adjust=True
+    )
+    close = df["Close"]
+    if isinstance(close, pd.Series):
+        close = close.to_frame(symbols[0])
+    return close[symbols].pct_change().iloc[1:]
+
+
+def run_backtest(returns, forgetting):
+    start = time.perf_counter()
+    result = harq.backtest(returns, forgetting=forgetting)
+    logging.info(
+        f"Backtested {returns.shape[1]} symbols over {len(returns)} days "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
 
-        return forecasts
+    losses = result.losses()
+    print("\nOne day ahead out of sample losses (HARQ vs random walk):")
+    print(losses.to_string(float_format=lambda value: f"{value:.5f}"))
+    beats = (losses["harq_qlike"] < losses["naive_qlike"]).sum()
+    print(f"\nHARQ has the lower QLIKE on {beats} of {len(losses)} symbols")
+    print("\nLatest coefficients:")
+    print(result.latest_betas().to_string(float_format=lambda value: f"{value:.4g}"))
 
 
-def main(args):
-    # Download data
-    symbol = args.symbol
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=365)
+def plot_forecasts(rv, forecasts):
+    plt.figure(figsize=(12, 6))
+    for symbol in rv.columns:
+        (line,) = plt.plot(rv.index[-60:], rv[symbol].iloc[-60:], label=symbol)
+        plt.plot(forecasts.index, forecasts[symbol], "--", color=line.get_color())
 
-    logging.info(f"Downloading data for {symbol}")
-    df = yf.download(symbol, start=start_date, end=end_date)
+    plt.title(f"{', '.join(rv.columns)} Volatility Forecast")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
 
-    # Calculate daily returns
-    df["returns"] = df["Close"].pct_change()
 
-    # Calculate realized volatility
-    df["rv"] = df["returns"].rolling(window=22).std() * np.sqrt(252)
+def main(args):
+    symbols = list(dict.fromkeys(args.symbols))
+    years = args.years or (BACKTEST_YEARS if args.backtest else 1)
+    returns = download_returns(symbols, years)
+
+    if args.backtest:
+        if len(returns) < harq.backtest_min_days():
+            logging.error(
+                f"--backtest needs at least {harq.backtest_min_days()} days of "
+                f"returns, got {len(returns)}. Increase --years"
+            )
+            return
+        run_backtest(returns, args.forgetting)
+        return
 
-    # Initialize and fit model
     model = HARQModel()
-    _, _ = model.fit(df["returns"], df["rv"])
+    model.fit(returns)
+    logging.debug(f"Coefficients:\n{model.params}")
 
-    # Make predictions
     n_days = args.days
-    forecasts = model.forecast_n_days(df["returns"], df["rv"], n_days)
+    forecasts = model.forecast_n_days(returns, n_days)
+    last_date = returns.index[-1]
+    forecasts.index = pd.bdate_range(last_date + timedelta(days=1), periods=n_days)
 
-    # Generate forecast dates
-    last_date = df.index[-1]
-    forecast_dates = [
-        (last_date + timedelta(days=i + 1)).strftime("%Y-%m-%d") for i in range(n_days)
-    ]
+    rv, _ = harq.realised_measures(returns.to_numpy())
+    rv = pd.DataFrame(rv, index=returns.index, columns=returns.columns)
 
-    # Print results
+    print(f"\nCurrent volatility ({last_date.strftime('%Y-%m-%d')}):")
+    for symbol in symbols:
+        print(f"- {symbol}: {rv[symbol].iloc[-1]:.1%}")
+    print("\nForecasted annualized volatility:")
     print(
-        f"\nCurrent volatility ({last_date.strftime('%Y-%m-%d')}): {df['rv'].iloc[-1]:.1%}"
+        forecasts.rename(index=lambda date: date.strftime("%Y-%m-%d")).to_string(
+            float_format=lambda value: f"{value:.1%}"
+        )
     )
-    print("\nForecasted annualized volatility:")
-    for date, forecast in zip(forecast_dates, forecasts):
-        print(f"- {date}: {forecast:.1%}")
-
-    # Plot results
-    plt.figure(figsize=(12, 6))
-    plt.plot(df.index[-60:], df["rv"].iloc[-60:], label="Historical Volatility")
 
-    # Plot forecasts
-    forecast_dates = [pd.to_datetime(date) for date in forecast_dates]
-    plt.plot(forecast_dates, forecasts, "r--", label="Forecast")
-
-    plt.title(f"{symbol} Volatility Forecast")
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    if not args.no_plot:
+        plot_forecasts(rv, forecasts)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 # /// script
 # dependencies = [
 #   "matplotlib",
+#   "numpy",
 #   "yfinance",
 #   "scipy"
 # ]
@@ -31,12 +32,33 @@ import math as m
 from datetime import datetime
 
 import matplotlib.pyplot as plt
+import numpy as np
 import yfinance as yf
-from scipy.stats import norm
+
+from common.black_scholes import bs_greeks, bs_price, bs_vega, implied_volatility
 
 plt.switch_backend("TkAgg")
 
 
+def time_to_expiry(current_date, current_time, exp):
+    """
+    Calculates the number of minutes to expiration, then converts to years.
+    Minutes are chosen because the VIX does this.
+    """
+    hr, minute = 17, 30
+    year, month, day = (int(x) for x in exp.split("-"))
+    exp_dt = dt.datetime(year, month, day, hr, minute)
+
+    hr, minute = (int(x) for x in current_time.split(":"))
+    year, month, day = (int(x) for x in current_date.split("-"))
+    current_dt = dt.datetime(year, month, day, hr, minute)
+
+    days = 24 * 60 * 60 * (exp_dt - current_dt).days
+    seconds = (exp_dt - current_dt).seconds
+
+    return (days + seconds) / (365 * 24 * 60 * 60)
+
+
 class Option:
     """
     Option contract 'object' according to the vanilla Black-Scholes-Merton model for the price of a European option.
@@ -107,9 +129,9 @@ class Option:
             - bid
             - ask
 
-        2) Implied volatility is iteratively calculated using a bisection algorithm. The Newton-Raphson
-           algorithm was initially used because it is very fast, but has problems converging for deep ITM
-           options, even with a good initial guess (analytical approximation).
+        2) Implied volatility is solved with Halley steps from an analytical initial guess, falling
+           back to bisection when a step leaves the bracket (deep ITM options), see
+           common.black_scholes.implied_volatility. get_options solves a whole chain at once.
            - can be called like "x.IV" using the option called "x" from the previous example.
 
         3) The following greeks are calculated and also available to call:
@@ -159,9 +181,11 @@ class Option:
         openInterest,
         bid,
         ask,
+        IV=None,
     ):
         """
         Sets all the attributes of the contract.
+        Pass IV when it has already been solved for the whole chain.
         """
         self.opt_type = opt_type.lower()
 
@@ -186,29 +210,16 @@ class Option:
         self.date = current_date
         self.time = current_time
         self.exp = exp
-        self.t = self.__t(current_date, current_time, exp)
+        self.t = time_to_expiry(current_date, current_time, exp)
         self.r = r
         self.q = 0
         self.volume = volume
         self.openInterest = openInterest
         self.bid = bid
         self.ask = ask
-        vol_params = self.__BSMIV(self.S, self.t)
-        self.IV = vol_params[0]
-        self.vega = vol_params[1]
-        self.delta = self.__BSMdelta()
-        self.gamma = self.__BSMgamma()
-        self.theta = self.__BSMtheta()
-        self.rho = self.__BSMrho()
-        self.Lambda = self.__BSMlambda()
-        self.vanna = self.__BSMvanna()
-        self.charm = self.__BSMcharm()
-        self.vomma = self.__BSMvomma()
-        self.veta = self.__BSMveta()
-        self.speed = self.__BSMspeed()
-        self.zomma = self.__BSMzomma()
-        self.color = self.__BSMcolor()
-        self.ultima = self.__BSMultima()
+        self.IV = self.__BSMIV(self.S, self.t) if IV is None else IV
+        self.vega = self.__BSMvega(self.S, self.t, self.IV)
+        self.__BSMgreeks()
 
     def __repr__(self):
         """
@@ -218,93 +229,14 @@ class Option:
             self.K, self.opt_type, self.exp
         )
 
-    def __t(self, current_date, current_time, exp):
-        """
-        Calculates the number of minutes to expiration, then converts to years.
-        Minutes are chosen because the VIX does this.
-        """
-        hr, minute = 17, 30
-        year, month, day = (int(x) for x in exp.split("-"))
-        exp_dt = dt.datetime(year, month, day, hr, minute)
-
-        hr, minute = (int(x) for x in current_time.split(":"))
-        year, month, day = (int(x) for x in current_date.split("-"))
-        current_dt = dt.datetime(year, month, day, hr, minute)
-
-        days = 24 * 60 * 60 * (exp_dt - current_dt).days
-        seconds = (exp_dt - current_dt).seconds
-
-        return (days + seconds) / (365 * 24 * 60 * 60)
-
-    def __d1(self, S, t, v):
-        """
-        Struggling to come up with a good explanation.
-        It's an input into the cumulative distribution function.
-        """
-        K = self.K
-        r = self.r
-        q = self.q
-
-        return (m.log(S / K) + (r - q + 0.5 * v**2) * t) / (v * m.sqrt(t))
-
-    def __d2(self, S, t, v):
-        """
-        Struggling to come up with a good explanation.
-        It's an input into the cumulative distribution function.
-        """
-        d1 = self.__d1(S, t, v)
-
-        return d1 - v * m.sqrt(t)
-
-    def __pvK(self, t):
-        """
-        Present value (pv) of the strike price (K)
-        """
-        K = self.K
-        r = self.r
-        return K * m.exp(-r * t)
-
-    def __pvS(self, S, t):
-        """
-        Present value (pv) of the stock price (S)
-        """
-        q = self.q
-
-        return S * m.exp(-q * t)
-
-    def __phi(self, x):
-        return norm.pdf(x)
-
-    def __N(self, x):
-        return norm.cdf(x)
-
     def __BSMprice(self, S, t, v):
         """
         Black-Scholes-Merton price of a European call or put.
         """
-        K = self.K
-        pvK = self.__pvK(t)
-        pvS = self.__pvS(S, t)
-
-        if t != 0:
-            if self.opt_type == "call":
-                Nd1 = self.__N(self.__d1(S, t, v))
-                Nd2 = -self.__N(self.__d2(S, t, v))
-
-            elif self.opt_type == "put":
-                Nd1 = -self.__N(-self.__d1(S, t, v))
-                Nd2 = self.__N(-self.__d2(S, t, v))
-
-            return round(pvS * Nd1 + pvK * Nd2, 2)
-
-        elif t == 0:
-            if self.opt_type == "call":
-                intrinsic_value = max(0, S - K)
-
-            elif self.opt_type == "put":
-                intrinsic_value = max(0, K - S)
-
-            return round(intrinsic_value, 2)
+        return round(
+            float(bs_price(S, self.K, t, v, self.r, self.q, self.opt_type == "call")),
+            2,
+        )
 
     # First order greek
     def __BSMvega(self, S, t, v):
@@ -313,10 +245,7 @@ class Option:
 
         - For a 1% increase in IV, how much will the option price rise?
         """
-        pvK = self.__pvK(t)
-        phid2 = self.__phi(self.__d2(S, t, v))
-
-        return round((pvK * phid2 * m.sqrt(t)) / 100, 4)
+        return round(float(bs_vega(S, self.K, t, v, self.r, self.q)) / 100, 4)
 
     def __BSMIV(self, S, t):
         """
@@ -324,346 +253,39 @@ class Option:
 
         - For the option price (V) to be fair, how volatile does the underlying (S) need to be?
 
-        Note: this function also returns vega, because initially the Newton-Raphson method was used, and
-        that requires vega to be solved at the same time. I didn't feel like rewriting things so I just
-        tacked on the vega calculation after IV was calculated.
-        """
-        V = self.V
-        # K = self.K
-
-        # Bisection method
-
-        # We are trying to solve the error function which is the difference between the estimated price and the actual price
-        # V_est - V
-        # We need to generate two initial guesses at IV, one with a positive error and one with a negative error
-        # Should be reasonable to assume that vol will be somewhere between 1% and 2000%
-        v_lo = 0
-        v_hi = 20
-        v_mid = 0.5 * (v_lo + v_hi)
-        V_mid = self.__BSMprice(S, t, v_mid)
-        error = V_mid - V
-
-        # Keep iterating until the error in estimated price is less than a cent
-        while v_hi - v_lo >= 0.1 / 100:
-            if error > 0:
-                v_hi = v_mid
-
-            elif error < 0:
-                v_lo = v_mid
-
-            elif error == 0:
-                break
-
-            v_mid = 0.5 * (v_hi + v_lo)
-            V_mid = self.__BSMprice(S, t, v_mid)
-            error = V_mid - V
-
-        vega = self.__BSMvega(S, t, v_mid)
-
-        # Newton-Raphson method
-        # Kind of a mess because I was trying different things to get it to converge better for certain deep ITM options.
-        # v = (m.sqrt(2*m.pi) / t)*(V / S)
-        # min_err = 1000000
-        # best_v = 0
-        # best_vega = 0
-
-        # i = 0
-        # if self.opt_type == 'call':
-        #     if V < S - K:
-        #         V = S - K
-
-        # elif self.opt_type == 'put':
-        #     if V < K - S:
-        #         V = K - S
-
-        # while i < 5000:
-        #     V_est = max(self.__BSMprice(S, t, v), 0.01)
-        #     vega = max(self.__BSMvega(S, t, v), 0.0001)
-        #     error = V_est - V
-
-        #     if abs(error) < min_err:
-        #         min_err = abs(error)
-        #         best_v = v
-        #         best_vega = vega
-
-        #     if error == 0:
-        #         break
-
-        #     else:
-        #         v = v - (error/(vega*100))*0.25
-
-        #     if (i == 4999) & (error != 0):
-        #         print('error in IV loop')
-
-        #     i += 1
-
-        # return round(best_v, 4), round(best_vega, 4)
-        return round(v_mid, 4), round(vega, 4)
-
-    # First order greek
-    def __BSMdelta(self):
+        Solved to 1e-8 with the vectorised solver in common.black_scholes. NaN when V is
+        outside the no-arbitrage bounds of the option.
         """
-        First derivative of the option price (V) with respect to
-        the underlying price (S).
-
-        - For a $1 increase in S, how much will V rise?
-
-        - Also is the risk neutral probability S is at or below K by expiration.
-
-        Note that a risk neutral probability is not a real life probability.
-        It is simply the probability that would exist if it were possible to
-        create a completely risk free portfolio.
-        """
-        S = self.S
-        t = self.t
-        v = self.IV
-
-        if self.opt_type == "call":
-            Nd1 = self.__N(self.__d1(S, t, v))
-
-        elif self.opt_type == "put":
-            Nd1 = -self.__N(-self.__d1(S, t, v))
-
-        return round(Nd1, 4)
-
-    # Second order greek
-    def __BSMgamma(self):
-        """
-        First dertivative of delta with respect to the price of the underlying (S).
-        Second derivative of the option price (V) with respect to the stock price.
-
-        - For a $1 increase in the stock price, how much will delta increase?
-        """
-        S = self.S
-        t = self.t
-        v = self.IV
-        pvK = self.__pvK(t)
-        phid2 = self.__phi(self.__d2(S, t, v))
-
-        return round((pvK * phid2) / (S**2 * v * m.sqrt(t)), 4)
-
-    # First order greek
-    def __BSMtheta(self):
-        """
-        First derivative of the option price (V) with respect to time (t).
-
-        - How much less will the option be worth tomorrow?
-        """
-        S = self.S
-        t = self.t
-        v = self.IV
-        pvK = self.__pvK(t)
-        pvS = self.__pvS(S, t)
-
-        if self.opt_type == "call":
-            phid1 = self.__phi(self.__d1(S, t, v))
-            r = -self.r
-            q = self.q
-            Nd1 = self.__N(self.__d1(S, t, v))
-            Nd2 = self.__N(self.__d2(S, t, v))
-
-        elif self.opt_type == "put":
-            phid1 = self.__phi(-self.__d1(S, t, v))
-            r = self.r
-            q = -self.q
-            Nd1 = self.__N(-self.__d1(S, t, v))
-            Nd2 = self.__N(-self.__d2(S, t, v))
-
-        return round(
-            (-((pvS * phid1 * v) / (2 * m.sqrt(t))) + r * pvK * Nd2 + q * pvS * Nd1)
-            / 365,
-            4,
+        iv, _ = implied_volatility(
+            self.V, S, self.K, t, self.r, self.q, self.opt_type == "call"
         )
+        return float(iv)
 
-    # First order greek
-    def __BSMrho(self):
+    def __BSMgreeks(self):
         """
-        First derivative of the option price (V) with respect to the risk free interest rate (r).
+        Greeks at the implied volatility from the shared Black-Scholes-Merton engine,
+        scaled to the units shown on the plots.
 
-        - For a 1% change in interest rates, by how many dollars will the value of the option change?
+        - vega, rho and vanna per 1% change, theta, charm and color per day,
+          veta per 1% change per day, vomma and ultima in vega (per 1%) units
+        - Lambda is the leverage at the traded option price (V)
         """
-        S = self.S
-        t = self.t
-        v = self.IV
-
-        if self.opt_type == "call":
-            pvK = self.__pvK(t)
-            Nd2 = self.__N(self.__d2(S, t, v))
-
-        elif self.opt_type == "put":
-            pvK = -self.__pvK(t)
-            Nd2 = self.__N(-self.__d2(S, t, v))
-
-        return round((pvK * t * Nd2) / 100, 4)
-
-    # First order greek
-    def __BSMlambda(self):
-        """
-        Measures the percentage change in the option price (V) per percentage change
-        in the price of the underlying (S).
-
-        - How much leverage does this option have?
-        """
-        V = self.V
-        S = self.S
-        delta = self.delta
-
-        return round(delta * (S / V), 4)
-
-    # Second order greek
-    def __BSMvanna(self):
-        """
-        First derivative of delta with respect to implied volatility.
-
-        - If volatility changes by 1%, how much will delta change?
-        """
-        V = self.V
-        S = self.S
-        t = self.t
-        v = self.IV
-        d1 = self.__d1(S, t, v)
-
-        return round((V / S) * (1 - (d1 / (v * m.sqrt(t)))), 4)
-
-    # Second order greek
-    def __BSMcharm(self):
-        """
-        First derivative of delta with respect to time.
-
-        - How much different will delta be tomorrow if everything else stays the same?
-        - Also can think of it as 'delta decay'
-        """
-        S = self.S
-        t = self.t
-        r = self.r
-        v = self.IV
-        pv = m.exp(-self.q * t)
-        phid1 = self.__phi(self.__d1(S, t, v))
-        d2 = self.__d2(S, t, v)
-        mess = (2 * (r - self.q) * t - d2 * v * m.sqrt(t)) / (2 * t * v * m.sqrt(t))
-
-        if self.opt_type == "call":
-            q = self.q
-            Nd1 = self.__N(self.__d1(S, t, v))
-
-        elif self.opt_type == "put":
-            q = -self.q
-            Nd1 = self.__N(-self.__d1(S, t, v))
-
-        return round((q * pv * Nd1 - pv * phid1 * mess) / 365, 4)
-
-    # Second order greek
-    def __BSMvomma(self):
-        """
-        First derivative of vega with respect to implied volatility.
-        Also the second derivative of the option price (V) with respect to
-        implied volatility.
-
-        - If IV changes by 1%, how will vega change?
-        """
-        S = self.S
-        t = self.t
-        vega = self.vega
-        v = self.IV
-        d1 = self.__d1(S, t, v)
-        d2 = self.__d2(S, t, v)
-
-        return round((vega * d1 * d2) / v, 4)
-
-    # Second order greek
-    def __BSMveta(self):
-        """
-        First derivative of vega with respect to time (t).
-
-        - How much different will vega be tomorrow if everything else stays the same?
-        """
-        S = self.S
-        t = self.t
-        v = self.IV
-        pvS = self.__pvS(
-            S,
-            t,
+        g = bs_greeks(
+            self.S, self.K, self.t, self.IV, self.r, self.q, self.opt_type == "call"
         )
-        d1 = self.__d1(S, t, v)
-        d2 = self.__d2(S, t, v)
-        phid1 = self.__phi(d1)
-        r = self.r
-        q = self.q
-        mess1 = ((r - q) * d1) / (v * m.sqrt(t))
-        mess2 = (1 + d1 * d2) / (2 * t)
-
-        return round((-pvS * phid1 * m.sqrt(t) * (q + mess1 - mess2)) / (100 * 365), 4)
-
-    # Third order greek
-    def __BSMspeed(self):
-        """
-        First derivative of gamma with respect to the underlying price (S).
-
-        - If S increases by $1, how will gamma change?
-        """
-        gamma = self.gamma
-        S = self.S
-        v = self.IV
-        t = self.t
-        d1 = self.__d1(S, t, v)
-
-        return round(-(gamma / S) * ((d1 / (v * m.sqrt(t))) + 1), 4)
-
-    # Third order greek
-    def __BSMzomma(self):
-        """
-        First derivative of gamma with respect to implied volatility.
-
-        - If volatility changes by 1%, how will gamma change?
-        """
-        gamma = self.gamma
-        S = self.S
-        t = self.t
-        v = self.IV
-        d1 = self.__d1(S, t, v)
-        d2 = self.__d2(S, t, v)
-
-        return round(gamma * ((d1 * d2 - 1) / v), 4)
-
-    # Third order greek
-    def __BSMcolor(self):
-        """
-        First derivative of gamma with respect to time.
-
-        - How much different will gamma be tomorrow if everything else stays the same?
-        """
-        S = self.S
-        t = self.t
-        r = self.r
-        v = self.IV
-        q = self.q
-        pv = m.exp(-q * t)
-        d1 = self.__d1(S, t, v)
-        d2 = self.__d2(S, t, v)
-        phid1 = self.__phi(d1)
-        mess = ((2 * (r - q) * t - d2 * v * m.sqrt(t)) / (v * m.sqrt(t))) * d1
-
-        return round(
-            (-pv * (phid1 / (2 * S * t * v * m.sqrt(t))) * (2 * q * t + 1 + mess))
-            / 365,
-            4,
-        )
-
-    # Third order greek
-    def __BSMultima(self):
-        """
-        First derivative of vomma with respect to volatility.
-
-        - ...why? At this point it just seems like an exercise in calculus.
-        """
-        vega = self.vega
-        S = self.S
-        t = self.t
-        v = self.IV
-        d1 = self.__d1(S, t, v)
-        d2 = self.__d2(S, t, v)
-
-        return round((-vega / (v**2)) * (d1 * d2 * (1 - d1 * d2) + d1**2 + d2**2), 4)
+        self.delta = round(float(g["delta"]), 4)
+        self.gamma = round(float(g["gamma"]), 4)
+        self.theta = round(float(g["theta"]) / 365, 4)
+        self.rho = round(float(g["rho"]) / 100, 4)
+        self.Lambda = round(self.delta * (self.S / self.V), 4)
+        self.vanna = round(float(g["vanna"]) / 100, 4)
+        self.charm = round(float(g["charm"]) / 365, 4)
+        self.vomma = round(float(g["vomma"]) / 100, 4)
+        self.veta = round(float(g["veta"]) / (100 * 365), 4)
+        self.speed = round(float(g["speed"]), 4)
+        self.zomma = round(float(g["zomma"]), 4)
+        self.color = round(float(g["color"]) / 365, 4)
+        self.ultima = round(float(g["ultima"]) / 100, 4)
 
     def theoPrice(self, date, S, v):
         """
@@ -1033,6 +655,61 @@ def single_option_input():
     return current_date, current_time, opt_type, exp, V, S, K, r
 
 
+def build_option_chain(
+    chain, opt_type, current_date, current_time, exp, S, r, price_type
+):
+    """
+    Option objects for every contract of one side of a Yahoo! option chain.
+    Implied volatilities of all contracts are solved in a single vectorised call.
+    """
+    # Get mid or last price
+    if price_type == "mid":
+        prices = [
+            max(round((bid + ask) / 2, 2), 0.01)
+            for bid, ask in zip(chain["bid"], chain["ask"])
+        ]
+
+    else:
+        prices = [max(last, 0.01) for last in chain["lastPrice"]]
+
+    ivs, _ = implied_volatility(
+        np.round(prices, 2),
+        round(S, 2),
+        chain["strike"].round(2).to_numpy(),
+        time_to_expiry(current_date, current_time, exp),
+        r,
+        0,
+        opt_type == "call",
+    )
+
+    return [
+        Option(
+            current_date,
+            current_time,
+            opt_type,
+            exp,
+            V,
+            S,
+            K,
+            r,
+            volume,
+            openInterest,
+            bid,
+            ask,
+            IV=iv,
+        )
+        for V, K, volume, openInterest, bid, ask, iv in zip(
+            prices,
+            chain["strike"],
+            chain["volume"],
+            chain["openInterest"],
+            chain["bid"],
+            chain["ask"],
+            np.atleast_1d(ivs),
+        )
+    ]
+
+
 def get_options(current_date, current_time, ticker, opt_type, price_type, r):
     """
     See the "Option" class for an explanation of the inputs.
@@ -1077,79 +754,13 @@ def get_options(current_date, current_time, ticker, opt_type, price_type, r):
         # Delete the original combined chain to save memory
         del option_chain
 
-        # Make a temporary list to hold the option objects
-        single_call_chain = []
-        single_put_chain = []
-
-        # Loop through call strikes and create option objects for each contract
-        for i in range(len(calls)):
-            # Get parameters
-            K = calls["strike"].iloc[i]
-            volume = calls["volume"].iloc[i]
-            openInterest = calls["openInterest"].iloc[i]
-            bid = calls["bid"].iloc[i]
-            ask = calls["ask"].iloc[i]
-            last = calls["lastPrice"].iloc[i]
-
-            # Get mid or last price
-            if price_type == "mid":
-                V = max(round((bid + ask) / 2, 2), 0.01)
-
-            else:
-                V = max(last, 0.01)
-
-            # Create and add the call object to the temp list
-            single_call_chain.append(
-                Option(
-                    current_date,
-                    current_time,
-                    "call",
-                    corrected_exp,
-                    V,
-                    S,
-                    K,
-                    r,
-                    volume,
-                    openInterest,
-                    bid,
-                    ask,
-                )
-            )
-
-        # Loop through put strikes and create option objects for each contract
-        for i in range(len(puts)):
-            # Get parameters
-            K = puts["strike"].iloc[i]
-            volume = puts["volume"].iloc[i]
-            openInterest = puts["openInterest"].iloc[i]
-            bid = puts["bid"].iloc[i]
-            ask = puts["ask"].iloc[i]
-            last = puts["lastPrice"].iloc[i]
-
-            # Get mid or last price
-            if price_type == "mid":
-                V = max(round((bid + ask) / 2, 2), 0.01)
-
-            else:
-                V = max(last, 0.01)
-
-            # Create and add the call object to the temp list
-            single_put_chain.append(
-                Option(
-                    current_date,
-                    current_time,
-                    "put",
-                    corrected_exp,
-                    V,
-                    S,
-                    K,
-                    r,
-                    volume,
-                    openInterest,
-                    bid,
-                    ask,
-                )
-            )
+        # Create option objects for each contract, solving the IVs of each side at once
+        single_call_chain = build_option_chain(
+            calls, "call", current_date, current_time, corrected_exp, S, r, price_type
+        )
+        single_put_chain = build_option_chain(
+            puts, "put", current_date, current_time, corrected_exp, S, r, price_type
+        )
 
         # Add the call and put temp lists to the dictionary
         # Indexed by expiration date
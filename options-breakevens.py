@@ -21,18 +21,15 @@ class OptionsCalculator:
         result = self.option_payoff(positions, price_range)
         payoff = result["payoff_dollars"]
 
-        breakevens = []
-        for i in range(len(payoff) - 1):
-            if (payoff[i] >= 0 and payoff[i + 1] < 0) or (
-                payoff[i] <= 0 and payoff[i + 1] > 0
-            ):
-                # Linear interpolation to find more precise breakeven
-                p1, p2 = price_range[i], price_range[i + 1]
-                v1, v2 = payoff[i], payoff[i + 1]
-                breakeven = p1 + (p2 - p1) * (-v1) / (v2 - v1)
-                breakevens.append(round(breakeven, 2))
-
-        return sorted(breakevens)
+        v1, v2 = payoff[:-1], payoff[1:]
+        crossing = ((v1 >= 0) & (v2 < 0)) | ((v1 <= 0) & (v2 > 0))
+
+        # Linear interpolation to find more precise breakeven
+        p1, p2 = price_range[:-1][crossing], price_range[1:][crossing]
+        v1, v2 = v1[crossing], v2[crossing]
+        breakevens = p1 + (p2 - p1) * (-v1) / (v2 - v1)
+
+        return sorted(round(float(breakeven), 2) for breakeven in breakevens)
 
     def option_payoff(self, positions, price_range=None):
         """
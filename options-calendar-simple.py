@@ -205,143 +205,148 @@ def main(args):
         db.setup_trades_table()
         quote_dates = db.get_quote_dates(args.start_date, args.end_date)
 
-        for quote_date in quote_dates:
-            logging.info(f"Processing {quote_date}")
-
-            update_open_trades(db, quote_date)
+        with db.batched_writes():
+            for quote_date in quote_dates:
+                logging.info(f"Processing {quote_date}")
+
+                update_open_trades(db, quote_date)
+
+                # Check if maximum number of open trades has been reached
+                open_trades = db.get_open_trades()
+                if len(open_trades) >= args.max_open_trades:
+                    logging.debug(
+                        f"Maximum number of open trades ({args.max_open_trades}) reached. Skipping new trade creation."
+                    )
+                    continue
+
+                expiry_front_dte, front_dte_found = db.get_next_expiry_by_dte(
+                    quote_date, front_dte
+                )
+                expiry_back_dte, back_dte_found = db.get_next_expiry_by_dte(
+                    quote_date, back_dte
+                )
+                if not expiry_front_dte or not expiry_back_dte:
+                    logging.warning(
+                        f"⚠️ Unable to find front {front_dte} or back {back_dte} expiry. {expiry_front_dte=}, {expiry_back_dte=} "
+                    )
+                    continue
+
+                logging.info(
+                    f"Quote date: {quote_date} -> {expiry_front_dte=} ({front_dte_found=:.1f}), "
+                    f"{expiry_back_dte=} ({back_dte_found=:.1f})"
+                )
+                front_call_df, front_put_df = db.get_options_by_delta(
+                    quote_date, expiry_front_dte
+                )
+                back_call_df, back_put_df = db.get_options_by_delta(
+                    quote_date, expiry_back_dte
+                )
 
-            # Check if maximum number of open trades has been reached
-            open_trades = db.get_open_trades()
-            if len(open_trades) >= args.max_open_trades:
+                # Only look at PUTs For now. We are only looking at Calendar PUT Spread
+                logging.debug("Front Option")
                 logging.debug(
-                    f"Maximum number of open trades ({args.max_open_trades}) reached. Skipping new trade creation."
+                    f"=> PUT OPTION: \n {front_put_df.to_string(index=False)}"
                 )
-                continue
 
-            expiry_front_dte, front_dte_found = db.get_next_expiry_by_dte(
-                quote_date, front_dte
-            )
-            expiry_back_dte, back_dte_found = db.get_next_expiry_by_dte(
-                quote_date, back_dte
-            )
-            if not expiry_front_dte or not expiry_back_dte:
-                logging.warning(
-                    f"⚠️ Unable to find front {front_dte} or back {back_dte} expiry. {expiry_front_dte=}, {expiry_back_dte=} "
+                logging.debug("Back Option")
+                logging.debug(f"=> PUT OPTION: \n {back_put_df.to_string(index=False)}")
+
+                if front_put_df.empty or back_put_df.empty:
+                    logging.warning(
+                        "⚠️ One or more options are not valid. Re-run with debug to see options found for selected DTEs"
+                    )
+                    continue
+
+                front_underlying_price = front_call_df["UNDERLYING_LAST"].iloc[0]
+                front_strike_price = front_call_df["CALL_STRIKE"].iloc[0]
+                front_call_price = front_call_df["CALL_C_LAST"].iloc[0]
+                front_put_price = front_put_df["PUT_P_LAST"].iloc[0]
+
+                # Extract Put Option Greeks
+                front_put_delta = front_put_df["PUT_P_DELTA"].iloc[0]
+                front_put_gamma = front_put_df["PUT_P_GAMMA"].iloc[0]
+                front_put_vega = front_put_df["PUT_P_VEGA"].iloc[0]
+                front_put_theta = front_put_df["PUT_P_THETA"].iloc[0]
+                front_put_iv = front_put_df["PUT_P_IV"].iloc[0]
+
+                back_underlying_price = back_call_df["UNDERLYING_LAST"].iloc[0]
+                back_strike_price = back_call_df["CALL_STRIKE"].iloc[0]
+                back_call_price = back_call_df["CALL_C_LAST"].iloc[0]
+                back_put_price = back_put_df["PUT_P_LAST"].iloc[0]
+
+                # Extract Put Option Greeks
+                back_put_delta = back_put_df["PUT_P_DELTA"].iloc[0]
+                back_put_gamma = back_put_df["PUT_P_GAMMA"].iloc[0]
+                back_put_vega = back_put_df["PUT_P_VEGA"].iloc[0]
+                back_put_theta = back_put_df["PUT_P_THETA"].iloc[0]
+                back_put_iv = back_put_df["PUT_P_IV"].iloc[0]
+
+                if (
+                    front_call_price is None
+                    or front_put_price is None
+                    or back_call_price is None
+                    or back_put_price is None
+                ):
+                    logging.warning(
+                        f"⚠️ Bad data found on {quote_date}. One of {front_call_price}, {front_put_price}, {back_call_price}, {back_put_price} is not valid."
+                    )
+                    continue
+
+                logging.info(
+                    f"Front Contract (Expiry {expiry_front_dte}): Underlying Price={front_underlying_price:.2f}, Strike Price={front_strike_price:.2f}, Call Price={front_call_price:.2f}, Put Price={front_put_price:.2f}"
                 )
-                continue
-
-            logging.info(
-                f"Quote date: {quote_date} -> {expiry_front_dte=} ({front_dte_found=:.1f}), "
-                f"{expiry_back_dte=} ({back_dte_found=:.1f})"
-            )
-            front_call_df, front_put_df = db.get_options_by_delta(
-                quote_date, expiry_front_dte
-            )
-            back_call_df, back_put_df = db.get_options_by_delta(
-                quote_date, expiry_back_dte
-            )
-
-            # Only look at PUTs For now. We are only looking at Calendar PUT Spread
-            logging.debug("Front Option")
-            logging.debug(f"=> PUT OPTION: \n {front_put_df.to_string(index=False)}")
-
-            logging.debug("Back Option")
-            logging.debug(f"=> PUT OPTION: \n {back_put_df.to_string(index=False)}")
-
-            if front_put_df.empty or back_put_df.empty:
-                logging.warning(
-                    "⚠️ One or more options are not valid. Re-run with debug to see options found for selected DTEs"
+                logging.info(
+                    f"Back Contract (Expiry {expiry_back_dte}): Underlying Price={back_underlying_price:.2f}, Strike Price={back_strike_price:.2f}, Call Price={back_call_price:.2f}, Put Price={back_put_price:.2f}"
                 )
-                continue
 
-            front_underlying_price = front_call_df["UNDERLYING_LAST"].iloc[0]
-            front_strike_price = front_call_df["CALL_STRIKE"].iloc[0]
-            front_call_price = front_call_df["CALL_C_LAST"].iloc[0]
-            front_put_price = front_put_df["PUT_P_LAST"].iloc[0]
-
-            # Extract Put Option Greeks
-            front_put_delta = front_put_df["PUT_P_DELTA"].iloc[0]
-            front_put_gamma = front_put_df["PUT_P_GAMMA"].iloc[0]
-            front_put_vega = front_put_df["PUT_P_VEGA"].iloc[0]
-            front_put_theta = front_put_df["PUT_P_THETA"].iloc[0]
-            front_put_iv = front_put_df["PUT_P_IV"].iloc[0]
-
-            back_underlying_price = back_call_df["UNDERLYING_LAST"].iloc[0]
-            back_strike_price = back_call_df["CALL_STRIKE"].iloc[0]
-            back_call_price = back_call_df["CALL_C_LAST"].iloc[0]
-            back_put_price = back_put_df["PUT_P_LAST"].iloc[0]
-
-            # Extract Put Option Greeks
-            back_put_delta = back_put_df["PUT_P_DELTA"].iloc[0]
-            back_put_gamma = back_put_df["PUT_P_GAMMA"].iloc[0]
-            back_put_vega = back_put_df["PUT_P_VEGA"].iloc[0]
-            back_put_theta = back_put_df["PUT_P_THETA"].iloc[0]
-            back_put_iv = back_put_df["PUT_P_IV"].iloc[0]
-
-            if (
-                front_call_price is None
-                or front_put_price is None
-                or back_call_price is None
-                or back_put_price is None
-            ):
-                logging.warning(
-                    f"⚠️ Bad data found on {quote_date}. One of {front_call_price}, {front_put_price}, {back_call_price}, {back_put_price} is not valid."
+                # create a multi leg trade in database
+                trade_legs = [
+                    Leg(
+                        leg_quote_date=quote_date,
+                        leg_expiry_date=expiry_front_dte,
+                        leg_type=LegType.TRADE_OPEN,
+                        position_type=PositionType.SHORT,
+                        contract_type=ContractType.PUT,
+                        strike_price=front_strike_price,
+                        underlying_price_open=front_underlying_price,
+                        premium_open=front_put_price,
+                        premium_current=0,
+                        delta=front_put_delta,
+                        gamma=front_put_gamma,
+                        vega=front_put_vega,
+                        theta=front_put_theta,
+                        iv=front_put_iv,
+                    ),
+                    Leg(
+                        leg_quote_date=quote_date,
+                        leg_expiry_date=expiry_back_dte,
+                        leg_type=LegType.TRADE_OPEN,
+                        position_type=PositionType.LONG,
+                        contract_type=ContractType.PUT,
+                        strike_price=back_strike_price,
+                        underlying_price_open=back_underlying_price,
+                        premium_open=back_put_price,
+                        premium_current=0,
+                        delta=back_put_delta,
+                        gamma=back_put_gamma,
+                        vega=back_put_vega,
+                        theta=back_put_theta,
+                        iv=back_put_iv,
+                    ),
+                ]
+                premium_captured_calculated = sum(
+                    leg.premium_open for leg in trade_legs
                 )
-                continue
-
-            logging.info(
-                f"Front Contract (Expiry {expiry_front_dte}): Underlying Price={front_underlying_price:.2f}, Strike Price={front_strike_price:.2f}, Call Price={front_call_price:.2f}, Put Price={front_put_price:.2f}"
-            )
-            logging.info(
-                f"Back Contract (Expiry {expiry_back_dte}): Underlying Price={back_underlying_price:.2f}, Strike Price={back_strike_price:.2f}, Call Price={back_call_price:.2f}, Put Price={back_put_price:.2f}"
-            )
-
-            # create a multi leg trade in database
-            trade_legs = [
-                Leg(
-                    leg_quote_date=quote_date,
-                    leg_expiry_date=expiry_front_dte,
-                    leg_type=LegType.TRADE_OPEN,
-                    position_type=PositionType.SHORT,
-                    contract_type=ContractType.PUT,
-                    strike_price=front_strike_price,
-                    underlying_price_open=front_underlying_price,
-                    premium_open=front_put_price,
-                    premium_current=0,
-                    delta=front_put_delta,
-                    gamma=front_put_gamma,
-                    vega=front_put_vega,
-                    theta=front_put_theta,
-                    iv=front_put_iv,
-                ),
-                Leg(
-                    leg_quote_date=quote_date,
-                    leg_expiry_date=expiry_back_dte,
-                    leg_type=LegType.TRADE_OPEN,
-                    position_type=PositionType.LONG,
-                    contract_type=ContractType.PUT,
-                    strike_price=back_strike_price,
-                    underlying_price_open=back_underlying_price,
-                    premium_open=back_put_price,
-                    premium_current=0,
-                    delta=back_put_delta,
-                    gamma=back_put_gamma,
-                    vega=back_put_vega,
-                    theta=back_put_theta,
-                    iv=back_put_iv,
-                ),
-            ]
-            premium_captured_calculated = sum(leg.premium_open for leg in trade_legs)
-            trade = Trade(
-                trade_date=quote_date,
-                expire_date=expiry_front_dte,
-                dte=front_dte,
-                status="OPEN",
-                premium_captured=premium_captured_calculated,
-                legs=trade_legs,
-            )
-            trade_id = db.create_trade_with_multiple_legs(trade)
-            logging.info(f"Trade {trade_id} created in database")
+                trade = Trade(
+                    trade_date=quote_date,
+                    expire_date=expiry_front_dte,
+                    dte=front_dte,
+                    status="OPEN",
+                    premium_captured=premium_captured_calculated,
+                    legs=trade_legs,
+                )
+                trade_id = db.create_trade_with_multiple_legs(trade)
+                logging.info(f"Trade {trade_id} created in database")
 
     finally:
         db.disconnect()
@@ -0,0 +1,111 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "pandas",
+# ]
+# ///
+"""
+Options Database Indexes
+
+Create the options_data indexes used by the backtests and audit the query plans of
+every query OptionsDatabase issues. Plans that scan a table or build a temporary
+B-tree for sorting/grouping are flagged.
+
+Usage:
+./options-db-indexes.py -h
+
+./options-db-indexes.py --db-path path/to/database.db create # Create missing indexes
+./options-db-indexes.py --db-path path/to/database.db explain # Show query plans
+./options-db-indexes.py --db-path path/to/database.db explain --quote-date 2020-03-16 --dte 45
+./options-db-indexes.py --db-path path/to/database.db --table-tag 14_30 explain # Calendar trade tables
+"""
+
+from argparse import ArgumentParser, RawDescriptionHelpFormatter
+
+import pandas as pd
+
+from common.logger import setup_logging
+from common.options_analysis import OptionsDatabase
+
+pd.set_option("display.max_colwidth", 120)
+pd.set_option("display.width", 250)
+
+
+def create_indexes(args):
+    with OptionsDatabase(args.db_path, args.table_tag) as db:
+        db.create_indexes()
+        db.cursor.execute("ANALYZE")
+    print(f"Indexes created and statistics refreshed for {args.db_path}")
+
+
+def explain(args):
+    db = OptionsDatabase(args.db_path, args.table_tag)
+    db.connect(read_only=True)
+    try:
+        plans = db.explain_queries(args.quote_date, args.dte)
+    finally:
+        db.disconnect()
+
+    for (method, statement), steps in plans.groupby(
+        ["Method", "Statement"], sort=False
+    ):
+        print(f"\n[{method}] {statement}")
+        for _, step in steps.iterrows():
+            marker = "  !! " if step["Flags"] else "     "
+            print(f"{marker}{step['Plan']}")
+
+    flagged = plans.loc[plans["Flags"] != ""]
+    print(
+        f"\n{plans['Statement'].nunique()} statements checked, "
+        f"{flagged['Statement'].nunique()} with scans or temp B-trees"
+    )
+
+
+def parse_args():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        dest="verbose",
+        help="Increase verbosity of logging output",
+    )
+    parser.add_argument(
+        "--db-path",
+        required=True,
+        help="Path to the SQLite database file",
+    )
+    parser.add_argument(
+        "--table-tag",
+        default="30",
+        help="Suffix of the trade tables to check, e.g. 30 or 14_30",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = subparsers.add_parser("create", help="Create missing indexes")
+    create_parser.set_defaults(func=create_indexes)
+
+    explain_parser = subparsers.add_parser(
+        "explain", help="Run EXPLAIN QUERY PLAN over every OptionsDatabase query"
+    )
+    explain_parser.add_argument(
+        "--quote-date",
+        help="Quote date used to bind the sample queries. Defaults to the middle date",
+    )
+    explain_parser.add_argument(
+        "--dte",
+        type=int,
+        default=30,
+        help="DTE used to pick the sample expiry",
+    )
+    explain_parser.set_defaults(func=explain)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging(args.verbose)
+    args.func(args)
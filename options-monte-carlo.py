@@ -0,0 +1,350 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "pandas",
+#   "numpy",
+#   "scipy",
+#   "pyyaml",
+#   "yfinance",
+#   "matplotlib",
+# ]
+# ///
+"""
+Monte Carlo P&L for multi-leg option positions
+
+Simulates price paths of the underlying, reprices every leg with Black-Scholes at the
+horizon and reports the P&L distribution, probability of profit, value at risk,
+expected shortfall and the probability of touching each strike before the horizon.
+Legs that expire before the horizon settle at intrinsic on their own expiry day.
+
+Takes the same YAML trade files as options_payoff.py and options-breakevens.py.
+Legs can also set days_to_expiry and iv (decimal), and the file can set them for
+all legs at the top level. Command line values are used when neither is set.
+
+Example Trade File:
+spot_price: 100
+multiplier: 100
+days_to_expiry: 30
+iv: 0.2
+
+initial_position:
+  - strike_price: 95
+    premium: 1.5
+    contract_type: put
+    position: short
+  - strike_price: 105
+    premium: 1.5
+    contract_type: call
+    position: short
+    iv: 0.18
+
+Path models:
+- gbm: geometric Brownian motion at --vol (defaults to the average leg IV)
+- jump: GBM plus Merton jumps (--jump-intensity per year, --jump-mean, --jump-std)
+- bootstrap: daily log returns of --symbol resampled in blocks of --block-size days
+
+Usage:
+./options-monte-carlo.py -h
+
+./options-monte-carlo.py trade.yaml
+./options-monte-carlo.py trade.yaml --horizon 10 --paths 200000
+./options-monte-carlo.py trade.yaml --model jump --jump-intensity 3 --jump-mean -0.03 --jump-std 0.02
+./options-monte-carlo.py trade.yaml --model bootstrap --symbol SPY --years 10 --block-size 5
+./options-monte-carlo.py trade.yaml --include-adjustments --plot
+"""
+
+import logging
+import time
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import yaml
+import yfinance as yf
+
+from common import RawTextWithDefaultsFormatter
+from common.black_scholes import bs_price
+from common.logger import setup_logging
+from common.price_paths import (
+    CALENDAR_DAYS,
+    TRADING_DAYS,
+    bootstrap_log_returns,
+    gbm_log_returns,
+    pnl_summary,
+    price_paths,
+    touch_probabilities,
+)
+
+pd.options.display.float_format = "{:,.4f}".format
+
+
+def parse_args():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=RawTextWithDefaultsFormatter
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        dest="verbose",
+        help="Increase verbosity of logging output",
+    )
+    parser.add_argument("strategy_file", help="YAML file containing the positions")
+    parser.add_argument(
+        "--include-adjustments",
+        action="store_true",
+        help="Add the legs of every adjustment to the initial position",
+    )
+    parser.add_argument(
+        "--dte",
+        type=float,
+        default=30,
+        help="Days to expiry of legs without days_to_expiry",
+    )
+    parser.add_argument(
+        "--iv",
+        type=float,
+        default=0.2,
+        help="Implied volatility (decimal) of legs without iv",
+    )
+    parser.add_argument(
+        "--horizon",
+        type=float,
+        help="Calendar days to simulate, defaults to the first expiry",
+    )
+    parser.add_argument(
+        "--model",
+        choices=["gbm", "jump", "bootstrap"],
+        default="gbm",
+        help="Price path model",
+    )
+    parser.add_argument(
+        "--paths", type=int, default=100_000, help="Number of simulated paths"
+    )
+    parser.add_argument(
+        "--vol",
+        type=float,
+        help="Annual volatility of the paths, defaults to the average leg IV",
+    )
+    parser.add_argument(
+        "--drift", type=float, default=0.0, help="Annual drift of the paths"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=0.0, help="Risk-free rate used for repricing"
+    )
+    parser.add_argument(
+        "--jump-intensity", type=float, default=2.0, help="Jumps per year"
+    )
+    parser.add_argument(
+        "--jump-mean", type=float, default=-0.03, help="Mean log size of a jump"
+    )
+    parser.add_argument(
+        "--jump-std", type=float, default=0.03, help="Std dev of the log jump size"
+    )
+    parser.add_argument(
+        "--symbol", default="SPY", help="Underlying history used by bootstrap"
+    )
+    parser.add_argument(
+        "--years", type=int, default=10, help="Years of history used by bootstrap"
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=5,
+        help="Consecutive days drawn together by bootstrap",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Tail probability for value at risk and expected shortfall",
+    )
+    parser.add_argument(
+        "--touch-levels",
+        type=float,
+        nargs="+",
+        help="Prices to report touch probabilities for, defaults to the strikes",
+    )
+    parser.add_argument("--seed", type=int, help="Random seed")
+    parser.add_argument("--plot", action="store_true", help="Plot the P&L distribution")
+    return parser.parse_args()
+
+
+def first_set(*values):
+    return next(value for value in values if value is not None)
+
+
+def load_legs(config, include_adjustments, default_dte, default_iv):
+    contracts = list(config["initial_position"])
+    if include_adjustments:
+        for adjustment in config.get("adjustments") or []:
+            contracts.extend(adjustment["options"])
+
+    legs = pd.DataFrame(
+        {
+            "Strike": float(contract["strike_price"]),
+            "Premium": float(contract["premium"]),
+            "IsCall": contract["contract_type"].lower() == "call",
+            "Side": 1 if contract["position"].lower() == "long" else -1,
+            "DTE": float(
+                first_set(
+                    contract.get("days_to_expiry"),
+                    config.get("days_to_expiry"),
+                    default_dte,
+                )
+            ),
+            "IV": float(first_set(contract.get("iv"), config.get("iv"), default_iv)),
+        }
+        for contract in contracts
+    )
+    return legs
+
+
+def expiry_steps(legs, horizon_days, steps):
+    """Path step of each leg's expiry, or the last step for legs alive at the horizon"""
+    if horizon_days <= 0:
+        return np.full(len(legs), steps)
+    elapsed = np.minimum(legs["DTE"].to_numpy(), horizon_days) / horizon_days
+    return np.clip(np.round(elapsed * steps).astype(int), 0, steps)
+
+
+def leg_values(legs, paths, horizon_days, rate):
+    """
+    (paths x legs) Black-Scholes values at the horizon. Legs that expire before it
+    are settled at intrinsic on the spot of their own expiry day.
+    """
+    spots = paths[:, expiry_steps(legs, horizon_days, paths.shape[1] - 1)]
+    remaining = np.maximum(legs["DTE"].to_numpy() - horizon_days, 0) / CALENDAR_DAYS
+    return bs_price(
+        spots,
+        legs["Strike"].to_numpy(),
+        remaining,
+        legs["IV"].to_numpy(),
+        rate,
+        0.0,
+        legs["IsCall"].to_numpy(),
+    )
+
+
+def position_pnl(legs, paths, horizon_days, rate, multiplier):
+    values = leg_values(legs, paths, horizon_days, rate)
+    per_leg = (values - legs["Premium"].to_numpy()) * legs["Side"].to_numpy()
+    return per_leg.sum(axis=1) * multiplier
+
+
+def historical_log_returns(symbol, years):
+    end = datetime.now()
+    start = end - timedelta(days=int(years * CALENDAR_DAYS))
+    closes = yf.download(symbol, start=start, end=end, auto_adjust=True)["Close"]
+    closes = closes.squeeze().dropna()
+    logging.info(f"Loaded {len(closes)} daily closes of {symbol}")
+    return np.diff(np.log(closes.to_numpy()))
+
+
+def simulate_paths(args, spot, vol, horizon_days, rng):
+    if args.model == "bootstrap":
+        steps = max(1, round(horizon_days * TRADING_DAYS / CALENDAR_DAYS))
+        log_returns = bootstrap_log_returns(
+            historical_log_returns(args.symbol, args.years),
+            args.paths,
+            steps,
+            args.block_size,
+            rng,
+        )
+    else:
+        steps = max(1, int(np.ceil(horizon_days)))
+        log_returns = gbm_log_returns(
+            args.paths,
+            steps,
+            horizon_days / steps / CALENDAR_DAYS,
+            vol,
+            args.drift,
+            args.jump_intensity if args.model == "jump" else 0.0,
+            args.jump_mean,
+            args.jump_std,
+            rng,
+        )
+    return price_paths(spot, log_returns)
+
+
+def plot_distribution(pnl, summary, alpha):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.hist(pnl, bins=200, color="steelblue", alpha=0.8)
+    ax.axvline(0, color="black", lw=1)
+    ax.axvline(summary["Mean"], color="green", linestyle="--", label="Mean")
+    ax.axvline(
+        -summary[f"VaR{alpha:.0%}"],
+        color="orange",
+        linestyle="--",
+        label=f"VaR {alpha:.0%}",
+    )
+    ax.axvline(
+        -summary[f"ES{alpha:.0%}"],
+        color="red",
+        linestyle="--",
+        label=f"Expected Shortfall {alpha:.0%}",
+    )
+    ax.set_title(
+        f"P&L Distribution ({summary['Paths']:,} paths, "
+        f"P(profit) {summary['ProbProfit']:.1%})"
+    )
+    ax.set_xlabel("P&L ($)")
+    ax.set_ylabel("Paths")
+    ax.legend()
+    plt.tight_layout()
+    plt.show()
+
+
+def main(args):
+    with open(args.strategy_file) as file:
+        config = yaml.safe_load(file)
+
+    spot = float(config["spot_price"])
+    multiplier = float(config.get("multiplier", 100))
+    legs = load_legs(config, args.include_adjustments, args.dte, args.iv)
+    horizon_days = args.horizon if args.horizon is not None else legs["DTE"].min()
+    vol = args.vol if args.vol is not None else float(legs["IV"].mean())
+    print(legs.to_string(index=False))
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(args.seed)
+    paths = simulate_paths(args, spot, vol, horizon_days, rng)
+    simulated = time.perf_counter()
+    pnl = position_pnl(legs, paths, horizon_days, args.rate, multiplier)
+    summary = pnl_summary(pnl, args.alpha)
+    touches = touch_probabilities(
+        paths, args.touch_levels or sorted(legs["Strike"].unique())
+    )
+    finished = time.perf_counter()
+
+    print(
+        f"\n{args.model} paths over {horizon_days:g} days at {vol:.1%} vol, "
+        f"{paths.shape[1] - 1} steps"
+    )
+    print(pd.Series(summary).to_string())
+    print("\nTouch probabilities:")
+    print(
+        pd.DataFrame(
+            {
+                "Level": list(touches),
+                "PctFromSpot": [(level / spot - 1) * 100 for level in touches],
+                "ProbTouch": list(touches.values()),
+            }
+        ).to_string(index=False)
+    )
+    print(
+        f"\nSimulated in {simulated - started:.2f}s, "
+        f"repriced {len(legs)} legs in {finished - simulated:.2f}s"
+    )
+
+    if args.plot:
+        plot_distribution(pnl, summary, args.alpha)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging(args.verbose)
+    main(args)
@@ -2,6 +2,8 @@
 # /// script
 # dependencies = [
 #   "pandas",
+#   "numpy",
+#   "scipy",
 #   "plotly",
 # ]
 # ///
@@ -20,6 +22,11 @@ options chain snapshots. It generates four types of interactive Plotly charts:
 The tool filters options data by expiration window, excludes specified dates, and
 focuses on delta ranges between 0.10-0.50 for visualization clarity.
 
+Delta levels are read from an SVI slice fitted to every expiry of a snapshot, so
+they sit exactly on 15Δ/25Δ/50Δ instead of the nearest listed strike, and premiums
+are priced at that strike and IV. Fits are cached in the svi_params table of the
+same database by symbol and quote date.
+
 Usage:
 ./options-price-plot.py -h
 
@@ -42,16 +49,23 @@ Usage:
 import logging
 import sqlite3
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from common.black_scholes import bs_price
 from common.logger import setup_logging
+from common.vol_surface import cached_svi_surface, otm_quotes
+
+# Floor on time to expiry so same day expiries can still be fitted
+MIN_EXPIRY_YEARS = 1 / (365 * 24)
 
 
 def parse_args():
@@ -185,6 +199,76 @@ def load_database(db_path: Path, symbol: str) -> dict[str, pd.DataFrame]:
         raise
 
 
+def svi_quotes(df: pd.DataFrame) -> pd.DataFrame:
+    """Out of the money quotes of every expiry in a snapshot, forward at spot"""
+    quote_date = pd.to_datetime(df["QuoteDate"].iloc[0])
+    spot_price = float(df["SpotPrice"].iloc[0])
+    frames = []
+    for expiration_date, group in df.groupby(pd.to_datetime(df["ExpirationDate"])):
+        years = max(
+            (expiration_date - quote_date).total_seconds() / (365 * 24 * 60 * 60),
+            MIN_EXPIRY_YEARS,
+        )
+        strikes, ivs = otm_quotes(group, "StrikePrice", "CallIV", "PutIV", spot_price)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Expiration": str(expiration_date),
+                    "Years": years,
+                    "Forward": spot_price,
+                    "Strike": strikes,
+                    "IV": ivs,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def fit_svi_surfaces(db_path: Path, symbol: str, dataframes: dict[str, pd.DataFrame]):
+    surfaces = {}
+    with closing(sqlite3.connect(db_path)) as conn:
+        for table_name, df in dataframes.items():
+            surfaces[table_name] = cached_svi_surface(
+                conn,
+                symbol,
+                pd.to_datetime(df["QuoteDate"].iloc[0]),
+                lambda df=df: svi_quotes(df),
+            )
+    return surfaces
+
+
+def delta_level_quotes(surface, expirations, spot_price: float) -> pd.DataFrame:
+    """Strike, IV and premium of every delta level at each expiration"""
+    rows = []
+    delta_levels = get_delta_levels()
+    deltas = [level.value for level in delta_levels]
+    for expiration_date in sorted(expirations):
+        svi = surface.slices.get(str(expiration_date))
+        if svi is None:
+            continue
+        strikes = svi.strike_at_delta(deltas)
+        ivs = svi.iv_at_delta(deltas)
+        premiums = bs_price(
+            spot_price,
+            strikes,
+            svi.years,
+            ivs,
+            is_call=np.array([level.is_call for level in delta_levels]),
+        )
+        rows.extend(
+            {
+                "ExpirationDate": expiration_date,
+                "Level": level.name,
+                "Strike": strike,
+                "IV": iv,
+                "Premium": premium,
+                "SpotPrice": spot_price,
+            }
+            for level, strike, iv, premium in zip(delta_levels, strikes, ivs, premiums)
+        )
+    return pd.DataFrame(rows)
+
+
 def filter_and_display_options(
     df: pd.DataFrame, expiration_window: int, exclude_dates: list[str] = None
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
@@ -350,47 +434,30 @@ def plot_options_data(data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame]]) -
     fig.show()
 
 
-def plot_implied_move(data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame]]) -> None:
-    num_plots = len(data_dict)
+def plot_implied_move(level_dict: dict[str, pd.DataFrame]) -> None:
+    num_plots = len(level_dict)
     specs = [[{"secondary_y": True}] for _ in range(num_plots)]
     fig = make_subplots(
         rows=num_plots,
         cols=1,
         subplot_titles=[
-            f"On {table_name.split('_')[-1]}" for table_name in list(data_dict.keys())
+            f"On {table_name.split('_')[-1]}" for table_name in list(level_dict.keys())
         ],
         specs=specs,
         vertical_spacing=0.05,
     )
 
-    for idx, (table_name, (put_df, call_df)) in enumerate(list(data_dict.items())):
+    for idx, (table_name, levels) in enumerate(list(level_dict.items())):
         row = idx + 1
 
-        if not put_df.empty and not call_df.empty:
-            # Find options closest to 50 delta
-            put_df["PutDeltaDiff"] = abs(put_df["PutDelta"] - (-0.50))
-            call_df["CallDeltaDiff"] = abs(call_df["CallDelta"] - 0.50)
-
-            # Get the nearest 50 delta options for each expiration
-            nearest_puts = put_df.loc[
-                put_df.groupby("ExpirationDate")["PutDeltaDiff"].idxmin()
-            ]
-            nearest_calls = call_df.loc[
-                call_df.groupby("ExpirationDate")["CallDeltaDiff"].idxmin()
-            ]
-
-            # Calculate mid prices for options
-            nearest_puts["PutMidPrice"] = (
-                nearest_puts["PutBid"] + nearest_puts["PutAsk"]
-            ) / 2
-            nearest_calls["CallMidPrice"] = (
-                nearest_calls["CallBid"] + nearest_calls["CallAsk"]
-            ) / 2
+        if not levels.empty:
+            nearest_puts = levels[levels["Level"] == "50Δ Put"]
+            nearest_calls = levels[levels["Level"] == "50Δ Call"]
 
             # Calculate implied move based on premium
             spot_price = nearest_puts["SpotPrice"].iloc[0]
-            implied_move_up = spot_price + nearest_calls["CallMidPrice"]
-            implied_move_down = spot_price - nearest_puts["PutMidPrice"]
+            implied_move_up = spot_price + nearest_calls["Premium"]
+            implied_move_down = spot_price - nearest_puts["Premium"]
 
             # Calculate implied move percentage
             implied_move_up_pct = (implied_move_up - spot_price) / spot_price * 100
@@ -469,16 +536,14 @@ def plot_implied_move(data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame]]) -
     fig.show()
 
 
-def plot_iv_term_structure(
-    data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame]],
-) -> None:
-    num_plots = len(data_dict)
+def plot_iv_term_structure(level_dict: dict[str, pd.DataFrame]) -> None:
+    num_plots = len(level_dict)
     specs = [[{"secondary_y": True}] for _ in range(num_plots)]
     fig = make_subplots(
         rows=num_plots,
         cols=1,
         subplot_titles=[
-            f"On {table_name.split('_')[-1]}" for table_name in list(data_dict.keys())
+            f"On {table_name.split('_')[-1]}" for table_name in list(level_dict.keys())
         ],
         specs=specs,
         vertical_spacing=0.05,
@@ -486,24 +551,17 @@ def plot_iv_term_structure(
 
     delta_levels = get_delta_levels()
 
-    for idx, (table_name, (put_df, call_df)) in enumerate(list(data_dict.items())):
+    for idx, (table_name, levels) in enumerate(list(level_dict.items())):
         row = idx + 1
 
-        if not put_df.empty and not call_df.empty:
+        if not levels.empty:
             for delta_level in delta_levels:
-                df = put_df if not delta_level.is_call else call_df
-                delta_col = "PutDelta" if not delta_level.is_call else "CallDelta"
-                iv_col = "PutIV" if not delta_level.is_call else "CallIV"
-
-                df[f"{delta_col}Diff"] = abs(df[delta_col] - delta_level.value)
-                nearest_options = df.loc[
-                    df.groupby("ExpirationDate")[f"{delta_col}Diff"].idxmin()
-                ]
+                nearest_options = levels[levels["Level"] == delta_level.name]
 
                 fig.add_trace(
                     go.Scatter(
                         x=nearest_options["ExpirationDate"],
-                        y=nearest_options[iv_col],
+                        y=nearest_options["IV"],
                         mode="lines+markers",
                         name=f"{delta_level.name} IV",
                         line=dict(color=delta_level.color, width=2),
@@ -539,16 +597,14 @@ def plot_iv_term_structure(
     fig.show()
 
 
-def plot_premium_structure(
-    data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame]],
-) -> None:
-    num_plots = len(data_dict)
+def plot_premium_structure(level_dict: dict[str, pd.DataFrame]) -> None:
+    num_plots = len(level_dict)
     specs = [[{"secondary_y": True}] for _ in range(num_plots)]
     fig = make_subplots(
         rows=num_plots,
         cols=1,
         subplot_titles=[
-            f"On {table_name.split('_')[-1]}" for table_name in list(data_dict.keys())
+            f"On {table_name.split('_')[-1]}" for table_name in list(level_dict.keys())
         ],
         specs=specs,
         vertical_spacing=0.05,
@@ -556,27 +612,17 @@ def plot_premium_structure(
 
     delta_levels = get_delta_levels()
 
-    for idx, (table_name, (put_df, call_df)) in enumerate(list(data_dict.items())):
+    for idx, (table_name, levels) in enumerate(list(level_dict.items())):
         row = idx + 1
 
-        if not put_df.empty and not call_df.empty:
-            put_df["PutMidPrice"] = (put_df["PutBid"] + put_df["PutAsk"]) / 2
-            call_df["CallMidPrice"] = (call_df["CallBid"] + call_df["CallAsk"]) / 2
-
+        if not levels.empty:
             for delta_level in delta_levels:
-                df = put_df if not delta_level.is_call else call_df
-                delta_col = "PutDelta" if not delta_level.is_call else "CallDelta"
-                price_col = "PutMidPrice" if not delta_level.is_call else "CallMidPrice"
-
-                df[f"{delta_col}Diff"] = abs(df[delta_col] - delta_level.value)
-                nearest_options = df.loc[
-                    df.groupby("ExpirationDate")[f"{delta_col}Diff"].idxmin()
-                ]
+                nearest_options = levels[levels["Level"] == delta_level.name]
 
                 fig.add_trace(
                     go.Scatter(
                         x=nearest_options["ExpirationDate"],
-                        y=nearest_options[price_col],
+                        y=nearest_options["Premium"],
                         mode="lines+markers",
                         name=f"{delta_level.name} Premium",
                         line=dict(color=delta_level.color, width=2),
@@ -616,17 +662,28 @@ def main(args):
     try:
         dataframes = load_database(args.db_path, args.symbol)
 
+        surfaces = fit_svi_surfaces(args.db_path, args.symbol, dataframes)
+
         processed_data = {}
+        level_data = {}
         for table_name, df in dataframes.items():
             put_data, call_data = filter_and_display_options(
                 df, args.expiration_window, args.exclude_dates
             )
             processed_data[table_name] = (put_data, call_data)
+            expirations = (
+                set(put_data["ExpirationDate"]) & set(call_data["ExpirationDate"])
+                if not put_data.empty and not call_data.empty
+                else set()
+            )
+            level_data[table_name] = delta_level_quotes(
+                surfaces[table_name], expirations, float(df["SpotPrice"].iloc[0])
+            )
 
         plot_options_data(processed_data)
-        plot_implied_move(processed_data)
-        plot_iv_term_structure(processed_data)
-        plot_premium_structure(processed_data)
+        plot_implied_move(level_data)
+        plot_iv_term_structure(level_data)
+        plot_premium_structure(level_data)
         logging.info("Data loaded and displayed successfully")
     except Exception as e:
         logging.error(f"Error in main: {e}")
@@ -186,82 +186,85 @@ def main(args):
         df[f"Signal_Med{window1}"] = (df[f"IVTS_Med{window1}"] < 1).astype(int) * 2 - 1
         df[f"Signal_Med{window2}"] = (df[f"IVTS_Med{window2}"] < 1).astype(int) * 2 - 1
 
-        for quote_date in quote_dates:
-            high_vol_regime = False
-            try:
-                signal_raw_value = df.loc[quote_date, "Signal_Raw"]
-                if signal_raw_value == 1:
-                    high_vol_regime = False
-                else:
-                    logging.info(
-                        f"High Vol environment. The Signal_Raw value for {quote_date} is not 1. It is {signal_raw_value}"
-                    )
-                    high_vol_regime = True
-            except KeyError:
-                logging.debug(f"Date {quote_date} not found in DataFrame.")
-
-            # Update existing open trades
-            update_open_trades(
-                db,
-                quote_date,
-                args.close_at_expiry,
-                args.profit_take,
-                args.stop_loss,
-                high_vol_regime,
-            )
-
-            if high_vol_regime:
-                continue
+        with db.batched_writes():
+            for quote_date in quote_dates:
+                high_vol_regime = False
+                try:
+                    signal_raw_value = df.loc[quote_date, "Signal_Raw"]
+                    if signal_raw_value == 1:
+                        high_vol_regime = False
+                    else:
+                        logging.info(
+                            f"High Vol environment. The Signal_Raw value for {quote_date} is not 1. It is {signal_raw_value}"
+                        )
+                        high_vol_regime = True
+                except KeyError:
+                    logging.debug(f"Date {quote_date} not found in DataFrame.")
 
-            # Look for new trade opportunities
-            result = db.get_next_expiry_by_dte(quote_date, args.dte)
-            if result:
-                expiry_date, dte = result
-                logging.info(
-                    f"Quote date: {quote_date} -> Next expiry: {expiry_date} (DTE: {dte:.1f})"
+                # Update existing open trades
+                update_open_trades(
+                    db,
+                    quote_date,
+                    args.close_at_expiry,
+                    args.profit_take,
+                    args.stop_loss,
+                    high_vol_regime,
                 )
 
-                call_df, put_df = db.get_options_by_delta(quote_date, expiry_date)
-
-                if not call_df.empty and not put_df.empty:
-                    logging.debug(f"CALL OPTION: \n {call_df.to_string(index=False)}")
-                    logging.debug(f"PUT OPTION: \n {put_df.to_string(index=False)}")
+                if high_vol_regime:
+                    continue
 
-                    underlying_price = call_df["UNDERLYING_LAST"].iloc[0]
-                    strike_price = call_df["CALL_STRIKE"].iloc[0]
-                    call_price = call_df["CALL_C_LAST"].iloc[0]
-                    put_price = put_df["PUT_P_LAST"].iloc[0]
+                # Look for new trade opportunities
+                result = db.get_next_expiry_by_dte(quote_date, args.dte)
+                if result:
+                    expiry_date, dte = result
+                    logging.info(
+                        f"Quote date: {quote_date} -> Next expiry: {expiry_date} (DTE: {dte:.1f})"
+                    )
 
-                    if not call_price or not put_price:
-                        logging.warning(
-                            f"Not creating trade. Call Price {call_price} or Put Price {put_price} is missing"
-                        )
-                        continue
+                    call_df, put_df = db.get_options_by_delta(quote_date, expiry_date)
 
-                    # Check if maximum number of open trades has been reached
-                    open_trades = db.get_open_trades()
-                    if len(open_trades) >= args.max_open_trades:
+                    if not call_df.empty and not put_df.empty:
                         logging.debug(
-                            f"Maximum number of open trades ({args.max_open_trades}) reached. Skipping new trade creation."
+                            f"CALL OPTION: \n {call_df.to_string(index=False)}"
                         )
-                        continue
-
-                    trade_id = db.create_trade(
-                        quote_date,
-                        strike_price,
-                        call_price,
-                        put_price,
-                        underlying_price,
-                        expiry_date,
-                        dte,
-                    )
-                    logging.info(f"Trade {trade_id} created in database")
+                        logging.debug(f"PUT OPTION: \n {put_df.to_string(index=False)}")
+
+                        underlying_price = call_df["UNDERLYING_LAST"].iloc[0]
+                        strike_price = call_df["CALL_STRIKE"].iloc[0]
+                        call_price = call_df["CALL_C_LAST"].iloc[0]
+                        put_price = put_df["PUT_P_LAST"].iloc[0]
+
+                        if not call_price or not put_price:
+                            logging.warning(
+                                f"Not creating trade. Call Price {call_price} or Put Price {put_price} is missing"
+                            )
+                            continue
+
+                        # Check if maximum number of open trades has been reached
+                        open_trades = db.get_open_trades()
+                        if len(open_trades) >= args.max_open_trades:
+                            logging.debug(
+                                f"Maximum number of open trades ({args.max_open_trades}) reached. Skipping new trade creation."
+                            )
+                            continue
+
+                        trade_id = db.create_trade(
+                            quote_date,
+                            strike_price,
+                            call_price,
+                            put_price,
+                            underlying_price,
+                            expiry_date,
+                            dte,
+                        )
+                        logging.info(f"Trade {trade_id} created in database")
+                    else:
+                        logging.debug("No options matching delta criteria found")
                 else:
-                    logging.debug("No options matching delta criteria found")
-            else:
-                logging.warning(
-                    f"Quote date: {quote_date} -> No valid expiration found"
-                )
+                    logging.warning(
+                        f"Quote date: {quote_date} -> No valid expiration found"
+                    )
 
     finally:
         db.disconnect()
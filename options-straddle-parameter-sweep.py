@@ -0,0 +1,210 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "pandas",
+#   "numpy",
+# ]
+# ///
+"""
+Short Straddle Parameter Sweep
+
+Runs the vectorised straddle backtest for every combination of the given parameters.
+Each combination runs in a worker process against a read-only connection to the
+options database, trades are kept in memory and only the summary metrics are saved.
+
+Usage:
+./options-straddle-parameter-sweep.py -h
+
+./options-straddle-parameter-sweep.py --db-path path/to/database.db --dte 30 45 60
+./options-straddle-parameter-sweep.py --db-path path/to/database.db --dte 30 45 --trade-delay -1 7 14 --max-open-trades 1 5 99
+./options-straddle-parameter-sweep.py --db-path path/to/database.db --profit-take 25 50 --stop-loss 100 200 # Early exits
+./options-straddle-parameter-sweep.py --db-path path/to/database.db --objective WinRate --workers 4
+"""
+
+import itertools
+import logging
+import os
+import time
+from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from common.logger import setup_logging
+from common.options_analysis import OptionsDatabase
+from common.straddle_backtest import (
+    CHAIN_COLUMNS,
+    StraddleBacktestParams,
+    run_straddle_backtest,
+    summarise_trades,
+)
+
+pd.set_option("display.float_format", lambda x: "%.4f" % x)
+
+OBJECTIVES = {
+    # metric: higher is better
+    "TotalPnL": True,
+    "AvgPnL": True,
+    "WinRate": True,
+    "PnLToDrawdown": True,
+    "MaxDrawdown": False,
+}
+
+_chain = None
+
+
+def load_shared_chain(db_path):
+    """Worker initializer: load the chain once per process over a read-only connection"""
+    global _chain
+    db = OptionsDatabase(db_path, "sweep")
+    db.connect(read_only=True)
+    try:
+        _chain = db.get_options_chain(CHAIN_COLUMNS)
+    finally:
+        db.disconnect()
+
+
+def run_combination(params):
+    started = time.perf_counter()
+    trades_df, _ = run_straddle_backtest(_chain, params)
+    return {
+        **vars(params),
+        **summarise_trades(trades_df),
+        "Seconds": time.perf_counter() - started,
+    }
+
+
+def build_grid(args):
+    profit_takes = args.profit_take or [None]
+    stop_losses = args.stop_loss or [None]
+    return [
+        StraddleBacktestParams(
+            dte=dte,
+            trade_delay=trade_delay,
+            max_open_trades=max_open_trades,
+            profit_take=profit_take,
+            stop_loss=stop_loss,
+        )
+        for dte, trade_delay, max_open_trades, profit_take, stop_loss in (
+            itertools.product(
+                args.dte,
+                args.trade_delay,
+                args.max_open_trades,
+                profit_takes,
+                stop_losses,
+            )
+        )
+    ]
+
+
+def parse_args():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        dest="verbose",
+        help="Increase verbosity of logging output",
+    )
+    parser.add_argument(
+        "--db-path",
+        required=True,
+        help="Path to the SQLite database file",
+    )
+    parser.add_argument(
+        "--dte",
+        type=int,
+        nargs="+",
+        default=[30],
+        help="DTE values to test",
+    )
+    parser.add_argument(
+        "--trade-delay",
+        type=int,
+        nargs="+",
+        default=[-1],
+        help="Trade delay values to test",
+    )
+    parser.add_argument(
+        "--max-open-trades",
+        type=int,
+        nargs="+",
+        default=[99],
+        help="Maximum open trades values to test",
+    )
+    parser.add_argument(
+        "--profit-take",
+        type=float,
+        nargs="+",
+        help="Profit take percentages to test. Hold to expiry when not given",
+    )
+    parser.add_argument(
+        "--stop-loss",
+        type=float,
+        nargs="+",
+        help="Stop loss percentages to test. Hold to expiry when not given",
+    )
+    parser.add_argument(
+        "--objective",
+        choices=OBJECTIVES.keys(),
+        default="TotalPnL",
+        help="Metric used to rank the combinations",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes",
+    )
+    parser.add_argument(
+        "--results-table",
+        default="straddle_sweep_results",
+        help="Table to store the ranked results in",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Number of ranked combinations to print",
+    )
+    return parser.parse_args()
+
+
+def main(args):
+    grid = build_grid(args)
+    logging.info(f"Running {len(grid)} combinations on {args.workers} workers")
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=load_shared_chain,
+        initargs=(args.db_path,),
+    ) as executor:
+        futures = [executor.submit(run_combination, params) for params in grid]
+        for completed, future in enumerate(as_completed(futures), start=1):
+            results.append(future.result())
+            logging.info(f"Completed {completed}/{len(grid)}: {results[-1]}")
+
+    results_df = pd.DataFrame(results).sort_values(
+        args.objective, ascending=not OBJECTIVES[args.objective], ignore_index=True
+    )
+    results_df.insert(0, "Rank", results_df.index + 1)
+
+    with OptionsDatabase(args.db_path, "sweep") as db:
+        results_df.to_sql(args.results_table, db.conn, if_exists="replace", index=False)
+
+    print(results_df.head(args.top).to_string(index=False))
+    print(
+        f"\n{len(grid)} combinations in {time.perf_counter() - started:.1f}s. "
+        f"Results saved to {args.results_table}"
+    )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging(args.verbose)
+    main(args)
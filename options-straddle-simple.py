@@ -14,6 +14,7 @@ Usage:
 ./options-straddle-simple.py -vv # To log DEBUG messages
 ./options-straddle-simple.py --db-path path/to/database.db # Specify database path
 ./options-straddle-simple.py --dte 30 # Find next expiration with DTE > 30 for each quote date
+./options-straddle-simple.py --vectorised # Use the vectorised engine (same output, much faster)
 ./options-straddle-simple.py --trade-delay 7 # Wait 7 days between new trades
 """
 
@@ -25,6 +26,11 @@ import pandas as pd
 
 from common.logger import setup_logging
 from common.options_analysis import OptionsDatabase
+from common.straddle_backtest import (
+    CHAIN_COLUMNS,
+    StraddleBacktestParams,
+    run_straddle_backtest,
+)
 
 pd.set_option("display.float_format", lambda x: "%.4f" % x)
 
@@ -136,74 +142,99 @@ def parse_args():
         default=-1,
         help="Minimum number of days to wait between new trades",
     )
+    parser.add_argument(
+        "--vectorised",
+        action="store_true",
+        help="Run the vectorised engine over the whole chain instead of the day-by-day loop",
+    )
     return parser.parse_args()
 
 
+def run_vectorised(db, args):
+    """Compute all trades in memory and write them once at the end"""
+    params = StraddleBacktestParams(
+        dte=args.dte,
+        trade_delay=args.trade_delay,
+        max_open_trades=args.max_open_trades,
+    )
+    trades_df, history_df = run_straddle_backtest(
+        db.get_options_chain(CHAIN_COLUMNS), params
+    )
+    db.save_backtest_results(trades_df, history_df)
+
+
 def main(args):
     db = OptionsDatabase(args.db_path, args.dte)
     db.connect()
 
     try:
         db.setup_trades_table()
-        quote_dates = db.get_quote_dates()
-
-        for quote_date in quote_dates:
-            # Update existing open trades
-            update_open_trades(db, quote_date)
+        if args.vectorised:
+            run_vectorised(db, args)
+            return
 
-            # Check if enough time has passed since last trade
-            if not can_create_new_trade(db, quote_date, args.trade_delay):
-                continue
-
-            # Look for new trade opportunities
-            result = db.get_next_expiry_by_dte(quote_date, args.dte)
-            if result:
-                expiry_date, dte = result
-                logging.info(
-                    f"Quote date: {quote_date} -> Next expiry: {expiry_date} (DTE: {dte:.1f})"
-                )
-
-                call_df, put_df = db.get_options_by_delta(quote_date, expiry_date)
+        quote_dates = db.get_quote_dates()
 
-                if not call_df.empty and not put_df.empty:
-                    logging.debug(f"CALL OPTION: \n {call_df.to_string(index=False)}")
-                    logging.debug(f"PUT OPTION: \n {put_df.to_string(index=False)}")
+        with db.batched_writes():
+            for quote_date in quote_dates:
+                # Update existing open trades
+                update_open_trades(db, quote_date)
+
+                # Check if enough time has passed since last trade
+                if not can_create_new_trade(db, quote_date, args.trade_delay):
+                    continue
+
+                # Look for new trade opportunities
+                result = db.get_next_expiry_by_dte(quote_date, args.dte)
+                if result:
+                    expiry_date, dte = result
+                    logging.info(
+                        f"Quote date: {quote_date} -> Next expiry: {expiry_date} (DTE: {dte:.1f})"
+                    )
 
-                    underlying_price = call_df["UNDERLYING_LAST"].iloc[0]
-                    strike_price = call_df["CALL_STRIKE"].iloc[0]
-                    call_price = call_df["CALL_C_LAST"].iloc[0]
-                    put_price = put_df["PUT_P_LAST"].iloc[0]
+                    call_df, put_df = db.get_options_by_delta(quote_date, expiry_date)
 
-                    if not call_price or not put_price:
+                    if not call_df.empty and not put_df.empty:
                         logging.debug(
-                            f"Not creating trade. Call Price {call_price} or Put Price {put_price} is missing"
+                            f"CALL OPTION: \n {call_df.to_string(index=False)}"
                         )
-                        continue
-
-                    # Check if maximum number of open trades has been reached
-                    open_trades = db.get_open_trades()
-                    if len(open_trades) >= args.max_open_trades:
-                        logging.debug(
-                            f"Maximum number of open trades ({args.max_open_trades}) reached. Skipping new trade creation."
+                        logging.debug(f"PUT OPTION: \n {put_df.to_string(index=False)}")
+
+                        underlying_price = call_df["UNDERLYING_LAST"].iloc[0]
+                        strike_price = call_df["CALL_STRIKE"].iloc[0]
+                        call_price = call_df["CALL_C_LAST"].iloc[0]
+                        put_price = put_df["PUT_P_LAST"].iloc[0]
+
+                        if not call_price or not put_price:
+                            logging.debug(
+                                f"Not creating trade. Call Price {call_price} or Put Price {put_price} is missing"
+                            )
+                            continue
+
+                        # Check if maximum number of open trades has been reached
+                        open_trades = db.get_open_trades()
+                        if len(open_trades) >= args.max_open_trades:
+                            logging.debug(
+                                f"Maximum number of open trades ({args.max_open_trades}) reached. Skipping new trade creation."
+                            )
+                            continue
+
+                        trade_id = db.create_trade(
+                            quote_date,
+                            strike_price,
+                            call_price,
+                            put_price,
+                            underlying_price,
+                            expiry_date,
+                            dte,
                         )
-                        continue
-
-                    trade_id = db.create_trade(
-                        quote_date,
-                        strike_price,
-                        call_price,
-                        put_price,
-                        underlying_price,
-                        expiry_date,
-                        dte,
-                    )
-                    logging.info(f"Trade {trade_id} created in database")
+                        logging.info(f"Trade {trade_id} created in database")
+                    else:
+                        logging.warning("No options matching delta criteria found")
                 else:
-                    logging.warning("No options matching delta criteria found")
-            else:
-                logging.warning(
-                    f"Quote date: {quote_date} -> No valid expiration found"
-                )
+                    logging.warning(
+                        f"Quote date: {quote_date} -> No valid expiration found"
+                    )
 
     finally:
         db.disconnect()
@@ -238,7 +238,7 @@ class DashTradeVisualizer:
         with self._get_db() as db:
             self.trades = {
                 trade.id: f"Trade {trade.id} - {trade.trade_date} to {trade.expire_date}"
-                for trade in db.load_all_trades()
+                for trade in db.iter_all_trades()
             }
 
         self.setup_layout()
@@ -3,6 +3,7 @@
 # dependencies = [
 #   "matplotlib",
 #   "numpy",
+#   "scipy",
 #   "seaborn",
 #   "pyyaml",
 #   "yfinance",
@@ -64,6 +65,7 @@ import seaborn as sns
 import yaml
 
 from common import RawTextWithDefaultsFormatter
+from common.black_scholes import intrinsic_value
 from common.ib import OptionContract
 
 
@@ -92,8 +94,7 @@ class OptionPlot:
         min_strike = min(option.strike_price for option in self.options)
         max_strike = max(option.strike_price for option in self.options)
         self.strike_range = np.arange(min_strike - 1000, max_strike + 1000, 1)
-        payoffs = [option.payoff(self.strike_range) for option in self.options]
-        total_payoff = np.sum(payoffs, axis=0)
+        total_payoff = self._total_payoff(self.strike_range)
         breakeven_points = self._plot_breakeven_points(total_payoff)
         if len(breakeven_points) > 0:
             min_range = min(min(breakeven_points), min_strike) - 100
@@ -117,6 +118,17 @@ class OptionPlot:
         if show_plot:
             plt.show()
 
+    def _total_payoff(self, prices):
+        """Expiry P&L of all legs at each price as one (prices x legs) broadcast"""
+        strikes = np.array([option.strike_price for option in self.options], float)
+        premiums = np.array([option.premium for option in self.options], float)
+        is_call = np.array([option.contract_type == "call" for option in self.options])
+        sides = np.array(
+            [1 if option.position == "long" else -1 for option in self.options]
+        )
+        values = intrinsic_value(np.asarray(prices)[:, None], strikes, is_call)
+        return ((values - premiums) * 100 * sides).sum(axis=1)
+
     def update_annot(self, pos):
         x, y = pos.xdata, pos.ydata
         self.annot.xy = (x, y)
@@ -150,8 +162,7 @@ class OptionPlot:
         self.ax.tick_params(axis="both", labelsize=8)
 
     def _plot_payoff(self):
-        payoffs = [option.payoff(self.strike_range) for option in self.options]
-        total_payoff = np.sum(payoffs, axis=0)
+        total_payoff = self._total_payoff(self.strike_range)
         self.ax.plot(
             self.strike_range, total_payoff, color="black", linewidth=1, alpha=0.2
         )
@@ -212,8 +223,7 @@ class OptionPlot:
         return breakeven_points
 
     def _calculate_max_losses(self):
-        payoffs = [option.payoff(self.strike_range) for option in self.options]
-        total_payoff = np.sum(payoffs, axis=0)
+        total_payoff = self._total_payoff(self.strike_range)
 
         downside_max_loss = min(total_payoff[self.strike_range <= self.spot_price])
         upside_max_loss = min(total_payoff[self.strike_range >= self.spot_price])
@@ -231,8 +241,7 @@ class OptionPlot:
         )
 
     def _annotate_max_profit_loss(self):
-        payoffs = [option.payoff(self.strike_range) for option in self.options]
-        total_payoff = np.sum(payoffs, axis=0)
+        total_payoff = self._total_payoff(self.strike_range)
         max_profit = max(total_payoff)
         max_profit_price = self.strike_range[np.argmax(total_payoff)]
 
@@ -1,7 +1,9 @@
 #!/usr/bin/env -S uv run --quiet --script
 # /// script
 # dependencies = [
-#   "pandas"
+#   "pandas",
+#   "numpy",
+#   "scipy",
 # ]
 # ///
 """
@@ -26,6 +28,9 @@ Examples:
 
     Import with detailed logging:
     ./optionsdx-data-importer -i ./data/2022 -o ./optionsdx.db -vv
+
+    Back-fill missing IV and greeks from the bid/ask mid (or last) price:
+    ./optionsdx-data-importer -i ./data/2022 -o ./optionsdx.db --backfill-greeks --risk-free-rate 0.04
 """
 
 import csv
@@ -35,8 +40,11 @@ import os
 import sqlite3
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
 
+import numpy as np
 import pandas as pd
 
+from common.black_scholes import bs_greeks, implied_volatility
+
 # Define expected columns with their correct case
 EXPECTED_COLUMNS = {
     "quote_unixtime": "QUOTE_UNIXTIME",
@@ -75,6 +83,17 @@ EXPECTED_COLUMNS = {
 }
 
 
+# Greek columns with the scaling from the raw Black-Scholes greeks to OptionsDX units
+# (vega and rho per 1%, theta per day)
+GREEK_COLUMNS = {
+    "DELTA": ("delta", 1),
+    "GAMMA": ("gamma", 1),
+    "VEGA": ("vega", 1 / 100),
+    "THETA": ("theta", 1 / 365),
+    "RHO": ("rho", 1 / 100),
+}
+
+
 def setup_logging(verbosity):
     logging_level = logging.WARNING
     if verbosity == 1:
@@ -236,7 +255,45 @@ def read_data_file(file_path):
         raise ValueError(f"Error reading file: {str(e)}")
 
 
-def import_csv_files(directory_path, db_connection):
+def backfill_greeks(df, risk_free_rate):
+    """Fill missing or zero IV and greeks of each side of the chain in one vectorised pass"""
+    spot = df["UNDERLYING_LAST"].to_numpy(dtype=float)
+    strike = df["STRIKE"].to_numpy(dtype=float)
+    years = df["DTE"].to_numpy(dtype=float) / 365
+
+    for side, is_call in [("C", True), ("P", False)]:
+        iv_col = f"{side}_IV"
+        missing = df[iv_col].isna() | (df[iv_col] <= 0)
+        if not missing.any():
+            continue
+
+        bid, ask = df[f"{side}_BID"], df[f"{side}_ASK"]
+        prices = ((bid + ask) / 2).where((bid > 0) & (ask > 0), df[f"{side}_LAST"])
+
+        iv, converged = implied_volatility(
+            prices.to_numpy(dtype=float),
+            spot,
+            strike,
+            years,
+            risk_free_rate,
+            is_call=is_call,
+        )
+        fill = missing.to_numpy() & converged
+        greeks = bs_greeks(spot, strike, years, iv, risk_free_rate, is_call=is_call)
+
+        df[iv_col] = np.where(fill, iv, df[iv_col])
+        for column, (greek, scale) in GREEK_COLUMNS.items():
+            column = f"{side}_{column}"
+            df[column] = np.where(fill, greeks[greek] * scale, df[column])
+
+        logging.debug(
+            f"Back-filled {iv_col} and greeks for {fill.sum()}/{missing.sum()} contracts"
+        )
+
+    return df
+
+
+def import_csv_files(directory_path, db_connection, risk_free_rate=None):
     data_files = glob.glob(
         os.path.join(directory_path, "**/*.csv"), recursive=True
     ) + glob.glob(os.path.join(directory_path, "**/*.txt"), recursive=True)
@@ -280,6 +337,9 @@ def import_csv_files(directory_path, db_connection):
             for col in numeric_columns:
                 df[col] = pd.to_numeric(df[col], errors="coerce")
 
+            if risk_free_rate is not None:
+                df = backfill_greeks(df, risk_free_rate)
+
             # Import to database
             df.to_sql("options_data", db_connection, if_exists="append", index=False)
             imported_count += 1
@@ -317,6 +377,17 @@ def parse_args():
         required=True,
         help="Output SQLite database file",
     )
+    parser.add_argument(
+        "--backfill-greeks",
+        action="store_true",
+        help="Solve missing or zero IV from the option price and fill the greeks from it",
+    )
+    parser.add_argument(
+        "--risk-free-rate",
+        type=float,
+        default=0.0,
+        help="Risk-free rate used when back-filling greeks",
+    )
     return parser.parse_args()
 
 
@@ -333,7 +404,11 @@ def main(args):
     try:
         conn = get_database_connection(args.output)
 
-        count = import_csv_files(args.input, conn)
+        count = import_csv_files(
+            args.input,
+            conn,
+            risk_free_rate=args.risk_free_rate if args.backfill_greeks else None,
+        )
 
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM options_data")
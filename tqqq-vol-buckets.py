@@ -3,6 +3,7 @@
 # dependencies = [
 #   "pandas",
 #   "numpy",
+#   "numba",
 #   "yfinance",
 #   "plotly",
 #   "persistent-cache@git+https://github.com/namuan/persistent-cache",
@@ -32,10 +33,13 @@ Usage:
 """
 
 import logging
+import os
+import sqlite3
 import subprocess
 import tempfile
 import time
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
 
@@ -45,8 +49,18 @@ import plotly.graph_objects as go
 import schedule
 from plotly.subplots import make_subplots
 
-from common.market_data import download_ticker_data
+from common.market_data import download_ticker_data, output_dir
+from common.plotly_report import PlotlyReport
+from common.strategy_state import (
+    BAR_COLUMNS,
+    StrategyCheckpoint,
+    compare_results,
+    extend_bars,
+    load_checkpoint,
+    save_checkpoint,
+)
 from common.tele_notifier import send_message_to_telegram
+from common.vol_regimes import bucket_codes, bucket_values, hysteresis_buckets
 
 # Strategy Configuration
 EXPOSURE_LEVELS = [0.00, 0.25, 0.70]  # Available exposure buckets
@@ -55,6 +69,11 @@ VOL_THRESHOLD_LOW = 1.30  # vol_ratio threshold for max exposure
 VOL_THRESHOLD_HIGH = 1.60  # vol_ratio threshold for 25% exposure
 ALTERNATE_TICKER = "GLD"
 
+# Bot checkpoint: daily runs advance the stored state by the new bars only and
+# rebuild it from the full history every FULL_RECOMPUTE_DAYS to verify it
+STATE_DB = "strategy_state.db"
+FULL_RECOMPUTE_DAYS = 30
+
 
 def is_weekday():
     """Check if today is a weekday (Monday-Friday)."""
@@ -178,43 +197,26 @@ def apply_hysteresis(target_exposures):
     - Sizing DOWN: immediate
     - Sizing UP: requires HYSTERESIS_DAYS consecutive days in lower-vol bucket
     """
-    current_exposure = []
-    days_in_bucket = 0
-    prev_exposure = 0.0
-
-    for target in target_exposures:
-        if pd.isna(target):
-            current_exposure.append(np.nan)
-            continue
-
-        # First valid target
-        if prev_exposure == 0.0 and not pd.isna(target):
-            prev_exposure = target
-            current_exposure.append(target)
-            days_in_bucket = 1
-            continue
-
-        # Sizing DOWN - immediate
-        if target < prev_exposure:
-            prev_exposure = target
-            current_exposure.append(target)
-            days_in_bucket = 1
-        # Sizing UP - need HYSTERESIS_DAYS consecutive days
-        elif target > prev_exposure:
-            days_in_bucket += 1
-            if days_in_bucket >= HYSTERESIS_DAYS:
-                # Increase by ONE bucket at a time
-                current_idx = EXPOSURE_LEVELS.index(prev_exposure)
-                if current_idx < len(EXPOSURE_LEVELS) - 1:
-                    prev_exposure = EXPOSURE_LEVELS[current_idx + 1]
-                days_in_bucket = 1
-            current_exposure.append(prev_exposure)
-        else:
-            # No change
-            current_exposure.append(prev_exposure)
-            days_in_bucket += 1
+    actual_exposure, _, _ = advance_hysteresis(target_exposures)
+    return actual_exposure
+
 
-    return pd.Series(current_exposure, index=target_exposures.index)
+def advance_hysteresis(target_exposures, current=0, count=0):
+    """
+    Apply hysteresis starting from the given bucket and counter.
+    Returns (actual exposures, final bucket, final counter).
+    """
+    buckets, current, count = hysteresis_buckets(
+        bucket_codes(target_exposures, EXPOSURE_LEVELS),
+        HYSTERESIS_DAYS,
+        len(EXPOSURE_LEVELS),
+        current,
+        count,
+    )
+    actual_exposure = pd.Series(
+        bucket_values(buckets, EXPOSURE_LEVELS), index=target_exposures.index
+    )
+    return actual_exposure, current, count
 
 
 def calculate_metrics(returns, label="Strategy"):
@@ -457,6 +459,7 @@ def generate_html_report(
     tqqq_dd = (tqqq_equity - tqqq_equity.cummax()) / tqqq_equity.cummax() * 100
 
     # Create individual Plotly charts
+    report = PlotlyReport()
     charts_html = []
 
     # Chart 1: Equity Curves Comparison
@@ -510,7 +513,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig1.to_html(full_html=False, include_plotlyjs="cdn"))
+    charts_html.append(report.figure_html(fig1))
 
     # Chart 2: Drawdown Comparison
     fig2 = go.Figure()
@@ -544,7 +547,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig2.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig2))
 
     # Chart 3: Exposure Over Time with Signals
     exposure_changes = results_df_data["actual_exposure"].diff() != 0
@@ -588,7 +591,7 @@ def generate_html_report(
         hovermode="x unified",
         yaxis=dict(range=[-5, 105]),
     )
-    charts_html.append(fig3.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig3))
 
     fig3_treasury = go.Figure()
     treasury_exposure_pct = (1 - results_df_data["actual_exposure"]) * 100
@@ -628,7 +631,7 @@ def generate_html_report(
         hovermode="x unified",
         yaxis=dict(range=[-5, 105]),
     )
-    charts_html.append(fig3_treasury.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig3_treasury))
 
     # Chart 4: Volatility Regime
     vol_ratio = results_df_data["vol_ratio"].dropna()
@@ -662,7 +665,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig4.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig4))
 
     # Chart 5: Rolling 1-Year Returns
     rolling_window = 252
@@ -708,7 +711,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig5.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig5))
 
     # Chart 6: Rolling Sharpe Ratio
     strat_rolling_sharpe = (
@@ -753,7 +756,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig6.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig6))
 
     # Chart 7: Monthly Returns Heatmap
     monthly_returns = (
@@ -804,7 +807,7 @@ def generate_html_report(
         template="plotly_white",
         height=600,
     )
-    charts_html.append(fig7.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig7))
 
     # Chart 8: Distribution of Daily Returns
     fig8 = go.Figure()
@@ -835,7 +838,7 @@ def generate_html_report(
         barmode="overlay",
         xaxis=dict(range=[-15, 15]),
     )
-    charts_html.append(fig8.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig8))
 
     # Chart 9: Exposure Distribution
     exposure_dist_pct = exposure_dist * 100
@@ -856,7 +859,7 @@ def generate_html_report(
         template="plotly_white",
         height=500,
     )
-    charts_html.append(fig9.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig9))
 
     # Chart 10: 2020 COVID Crash
     covid_period = slice("2020-01-01", "2020-12-31")
@@ -904,7 +907,7 @@ def generate_html_report(
             height=500,
             hovermode="x unified",
         )
-        charts_html.append(fig10.to_html(full_html=False, include_plotlyjs=False))
+        charts_html.append(report.figure_html(fig10))
 
     # Chart 11: 2022 Rate Shock
     rate_period = slice("2022-01-01", "2022-12-31")
@@ -952,7 +955,7 @@ def generate_html_report(
             height=500,
             hovermode="x unified",
         )
-        charts_html.append(fig11.to_html(full_html=False, include_plotlyjs=False))
+        charts_html.append(report.figure_html(fig11))
 
     # Generate HTML
     html_content = f"""<!DOCTYPE html>
@@ -961,6 +964,7 @@ def generate_html_report(
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>TQQQ Volatility Bucket Strategy - Backtest Report</title>
+    {report.head_html()}
     <style>
         * {{
             margin: 0;
@@ -1268,6 +1272,47 @@ def generate_html_report(
     return html_file
 
 
+def calculate_strategy_returns(
+    actual_exposure, tqqq_data, treasury_data, use_alternate
+):
+    """Align exposures with TQQQ and alternate returns and combine them.
+
+    Returns:
+        tuple: (actual_exposure, strategy_returns, tqqq_returns, treasury_returns,
+                common_index)
+    """
+    tqqq_returns = tqqq_data["Close"].pct_change()
+    treasury_returns = (
+        treasury_data["Close"].pct_change() if use_alternate else pd.Series(dtype=float)
+    )
+
+    # Align indices
+    common_index = actual_exposure.dropna().index.intersection(
+        tqqq_returns.dropna().index
+    )
+    if use_alternate:
+        common_index = common_index.intersection(treasury_returns.dropna().index)
+    actual_exposure = actual_exposure.loc[common_index]
+    tqqq_returns = tqqq_returns.loc[common_index]
+    if use_alternate:
+        treasury_returns = treasury_returns.loc[common_index]
+    else:
+        treasury_returns = pd.Series(0.0, index=common_index)
+
+    # Strategy returns: TQQQ portion + Treasury portion
+    tqqq_portion = actual_exposure * tqqq_returns
+    treasury_portion = (1 - actual_exposure) * treasury_returns
+    strategy_returns = tqqq_portion + treasury_portion
+
+    return (
+        actual_exposure,
+        strategy_returns,
+        tqqq_returns,
+        treasury_returns,
+        common_index,
+    )
+
+
 def run_analysis(start_date, end_date, use_alternate=True):
     """Run the complete analysis and return all results.
 
@@ -1306,28 +1351,15 @@ def run_analysis(start_date, end_date, use_alternate=True):
 
     # Calculate Returns
     logging.info("Calculating strategy returns")
-    tqqq_returns = tqqq_data["Close"].pct_change()
-    treasury_returns = (
-        treasury_data["Close"].pct_change() if use_alternate else pd.Series(dtype=float)
-    )
-
-    # Align indices
-    common_index = actual_exposure.dropna().index.intersection(
-        tqqq_returns.dropna().index
+    (
+        actual_exposure,
+        strategy_returns,
+        tqqq_returns,
+        treasury_returns,
+        common_index,
+    ) = calculate_strategy_returns(
+        actual_exposure, tqqq_data, treasury_data, use_alternate
     )
-    if use_alternate:
-        common_index = common_index.intersection(treasury_returns.dropna().index)
-    actual_exposure = actual_exposure.loc[common_index]
-    tqqq_returns = tqqq_returns.loc[common_index]
-    if use_alternate:
-        treasury_returns = treasury_returns.loc[common_index]
-    else:
-        treasury_returns = pd.Series(0.0, index=common_index)
-
-    # Strategy returns: TQQQ portion + Treasury portion
-    tqqq_portion = actual_exposure * tqqq_returns
-    treasury_portion = (1 - actual_exposure) * treasury_returns
-    strategy_returns = tqqq_portion + treasury_portion
 
     return (
         qqq_data,
@@ -1343,24 +1375,34 @@ def run_analysis(start_date, end_date, use_alternate=True):
     )
 
 
-def run_bot(use_alternate=True):
-    """Run the daily update and send to Telegram."""
-    if not is_weekday():
-        logging.info("Not a weekday, skipping...")
-        return
+def build_alert_df(
+    qqq_close,
+    vol_ratio,
+    target_exposure,
+    actual_exposure,
+    strategy_returns,
+    tqqq_returns,
+    common_index,
+):
+    """Daily strategy output used by the Telegram alert and the bot checkpoint."""
+    return pd.DataFrame(
+        {
+            "qqq_close": qqq_close.loc[common_index],
+            "vol_ratio": vol_ratio.loc[common_index],
+            "target_exposure": target_exposure.loc[common_index],
+            "actual_exposure": actual_exposure,
+            "strategy_returns": strategy_returns,
+            "tqqq_returns": tqqq_returns,
+        }
+    )
 
-    logging.info(f"Running bot at {datetime.now()}")
 
-    # Calculate lookback to ensure we have enough data
-    start_date = "2010-02-10"  # TQQQ inception
-    end_date = datetime.today().strftime("%Y-%m-%d")
+def checkpoint_name(use_alternate):
+    return "tqqq-vol-buckets" if use_alternate else "tqqq-vol-buckets-cash"
 
-    # Run analysis
-    result = run_analysis(start_date, end_date, use_alternate)
-    if result is None:
-        logging.error("Analysis failed, skipping Telegram update")
-        return
 
+def full_checkpoint(result, use_alternate, today):
+    """Build the bot checkpoint from a full run_analysis result."""
     (
         qqq_data,
         _,
@@ -1373,21 +1415,133 @@ def run_bot(use_alternate=True):
         _,
         common_index,
     ) = result
+    alert_df = build_alert_df(
+        qqq_data["Close"],
+        vol_ratio,
+        target_exposure,
+        actual_exposure,
+        strategy_returns,
+        tqqq_returns,
+        common_index,
+    )
+    _, current, count = advance_hysteresis(target_exposure)
+    return StrategyCheckpoint(
+        checkpoint_name(use_alternate),
+        current,
+        count,
+        pd.Timestamp(today),
+        qqq_data[BAR_COLUMNS],
+        alert_df,
+    )
 
-    # Prepare alert dataframe
-    alert_df = pd.DataFrame(
-        {
-            "qqq_close": qqq_data["Close"].loc[common_index],
-            "vol_ratio": vol_ratio.loc[common_index],
-            "target_exposure": target_exposure.loc[common_index],
-            "actual_exposure": actual_exposure,
-            "strategy_returns": strategy_returns,
-            "tqqq_returns": tqqq_returns,
-        }
+
+def advance_checkpoint(checkpoint, end_date, use_alternate):
+    """
+    Advance the checkpoint by the bars after its last date. Only those bars (plus
+    the last checkpointed one, to verify the overlap and chain returns) are
+    downloaded. Returns None when the checkpoint can't be advanced.
+    """
+    if checkpoint.bars.index[-1] != checkpoint.last_date:
+        return None
+
+    start_date = checkpoint.last_date.strftime("%Y-%m-%d")
+    logging.info(f"Downloading QQQ, TQQQ data from {start_date} to {end_date}")
+    qqq_data = download_ticker_data("QQQ", start_date, end_date)
+    tqqq_data = download_ticker_data("TQQQ", start_date, end_date)
+    treasury_data = (
+        download_ticker_data(ALTERNATE_TICKER, start_date, end_date)
+        if use_alternate
+        else pd.DataFrame()
     )
+    if qqq_data.empty or tqqq_data.empty or (use_alternate and treasury_data.empty):
+        return None
+
+    bars = extend_bars(checkpoint.bars, qqq_data)
+    if bars is None:
+        logging.warning("Downloaded QQQ bars disagree with the checkpoint")
+        return None
+
+    new_dates = bars.index[bars.index > checkpoint.last_date]
+    logging.info(f"Advancing checkpoint by {len(new_dates)} new bars")
+    if new_dates.empty:
+        return checkpoint
+
+    vol_ratio = calculate_vol_ratio(bars).loc[new_dates]
+    target_exposure = vol_ratio.apply(get_target_exposure)
+    actual_exposure, current, count = advance_hysteresis(
+        target_exposure, checkpoint.state, checkpoint.count
+    )
+    (
+        actual_exposure,
+        strategy_returns,
+        tqqq_returns,
+        _,
+        common_index,
+    ) = calculate_strategy_returns(
+        actual_exposure, tqqq_data, treasury_data, use_alternate
+    )
+    new_rows = build_alert_df(
+        bars["Close"],
+        vol_ratio,
+        target_exposure,
+        actual_exposure,
+        strategy_returns,
+        tqqq_returns,
+        common_index,
+    )
+    return StrategyCheckpoint(
+        checkpoint.name,
+        current,
+        count,
+        checkpoint.verified_at,
+        bars,
+        pd.concat([checkpoint.results, new_rows]),
+    )
+
+
+def run_bot(use_alternate=True):
+    """Run the daily update and send to Telegram."""
+    if not is_weekday():
+        logging.info("Not a weekday, skipping...")
+        return
+
+    logging.info(f"Running bot at {datetime.now()}")
+
+    # Calculate lookback to ensure we have enough data
+    start_date = "2010-02-10"  # TQQQ inception
+    end_date = datetime.today().strftime("%Y-%m-%d")
+
+    with closing(sqlite3.connect(os.path.join(output_dir(), STATE_DB))) as conn:
+        previous = load_checkpoint(conn, checkpoint_name(use_alternate))
+        checkpoint = None
+        if previous is not None and not previous.full_recompute_due(
+            end_date, FULL_RECOMPUTE_DAYS
+        ):
+            checkpoint = advance_checkpoint(previous, end_date, use_alternate)
+
+        if checkpoint is not None:
+            save_checkpoint(conn, checkpoint)
+        else:
+            # Run analysis
+            logging.info("Recomputing the full history")
+            result = run_analysis(start_date, end_date, use_alternate)
+            if result is None:
+                logging.error("Analysis failed, skipping Telegram update")
+                return
+
+            checkpoint = full_checkpoint(result, use_alternate, end_date)
+            if previous is not None:
+                compare_results(
+                    previous.results,
+                    checkpoint.results,
+                    ["vol_ratio", "target_exposure", "actual_exposure"],
+                )
+            save_checkpoint(conn, checkpoint, full=True)
 
     # Generate and send Telegram message
-    message = generate_telegram_alert_message(alert_df, qqq_data, use_alternate)
+    message = generate_telegram_alert_message(
+        checkpoint.results, checkpoint.bars, use_alternate
+    )
     send_message_to_telegram(message, format="Markdown")
     logging.info("Telegram message sent successfully")
 
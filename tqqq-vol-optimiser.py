@@ -0,0 +1,483 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "pandas",
+#   "numpy",
+#   "numba",
+#   "matplotlib",
+#   "yfinance",
+#   "persistent-cache@git+https://github.com/namuan/persistent-cache",
+# ]
+# ///
+"""
+TQQQ Volatility Strategy Optimiser
+
+Walk-forward parameter sweep for the strategies of tqqq-vol-buckets.py (buckets) and
+tqqq-vol-regimes.py (regimes). Every combination of the given parameter values runs
+in a pool of worker processes that load the QQQ/TQQQ price arrays once.
+
+The history after the vol ratio warm-up is split into rolling folds of --train-years
+followed by --test-years. For each combination the out-of-sample (OOS) CAGR, max
+drawdown and Sharpe of the stitched test windows are reported. The walk-forward result
+picks the combination with the best in-sample --objective in every fold and chains
+their test windows.
+
+Exposure is applied to the next day's return in both strategies.
+--same-day-exposure applies it to the same day's return, which is how
+tqqq-vol-buckets.py computes its backtest.
+
+Usage:
+./tqqq-vol-optimiser.py -h
+
+./tqqq-vol-optimiser.py buckets --low 1.1 1.2 1.3 1.4 --high 1.5 1.6 1.7 1.8 --hysteresis-days 5 10 15 20
+./tqqq-vol-optimiser.py buckets --exposure-levels 0,0.25,0.7 0,0.5,1 --no-alternate --surface low high
+./tqqq-vol-optimiser.py regimes --stress-enter 1.2 1.3 1.4 --panic-enter 1.5 1.6 1.8 --stress-days 3 5 8
+./tqqq-vol-optimiser.py regimes --calm-days 10 20 30 --normal-days 10 15 20 --objective Sharpe --surface calm_days normal_days --plot
+./tqqq-vol-optimiser.py -v regimes --train-years 3 --test-years 1 --workers 8
+"""
+
+import itertools
+import logging
+import os
+import time
+from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from common.logger import setup_logging
+from common.market_data import download_ticker_data
+from common.vol_regimes import (
+    exposure_buckets,
+    hysteresis_buckets,
+    transition_regimes,
+)
+
+pd.set_option("display.float_format", lambda x: "%.4f" % x)
+
+TRADING_DAYS = 252
+ATR_WINDOW = 20
+MEDIAN_WINDOW = 252
+# Minimum observations of the rolling vol median used by each strategy
+MEDIAN_MIN_PERIODS = {"buckets": 252, "regimes": 20}
+ALTERNATE_TICKER = "GLD"
+METRICS = ["CAGR", "MaxDD", "Sharpe"]
+COMBINATIONS_PER_TASK = 64
+
+# Parameter names and defaults (the constants of the strategy scripts)
+BUCKET_PARAMS = {
+    "low": 1.30,
+    "high": 1.60,
+    "hysteresis_days": 10,
+    "exposure_levels": "0,0.25,0.7",
+}
+REGIME_PARAMS = {
+    "calm_enter": 0.80,
+    "normal_enter": 1.00,
+    "stress_enter": 1.30,
+    "panic_enter": 1.60,
+    "calm_days": 20,
+    "normal_days": 15,
+    "stress_days": 5,
+    "panic_drop": -0.04,
+    "regime_exposure": "1,0.75,0.5,0",
+}
+
+_data = None
+
+
+def parse_args():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        dest="verbose",
+        help="Increase verbosity of logging output",
+    )
+    subparsers = parser.add_subparsers(dest="strategy", required=True)
+
+    buckets = subparsers.add_parser("buckets", help="Sweep tqqq-vol-buckets.py")
+    buckets.add_argument("--low", type=float, nargs="+", default=[1.30])
+    buckets.add_argument("--high", type=float, nargs="+", default=[1.60])
+    buckets.add_argument("--hysteresis-days", type=int, nargs="+", default=[10])
+    buckets.add_argument(
+        "--exposure-levels",
+        nargs="+",
+        default=["0,0.25,0.7"],
+        help="Comma separated exposure of the high, medium and low vol buckets",
+    )
+    buckets.add_argument(
+        "--no-alternate",
+        action="store_true",
+        help=f"Hold cash instead of {ALTERNATE_TICKER} with the uninvested portion",
+    )
+
+    regimes = subparsers.add_parser("regimes", help="Sweep tqqq-vol-regimes.py")
+    for name, default in REGIME_PARAMS.items():
+        if name == "regime_exposure":
+            continue
+        regimes.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=type(default),
+            nargs="+",
+            default=[default],
+        )
+    regimes.add_argument(
+        "--regime-exposure",
+        nargs="+",
+        default=["1,0.75,0.5,0"],
+        help="Comma separated exposure in CALM, NORMAL, STRESS and PANIC",
+    )
+
+    for subparser in (buckets, regimes):
+        subparser.add_argument(
+            "--start-date", default="2010-02-11", help="Start date (YYYY-MM-DD)"
+        )
+        subparser.add_argument(
+            "--end-date",
+            default=datetime.now().strftime("%Y-%m-%d"),
+            help="End date (YYYY-MM-DD)",
+        )
+        subparser.add_argument(
+            "--train-years", type=float, default=5, help="In-sample years per fold"
+        )
+        subparser.add_argument(
+            "--test-years", type=float, default=1, help="Out-of-sample years per fold"
+        )
+        subparser.add_argument(
+            "--objective",
+            choices=METRICS,
+            default="Sharpe",
+            help="In-sample metric used to pick the walk-forward combination",
+        )
+        subparser.add_argument(
+            "--same-day-exposure",
+            action="store_true",
+            help="Apply exposure to the same day's return instead of the next",
+        )
+        subparser.add_argument(
+            "--surface",
+            nargs=2,
+            metavar=("X", "Y"),
+            help="Print OOS metric surfaces over two parameters (median of the rest)",
+        )
+        subparser.add_argument(
+            "--plot", action="store_true", help="Plot the OOS metric surfaces"
+        )
+        subparser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes",
+        )
+        subparser.add_argument(
+            "--output",
+            type=Path,
+            help="CSV file for the results of every combination",
+        )
+        subparser.add_argument(
+            "--top",
+            type=int,
+            default=20,
+            help="Number of ranked combinations to print",
+        )
+    return parser.parse_args()
+
+
+def load_prices(args):
+    tickers = ["QQQ", "TQQQ"]
+    if args.strategy == "buckets" and not args.no_alternate:
+        tickers.append(ALTERNATE_TICKER)
+
+    frames = {}
+    for ticker in tickers:
+        logging.info(f"Downloading {ticker} from {args.start_date} to {args.end_date}")
+        frames[ticker] = download_ticker_data(
+            ticker, start=args.start_date, end=args.end_date
+        )
+    common_dates = frames["QQQ"].index
+    for df in frames.values():
+        common_dates = common_dates.intersection(df.index)
+    return {ticker: df.loc[common_dates] for ticker, df in frames.items()}
+
+
+def calculate_vol_ratio(qqq_df, min_periods):
+    """ATR(20) / Close over its 252-day median as of the previous day"""
+    prev_close = qqq_df["Close"].shift(1)
+    tr = pd.concat(
+        [
+            qqq_df["High"] - qqq_df["Low"],
+            (qqq_df["High"] - prev_close).abs(),
+            (qqq_df["Low"] - prev_close).abs(),
+        ],
+        axis=1,
+    ).max(axis=1)
+    vol_raw = tr.rolling(window=ATR_WINDOW).mean() / qqq_df["Close"]
+    vol_median = (
+        vol_raw.rolling(window=MEDIAN_WINDOW, min_periods=min_periods).median().shift(1)
+    )
+    return vol_raw / vol_median
+
+
+def prepare_data(args, prices):
+    """Plain arrays shared by every worker"""
+    vol_ratio = calculate_vol_ratio(prices["QQQ"], MEDIAN_MIN_PERIODS[args.strategy])
+    alternate = prices.get(ALTERNATE_TICKER)
+    return {
+        "dates": prices["QQQ"].index.to_numpy(),
+        "vol_ratio": vol_ratio.to_numpy(dtype=float),
+        "qqq_close": prices["QQQ"]["Close"].to_numpy(dtype=float),
+        "tqqq_returns": prices["TQQQ"]["Close"].pct_change().to_numpy(dtype=float),
+        "alternate_returns": (
+            alternate["Close"].pct_change().to_numpy(dtype=float)
+            if alternate is not None
+            else np.zeros(len(vol_ratio))
+        ),
+        "first_valid": int(np.argmax(np.isfinite(vol_ratio.to_numpy()))),
+        "lag": 0 if args.same_day_exposure else 1,
+    }
+
+
+def walk_forward_folds(first_valid, n, train_years, test_years):
+    """(train, test) index ranges rolling forward by the test length"""
+    train = int(train_years * TRADING_DAYS)
+    test = int(test_years * TRADING_DAYS)
+    folds = []
+    start = first_valid
+    while start + train + test <= n:
+        folds.append(((start, start + train), (start + train, start + train + test)))
+        start += test
+    return folds
+
+
+def parse_levels(text):
+    return np.array([float(level) for level in text.split(",")])
+
+
+def bucket_exposure(params, data):
+    levels = parse_levels(params["exposure_levels"])
+    targets = exposure_buckets(data["vol_ratio"], params["low"], params["high"])
+    buckets, _, _ = hysteresis_buckets(targets, params["hysteresis_days"], len(levels))
+    return np.append(levels, np.nan)[buckets]
+
+
+def regime_exposure(params, data):
+    codes, _, _ = transition_regimes(
+        data["vol_ratio"],
+        data["qqq_close"],
+        [
+            params["calm_enter"],
+            params["normal_enter"],
+            params["stress_enter"],
+            params["panic_enter"],
+        ],
+        # PANIC is entered on the override only, so it has no persistence days
+        [params["calm_days"], params["normal_days"], params["stress_days"]],
+        params["panic_drop"],
+    )
+    return parse_levels(params["regime_exposure"])[codes]
+
+
+def strategy_returns(strategy, params, data):
+    """Daily returns of one combination, NaN where the exposure is unknown"""
+    if strategy == "buckets":
+        exposure = bucket_exposure(params, data)
+        alternate = data["alternate_returns"]
+    else:
+        exposure = regime_exposure(params, data)
+        alternate = np.zeros_like(exposure)
+
+    lag = data["lag"]
+    if lag:
+        exposure = np.concatenate([np.full(lag, np.nan), exposure[:-lag]])
+    return exposure * data["tqqq_returns"] + (1 - exposure) * alternate
+
+
+def performance(returns):
+    """CAGR, max drawdown and Sharpe as calculated by tqqq-vol-buckets.py"""
+    returns = returns[np.isfinite(returns)]
+    if len(returns) < 2:
+        return np.nan, np.nan, np.nan
+    equity = np.cumprod(1 + returns)
+    cagr = equity[-1] ** (TRADING_DAYS / len(returns)) - 1
+    running_max = np.maximum.accumulate(equity)
+    max_dd = ((equity - running_max) / running_max).min()
+    std = returns.std(ddof=1)
+    sharpe = returns.mean() * np.sqrt(TRADING_DAYS) / std if std > 0 else 0.0
+    return cagr, max_dd, sharpe
+
+
+def load_shared_data(data, folds):
+    """Worker initializer: keep the price arrays and folds for every task"""
+    global _data
+    _data = dict(data, folds=folds)
+
+
+def evaluate_combinations(strategy, combinations, objective):
+    """OOS metrics and per fold in-sample objective of each combination"""
+    objective_idx = METRICS.index(objective)
+    results = []
+    for params in combinations:
+        returns = strategy_returns(strategy, params, _data)
+        in_sample = [
+            performance(returns[train[0] : train[1]])[objective_idx]
+            for train, _ in _data["folds"]
+        ]
+        oos_returns = np.concatenate(
+            [returns[test[0] : test[1]] for _, test in _data["folds"]]
+        )
+        results.append(
+            (
+                {**params, **dict(zip(METRICS, performance(oos_returns)))},
+                in_sample,
+            )
+        )
+    return results
+
+
+def build_grid(args):
+    names = list(BUCKET_PARAMS if args.strategy == "buckets" else REGIME_PARAMS)
+    grid = [
+        dict(zip(names, values))
+        for values in itertools.product(*(getattr(args, name) for name in names))
+    ]
+    if args.strategy == "buckets":
+        return [p for p in grid if p["low"] < p["high"]]
+    return [
+        p
+        for p in grid
+        if p["calm_enter"] < p["normal_enter"] < p["stress_enter"] < p["panic_enter"]
+    ]
+
+
+def run_sweep(args, grid, data, folds):
+    # Compile the kernels once so the workers load them from the numba cache
+    strategy_returns(args.strategy, grid[0], data)
+
+    chunks = [
+        grid[i : i + COMBINATIONS_PER_TASK]
+        for i in range(0, len(grid), COMBINATIONS_PER_TASK)
+    ]
+    rows, in_sample = [], []
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=load_shared_data,
+        initargs=(data, folds),
+    ) as executor:
+        futures = [
+            executor.submit(evaluate_combinations, args.strategy, chunk, args.objective)
+            for chunk in chunks
+        ]
+        for completed, future in enumerate(futures, start=1):
+            for row, scores in future.result():
+                rows.append(row)
+                in_sample.append(scores)
+            logging.info(f"Completed {completed}/{len(chunks)} tasks")
+    return pd.DataFrame(rows), np.array(in_sample, dtype=float)
+
+
+def walk_forward(args, grid, data, folds, in_sample):
+    """Best in-sample combination of each fold and its out-of-sample result"""
+    # MaxDD is negative, so higher is better for every metric
+    scores = np.where(np.isfinite(in_sample), in_sample, -np.inf)
+    picks = scores.argmax(axis=0)
+
+    fold_rows, oos_returns = [], []
+    for fold, ((_, test), pick) in enumerate(zip(folds, picks)):
+        returns = strategy_returns(args.strategy, grid[pick], data)[test[0] : test[1]]
+        oos_returns.append(returns)
+        fold_rows.append(
+            {
+                "TestStart": pd.Timestamp(data["dates"][test[0]]).date(),
+                "TestEnd": pd.Timestamp(data["dates"][test[1] - 1]).date(),
+                **grid[pick],
+                f"IS_{args.objective}": in_sample[pick, fold],
+                **{f"OOS_{m}": v for m, v in zip(METRICS, performance(returns))},
+            }
+        )
+    return pd.DataFrame(fold_rows), performance(np.concatenate(oos_returns))
+
+
+def metric_surfaces(results, x, y):
+    return {
+        metric: results.pivot_table(index=y, columns=x, values=metric, aggfunc="median")
+        for metric in METRICS
+    }
+
+
+def plot_surfaces(surfaces, strategy, x, y):
+    fig, axes = plt.subplots(1, len(surfaces), figsize=(6 * len(surfaces), 5))
+    for ax, (metric, surface) in zip(axes, surfaces.items()):
+        image = ax.imshow(surface.to_numpy(), origin="lower", aspect="auto")
+        ax.set_xticks(range(len(surface.columns)), surface.columns, rotation=45)
+        ax.set_yticks(range(len(surface.index)), surface.index)
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+        ax.set_title(f"OOS {metric}")
+        fig.colorbar(image, ax=ax)
+    fig.suptitle(f"TQQQ vol {strategy} walk-forward surfaces")
+    plt.tight_layout()
+    plt.show()
+
+
+def main(args):
+    started = time.perf_counter()
+    data = prepare_data(args, load_prices(args))
+    folds = walk_forward_folds(
+        data["first_valid"], len(data["dates"]), args.train_years, args.test_years
+    )
+    if not folds:
+        raise ValueError("Not enough history for a single train/test fold")
+
+    grid = build_grid(args)
+    logging.info(
+        f"Running {len(grid)} combinations over {len(folds)} folds "
+        f"on {args.workers} workers"
+    )
+    results, in_sample = run_sweep(args, grid, data, folds)
+    swept = time.perf_counter()
+
+    ranked = results.sort_values(args.objective, ascending=False, ignore_index=True)
+    ranked.insert(0, "Rank", ranked.index + 1)
+    print(f"Top combinations by OOS {args.objective}:")
+    print(ranked.head(args.top).to_string(index=False))
+
+    fold_results, wf_metrics = walk_forward(args, grid, data, folds, in_sample)
+    print("\nWalk-forward picks:")
+    print(fold_results.to_string(index=False))
+    print(
+        "\nWalk-forward OOS: "
+        + ", ".join(f"{m} {v:.4f}" for m, v in zip(METRICS, wf_metrics))
+    )
+
+    if args.surface:
+        x, y = (name.replace("-", "_") for name in args.surface)
+        surfaces = metric_surfaces(results, x, y)
+        for metric, surface in surfaces.items():
+            print(f"\nOOS {metric} ({y} x {x}):")
+            print(surface.to_string())
+        if args.plot:
+            plot_surfaces(surfaces, args.strategy, x, y)
+
+    if args.output:
+        ranked.to_csv(args.output, index=False)
+        logging.info(f"Saved results to {args.output}")
+
+    print(
+        f"\n{len(grid)} combinations x {len(folds)} folds "
+        f"in {swept - started:.1f}s on {args.workers} workers"
+    )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging(args.verbose)
+    main(args)
@@ -3,6 +3,7 @@
 # dependencies = [
 #   "pandas",
 #   "numpy",
+#   "numba",
 #   "plotly",
 #   "yfinance",
 #   "persistent-cache@git+https://github.com/namuan/persistent-cache",
@@ -27,10 +28,13 @@ Usage:
 """
 
 import logging
+import os
+import sqlite3
 import subprocess
 import tempfile
 import time
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from contextlib import closing
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
@@ -40,8 +44,18 @@ import pandas as pd
 import plotly.graph_objects as go
 import schedule
 
-from common.market_data import download_ticker_data
+from common.market_data import download_ticker_data, output_dir
+from common.plotly_report import PlotlyReport
+from common.strategy_state import (
+    BAR_COLUMNS,
+    StrategyCheckpoint,
+    compare_results,
+    extend_bars,
+    load_checkpoint,
+    save_checkpoint,
+)
 from common.tele_notifier import send_message_to_telegram
+from common.vol_regimes import NORMAL, REGIME_NAMES, transition_regimes
 
 
 class Regime(Enum):
@@ -53,6 +67,9 @@ class Regime(Enum):
     PANIC = "PANIC"
 
 
+# Regimes by the int8 code of the state machine kernel
+REGIMES = np.array([Regime(name) for name in REGIME_NAMES], dtype=object)
+
 # Exposure allocation per regime
 EXPOSURE = {
     Regime.CALM: 1.00,
@@ -81,6 +98,12 @@ PERSISTENCE_DAYS = {
 PANIC_DAILY_DROP = -0.04
 PANIC_DAILY_DROP_PCT = PANIC_DAILY_DROP * 100
 
+# Bot checkpoint: daily runs advance the stored state by the new bars only and
+# rebuild it from the full history every FULL_RECOMPUTE_DAYS to verify it
+STATE_DB = "strategy_state.db"
+CHECKPOINT_NAME = "tqqq-vol-regimes"
+FULL_RECOMPUTE_DAYS = 30
+
 
 def is_weekday():
     """Check if today is a weekday (Monday-Friday)."""
@@ -222,75 +245,30 @@ def run_regime_state_machine(df, vol_ratio):
 
     Returns a series with the regime for each day.
     """
-    n = len(df)
-    regimes = [None] * n
-    current_state = Regime.NORMAL
-    days_condition_met = 0
+    regimes, _, _ = advance_regime_state_machine(df, vol_ratio)
+    return regimes
 
-    for i in range(n):
-        vr = vol_ratio.iloc[i]
 
-        # Calculate QQQ daily return
-        if i > 0:
-            qqq_ret = (df["Close"].iloc[i] / df["Close"].iloc[i - 1]) - 1
-        else:
-            qqq_ret = 0
-
-        # PANIC OVERRIDE (highest priority)
-        if vr >= VOL_THRESHOLDS["PANIC_ENTER"] or qqq_ret <= PANIC_DAILY_DROP:
-            current_state = Regime.PANIC
-            days_condition_met = 0
-            regimes[i] = current_state
-            continue
-
-        # STATE-SPECIFIC TRANSITION LOGIC
-        if current_state == Regime.PANIC:
-            if vr < VOL_THRESHOLDS["STRESS_ENTER"]:
-                days_condition_met += 1
-                if days_condition_met >= PERSISTENCE_DAYS[Regime.STRESS]:
-                    current_state = Regime.STRESS
-                    days_condition_met = 0
-            else:
-                days_condition_met = 0
-
-        elif current_state == Regime.STRESS:
-            if vr >= VOL_THRESHOLDS["PANIC_ENTER"]:
-                current_state = Regime.PANIC
-                days_condition_met = 0
-            elif vr < VOL_THRESHOLDS["NORMAL_ENTER"]:
-                days_condition_met += 1
-                if days_condition_met >= PERSISTENCE_DAYS[Regime.NORMAL]:
-                    current_state = Regime.NORMAL
-                    days_condition_met = 0
-            else:
-                days_condition_met = 0
-
-        elif current_state == Regime.NORMAL:
-            if vr >= VOL_THRESHOLDS["STRESS_ENTER"]:
-                days_condition_met += 1
-                if days_condition_met >= PERSISTENCE_DAYS[Regime.STRESS]:
-                    current_state = Regime.STRESS
-                    days_condition_met = 0
-            elif vr < VOL_THRESHOLDS["CALM_ENTER"]:
-                days_condition_met += 1
-                if days_condition_met >= PERSISTENCE_DAYS[Regime.CALM]:
-                    current_state = Regime.CALM
-                    days_condition_met = 0
-            else:
-                days_condition_met = 0
-
-        elif current_state == Regime.CALM:
-            if vr >= VOL_THRESHOLDS["NORMAL_ENTER"]:
-                days_condition_met += 1
-                if days_condition_met >= PERSISTENCE_DAYS[Regime.NORMAL]:
-                    current_state = Regime.NORMAL
-                    days_condition_met = 0
-            else:
-                days_condition_met = 0
-
-        regimes[i] = current_state
-
-    return pd.Series(regimes, index=df.index)
+def advance_regime_state_machine(
+    df, vol_ratio, state=NORMAL, count=0, prev_close=np.nan
+):
+    """
+    Run the regime state machine from the given regime code, persistence counter
+    and the close before the first day.
+
+    Returns (regime series, final regime code, final counter).
+    """
+    codes, state, count = transition_regimes(
+        vol_ratio.to_numpy(dtype=float),
+        df["Close"].to_numpy(dtype=float),
+        [VOL_THRESHOLDS[f"{regime.value}_ENTER"] for regime in REGIMES],
+        [PERSISTENCE_DAYS[regime] for regime in REGIMES],
+        PANIC_DAILY_DROP,
+        state,
+        count,
+        prev_close,
+    )
+    return pd.Series(REGIMES[codes], index=df.index), state, count
 
 
 def calculate_strategy_returns(tqqq_df, regimes):
@@ -612,6 +590,7 @@ def generate_html_report(
         temp_dir / f"tqqq_regime_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
     )
 
+    report = PlotlyReport()
     charts_html = []
 
     # Chart 1: Volatility Ratio
@@ -657,7 +636,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig1.to_html(full_html=False, include_plotlyjs="cdn"))
+    charts_html.append(report.figure_html(fig1))
 
     # Chart 2: Regime Over Time
     regime_colors = {
@@ -697,7 +676,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig2.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig2))
 
     # Chart 3: Exposure Over Time
     exposure_changes = exposure.diff() != 0
@@ -742,7 +721,7 @@ def generate_html_report(
         hovermode="x unified",
         yaxis=dict(range=[-5, 105]),
     )
-    charts_html.append(fig3.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig3))
 
     # Chart 4: Equity Curves (Log Scale)
     fig4 = go.Figure()
@@ -774,7 +753,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig4.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig4))
 
     # Chart 5: Drawdown Comparison
     strategy_dd = (equity - equity.cummax()) / equity.cummax() * 100
@@ -811,7 +790,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig5.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig5))
 
     # Chart 6: Rolling 1-Year Returns
     rolling_window = 252
@@ -857,7 +836,7 @@ def generate_html_report(
         height=500,
         hovermode="x unified",
     )
-    charts_html.append(fig6.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig6))
 
     # Chart 7: Regime Distribution
     regime_counts = regimes.value_counts()
@@ -887,7 +866,7 @@ def generate_html_report(
         template="plotly_white",
         height=500,
     )
-    charts_html.append(fig7.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig7))
 
     # Chart 8: Distribution of Daily Returns
     fig8 = go.Figure()
@@ -918,7 +897,7 @@ def generate_html_report(
         barmode="overlay",
         xaxis=dict(range=[-15, 15]),
     )
-    charts_html.append(fig8.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig8))
 
     # Chart 9: Monthly Returns Heatmap
     monthly_returns = strategy_returns.resample("ME").apply(
@@ -964,7 +943,7 @@ def generate_html_report(
         template="plotly_white",
         height=600,
     )
-    charts_html.append(fig9.to_html(full_html=False, include_plotlyjs=False))
+    charts_html.append(report.figure_html(fig9))
 
     # Calculate performance metrics
     total_years = len(strategy_returns) / 252
@@ -1043,6 +1022,7 @@ def generate_html_report(
 <html>
 <head>
     <title>TQQQ Volatility Regime Strategy Report</title>
+    {report.head_html()}
     <style>
         body {{
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
@@ -1277,6 +1257,70 @@ def run_analysis(start_date, end_date):
     )
 
 
+def build_results_df(vol_ratio, regimes):
+    """Daily regime output kept in the bot checkpoint."""
+    return pd.DataFrame(
+        {
+            "vol_ratio": vol_ratio,
+            "regime": regimes.map(lambda regime: regime.value),
+        }
+    )
+
+
+def full_checkpoint(qqq_df, vol_ratio, today):
+    """Build the bot checkpoint from the full history."""
+    regimes, state, count = advance_regime_state_machine(qqq_df, vol_ratio)
+    return StrategyCheckpoint(
+        CHECKPOINT_NAME,
+        state,
+        count,
+        pd.Timestamp(today),
+        qqq_df[BAR_COLUMNS],
+        build_results_df(vol_ratio, regimes),
+    )
+
+
+def advance_checkpoint(checkpoint, end_date):
+    """
+    Advance the checkpoint by the bars after its last date, downloading only
+    those and the last checkpointed one. Returns None when it can't be advanced.
+    """
+    if checkpoint.bars.index[-1] != checkpoint.last_date:
+        return None
+
+    qqq_df, _ = load_data(checkpoint.last_date.strftime("%Y-%m-%d"), end_date)
+    if qqq_df.empty:
+        return None
+
+    bars = extend_bars(checkpoint.bars, qqq_df)
+    if bars is None:
+        logging.warning("Downloaded QQQ bars disagree with the checkpoint")
+        return None
+
+    new_dates = bars.index[bars.index > checkpoint.last_date]
+    logging.info(f"Advancing checkpoint by {len(new_dates)} new bars")
+    if new_dates.empty:
+        return checkpoint
+
+    vol_ratio, _, _ = calculate_volatility_ratio(bars)
+    vol_ratio = vol_ratio.loc[new_dates]
+    regimes, state, count = advance_regime_state_machine(
+        bars.loc[new_dates],
+        vol_ratio,
+        checkpoint.state,
+        checkpoint.count,
+        bars["Close"].loc[checkpoint.last_date],
+    )
+    return StrategyCheckpoint(
+        checkpoint.name,
+        state,
+        count,
+        checkpoint.verified_at,
+        bars,
+        pd.concat([checkpoint.results, build_results_df(vol_ratio, regimes)]),
+    )
+
+
 def run_bot():
     """Run the daily update and send to Telegram."""
     if not is_weekday():
@@ -1289,13 +1333,35 @@ def run_bot():
     end_date = datetime.now().strftime("%Y-%m-%d")
     start_date = "2015-01-01"  # Use consistent start date for regime calculation
 
-    # Run analysis
-    (qqq_df, _, vol_ratio, _, _, regimes, _, _, _, exposure, _) = run_analysis(
-        start_date, end_date
-    )
+    with closing(sqlite3.connect(os.path.join(output_dir(), STATE_DB))) as conn:
+        previous = load_checkpoint(conn, CHECKPOINT_NAME)
+        checkpoint = None
+        if previous is not None and not previous.full_recompute_due(
+            end_date, FULL_RECOMPUTE_DAYS
+        ):
+            checkpoint = advance_checkpoint(previous, end_date)
+
+        if checkpoint is not None:
+            save_checkpoint(conn, checkpoint)
+        else:
+            # Run analysis
+            logging.info("Recomputing the full history")
+            qqq_df, _ = load_data(start_date, end_date)
+            vol_ratio, _, _ = calculate_volatility_ratio(qqq_df)
+            checkpoint = full_checkpoint(qqq_df, vol_ratio, end_date)
+            if previous is not None:
+                compare_results(
+                    previous.results, checkpoint.results, ["vol_ratio", "regime"]
+                )
+            save_checkpoint(conn, checkpoint, full=True)
+
+    regimes = checkpoint.results["regime"].map(Regime)
+    exposure = regimes.map(EXPOSURE)
 
     # Generate and send Telegram message
-    message = generate_telegram_message(vol_ratio, regimes, exposure, qqq_df)
+    message = generate_telegram_message(
+        checkpoint.results["vol_ratio"], regimes, exposure, checkpoint.bars
+    )
     send_message_to_telegram(message, format="Markdown")
     logging.info("Telegram message sent successfully")
 
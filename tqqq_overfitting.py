@@ -5,193 +5,135 @@
 #   "matplotlib",
 #   "numpy",
 #   "yfinance",
-#   "tqdm",
 # ]
 # ///
-# Credit: https://old.reddit.com/r/LETFs/comments/1il23ss/a_optimization_of_the_moving_average_buy_and_hold/
+"""
+Moving average filters on a leveraged NASDAQ index, and how much of their edge
+survives out of sample
+
+Every MA type x period holds the leveraged index on the days after the close is
+above the moving average, and cash otherwise. Besides the full-sample best period
+of each MA type, the grid is re-selected in a rolling walk-forward and in
+combinatorially purged cross-validation (CPCV). The out-of-sample Sharpe ratios of
+those selections and the probability of backtest overfitting (PBO) measure how
+much of the in-sample optimum is curve fitting.
+
+Each MA family is computed for all periods at once and the families run in a
+process pool.
+
+Credit: https://old.reddit.com/r/LETFs/comments/1il23ss/a_optimization_of_the_moving_average_buy_and_hold/
+
+Usage:
+./tqqq_overfitting.py -h
+./tqqq_overfitting.py -v
+./tqqq_overfitting.py --plot
+./tqqq_overfitting.py --ticker ^NDX --start 1990-01-01 --leverage 2
+./tqqq_overfitting.py --train-years 8 --test-years 2 --groups 8 --test-groups 2
+"""
+
+import logging
+import time
+from argparse import ArgumentParser, RawDescriptionHelpFormatter
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import yfinance
-from tqdm import tqdm
 
-# Fetch data
-ticker = "^IXIC"
-data = yfinance.download(ticker, start="1985-01-01")
-close = data["Close"]
-volume = data["Volume"]
+from common import ma_grid
+from common.logger import setup_logging
 
-# Calculate returns
-index_returns = close.pct_change()
 
-# Buy and Hold 3x ETF
-bnh_3x = (1 + 3 * index_returns).cumprod()
-bnh_3x.iloc[0] = 1
-
-
-# Moving Average Functions
-def sma(series, period):
-    return series.rolling(window=period).mean()
-
-
-def ema(series, period):
-    return series.ewm(span=period, adjust=False).mean()
-
-
-def wma(series, period):
-    weights = np.arange(1, period + 1)
-    return series.rolling(window=period).apply(
-        lambda x: np.sum(x * weights) / np.sum(weights), raw=True
+def parse_args():
+    parser = ArgumentParser(
+        description=__doc__, formatter_class=RawDescriptionHelpFormatter
     )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        dest="verbose",
+        help="Increase verbosity of logging output",
+    )
+    parser.add_argument(
+        "--ticker", default="^IXIC", help="Index to lever (default: ^IXIC)"
+    )
+    parser.add_argument(
+        "--start", default="1985-01-01", help="First day of data (default: 1985-01-01)"
+    )
+    parser.add_argument(
+        "--leverage", type=float, default=3.0, help="Daily leverage (default: 3)"
+    )
+    parser.add_argument(
+        "--periods",
+        type=int,
+        nargs=3,
+        default=[10, 200, 5],
+        metavar=("MIN", "MAX", "STEP"),
+        help="Moving average periods to search (default: 10 200 5)",
+    )
+    parser.add_argument(
+        "--train-years",
+        type=int,
+        default=10,
+        help="Walk-forward training window in years (default: 10)",
+    )
+    parser.add_argument(
+        "--test-years",
+        type=int,
+        default=1,
+        help="Walk-forward test window in years (default: 1)",
+    )
+    parser.add_argument(
+        "--groups",
+        type=int,
+        default=6,
+        help="CPCV groups the history is cut into (default: 6)",
+    )
+    parser.add_argument(
+        "--test-groups",
+        type=int,
+        default=2,
+        help="CPCV groups held out in each split (default: 2)",
+    )
+    parser.add_argument(
+        "--purge-days",
+        type=int,
+        default=5,
+        help="CPCV training days dropped before each test group (default: 5)",
+    )
+    parser.add_argument(
+        "--embargo-days",
+        type=int,
+        default=21,
+        help="CPCV training days dropped after each test group (default: 21)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes computing the MA families (default: CPU count)",
+    )
+    parser.add_argument(
+        "--plot",
+        action="store_true",
+        help="Plot the growth of $1 of the full-sample best filters",
+    )
+    return parser.parse_args()
 
 
-def hull_moving_average(series, period):
-    wma_half = wma(series, period // 2)
-    wma_full = wma(series, period)
-    hma = 2 * wma_half - wma_full
-    return hma.rolling(window=int(np.sqrt(period))).mean()
-
-
-def dema(series, period):
-    ema1 = ema(series, period)
-    ema2 = ema(ema1, period)
-    return 2 * ema1 - ema2
-
-
-def tema(series, period):
-    ema1 = ema(series, period)
-    ema2 = ema(ema1, period)
-    ema3 = ema(ema2, period)
-    return 3 * ema1 - 3 * ema2 + ema3
-
-
-def vwma(series, volume, period):
-    return (series * volume).rolling(window=period).sum() / volume.rolling(
-        window=period
-    ).sum()
-
-
-def zero_lag_ema(series, period):
-    lag = (period - 1) // 2
-    return ema(series, period) + (series - series.shift(lag))
-
-
-def alma(series, period, offset=0.85, sigma=6):
-    window = np.arange(1, period + 1)
-    weights = np.exp(-((window - offset * period) ** 2) / (2 * (sigma**2)))
-    weights /= np.sum(weights)
-    return series.rolling(window=period).apply(lambda x: np.sum(x * weights), raw=True)
-
-
-# Define strategies to optimize
-strategies_to_optimize = [
-    {"name": "SMA", "func": sma, "args": ()},
-    {"name": "EMA", "func": ema, "args": ()},
-    {"name": "WMA", "func": wma, "args": ()},
-    {"name": "HMA", "func": hull_moving_average, "args": ()},
-    {"name": "DEMA", "func": dema, "args": ()},
-    {"name": "TEMA", "func": tema, "args": ()},
-    {"name": "VWMA", "func": vwma, "args": (volume,)},
-    {"name": "ZLMA", "func": zero_lag_ema, "args": ()},
-    {"name": "ALMA", "func": alma, "args": ()},
-]
-
-# Grid search parameters
-periods = range(10, 201, 5)
-best_periods = {}
-
-# Perform grid search with progress bars
-for strategy in tqdm(strategies_to_optimize, desc="Optimizing strategies"):
-    name = strategy["name"]
-    func = strategy["func"]
-    args = strategy["args"]
-
-    best_sharpe = -np.inf
-    best_period = periods[0]  # Initialize with first valid period
-
-    for period in tqdm(periods, desc=f"{name} periods", leave=False):
-        try:
-            # Compute moving average
-            ma_series = func(close, *args, period)
-
-            # Generate signals
-            signal = (close > ma_series).astype(int).shift(1).fillna(0)
-
-            # Calculate strategy returns
-            strategy_returns = (1 + (signal * 3 * index_returns)).cumprod()
-
-            # Calculate Sharpe ratio
-            daily_returns = strategy_returns.pct_change().dropna()
-            if len(daily_returns) < 2:
-                continue  # Skip invalid returns
-
-            returns_np = daily_returns.to_numpy()
-            mean_return = np.mean(returns_np)
-            std_return = np.std(returns_np, ddof=1)
-
-            if np.abs(std_return) < 1e-9:
-                continue  # Avoid division by zero
-
-            sharpe = (mean_return / std_return) * np.sqrt(252)
-
-            # Update best period
-            if sharpe > best_sharpe and not np.isnan(sharpe):
-                best_sharpe = sharpe
-                best_period = period
-
-        except Exception:
-            continue
-
-    # Ensure valid integer conversion
-    best_periods[name] = int(best_period)
-
-# Recalculate strategies with best periods
-strategies_optimized = {"3x BNH": bnh_3x}
-
-for strategy in strategies_to_optimize:
-    name = strategy["name"]
-    func = strategy["func"]
-    args = strategy["args"]
-    best_period = int(best_periods[name])
-
-    # Compute MA with best period
-    ma_series = func(close, *args, best_period)
-
-    # Generate signals
-    signal = (close > ma_series).astype(int).shift(1).fillna(0)
-
-    # Calculate strategy returns
-    strategy_returns = (1 + (signal * 3 * index_returns)).cumprod()
-
-    strategies_optimized[f"3x {name} Filter"] = strategy_returns
-
-# Plotting
-plt.figure(figsize=(14, 7))
-for strategy_name, series in strategies_optimized.items():
-    if strategy_name == "3x BNH":
-        label = strategy_name
-    else:
-        base_name = strategy_name.split("3x ")[1].split(" Filter")[0]
-        best_period = best_periods[base_name]
-        label = f"{strategy_name} ({best_period})"
-    plt.plot(series, label=label)
-
-plt.yscale("log")
-plt.title("NASDAQ 3x Leveraged Strategies with Optimal Periods (1985–2023)")
-plt.xlabel("Year")
-plt.ylabel("Growth of $1")
-plt.legend()
-plt.show()
+def download_prices(ticker, start):
+    logging.info(f"Downloading {ticker} from {start}")
+    data = yfinance.download(ticker, start=start, progress=False)
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.xs(ticker, axis=1, level=1)
+    return data[["Close", "Volume"]].dropna(subset=["Close"])
 
 
 def calculate_metrics(series):
     """Calculate performance metrics for a given series."""
     try:
-        # Handle pandas Series/DataFrame input
-        if isinstance(series, pd.DataFrame):
-            series = series.iloc[:, 0]
-
         # Check valid data length
         if len(series) < 2 or series.dropna().empty:
             return (0.0, 0.0, 0.0, 0.0)
@@ -234,25 +176,174 @@ def calculate_metrics(series):
         return (0.0, 0.0, 0.0, 0.0)
 
 
-# Update metrics collection
-metrics = {}
-for strategy_name, series in strategies_optimized.items():
-    # Ensure we're working with a Series
-    if isinstance(series, pd.DataFrame):
-        series = series.iloc[:, 0]
-    metrics[strategy_name] = calculate_metrics(series)
-
-# Create and format DataFrame
-metrics_df = pd.DataFrame(
-    metrics, index=["CAGR (%)", "Max DD (%)", "Volatility (%)", "Sharpe"]
-).T
-
-metrics_df["Period"] = metrics_df.index.map(
-    lambda x: str(int(best_periods.get(x.split(" Filter")[0].split("3x ")[-1], "")))
-    if "Filter" in x
-    else ""
-)
-
-pd.set_option("display.float_format", "{:.2f}".format)
-print("\nOptimized Strategy Metrics:")
-print(metrics_df[["CAGR (%)", "Max DD (%)", "Volatility (%)", "Sharpe", "Period"]])
+def evaluation_masks(n_days, start, args):
+    """
+    Stack the full-sample, walk-forward and CPCV day masks into one array, with the
+    row indices of each set.
+    """
+    wf_train, wf_test = ma_grid.walk_forward_folds(
+        n_days,
+        start,
+        args.train_years * ma_grid.TRADING_DAYS,
+        args.test_years * ma_grid.TRADING_DAYS,
+    )
+    groups, cv_train, test_groups = ma_grid.cpcv_splits(
+        n_days, start, args.groups, args.test_groups, args.purge_days, args.embargo_days
+    )
+    full = (np.arange(n_days) >= start)[None, :]
+
+    blocks = {
+        "full": full,
+        "wf_train": wf_train,
+        "wf_test": wf_test,
+        "groups": groups,
+        "cv_train": cv_train,
+    }
+    index, offset = {}, 0
+    for name, block in blocks.items():
+        index[name] = np.arange(offset, offset + len(block))
+        offset += len(block)
+    return np.concatenate(list(blocks.values())), index, test_groups
+
+
+def optimised_curves(prices, best_periods, start, leverage):
+    """Growth of $1 of leveraged buy and hold and of each full-sample best filter"""
+    close = prices["Close"].to_numpy()
+    index_returns = prices["Close"].pct_change().to_numpy()
+    dates = prices.index[start - 1 :]
+
+    def growth(returns):
+        curve = np.cumprod(1 + returns[start:])
+        return pd.Series(np.concatenate([[1.0], curve]), index=dates)
+
+    curves = {"BNH": growth(leverage * np.nan_to_num(index_returns))}
+    for name, period in best_periods.items():
+        ma = ma_grid.moving_averages(name, close, prices["Volume"].to_numpy(), [period])
+        returns = ma_grid.signal_returns(close, ma, index_returns, leverage)[0]
+        curves[name] = growth(returns)
+    return curves
+
+
+def overfitting_table(moments, index, test_groups):
+    rows = {}
+    full_sharpe = moments.sharpe(index["full"])
+    for ma_type in moments.ma_types + ["All"]:
+        ma_types = None if ma_type == "All" else [ma_type]
+        if ma_type == "All":
+            t, p = np.unravel_index(np.nanargmax(full_sharpe), full_sharpe.shape)
+            best = f"{moments.ma_types[t]} {moments.periods[p]}"
+            is_sharpe = full_sharpe[t, p]
+        else:
+            sharpe = full_sharpe[moments.ma_types.index(ma_type)]
+            best = str(moments.periods[np.nanargmax(sharpe)])
+            is_sharpe = np.nanmax(sharpe)
+
+        wf = ma_grid.walk_forward(
+            moments, index["wf_train"], index["wf_test"], ma_types
+        )
+        cv = ma_grid.cpcv(
+            moments, index["groups"], index["cv_train"], test_groups, ma_types
+        )
+        rows[ma_type] = {
+            "Best": best,
+            "IS Sharpe": is_sharpe,
+            "WF OOS Sharpe": wf.stitched_sharpe,
+            "WF Picks": len(set(wf.chosen)),
+            "CPCV IS Sharpe": np.nanmean(cv.is_sharpe),
+            "CPCV OOS Sharpe": np.nanmean(cv.oos_sharpe),
+            "Path Min": np.nanmin(cv.path_sharpe),
+            "Path Max": np.nanmax(cv.path_sharpe),
+            "PBO (%)": cv.pbo * 100,
+        }
+    return pd.DataFrame(rows).T
+
+
+def strategy_label(name, leverage):
+    return f"{leverage:g}x {name}" if name == "BNH" else f"{leverage:g}x {name} Filter"
+
+
+def plot_curves(curves, best_periods, ticker, leverage):
+    plt.figure(figsize=(14, 7))
+    for name, series in curves.items():
+        label = strategy_label(name, leverage)
+        if name in best_periods:
+            label = f"{label} ({best_periods[name]})"
+        plt.plot(series, label=label)
+
+    first, last = curves["BNH"].index[[0, -1]]
+    plt.yscale("log")
+    plt.title(
+        f"{ticker} Leveraged Strategies with Optimal Periods ({first.year}–{last.year})"
+    )
+    plt.xlabel("Year")
+    plt.ylabel("Growth of $1")
+    plt.legend()
+    plt.show()
+
+
+def main(args):
+    prices = download_prices(args.ticker, args.start)
+    low, high, step = args.periods
+    periods = np.arange(low, high + 1, step)
+    start = ma_grid.warmup_days(periods)
+    n_days = len(prices)
+    if n_days <= start + args.train_years * ma_grid.TRADING_DAYS:
+        raise ValueError(
+            f"{n_days} days of {args.ticker} are too few for a {start} day warm-up "
+            f"and a {args.train_years} year training window"
+        )
+
+    masks, index, test_groups = evaluation_masks(n_days, start, args)
+    started = time.perf_counter()
+    moments = ma_grid.grid_moments(
+        prices["Close"].to_numpy(),
+        prices["Volume"].to_numpy(),
+        prices["Close"].pct_change().to_numpy(),
+        periods,
+        masks,
+        leverage=args.leverage,
+        workers=args.workers,
+    )
+    logging.info(
+        f"Evaluated {len(moments.ma_types) * len(periods)} filters over "
+        f"{len(masks)} day masks in {time.perf_counter() - started:.2f}s"
+    )
+
+    full_sharpe = moments.sharpe(index["full"])
+    best_periods = {
+        name: int(periods[np.nanargmax(sharpe)])
+        for name, sharpe in zip(moments.ma_types, full_sharpe)
+    }
+    curves = optimised_curves(prices, best_periods, start, args.leverage)
+
+    metrics_df = pd.DataFrame(
+        {
+            strategy_label(name, args.leverage): calculate_metrics(series)
+            for name, series in curves.items()
+        },
+        index=["CAGR (%)", "Max DD (%)", "Volatility (%)", "Sharpe"],
+    ).T
+    metrics_df["Period"] = [str(best_periods.get(name, "")) for name in curves]
+
+    pd.set_option("display.float_format", "{:.2f}".format)
+    print(f"\nOptimized Strategy Metrics (from {prices.index[start].date()}):")
+    print(metrics_df[["CAGR (%)", "Max DD (%)", "Volatility (%)", "Sharpe", "Period"]])
+
+    n_paths = len(ma_grid.cpcv_paths(args.groups, test_groups))
+    print(
+        f"\nOut-of-sample Sharpe ratios: walk-forward {args.train_years}y train / "
+        f"{args.test_years}y test ({len(index['wf_test'])} folds), CPCV "
+        f"{args.groups} groups, {args.test_groups} held out ({len(test_groups)} "
+        f"splits, {n_paths} paths, purge {args.purge_days}d, embargo "
+        f"{args.embargo_days}d):"
+    )
+    print(overfitting_table(moments, index, test_groups).to_string())
+
+    if args.plot:
+        plot_curves(curves, best_periods, args.ticker, args.leverage)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging(args.verbose)
+    main(args)
@@ -4,7 +4,6 @@
 #   "pandas",
 #   "numpy",
 #   "requests",
-#   "persistent-cache@git+https://github.com/namuan/persistent-cache",
 #   "matplotlib",
 #   "plotly",
 #   "arch",
@@ -15,6 +14,8 @@ Compute the historical volatility of 2-Year US Treasury yields (DGS2)
 and compare across maturities (2Y / 5Y / 10Y / 30Y).
 
 Data source: FRED public CSV endpoint (no API key required for DGS-series).
+Observations are cached in --cache-db; after the first run only the days since
+the last cached observation are downloaded, at most every 12 hours.
 
 Outputs (in the specified --out-dir, or a temp dir by default):
   - 2y_vol_summary.txt         : text summary of current snapshot
@@ -30,54 +31,41 @@ Usage:
 ./treasury_vol.py -vv       # DEBUG
 ./treasury_vol.py --no-plot # skip chart generation (text output only)
 ./treasury_vol.py --open    # open interactive HTML in default browser
+./treasury_vol.py --refresh # check FRED for new observations now
 """
 
+import hashlib
 import logging
+import sqlite3
 import sys
 import tempfile
 import webbrowser
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from importlib.util import find_spec
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
 
-# Optional but standard
-try:
-    import matplotlib
-
-    matplotlib.use("Agg")  # headless
-    import matplotlib.pyplot as plt
-
-    HAS_MPL = True
-except ImportError:  # pragma: no cover
-    HAS_MPL = False
+# Optional but standard. They are imported where they are used: arch, matplotlib
+# and plotly take seconds to import, longer than a cached --no-plot run.
+HAS_MPL = find_spec("matplotlib") is not None
+if not HAS_MPL:  # pragma: no cover
     logging.warning("matplotlib not available — skipping plots")
 
-try:
-    import plotly.graph_objects as go
-
-    HAS_PLOTLY = True
-except ImportError:  # pragma: no cover
-    HAS_PLOTLY = False
+HAS_PLOTLY = find_spec("plotly") is not None
+if not HAS_PLOTLY:  # pragma: no cover
     logging.warning("plotly not available — skipping interactive charts")
 
-try:
-    from arch import arch_model
-
-    HAS_ARCH = True
-except ImportError:  # pragma: no cover
-    HAS_ARCH = False
+HAS_ARCH = find_spec("arch") is not None
+if not HAS_ARCH:  # pragma: no cover
     logging.warning("arch not available — skipping GARCH(1,1)")
 
-# Caching to be polite to FRED (and faster on re-runs)
-try:
-    from persistent_cache import persistent_cache
-
-    HAS_CACHE = True
-except ImportError:  # pragma: no cover
-    HAS_CACHE = False
-    logging.warning("persistent_cache not available — fetching live every run")
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 
 # --------------------------------------------------------------------------- #
@@ -85,74 +73,191 @@ except ImportError:  # pragma: no cover
 # --------------------------------------------------------------------------- #
 
 FRED_BASE = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+CACHE_DB = Path("output/treasury_vol.db")
+OBSERVATIONS_TABLE = "fred_observations"
+SERIES_TABLE = "fred_series"
+GARCH_TABLE = "garch_params"
+# FRED publishes the DGS series once a business day
+REFRESH_HOURS = 12
+# Re-download the last few cached days so revised observations are picked up
+REFRESH_OVERLAP_DAYS = 7
 
 
-def fetch_fred_series(series_id: str) -> pd.Series:
+def fetch_fred_series(series_id: str, start: pd.Timestamp | None = None) -> pd.Series:
     """Fetch a FRED series (e.g. DGS2) as a pandas Series indexed by date.
 
     FRED's public CSV endpoint does not require an API key. Missing values
-    are returned as the string '.' and are dropped here.
+    are returned as the string '.' and are dropped here. With start only the
+    observations from that date on are requested.
     """
+    import shutil
+    import subprocess
+    from io import StringIO
+
     url = f"{FRED_BASE}?id={series_id}"
+    if start is not None:
+        url += f"&cosd={start:%Y-%m-%d}"
     logging.info("Fetching %s from FRED …", series_id)
 
-    def _do_fetch():
-        import shutil
-        import subprocess
-        from io import StringIO
+    if not shutil.which("curl"):
+        raise RuntimeError("curl not found on PATH")
 
-        if not shutil.which("curl"):
-            raise RuntimeError("curl not found on PATH")
+    # curl handles the (sometimes long-running) FRED download more reliably
+    # than python-requests in some network environments.
+    last_err = None
+    for attempt, timeout in enumerate([60, 120, 180], start=1):
+        try:
+            logging.debug("  curl attempt %d (timeout=%ds)", attempt, timeout)
+            result = subprocess.run(
+                [
+                    "curl",
+                    "-sS",
+                    "--max-time",
+                    str(timeout),
+                    url,  # no -L, no custom User-Agent (both triggered HTTP/2 issues)
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            if not result.stdout.strip():
+                raise RuntimeError("empty response from FRED")
+            df = pd.read_csv(StringIO(result.stdout), parse_dates=["observation_date"])
+            # FRED marks missing as empty string (or legacy '.') — drop both
+            df = df[
+                df[series_id].notna() & (df[series_id] != ".") & (df[series_id] != "")
+            ].copy()
+            df[series_id] = pd.to_numeric(df[series_id])
+            df = df.set_index("observation_date")[series_id].sort_index()
+            df.name = series_id
+            logging.info("  → %s: %d rows", series_id, len(df))
+            return df
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            last_err = e
+            logging.warning("  curl attempt %d failed: %s", attempt, e)
+    raise RuntimeError(
+        f"Failed to fetch {series_id} from FRED after 3 attempts"
+    ) from last_err
+
+
+def create_cache_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {OBSERVATIONS_TABLE} (
+            series_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (series_id, date)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SERIES_TABLE} (
+            series_id TEXT PRIMARY KEY,
+            checked_at TEXT NOT NULL
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {GARCH_TABLE} (
+            name TEXT PRIMARY KEY,
+            data_key TEXT NOT NULL,
+            omega REAL NOT NULL,
+            alpha REAL NOT NULL,
+            beta REAL NOT NULL
+        )
+    """)
 
-        # curl handles the (sometimes long-running) FRED download more reliably
-        # than python-requests in some network environments.
-        last_err = None
-        for attempt, timeout in enumerate([60, 120, 180], start=1):
-            try:
-                logging.debug("  curl attempt %d (timeout=%ds)", attempt, timeout)
-                result = subprocess.run(
-                    [
-                        "curl",
-                        "-sS",
-                        "--max-time",
-                        str(timeout),
-                        url,  # no -L, no custom User-Agent (both triggered HTTP/2 issues)
-                    ],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                if not result.stdout.strip():
-                    raise RuntimeError("empty response from FRED")
-                df = pd.read_csv(
-                    StringIO(result.stdout), parse_dates=["observation_date"]
-                )
-                # FRED marks missing as empty string (or legacy '.') — drop both
-                df = df[
-                    df[series_id].notna()
-                    & (df[series_id] != ".")
-                    & (df[series_id] != "")
-                ].copy()
-                df[series_id] = pd.to_numeric(df[series_id])
-                df = df.set_index("observation_date")[series_id].sort_index()
-                df.name = series_id
-                return df
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-                last_err = e
-                logging.warning("  curl attempt %d failed: %s", attempt, e)
-        raise RuntimeError(
-            f"Failed to fetch {series_id} from FRED after 3 attempts"
-        ) from last_err
-
-    if HAS_CACHE:
-        df = persistent_cache(_do_fetch, key=f"fred-{series_id}", expire=24 * 60 * 60)
-    else:
-        df = _do_fetch()
 
-    logging.info(
-        "  → %d rows, %s → %s", len(df), df.index.min().date(), df.index.max().date()
+def load_cached_series(conn: sqlite3.Connection, series_id: str) -> pd.Series:
+    df = pd.read_sql_query(
+        f"SELECT date, value FROM {OBSERVATIONS_TABLE} WHERE series_id = ? "
+        "ORDER BY date",
+        conn,
+        params=(series_id,),
+        parse_dates=["date"],
     )
-    return df
+    series = df.set_index("date")["value"].rename_axis(None)
+    series.name = series_id
+    return series
+
+
+def _refresh_start(conn: sqlite3.Connection, series_id: str, force: bool):
+    """(due, start) of the next FRED download of series_id.
+
+    A series checked within REFRESH_HOURS is not due. Otherwise only the days
+    from REFRESH_OVERLAP_DAYS before the last cached observation are requested,
+    or the full history when nothing is cached yet.
+    """
+    checked_at, last_date = conn.execute(
+        f"SELECT (SELECT checked_at FROM {SERIES_TABLE} WHERE series_id = ?), "
+        f"(SELECT MAX(date) FROM {OBSERVATIONS_TABLE} WHERE series_id = ?)",
+        (series_id, series_id),
+    ).fetchone()
+    if last_date is None:
+        return True, None
+    age = pd.Timestamp.now() - pd.Timestamp(checked_at)
+    due = force or age > pd.Timedelta(hours=REFRESH_HOURS)
+    return due, pd.Timestamp(last_date) - pd.Timedelta(days=REFRESH_OVERLAP_DAYS)
+
+
+def store_observations(
+    conn: sqlite3.Connection, series_id: str, series: pd.Series
+) -> None:
+    rows = zip(
+        [series_id] * len(series),
+        series.index.strftime("%Y-%m-%d"),
+        series.to_numpy(dtype=float).tolist(),
+    )
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {OBSERVATIONS_TABLE} VALUES (?, ?, ?)", rows
+        )
+        conn.execute(
+            f"INSERT OR REPLACE INTO {SERIES_TABLE} VALUES (?, ?)",
+            (series_id, pd.Timestamp.now().isoformat(timespec="seconds")),
+        )
+
+
+def cached_fred_series(
+    conn: sqlite3.Connection, series_ids: list[str], refresh: bool = False
+) -> dict[str, pd.Series]:
+    """Every series in series_ids from the local cache, downloading new observations.
+
+    Due series are downloaded concurrently, each from just before its last cached
+    observation. When a download fails the cached history is used if there is one.
+    """
+    create_cache_tables(conn)
+    starts = {}
+    for sid in series_ids:
+        due, start = _refresh_start(conn, sid, refresh)
+        if due:
+            starts[sid] = start
+
+    if starts:
+
+        def download(sid):
+            try:
+                return fetch_fred_series(sid, starts[sid])
+            except RuntimeError:
+                if starts[sid] is None:
+                    raise
+                logging.warning("Using cached %s, FRED refresh failed", sid)
+                return None
+
+        with ThreadPoolExecutor(max_workers=len(starts)) as executor:
+            fresh = dict(zip(starts, executor.map(download, starts)))
+        for sid, series in fresh.items():
+            if series is not None:
+                store_observations(conn, sid, series)
+
+    out = {sid: load_cached_series(conn, sid) for sid in series_ids}
+    for sid, series in out.items():
+        logging.info(
+            "  %s: %d rows, %s → %s",
+            sid,
+            len(series),
+            series.index.min().date(),
+            series.index.max().date(),
+        )
+    return out
 
 
 # --------------------------------------------------------------------------- #
@@ -160,82 +265,190 @@ def fetch_fred_series(series_id: str) -> pd.Series:
 # --------------------------------------------------------------------------- #
 
 TRADING_DAYS = 252
+VOL_WINDOWS = [21, 63, 126, 252, 504, 1260]
+
 
+def rolling_vol_cube(changes: np.ndarray, windows: list[int]) -> np.ndarray:
+    """Rolling annualized vol (in pp) of every window × series at once.
 
-def annualized_vol(series_pp: pd.Series, window: int) -> pd.Series:
-    """Rolling annualized vol (in percentage points) from a series of pp changes."""
-    return series_pp.rolling(window, min_periods=window).std(ddof=1) * np.sqrt(
-        TRADING_DAYS
+    changes is a (days × series) array of daily pp changes; the result is
+    (windows × days × series). One pass of cumulative sums of x and x² serves
+    every window. As with rolling(window, min_periods=window).std(), a window
+    holding a missing change is NaN.
+    """
+    x = np.asarray(changes, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    valid = np.isfinite(x)
+    # Centred changes keep the sum-of-squares difference well conditioned
+    x = np.where(valid, x - np.nanmean(x, axis=0), 0.0)
+    zero = np.zeros((1, x.shape[1]))
+    sums = np.concatenate([zero, np.cumsum(x, axis=0)])
+    squares = np.concatenate([zero, np.cumsum(x * x, axis=0)])
+    counts = np.concatenate([zero, np.cumsum(valid, axis=0)])
+
+    w = np.asarray(windows)[:, None]
+    ends = np.arange(1, len(x) + 1)[None, :]
+    starts = np.maximum(ends - w, 0)
+    n = counts[ends] - counts[starts]
+    s1 = sums[ends] - sums[starts]
+    s2 = squares[ends] - squares[starts]
+
+    w = w[:, :, None]
+    var = np.maximum(s2 - s1 * s1 / w, 0.0) / (w - 1)
+    return np.where(n == w, np.sqrt(var * TRADING_DAYS), np.nan)
+
+
+def rolling_vols(
+    changes: pd.DataFrame, windows: list[int] | None = None
+) -> pd.DataFrame:
+    """Rolling annualized vol (in bps) with (window, maturity) columns."""
+    if windows is None:
+        windows = VOL_WINDOWS
+    cube = rolling_vol_cube(changes.to_numpy(), windows) * 100
+    columns = pd.MultiIndex.from_product(
+        [windows, changes.columns], names=["window", "maturity"]
+    )
+    return pd.DataFrame(
+        cube.transpose(1, 0, 2).reshape(len(changes), -1),
+        index=changes.index,
+        columns=columns,
     )
 
 
+def term_structure(vols: pd.DataFrame, window: int = 252) -> dict:
+    """Latest vol (in bps) of each maturity over window."""
+    return vols[window].iloc[-1].to_dict()
+
+
 def ewma_vol(series_pp: pd.Series, lam: float = 0.94) -> pd.Series:
     """RiskMetrics-style exponentially weighted vol (in pp)."""
     var = series_pp.pow(2).ewm(alpha=1 - lam, adjust=False).mean()
     return np.sqrt(var) * np.sqrt(TRADING_DAYS)
 
 
-def snapshot_realized(df: pd.Series, garch_bps: float | None = None) -> dict:
-    """Compute headline realized vol numbers for the most recent windows."""
+def snapshot_realized(
+    df: pd.Series, vols: pd.DataFrame, garch_bps: float | None = None
+) -> dict:
+    """Compute headline realized vol numbers for the most recent windows.
+
+    vols holds the rolling vols (in bps) of df by window, as in rolling_vols.
+    """
     chg = df.diff().dropna()
+    latest = vols.iloc[-1]
     out = {
         "current_yield_pct": float(df.iloc[-1]),
         "as_of": df.index[-1].date().isoformat(),
-        "realized_21d_bps": float(annualized_vol(chg, 21).iloc[-1] * 100),
-        "realized_63d_bps": float(annualized_vol(chg, 63).iloc[-1] * 100),
-        "realized_252d_bps": float(annualized_vol(chg, 252).iloc[-1] * 100),
-        "realized_1260d_bps": float(annualized_vol(chg, 1260).iloc[-1] * 100),
+        "realized_21d_bps": float(latest[21]),
+        "realized_63d_bps": float(latest[63]),
+        "realized_252d_bps": float(latest[252]),
+        "realized_1260d_bps": float(latest[1260]),
         "ewma_bps": float(ewma_vol(chg).iloc[-1] * 100),
         "garch_bps": garch_bps,
     }
     return out
 
 
-def garch_conditional_vol(series_pp: pd.Series) -> pd.Series | None:
+def _garch_data_key(y: pd.Series) -> str:
+    return hashlib.sha256(np.ascontiguousarray(y.to_numpy())).hexdigest()
+
+
+def garch_variance(y: np.ndarray, omega: float, alpha: float, beta: float):
+    """Conditional variance of a zero-mean GARCH(1,1), started like arch does.
+
+    The squared change and variance before the first day are backcast with an
+    exponentially weighted mean of the first 75 squared changes.
+    """
+    y2 = np.square(np.asarray(y, dtype=float))
+    tau = min(75, len(y2))
+    weights = 0.94 ** np.arange(tau)
+    backcast = float(np.sum(y2[:tau] * weights / weights.sum()))
+
+    sigma2 = np.empty(len(y2))
+    prev_y2, prev_sigma2 = backcast, backcast
+    for t, value in enumerate(y2.tolist()):
+        prev_sigma2 = omega + alpha * prev_y2 + beta * prev_sigma2
+        sigma2[t] = prev_sigma2
+        prev_y2 = value
+    return sigma2
+
+
+def garch_conditional_vol(
+    series_pp: pd.Series, conn: sqlite3.Connection | None = None, name: str = "2Y"
+) -> pd.Series | None:
     """Fit GARCH(1,1) to daily yield changes (in bps) and return conditional vol.
 
     Conditional vol here is the *one-period-ahead* daily standard deviation
     (in bps), annualized via sqrt(252).  Uses Normal innovations for speed;
     switch to 't' if you want fatter tails.
+
+    With conn the fitted parameters are cached under name: unchanged data
+    reuses them without refitting, new data starts the fit from them.
     """
     if not HAS_ARCH:
         return None
     # Work in bps — GARCH is much more stable in higher-magnitude units
     y = series_pp.dropna() * 100
-    am = arch_model(y, mean="Zero", vol="GARCH", p=1, q=1, dist="normal")
-    res = am.fit(disp="off", show_warning=False)
-    cond_daily = res.conditional_volatility  # in bps
+    data_key = _garch_data_key(y)
+    cached = None
+    if conn is not None:
+        create_cache_tables(conn)
+        cached = conn.execute(
+            f"SELECT data_key, omega, alpha, beta FROM {GARCH_TABLE} WHERE name = ?",
+            (name,),
+        ).fetchone()
+
+    if cached is not None and cached[0] == data_key:
+        logging.info("  GARCH parameters unchanged, reusing the cached fit")
+        params = cached[1:]
+    else:
+        from arch import arch_model
+
+        am = arch_model(y, mean="Zero", vol="GARCH", p=1, q=1, dist="normal")
+        starting_values = None if cached is None else np.array(cached[1:])
+        res = am.fit(disp="off", show_warning=False, starting_values=starting_values)
+        params = tuple(float(v) for v in res.params[["omega", "alpha[1]", "beta[1]"]])
+        logging.info(
+            "  GARCH fit in %d iterations%s",
+            res.optimization_result.nit,
+            "" if cached is None else " from the cached parameters",
+        )
+        if conn is not None:
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {GARCH_TABLE} VALUES (?, ?, ?, ?, ?)",
+                    (name, data_key, *params),
+                )
+
+    cond_daily = np.sqrt(garch_variance(y.to_numpy(), *params))  # in bps
     cond_ann = cond_daily * np.sqrt(TRADING_DAYS)
-    cond_ann.index = series_pp.dropna().index
-    return cond_ann
+    return pd.Series(cond_ann, index=y.index)
 
 
-def vol_cone(series_pp: pd.Series, windows: list[int] | None = None) -> pd.DataFrame:
+def vol_cone(vols: pd.DataFrame) -> pd.DataFrame:
     """Compute a 'vol cone': percentiles of historical vol at multiple windows.
 
+    vols holds rolling vols (in bps) of one series by window, as in rolling_vols.
     Returns a DataFrame indexed by window, with min / 5th / 25th / 50th / 75th
     / 95th / max annualized vol (in bps).  This gives regime context:
     "is today's vol historically high or low?"
     """
-    if windows is None:
-        windows = [21, 63, 126, 252, 504, 1260]
-    rows = []
-    for w in windows:
-        v = annualized_vol(series_pp, w).dropna() * 100  # bps
-        rows.append(
-            {
-                "window_days": w,
-                "min": v.min(),
-                "p05": v.quantile(0.05),
-                "p25": v.quantile(0.25),
-                "p50": v.quantile(0.50),
-                "p75": v.quantile(0.75),
-                "p95": v.quantile(0.95),
-                "max": v.max(),
-                "current": v.iloc[-1] if len(v) else np.nan,
-            }
-        )
-    return pd.DataFrame(rows).set_index("window_days")
+    values = vols.to_numpy()
+    p05, p25, p50, p75, p95 = np.nanpercentile(values, [5, 25, 50, 75, 95], axis=0)
+    cone = pd.DataFrame(
+        {
+            "min": np.nanmin(values, axis=0),
+            "p05": p05,
+            "p25": p25,
+            "p50": p50,
+            "p75": p75,
+            "p95": p95,
+            "max": np.nanmax(values, axis=0),
+            "current": vols.ffill().iloc[-1].to_numpy(),
+        },
+        index=pd.Index(vols.columns, name="window_days"),
+    )
+    return cone
 
 
 def yield_change_quantiles(series_pp: pd.Series) -> dict:
@@ -283,18 +496,18 @@ MATURITIES = {
 }
 
 
-def build_panel() -> pd.DataFrame:
-    """Fetch every maturity and join into one DataFrame of yields."""
-    frames = {}
-    for label, sid in MATURITIES.items():
-        frames[label] = fetch_fred_series(sid)
-    panel = pd.concat(frames.values(), axis=1, join="inner")
-    panel.columns = list(frames.keys())
+def build_panel(conn: sqlite3.Connection, refresh: bool = False) -> pd.DataFrame:
+    """Load every maturity from the FRED cache and join into one DataFrame of yields."""
+    series = cached_fred_series(conn, list(MATURITIES.values()), refresh=refresh)
+    panel = pd.concat(
+        [series[sid] for sid in MATURITIES.values()], axis=1, join="inner"
+    )
+    panel.columns = list(MATURITIES)
     return panel
 
 
 def make_text_summary(
-    panel: pd.DataFrame,
+    vols: pd.DataFrame,
     snap_2y: dict,
     cone: pd.DataFrame,
     quantiles: dict,
@@ -319,9 +532,7 @@ def make_text_summary(
     lines.append("")
     lines.append("Term structure of 1Y historical vol (bps)")
     lines.append("-" * 60)
-    for m in MATURITIES:
-        chg = panel[m].diff().dropna()
-        v = annualized_vol(chg, 252).iloc[-1] * 100
+    for m, v in term_structure(vols).items():
         lines.append(f"  {m:>3}: {v:6.1f} bps")
     lines.append("")
     lines.append("Vol cone — current 1Y reading vs history")
@@ -377,7 +588,7 @@ def make_text_summary(
     return "\n".join(lines)
 
 
-def make_plots(panel: pd.DataFrame, cone: pd.DataFrame, out_dir: Path) -> list[Path]:
+def make_plots(vols: pd.DataFrame, cone: pd.DataFrame, out_dir: Path) -> list[Path]:
     """Generate static (matplotlib) charts.
 
     - 2y_vol_timeseries.png  : rolling 63d vol for all maturities
@@ -387,13 +598,16 @@ def make_plots(panel: pd.DataFrame, cone: pd.DataFrame, out_dir: Path) -> list[P
     if not HAS_MPL:
         return []
 
+    import matplotlib
+
+    matplotlib.use("Agg")  # headless
+    import matplotlib.pyplot as plt
+
     out = []
 
     # --- Plot 1: Rolling 63d vol time series for all maturities --- #
     fig, ax = plt.subplots(figsize=(11, 5.5))
-    for m in MATURITIES:
-        chg = panel[m].diff()
-        v63 = annualized_vol(chg, 63) * 100
+    for m, v63 in vols[63].items():
         ax.plot(v63.index, v63.values, label=m, linewidth=1.2)
     ax.set_title("63-Day Rolling Annualized Volatility of US Treasury Yields")
     ax.set_ylabel("Annualized vol (bps)")
@@ -407,10 +621,7 @@ def make_plots(panel: pd.DataFrame, cone: pd.DataFrame, out_dir: Path) -> list[P
     out.append(p)
 
     # --- Plot 2: Term structure of vol snapshot --- #
-    snap = {
-        m: annualized_vol(panel[m].diff().dropna(), 252).iloc[-1] * 100
-        for m in MATURITIES
-    }
+    snap = term_structure(vols)
     fig, ax = plt.subplots(figsize=(7, 4.5))
     ax.bar(
         list(snap.keys()),
@@ -459,11 +670,12 @@ def make_plots(panel: pd.DataFrame, cone: pd.DataFrame, out_dir: Path) -> list[P
     return out
 
 
-def _build_timeseries_fig(panel: pd.DataFrame, garch: pd.Series | None) -> "go.Figure":
+def _build_timeseries_fig(vols: pd.DataFrame, garch: pd.Series | None) -> "go.Figure":
+    import plotly.graph_objects as go
+
     fig = go.Figure()
     for m, color in zip(MATURITIES, ["#1f77b4", "#2ca02c", "#ff7f0e", "#d62728"]):
-        chg = panel[m].diff()
-        v63 = annualized_vol(chg, 63) * 100
+        v63 = vols[(63, m)]
         fig.add_trace(
             go.Scatter(
                 x=v63.index,
@@ -495,11 +707,10 @@ def _build_timeseries_fig(panel: pd.DataFrame, garch: pd.Series | None) -> "go.F
     return fig
 
 
-def _build_term_structure_fig(panel: pd.DataFrame) -> "go.Figure":
-    snap = {
-        m: annualized_vol(panel[m].diff().dropna(), 252).iloc[-1] * 100
-        for m in MATURITIES
-    }
+def _build_term_structure_fig(vols: pd.DataFrame) -> "go.Figure":
+    import plotly.graph_objects as go
+
+    snap = term_structure(vols)
     fig = go.Figure(
         data=[
             go.Bar(
@@ -522,6 +733,8 @@ def _build_term_structure_fig(panel: pd.DataFrame) -> "go.Figure":
 
 
 def _build_cone_fig(cone: pd.DataFrame) -> "go.Figure":
+    import plotly.graph_objects as go
+
     x_labels = [f"{w}d" for w in cone.index]
     fig = go.Figure()
     fig.add_trace(
@@ -579,30 +792,17 @@ def _build_cone_fig(cone: pd.DataFrame) -> "go.Figure":
 def _combine_html(figs: list[tuple[str, "go.Figure"]], as_of: str) -> str:
     """Combine multiple plotly figures into one self-contained HTML page.
 
-    Each figure is rendered as a <div> with `include_plotlyjs=False` so we
-    only embed the Plotly runtime once. Uses Plotly's HTML postMessage API
-    to inject the figures into placeholder divs.
+    The Plotly runtime and the layout template shared by the charts are inlined
+    once in the <head>; each chart is a <div> with its own Plotly.newPlot call,
+    long series downsampled and stored as float32 typed arrays.
     """
-    # Use Plotly's new_plotly.to_html with postMessage graphs that we wire
-    # together. The cleanest portable approach: generate a div with
-    # Plotly.newPlot(...) calls in a single <script>.
-    parts = []
-    div_ids = []
-    for i, (title, fig) in enumerate(figs):
-        div_id = f"chart-{i}"
-        div_ids.append(div_id)
-        parts.append(
-            f'<section><h2>{title}</h2><div id="{div_id}" class="chart"></div></section>'
-        )
+    from common.plotly_report import PlotlyReport
 
-    # Build the JS payload: one inline Plotly.newPlot call per chart.
-    plot_calls = []
-    for i, (_title, fig) in enumerate(figs):
-        # `to_json` gives a Figure object; we wrap in Plotly.newPlot at runtime.
-        plot_calls.append(
-            f"Plotly.newPlot('{div_ids[i]}', {fig.to_json()}, {{responsive: true}});"
-        )
-    plotly_init = "\n".join(plot_calls)
+    report = PlotlyReport(plotlyjs="inline")
+    parts = [
+        f'<section><h2>{title}</h2><div class="chart">{report.figure_html(fig)}</div></section>'
+        for title, fig in figs
+    ]
 
     return f"""<!DOCTYPE html>
 <html lang="en">
@@ -622,6 +822,7 @@ def _combine_html(figs: list[tuple[str, "go.Figure"]], as_of: str) -> str:
   section h2 {{ font-size: 1.15em; margin: 0 0 8px 0; color: #333; }}
   .chart {{ width: 100%; min-height: 360px; }}
 </style>
+{report.head_html()}
 </head>
 <body>
   <header>
@@ -629,16 +830,13 @@ def _combine_html(figs: list[tuple[str, "go.Figure"]], as_of: str) -> str:
     <div class="meta">As of {as_of}. Historical vol does not predict future moves.</div>
   </header>
   {''.join(parts)}
-  <script>
-{plotly_init}
-  </script>
 </body>
 </html>
 """
 
 
 def make_plotly_charts(
-    panel: pd.DataFrame,
+    vols: pd.DataFrame,
     cone: pd.DataFrame,
     garch: pd.Series | None,
     out_dir: Path,
@@ -655,8 +853,8 @@ def make_plotly_charts(
 
     out: list[Path] = []
 
-    fig_ts = _build_timeseries_fig(panel, garch)
-    fig_term = _build_term_structure_fig(panel)
+    fig_ts = _build_timeseries_fig(vols, garch)
+    fig_term = _build_term_structure_fig(vols)
     fig_cone = _build_cone_fig(cone)
 
     figs = [
@@ -666,31 +864,10 @@ def make_plotly_charts(
     ]
 
     if combined:
-        # Build the page manually so we control layout and embed plotly.js once.
-        as_of = panel.index[-1].date().isoformat()
-        # Get the inline plotly.js bundle so the page is fully self-contained
+        # Build the page manually so we control layout and embed plotly.js once
         # (no internet / CDN required to view).
-        try:
-            from plotly.offline import get_plotlyjs
-
-            plotlyjs_src = get_plotlyjs()
-        except ImportError:
-            plotlyjs_src = None
-            logging.warning("Could not load plotly.js bundle; falling back to CDN")
-
-        # Get the page body (sections + init script)
-        body = _combine_html(figs, as_of)
-
-        if plotlyjs_src is not None:
-            page = body.replace(
-                "</head>", f"<script>{plotlyjs_src}</script>\n</head>", 1
-            )
-        else:
-            page = body.replace(
-                "</head>",
-                '<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>\n</head>',
-                1,
-            )
+        as_of = vols.index[-1].date().isoformat()
+        page = _combine_html(figs, as_of)
 
         p = out_dir / "2y_vol_dashboard.html"
         p.write_text(page)
@@ -751,6 +928,17 @@ def parse_args():
         default=None,
         help="Directory to write outputs (default: a temporary directory)",
     )
+    parser.add_argument(
+        "--cache-db",
+        type=Path,
+        default=CACHE_DB,
+        help=f"SQLite file caching FRED observations and GARCH fits (default: {CACHE_DB})",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help=f"Check FRED for new observations even if checked in the last {REFRESH_HOURS}h",
+    )
     parser.add_argument(
         "--open",
         action="store_true",
@@ -767,26 +955,32 @@ def main(args):
         logging.info("Using temporary output directory: %s", args.out_dir)
     args.out_dir.mkdir(parents=True, exist_ok=True)
 
-    panel = build_panel()
-    logging.info("Panel: %d rows × %d maturities", len(panel), panel.shape[1])
-
-    # Per-column daily changes
-    changes = panel.diff()  # in pp
-
-    # ----- GARCH(1,1) conditional vol for the 2Y --- #
-    garch_series: pd.Series | None = None
-    garch_current_bps: float | None = None
-    if HAS_ARCH:
-        logging.info("Fitting GARCH(1,1) on 2Y daily changes …")
-        garch_series = garch_conditional_vol(changes["2Y"])
-        if garch_series is not None and len(garch_series):
-            garch_current_bps = float(garch_series.iloc[-1])
-            logging.info("  GARCH current: %.1f bps", garch_current_bps)
-    else:
-        logging.warning("Skipping GARCH — arch package unavailable")
+    args.cache_db.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(args.cache_db)) as conn:
+        panel = build_panel(conn, refresh=args.refresh)
+        logging.info("Panel: %d rows × %d maturities", len(panel), panel.shape[1])
+
+        # Per-column daily changes
+        changes = panel.diff()  # in pp
+
+        # ----- GARCH(1,1) conditional vol for the 2Y --- #
+        garch_series: pd.Series | None = None
+        garch_current_bps: float | None = None
+        if HAS_ARCH:
+            logging.info("Fitting GARCH(1,1) on 2Y daily changes …")
+            garch_series = garch_conditional_vol(changes["2Y"], conn)
+            if garch_series is not None and len(garch_series):
+                garch_current_bps = float(garch_series.iloc[-1])
+                logging.info("  GARCH current: %.1f bps", garch_current_bps)
+        else:
+            logging.warning("Skipping GARCH — arch package unavailable")
+
+    # ----- Rolling vol of every window × maturity, in bps --- #
+    vols = rolling_vols(changes)
+    vols_2y = vols.xs("2Y", axis=1, level="maturity")
 
     # ----- Vol cone for the 2Y --- #
-    cone = vol_cone(changes["2Y"].dropna())
+    cone = vol_cone(vols_2y)
     logging.info("Vol cone:\n%s", cone.round(1).to_string())
 
     # ----- Tail-risk quantiles for the 2Y --- #
@@ -799,9 +993,8 @@ def main(args):
     for m in MATURITIES:
         derived[f"{m}_yield_pct"] = panel[m]
         derived[f"{m}_change_pp"] = changes[m]
-        derived[f"{m}_vol_21d_bps"] = annualized_vol(changes[m], 21) * 100
-        derived[f"{m}_vol_63d_bps"] = annualized_vol(changes[m], 63) * 100
-        derived[f"{m}_vol_252d_bps"] = annualized_vol(changes[m], 252) * 100
+        for w in (21, 63, 252):
+            derived[f"{m}_vol_{w}d_bps"] = vols[(w, m)]
     derived[f"2Y_ewma_bps"] = ewma_vol(changes["2Y"].dropna()) * 100
     if garch_series is not None:
         # Align GARCH to the daily-change index
@@ -812,11 +1005,11 @@ def main(args):
     logging.info("Wrote %s", out_csv)
 
     # Headline 2Y snapshot
-    snap_2y = snapshot_realized(panel["2Y"], garch_bps=garch_current_bps)
+    snap_2y = snapshot_realized(panel["2Y"], vols_2y, garch_bps=garch_current_bps)
     logging.info("2Y snapshot: %s", snap_2y)
 
     # Text summary
-    summary = make_text_summary(panel, snap_2y, cone, quantiles)
+    summary = make_text_summary(vols, snap_2y, cone, quantiles)
     print(summary)
     out_txt = args.out_dir / "2y_vol_summary.txt"
     out_txt.write_text(summary + "\n")
@@ -824,7 +1017,7 @@ def main(args):
 
     # Plots
     if not args.no_plot:
-        for p in make_plots(panel, cone, args.out_dir):
+        for p in make_plots(vols, cone, args.out_dir):
             logging.info("Wrote %s", p)
 
         # HTML: optional temp dir if --open, otherwise the regular out_dir
@@ -835,7 +1028,7 @@ def main(args):
             html_dir = Path(html_temp_ctx.name)
             logging.info("Writing HTML to temp dir: %s", html_dir)
 
-        for p in make_plotly_charts(panel, cone, garch_series, html_dir):
+        for p in make_plotly_charts(vols, cone, garch_series, html_dir):
             logging.info("Wrote %s", p)
 
         if args.open_browser and HAS_PLOTLY:
@@ -4,6 +4,7 @@
 #   "pandas",
 #   "matplotlib",
 #   "numpy",
+#   "scipy",
 #   "highlight_text",
 #   "yfinance",
 #   "persistent-cache@git+https://github.com/namuan/persistent-cache",
@@ -21,11 +22,20 @@ Usage:
 ./vol-surface.py -v # To log INFO messages
 ./vol-surface.py -vv # To log DEBUG messages
 ./vol-surface.py -d 60 # To analyze options expiring within 60 days
+./vol-surface.py -r 0.045 # Solve implied volatility with a 4.5% risk-free rate
+./vol-surface.py --yahoo-iv # Plot the implied volatility reported by Yahoo Finance
+./vol-surface.py --svi # Fit an SVI slice per expiry and plot the smooth surface, skew and term structure
+
+SVI fits are cached in --cache-db by ticker and time of the latest trade in the chain,
+so running again while the market is closed reuses them.
 """
 
 import datetime as dt
 import logging
+import sqlite3
 from argparse import ArgumentParser
+from contextlib import closing
+from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -34,6 +44,8 @@ import yfinance as yf
 from matplotlib.colors import LinearSegmentedColormap
 
 from common import RawTextWithDefaultsFormatter
+from common.black_scholes import implied_volatility
+from common.vol_surface import cached_svi_surface, otm_quotes
 
 # Plot constants
 FIGURE_SIZE = (12, 8)
@@ -51,6 +63,10 @@ LEGEND_CALL_COLOR = "darkgreen"
 LEGEND_PUT_COLOR = "darkred"
 LEGEND_PRICE_COLOR = PRICE_PLANE_COLOR
 
+# SVI plot constants
+SVI_STRIKE_POINTS = 100
+SVI_DELTAS = {"25Δ Put": -0.25, "ATM": 0.5, "25Δ Call": 0.25}
+
 
 def setup_logging(verbosity):
     logging_level = logging.WARNING
@@ -95,6 +111,29 @@ def parse_args():
         default=30,
         help="Maximum days to expiration to analyze",
     )
+    parser.add_argument(
+        "-r",
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Risk-free rate used to solve implied volatility",
+    )
+    parser.add_argument(
+        "--yahoo-iv",
+        action="store_true",
+        help="Plot the implied volatility reported by Yahoo Finance instead of solving it",
+    )
+    parser.add_argument(
+        "--svi",
+        action="store_true",
+        help="Fit an SVI slice per expiry and plot the fitted surface",
+    )
+    parser.add_argument(
+        "--cache-db",
+        type=Path,
+        default=Path("output/vol_surface_svi.db"),
+        help="SQLite file caching the SVI fits",
+    )
     return parser.parse_args()
 
 
@@ -132,6 +171,147 @@ def option_chains(ticker_data, max_days):
     return chains
 
 
+def solve_implied_volatility(chains, current_price, rate):
+    """Replace Yahoo's implied volatility with one solved from the mid (or last) price"""
+    now = dt.datetime.today()
+    mid = (chains["bid"] + chains["ask"]) / 2
+    prices = mid.where((chains["bid"] > 0) & (chains["ask"] > 0), chains["lastPrice"])
+    years = (chains["expiration"] - now).dt.total_seconds() / (365 * 24 * 60 * 60)
+
+    iv, converged = implied_volatility(
+        prices.to_numpy(),
+        current_price,
+        chains["strike"].to_numpy(),
+        years.to_numpy(),
+        rate,
+        is_call=(chains["optionType"] == "call").to_numpy(),
+    )
+    logging.info(
+        f"Solved implied volatility for {converged.sum()}/{len(chains)} contracts, "
+        "keeping Yahoo's value for the rest"
+    )
+
+    chains = chains.copy()
+    chains["impliedVolatility"] = np.where(converged, iv, chains["impliedVolatility"])
+    return chains
+
+
+def quote_time(options):
+    """Time of the latest trade in the chain, to the minute"""
+    if "lastTradeDate" not in options:
+        return pd.Timestamp.now().floor("min")
+    return pd.to_datetime(options["lastTradeDate"], utc=True).max().floor("min")
+
+
+def svi_quotes(options, current_price, rate):
+    """Out of the money quotes of each expiry in the layout fit_svi_surface expects"""
+    now = dt.datetime.today()
+    frames = []
+    for expiration, chain in options.groupby("expiration"):
+        years = (expiration - now).total_seconds() / (365 * 24 * 60 * 60)
+        forward = current_price * np.exp(rate * years)
+        by_strike = chain.pivot_table(
+            values="impliedVolatility", index="strike", columns="optionType"
+        ).reindex(columns=["call", "put"])
+        strikes, ivs = otm_quotes(
+            by_strike.reset_index(), "strike", "call", "put", forward
+        )
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Expiration": expiration.strftime("%Y-%m-%d"),
+                    "Years": years,
+                    "Forward": forward,
+                    "Strike": strikes,
+                    "IV": ivs,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def fit_surface(options, symbol, current_price, rate, yahoo_iv, cache_db):
+    # Fits also depend on the IV source and the expiries requested
+    iv_source = "yahoo" if yahoo_iv else f"rate={rate:g}"
+    last_expiry = options["expiration"].max().strftime("%Y-%m-%d")
+    cache_db.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(cache_db)) as conn:
+        return cached_svi_surface(
+            conn,
+            f"{symbol} {iv_source} to {last_expiry}",
+            quote_time(options),
+            lambda: svi_quotes(options, current_price, rate),
+        )
+
+
+def svi_summary(surface):
+    """IV at fixed deltas of every slice with risk reversal and butterfly"""
+    rows = []
+    for svi in surface:
+        ivs = dict(zip(SVI_DELTAS, svi.iv_at_delta(list(SVI_DELTAS.values()))))
+        rows.append(
+            {
+                "Expiration": svi.expiration,
+                "Days": svi.years * 365,
+                **ivs,
+                "RiskReversal": ivs["25Δ Call"] - ivs["25Δ Put"],
+                "Butterfly": (ivs["25Δ Call"] + ivs["25Δ Put"]) / 2 - ivs["ATM"],
+                "FitRMSE(w)": svi.rmse,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def plot_svi_surface(surface, options, symbol, current_price):
+    logging.info("Creating SVI surface plot")
+    summary = svi_summary(surface)
+    strikes = np.linspace(
+        options["strike"].min(), options["strike"].max(), SVI_STRIKE_POINTS
+    )
+    days = summary["Days"].to_numpy()
+    ivs = np.column_stack([svi.iv_at_strike(strikes) for svi in surface])
+
+    fig = plt.figure(figsize=FIGURE_SIZE)
+    ax = fig.add_subplot(111, projection="3d")
+    X, Y = np.meshgrid(days, strikes)
+    ax.plot_surface(X, Y, ivs, cmap="viridis", edgecolor="none", alpha=SURFACE_ALPHA)
+    xx, zz = np.meshgrid([days.min(), days.max()], [0, ivs.max()])
+    ax.plot_surface(
+        xx,
+        np.full_like(xx, current_price),
+        zz,
+        color=PRICE_PLANE_COLOR,
+        alpha=PRICE_PLANE_ALPHA,
+    )
+    ax.set_xlabel("Days to expiration")
+    ax.set_ylabel("Strike price")
+    ax.set_zlabel("Implied volatility")
+    ax.set_title(f"{symbol} SVI Implied Volatility Surface")
+    ax.view_init(elev=PLOT_VIEW_ELEVATION, azim=PLOT_VIEW_AZIMUTH)
+
+    fig, (skew_ax, term_ax) = plt.subplots(1, 2, figsize=FIGURE_SIZE)
+    for svi, svi_days in zip(surface, days):
+        skew_ax.plot(strikes, svi.iv_at_strike(strikes), label=f"{svi_days:.0f}d")
+    skew_ax.axvline(current_price, color=PRICE_PLANE_COLOR, linestyle="--", lw=1)
+    skew_ax.set_title("Skew by Expiry")
+    skew_ax.set_xlabel("Strike price")
+    skew_ax.set_ylabel("Implied volatility")
+    skew_ax.legend(fontsize=FOOTNOTE_FONTSIZE)
+    skew_ax.grid(True)
+
+    for label in SVI_DELTAS:
+        term_ax.plot(days, summary[label], marker="o", label=label)
+    term_ax.set_title("Term Structure")
+    term_ax.set_xlabel("Days to expiration")
+    term_ax.set_ylabel("Implied volatility")
+    term_ax.legend()
+    term_ax.grid(True)
+
+    plt.tight_layout()
+    logging.info("Displaying plot")
+    plt.show()
+
+
 def plot_volatility_surface(options, symbol, current_price):
     logging.info("Creating volatility surface plot")
 
@@ -228,7 +408,16 @@ def main(args):
     current_price = (asset.info["bid"] + asset.info["ask"]) / 2
     logging.info(f"Current price for {ticker}: ${current_price:.2f}")
     options = option_chains(asset, args.days)
-    plot_volatility_surface(options, ticker, current_price)
+    if not args.yahoo_iv:
+        options = solve_implied_volatility(options, current_price, args.rate)
+    if args.svi:
+        surface = fit_surface(
+            options, ticker, current_price, args.rate, args.yahoo_iv, args.cache_db
+        )
+        print(svi_summary(surface).to_string(index=False))
+        plot_svi_surface(surface, options, ticker, current_price)
+    else:
+        plot_volatility_surface(options, ticker, current_price)
 
 
 if __name__ == "__main__":